@@ -25,8 +25,11 @@ import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -119,7 +122,6 @@ def change_bios_password():
     
 def create_bios_config_job():
     global job_id
-    global start_time
     url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs' % idrac_ip
     payload = {"TargetSettingsURI":"/redfish/v1/Systems/System.Embedded.1/Bios/Settings"}
     if args["x"]:
@@ -139,26 +141,22 @@ def create_bios_config_job():
     job_id_search = re.search("JID_.+?,",create_dict).group()
     job_id = re.sub("[,']","",job_id_search)
     logging.info("- INFO: %s job ID successfully created" % job_id)
-    start_time = datetime.now()
 
 def check_schedule_job_status():
-    while True:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        if response.status_code != 200:
-            logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(req.json()))
-            sys.exit(0)
-        time.sleep(10)
-        data = response.json()
-        if data['Message'] == "Task successfully scheduled.":
-            logging.info("- PASS, %s job id successfully scheduled, rebooting the server to apply config changes" % job_id)
-            break
-        else:
-            logging.info("- INFO: job status not scheduled, current status: %s" % data['Message'])
-            time.sleep(5)
+    def job_status_update(status):
+        if status.message != "Task successfully scheduled.":
+            logging.info("- INFO: job status not scheduled, current status: %s" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=10), until=lambda data: data.get("Message") == "Task successfully scheduled.", on_update=job_status_update)
+    if status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.timed_out:
+        logging.error("- FAIL, job ID %s not marked as scheduled within 10 minutes, current status: %s" % (job_id, status.message))
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    logging.info("- PASS, %s job id successfully scheduled, rebooting the server to apply config changes" % job_id)
                                                                           
 def reboot_server():
     if args["x"]:
@@ -191,11 +189,11 @@ def reboot_server():
             else:
                 response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time >= "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 if args["x"]:
@@ -254,31 +252,22 @@ def reboot_server():
 
 def check_job_status_final():
     if args["type"] == "1":
-        logging.info("\n- INFO, BIOS system password config job detected. If setting new or changing BIOS system password, server will halt during POST prompting to enter password. System password must be entered for POST to complete, mark the job completed\n") 
-    while True:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        current_time = (datetime.now()-start_time)
-        if response.status_code != 200:
-            logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(req.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "0:50:00":
-            logging.error("\n- FAIL: Timeout of 50 minutes has been hit, script stopped\n")
-            sys.exit(0)
-        elif "Fail" in data['Message'] or "fail" in data['Message']:
-            logging.error("- FAIL: %s failed" % job_id)
-            sys.exit(0)
-        elif data['Message'] == "Job completed successfully.":
-            logging.info("\n- Final detailed job results -\n")
-            pprint(data)
-            break
-        else:
-            logging.info("- INFO, job status not complete, current status: \"%s\"" % data['Message'])
-            time.sleep(30)
+        logging.info("\n- INFO, BIOS system password config job detected. If setting new or changing BIOS system password, server will halt during POST prompting to enter password. System password must be entered for POST to complete, mark the job completed\n")
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job status not complete, current status: \"%s\"" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=50), until=lambda data: "fail" in data.get("Message", "").lower() or data.get("Message") == "Job completed successfully.", on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 50 minutes has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: %s failed" % job_id)
+        sys.exit(0)
+    logging.info("\n- Final detailed job results -\n")
+    pprint(status.data)
             
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -289,7 +278,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -299,6 +288,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
                 verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
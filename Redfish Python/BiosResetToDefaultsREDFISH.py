@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
@@ -25,8 +24,10 @@ import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -123,11 +124,11 @@ def reboot_server():
             else:
                 response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time >= "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 if args["x"]:
@@ -193,7 +194,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -203,6 +204,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
                 verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
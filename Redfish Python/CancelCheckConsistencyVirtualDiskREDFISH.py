@@ -16,17 +16,18 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
 import requests
 import sys
-import time
 import warnings
 
-from datetime import datetime
+from datetime import timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -170,7 +171,6 @@ def cancel_check_consistency():
         sys.exit(0)
 
 def loop_job_status():
-    start_time = datetime.now()
     if args["x"]:
         response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
     else:
@@ -180,31 +180,22 @@ def loop_job_status():
         logging.info("- PASS, staged jid \"%s\" successfully created. Server will now reboot to apply the configuration changes" % job_id)
     elif data['JobType'] == "RealTimeNoRebootConfiguration":
         logging.info("- PASS, realtime jid \"%s\" successfully created. Server will apply the configuration changes in real time, no server reboot needed" % job_id)
-    while True:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        current_time = (datetime.now()-start_time)
-        if response.status_code != 200:
-            logging.error("\n- FAIL, GET command failed to check job status, return code is %s" % statusCode)
-            logging.error("Extended Info Message: {0}".format(req.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "2:00:00":
-            logging.error("\n- FAIL: Timeout of 2 hours has been hit, script stopped\n")
-            sys.exit(0)
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed":
-            logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, data['Message']))
-            sys.exit(0)
-        elif data['JobState'] == "Completed":
-            logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
-            for i in data.items():
-                pprint(i)
-            break
-        else:
-            logging.info("- INFO, job status not completed, current status: \"%s\"" % data['Message'])
-            time.sleep(10)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job status not completed, current status: \"%s\"" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(hours=2), until=lambda data: "fail" in data.get("Message", "").lower(), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 2 hours has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, GET command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
+    for i in status.data.items():
+        pprint(i)
             
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -215,7 +206,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -225,6 +216,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
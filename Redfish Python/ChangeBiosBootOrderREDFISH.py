@@ -17,7 +17,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
@@ -26,8 +25,11 @@ import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -128,34 +130,20 @@ def change_boot_order():
     logging.info("- PASS, job ID \"%s\" successfully created to change %s boot order sequence" % (job_id, current_boot_mode))
     
 def get_job_status_scheduled():
-    count = 0
-    while True:
-        if count == 5:
-            logging.error("- FAIL, GET job status retry count of 5 has been reached, script will exit")
-            sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.error(error_message)
-            logging.info("\n- INFO, GET request will try again to poll job status")
-            time.sleep(5)
-            count += 1
-            continue
-        if response.status_code == 200:
-            time.sleep(5)
-        else:
-            logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(response.json()))
-            sys.exit(0)
-        data = response.json()
-        if data['Message'] == "Task successfully scheduled.":
-            logging.info("- INFO, staged config job marked as scheduled")
-            break
-        else:
-            logging.info("- INFO: job status not scheduled, current status: %s\n" % data['Message'])                                                       
+    def job_status_update(status):
+        if status.message != "Task successfully scheduled.":
+            logging.info("- INFO: job status not scheduled, current status: %s\n" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=10), until=lambda data: data.get("Message") == "Task successfully scheduled.", on_update=job_status_update)
+    if status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.timed_out:
+        logging.error("- FAIL, job ID %s not marked as scheduled within 10 minutes, current status: %s" % (job_id, status.message))
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    logging.info("- INFO, staged config job marked as scheduled")
 
 def reboot_server():
     if args["x"]:
@@ -188,11 +176,11 @@ def reboot_server():
             else:
                 response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time >= "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 if args["x"]:
@@ -250,37 +238,22 @@ def reboot_server():
         sys.exit(0)
 
 def loop_job_status_final():
-    start_time = datetime.now()
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
-    while True:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        current_time = (datetime.now()-start_time)
-        if response.status_code != 200:
-            logging.error("\n- FAIL, GET command failed to check job status, return code is %s" % statusCode)
-            logging.error("Extended Info Message: {0}".format(req.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "2:00:00":
-            logging.error("\n- FAIL: Timeout of 2 hours has been hit, script stopped\n")
-            sys.exit(0)
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed":
-            logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, data['Message']))
-            sys.exit(0)
-        elif data['JobState'] == "Completed":
-            logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
-            for i in data.items():
-                pprint(i)
-            break
-        else:
-            logging.info("- INFO, job status not completed, current status: \"%s\"" % data['Message'])
-            time.sleep(30)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job status not completed, current status: \"%s\"" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(hours=2), until=lambda data: "fail" in data.get("Message", "").lower(), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 2 hours has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, GET command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
+    for i in status.data.items():
+        pprint(i)
 
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -291,7 +264,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -301,6 +274,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -27,6 +27,7 @@ import warnings
 
 from datetime import datetime
 from pprint import pprint
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -114,7 +115,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -17,7 +17,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import requests
@@ -26,6 +25,8 @@ import time
 import warnings
 
 from pprint import pprint
+from IdracRedfishSupport.token_cache import delete_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -38,6 +39,7 @@ parser.add_argument('--script-examples', help='Get executing script examples', a
 parser.add_argument('--create', help='Create X-auth token session', action="store_true", required=False)
 parser.add_argument('--get-sessions', help='Get iDRAC sessions information. You must also use argument -u and -p', dest="get_sessions", action="store_true", required=False)
 parser.add_argument('--delete', help='Delete X-auth-token session or any iDRAC session, pass in the session ID.', required=False)
+parser.add_argument('--delete-cached-token', help='Delete X-auth token cached for the iDRAC user (-ip and -u) and its iDRAC session. Redfish scripts cache X-auth token per iDRAC user and reuse it across script runs until it expires.', action="store_true", dest="delete_cached_token", required=False)
 
 args=vars(parser.parse_args())
 logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
@@ -45,7 +47,8 @@ logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
 def script_examples():
     print("""\n- CreateXAuthTokenSessionREDFISH.py -ip 192.168.0.120 -u root -p calvin --get, this example will get current iDRAC sessions information.
     \n- CreateXAuthTokenSessionREDFISH.py -ip 192.168.0.120 -u root --create, this example will first prompt to enter user password, then create X auth token session for iDRAC.
-    \n- CreateXAuthTokenSessionREDFISH.py -ip 192.168.0.120 -u root -p calvin --delete 28, this example will delete iDRAC session ID 28.""")
+    \n- CreateXAuthTokenSessionREDFISH.py -ip 192.168.0.120 -u root -p calvin --delete 28, this example will delete iDRAC session ID 28.
+    \n- CreateXAuthTokenSessionREDFISH.py -ip 192.168.0.120 -u root -p calvin --delete-cached-token, this example will delete X-auth token cached for iDRAC user root and its iDRAC session.""")
     sys.exit(0)
     
 def get_redfish_version():
@@ -120,6 +123,12 @@ def create_x_auth_session():
     for i in response.headers.items():
         print("%s: %s" % (i[0],i[1]))
 
+def delete_cached_x_auth_session():
+    if delete_cached_x_auth_token(idrac_ip, idrac_username, verify_cert):
+        logging.info("\n- PASS, successfully deleted cached X-auth token for iDRAC %s user %s" % (idrac_ip, idrac_username))
+    else:
+        logging.warning("\n- WARNING, no cached X-auth token detected for iDRAC %s user %s" % (idrac_ip, idrac_username))
+
 def delete_x_auth_session():
     url = 'https://%s/%s/%s' % (idrac_ip, session_uri, args["delete"])
     try:
@@ -144,7 +153,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -164,5 +173,7 @@ if __name__ == "__main__":
         get_session_info_using_username_password()
     elif args["delete"]:
         delete_x_auth_session()
+    elif args["delete_cached_token"]:
+        delete_cached_x_auth_session()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
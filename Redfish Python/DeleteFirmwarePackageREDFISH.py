@@ -18,7 +18,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
@@ -27,6 +26,9 @@ import sys
 import time
 import warnings
 
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+
 warnings.filterwarnings("ignore")
 
 parser = argparse.ArgumentParser(description='Python script using Redfish API to either get AVAILABLE entries for delete, get ETag for the AVAILABLE entry or DELETE the AVAILABLE downloaded package')
@@ -186,7 +188,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -196,6 +198,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -16,20 +16,19 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
-import platform
 import re
 import requests
-import subprocess
 import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -136,105 +135,62 @@ def rollback_fw():
         sys.exit(0)
 
 def check_job_status():
-    retry_count = 1
-    while True:
-        check_idrac_connection()
-        if retry_count == 20:
-            logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
-            sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.info("- INFO, GET request failed due to connection error, retry")
-            time.sleep(10)
-            retry_count += 1
-            continue
-        data = response.json()
-        current_time = str(datetime.now()-start_time)[0:7]   
-        message_string = data["Messages"]
-        if response.status_code == 200 or response.status_code == 202:
-            time.sleep(1)
-        else:
-            logging.error("\n- ERROR, GET request failed to get job ID details, status code %s returned, error: \n%s" % (response.status_code, data))
-            sys.exit(0)
-        if data["TaskState"] == "Completed" and data["Oem"]["Dell"]["JobState"]:
-            logging.info("\n- INFO, job completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            sys.exit(0)
-        if data["TaskState"] == "Completed":
-            logging.info("\n- PASS, job ID successfuly marked completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            sys.exit(0)
-        if str(current_time)[0:7] >= "0:30:00":
-            logging.error("\n- FAIL: Timeout of 30 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
-            sys.exit(0)
-        elif "failed" in data['Oem']['Dell']['Message'] or "completed with errors" in data['Oem']['Dell']['Message'] or "Failed" in data['Oem']['Dell']['Message']:
-            logging.error("- FAIL: Job failed, current message: %s" % data["Messages"])
+    def job_finished(data):
+        message = data.get("Message", "")
+        return "failed" in message.lower() or "completed with errors" in message or "scheduled" in message or "completed successfully" in message
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES and "scheduled" not in (status.message or ""):
+            logging.info("- INFO: %s, execution time: %s" % ((status.message or "").rstrip("."), str(datetime.now()-start_time)[0:7]))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=30), until=job_finished, on_update=job_status_update)
+    current_time = datetime.now()-start_time
+    message = status.message or ""
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 30 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- ERROR, GET request failed to get job ID details, %s" % status.error)
+        sys.exit(0)
+    if status.job_state == "Completed":
+        logging.info("\n- INFO, job completed, detailed final job status results\n")
+        for i in status.data.items():
+            pprint(i)
+        logging.info("\n- JOB ID %s completed in %s" % (job_id, str(current_time)[0:7]))
+        sys.exit(0)
+    elif status.failed or "completed with errors" in message:
+        logging.error("- FAIL: Job failed, current message: %s" % message)
+        sys.exit(0)
+    elif "scheduled" in message:
+        print("- PASS, job ID %s successfully marked as scheduled" % job_id)
+        if not args["reboot"]:
+            logging.warning("- WARNING, missing argument --reboot for rebooting the server. Job is still scheduled and will be applied on next manual server reboot")
             sys.exit(0)
-        elif "scheduled" in data['Oem']['Dell']['Message']:
-            print("- PASS, job ID %s successfully marked as scheduled" % data["Id"])
-            if not args["reboot"]:
-                logging.warning("- WARNING, missing argument --reboot for rebooting the server. Job is still scheduled and will be applied on next manual server reboot")
-                sys.exit(0)
-            elif args["reboot"]:
-                break
-        elif "completed successfully" in data['Oem']['Dell']['Message']:
-            logging.info("\n- PASS, job ID %s successfully marked completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
-            break
-        else:
-            logging.info("- INFO: %s, execution time: %s" % (message_string[0]["Message"].rstrip("."), current_time))
-            time.sleep(1)
-            continue
+    else:
+        logging.info("\n- PASS, job ID %s successfully marked completed, detailed final job status results\n" % job_id)
+        for i in status.data.items():
+            pprint(i)
+        logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
 
 def loop_check_final_job_status():
-    retry_count = 1
-    while True:
-        if retry_count == 20:
-            logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
-            sys.exit(0)
-        check_idrac_connection()
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.info("- INFO, GET request failed due to connection error, retry")
-            time.sleep(10)
-            retry_count += 1
-            continue 
-        current_time = str((datetime.now()-start_time))[0:7]
-        if response.status_code != 200:
-            logging.error("\n- FAIL, GET command failed to check job status, return code %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(response.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "0:30:00":
-            logging.error("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
-            sys.exit(0)
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or "fail" in data['JobState'] or "Fail" in data['JobState']:
-            logging.error("- FAIL: job ID %s failed" % job_id)
-            sys.exit(0)
-        elif "completed successfully" in data['Message']:
-            logging.info("\n- PASS, job ID %s successfully marked completed" % job_id)
-            logging.info("\n- Final detailed job results -\n")
-            for i in data.items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            sys.exit(0)
-        else:
-            logging.info("- INFO, JobStatus not completed, current status: \"%s\", execution time: \"%s\"" % (data['Message'].rstrip("."), current_time))
-            time.sleep(1)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, JobStatus not completed, current status: \"%s\", execution time: \"%s\"" % ((status.message or "").rstrip("."), str(datetime.now()-start_time)[0:7]))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=30), until=lambda data: "fail" in data.get("Message", "").lower(), on_update=job_status_update)
+    current_time = datetime.now()-start_time
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, GET command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed" % job_id)
+        sys.exit(0)
+    logging.info("\n- PASS, job ID %s successfully marked completed" % job_id)
+    logging.info("\n- Final detailed job results -\n")
+    for i in status.data.items():
+        pprint(i)
+    logging.info("\n- JOB ID %s completed in %s" % (job_id, str(current_time)[0:7]))
+    sys.exit(0)
 
 def reboot_server():
     if args["x"]:
@@ -267,11 +223,11 @@ def reboot_server():
             else:
                 response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time >= "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 if args["x"]:
@@ -328,50 +284,6 @@ def reboot_server():
         logging.error("- FAIL, unable to get current server power state to perform either reboot or power on")
         sys.exit(0)
 
-def check_idrac_connection():
-    run_network_connection_function = ""
-    if platform.system().lower() == "windows":
-        ping_command = "ping -n 3 %s" % idrac_ip
-    elif platform.system().lower() == "linux":
-        ping_command = "ping -c 3 %s" % idrac_ip
-    else:
-        logging.error("- FAIL, unable to determine OS type, check iDRAC connection function will not execute")
-        run_network_connection_function = "fail"
-    execute_command = subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-    if execute_command != 0:
-        ping_status = "lost"
-    else:
-        ping_status = "good"
-        pass
-    if ping_status == "lost":
-            logging.info("- INFO, iDRAC network connection lost due to slow network response, waiting 30 seconds to access iDRAC again")
-            time.sleep(30)
-            while True:
-                if run_network_connection_function == "fail":
-                    break
-                execute_command=subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-                if execute_command != 0:
-                    ping_status = "lost"
-                else:
-                    ping_status = "good"
-                if ping_status == "lost":
-                    logging.info("- INFO, unable to ping iDRAC IP, script will wait 30 seconds and try again")
-                    time.sleep(30)
-                    continue
-                else:
-                    break
-            while True:
-                try:
-                    if args["x"]:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                    else:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-                except requests.ConnectionError as error_message:
-                    logging.info("- INFO, GET request failed due to connection error, retry")
-                    time.sleep(10)
-                    continue
-                break
-
 if __name__ == "__main__":
     if args["script_examples"]:
         script_examples()
@@ -381,7 +293,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -14,24 +14,25 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
-import platform
 import re
 import requests
-import subprocess
 import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.upload import post_multipart
+from IdracRedfishSupport.firmware import dup_update_needed, forget_firmware_inventory, get_firmware_inventory
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
-parser = argparse.ArgumentParser(description="Python script using Redfish API to first check current firmware version for a device, then only apply the new firwmare package if version difference is detected. NOTE: There is a --force argument to apply the firmware even if same version is detected.")
+parser = argparse.ArgumentParser(description="Python script using Redfish API to first check current firmware version for a device, then only apply the new firwmare package if version difference is detected. Package version is compared against installed version before the package is uploaded when the Dell update package details can be read locally. NOTE: There is a --force argument to apply the firmware even if same version is detected.")
 parser.add_argument('-ip',help='iDRAC IP address', required=False)
 parser.add_argument('-u', help='iDRAC username', required=False)
 parser.add_argument('-p', help='iDRAC password. If you do not pass in argument -p, script will prompt to enter user password which will not be echoed to the screen.', required=False)
@@ -39,6 +40,7 @@ parser.add_argument('-x', help='Pass in X-Auth session token for executing Redfi
 parser.add_argument('--ssl', help='SSL cert verification for all Redfish calls, pass in value \"true\" or \"false\". By default, this argument is not required and script ignores validating SSL cert for all Redfish calls.', required=False)
 parser.add_argument('--script-examples', action="store_true", help='Prints script examples')
 parser.add_argument('--location', help='Pass in the local directory location of the firmware image', required=False)
+parser.add_argument('--max-upload-rate', help='Pass in max upload bandwidth in MB per second for uploading the firmware image. Use this to limit network usage when updating multiple servers at the same time, by default upload bandwidth is not limited. Upload progress and MB/s are reported while uploading', required=False, dest='max_upload_rate', type=float)
 parser.add_argument('--image', help='Pass in the firmware image name', required=False)
 parser.add_argument('--reboot', help='Reboot the server to apply the update if needed. if argument not passed in, job ID will still be in scheduled state and execute on next manual server reboot. Note: If the update gets applied with no server reboot (Example: iDRAC, DIAGs, Driver pack), you don\'t need to pass in this argument. For more details on which devices update immediately, refer to Lifecycle Controller User Guide Update section.', action="store_true", required=False)
 parser.add_argument('--force', help='Pass in this argument to force the update when same version installed and package version are the same', action="store_true", required=False)
@@ -77,6 +79,35 @@ def get_idrac_version():
         sys.exit(0)
     idrac_fw_version = data["FirmwareVersion"].replace(".","")
 
+def get_cached_firmware_inventory():
+    # Firmware inventory is fetched with one $expand request and reused for every version compare executed by the script.
+    if args["x"]:
+        return get_firmware_inventory(idrac_ip, x_auth_token=args["x"], verify_cert=verify_cert)
+    else:
+        return get_firmware_inventory(idrac_ip, idrac_username, idrac_password, verify_cert=verify_cert)
+
+def check_package_version_before_upload():
+    # Read device component IDs and version from the Dell update package locally and compare against installed version before uploading the package.
+    # If versions are the same, script exits without uploading the package. If the compare can't be done locally, versions are compared after upload using the available entry.
+    if args["x"]:
+        version_check = dup_update_needed(os.path.join(args["location"], args["image"]), idrac_ip, x_auth_token=args["x"], verify_cert=verify_cert)
+    else:
+        version_check = dup_update_needed(os.path.join(args["location"], args["image"]), idrac_ip, idrac_username, idrac_password, verify_cert=verify_cert)
+    if version_check.update_needed is None:
+        logging.info("- INFO, unable to compare package version before upload, %s. Version will be compared after uploading the package" % version_check.reason)
+        return
+    for i in version_check.installed:
+        logging.info("\n- Device Name: %s" % i["Name"])
+        logging.info("- Installed version detected: %s" % i["Version"])
+    logging.info("- Package version detected: %s" % version_check.package.version)
+    if version_check.update_needed:
+        logging.info("\n- INFO, version difference detected, script will now upload and apply firmware version %s" % version_check.package.version)
+    elif args["force"]:
+        logging.info("- WARNING, same version installed and package version detected but force argument passed, update will get applied")
+    else:
+        logging.info("\n- WARNING, same version detected, script will NOT upload and apply package version")
+        sys.exit(0)
+
 def download_image_payload():
     # Download the payload from the Dell update package to create the available URI entry. 
     global available_entry
@@ -103,10 +134,10 @@ def download_image_payload():
     files = {'file': (filename, open(ImagePath, 'rb'), 'multipart/form-data')}
     if args["x"]:
         headers = {'X-Auth-Token': args["x"], "if-match": ETag}
-        response = requests.post(url, files=files, headers=headers, verify=verify_cert)
+        response = post_multipart(url, files, max_rate=args["max_upload_rate"], headers=headers, verify=verify_cert)
     else:
         headers = {"if-match": ETag}
-        response = requests.post(url, files=files, verify=verify_cert,auth=(idrac_username,idrac_password), headers=headers)
+        response = post_multipart(url, files, max_rate=args["max_upload_rate"], verify=verify_cert,auth=(idrac_username,idrac_password), headers=headers)
     post_command_response_output = response.json()
     if response.status_code == 201:
         logging.info("\n- PASS: POST command passed successfully to download image")
@@ -131,53 +162,41 @@ def get_available_entry_version_compare_current_version():
         logging.error("\n- ERROR, GET request failed to get AVAILABLE entry data, error: \n%s" % data)
         sys.exit(0)
     available_entry_details = {"Name": data["Name"], "Version": data["Version"], "etag": response.headers["ETag"]}
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/UpdateService/FirmwareInventory' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/UpdateService/FirmwareInventory' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- ERROR, GET request failed to get current firmware version details, error: \n%s" % data)
+    try:
+        firmware_inventory = get_cached_firmware_inventory()
+    except (requests.RequestException, ValueError) as error_message:
+        logging.error("\n- ERROR, GET request failed to get current firmware version details, error: \n%s" % error_message)
         sys.exit(0)
-    for i in data["Members"]:
-        for ii in i.items():
-            if "installed" in ii[1].lower():
-                if args["x"]:
-                    response = requests.get('https://%s%s' % (idrac_ip, ii[1]), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                else:
-                    response = requests.get('https://%s%s' % (idrac_ip, ii[1]), verify=verify_cert, auth=(idrac_username, idrac_password))
-                    data = response.json()
-                    if response.status_code != 200:
-                        logging.error("\n- ERROR, GET request failed to get URI details for Name and Version, error: \n%s" % data)
-                        sys.exit(0)
-                    installed_entry_details = {"Name": data["Name"], "Version": data["Version"]}
-                    if available_entry_details["Name"] == installed_entry_details["Name"]:
-                        logging.info("\n- Device Name: %s" % installed_entry_details["Name"])
-                        logging.info("- Installed version detected: %s" % installed_entry_details["Version"])
-                        logging.info("- Available package version detected: %s" % available_entry_details["Version"])
-                        if installed_entry_details["Version"] != available_entry_details["Version"]:
-                            logging.info("\n- INFO, version difference detected, script will now apply firmware version %s" % available_entry_details["Version"])
-                        elif installed_entry_details["Version"] == available_entry_details["Version"]:
-                            if args["force"]:
-                                logging.info("- WARNING, same version installed and package version detected but force argument passed, update will get applied")
-                                return
-                            else:
-                                logging.info("\n- WARNING, same version detected, script will NOT apply package version and delete available entry")
-                                url = 'https://%s/redfish/v1/UpdateService/FirmwareInventory/%s' % (idrac_ip, available_entry)
-                                if args["x"]:
-                                    headers = {'X-Auth-Token': args["x"], "if-match": "%s" % available_entry_details["etag"]}
-                                    response = requests.delete(url, headers=headers, verify=verify_cert)
-                                else:
-                                    headers = {"if-match": "%s" % available_entry_details["etag"]}
-                                    response = requests.delete(url, headers=headers, verify=verify_cert,auth=(idrac_username,idrac_password))
-                                data = response.json()
-                                if response.status_code == 200:
-                                    logging.debug("\n- PASS, successfully deleted available entry")
-                                    sys.exit(0)
-                                else:
-                                    logging.error("\n- FAIL, command failed to delete available entry, error: \n%s" % data)
-                                    sys.exit(0)
-        
+    for data in firmware_inventory:
+        if "installed" in data["Id"].lower():
+            installed_entry_details = {"Name": data["Name"], "Version": data["Version"]}
+            if available_entry_details["Name"] == installed_entry_details["Name"]:
+                logging.info("\n- Device Name: %s" % installed_entry_details["Name"])
+                logging.info("- Installed version detected: %s" % installed_entry_details["Version"])
+                logging.info("- Available package version detected: %s" % available_entry_details["Version"])
+                if installed_entry_details["Version"] != available_entry_details["Version"]:
+                    logging.info("\n- INFO, version difference detected, script will now apply firmware version %s" % available_entry_details["Version"])
+                elif installed_entry_details["Version"] == available_entry_details["Version"]:
+                    if args["force"]:
+                        logging.info("- WARNING, same version installed and package version detected but force argument passed, update will get applied")
+                        return
+                    else:
+                        logging.info("\n- WARNING, same version detected, script will NOT apply package version and delete available entry")
+                        url = 'https://%s/redfish/v1/UpdateService/FirmwareInventory/%s' % (idrac_ip, available_entry)
+                        if args["x"]:
+                            headers = {'X-Auth-Token': args["x"], "if-match": "%s" % available_entry_details["etag"]}
+                            response = requests.delete(url, headers=headers, verify=verify_cert)
+                        else:
+                            headers = {"if-match": "%s" % available_entry_details["etag"]}
+                            response = requests.delete(url, headers=headers, verify=verify_cert,auth=(idrac_username,idrac_password))
+                        data = response.json()
+                        if response.status_code == 200:
+                            logging.debug("\n- PASS, successfully deleted available entry")
+                            sys.exit(0)
+                        else:
+                            logging.error("\n- FAIL, command failed to delete available entry, error: \n%s" % data)
+                            sys.exit(0)
+
 def install_image_payload():
     # Once the payload has been downloaded and available URI created, payload will now be applied and create an update job ID which can be used to track update progress. 
     global job_id
@@ -203,103 +222,60 @@ def install_image_payload():
     logging.info("- PASS, update job ID %s successfully created, script will now loop polling the job status" % job_id)
 
 def check_job_status():
-    # Loop job status to validate if job is marked failed, scheduled or completed. Completed status will only occur if device can apply firmware update with no reboot needed. 
-    retry_count = 1
-    while True:
-        check_idrac_connection()
-        if retry_count == 20:
-            logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
-            sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.info("- INFO, GET request failed due to connection error, retry")
-            time.sleep(10)
-            retry_count += 1
-            continue
-        data = response.json()
-        current_time = str(datetime.now()-start_time)[0:7]   
-        message_string = data["Messages"]
-        if response.status_code == 200 or response.status_code == 202:
-            time.sleep(1)
-        else:
-            logging.error("\n- ERROR, GET request failed to get job ID details, status code %s returned, error: \n%s" % (response.status_code, data))
-            sys.exit(0)
-        if data["TaskState"] == "Completed" and data["Oem"]["Dell"]["JobState"]:
-            logging.info("\n- INFO, job completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            sys.exit(0)
-        if data["TaskState"] == "Completed":
-            logging.info("\n- PASS, job ID successfuly marked completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            sys.exit(0)
-        if str(current_time)[0:7] >= "0:30:00":
-            logging.error("\n- FAIL: Timeout of 30 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
-            sys.exit(0)
-        elif "failed" in data['Oem']['Dell']['Message'] or "completed with errors" in data['Oem']['Dell']['Message'] or "Failed" in data['Oem']['Dell']['Message']:
-            logging.error("- FAIL: Job failed, current message: %s" % data["Messages"])
-            sys.exit(0)
-        elif "scheduled" in data['Oem']['Dell']['Message']:
-            print("- PASS, job ID %s successfully marked as scheduled, server will now reboot to apply the firmware." % data["Id"])
-            break
-        elif "completed successfully" in data['Oem']['Dell']['Message']:
-            logging.info("\n- PASS, job ID %s successfully marked completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
-            break
-        else:
-            logging.info("- INFO: %s, execution time: %s" % (message_string[0]["Message"].rstrip("."), current_time))
-            time.sleep(1)
-            continue
+    # Loop job status to validate if job is marked failed, scheduled or completed. Completed status will only occur if device can apply firmware update with no reboot needed.
+    def job_finished(data):
+        message = data.get("Message", "")
+        return "failed" in message.lower() or "completed with errors" in message or "scheduled" in message or "completed successfully" in message
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES and "scheduled" not in (status.message or ""):
+            logging.info("- INFO: %s, execution time: %s" % ((status.message or "").rstrip("."), str(datetime.now()-start_time)[0:7]))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=30), until=job_finished, on_update=job_status_update)
+    current_time = datetime.now()-start_time
+    message = status.message or ""
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 30 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- ERROR, GET request failed to get job ID details, %s" % status.error)
+        sys.exit(0)
+    if status.job_state == "Completed":
+        logging.info("\n- INFO, job completed, detailed final job status results\n")
+        for i in status.data.items():
+            pprint(i)
+        logging.info("\n- JOB ID %s completed in %s" % (job_id, str(current_time)[0:7]))
+        sys.exit(0)
+    elif status.failed or "completed with errors" in message:
+        logging.error("- FAIL: Job failed, current message: %s" % message)
+        sys.exit(0)
+    elif "scheduled" in message:
+        print("- PASS, job ID %s successfully marked as scheduled, server will now reboot to apply the firmware." % job_id)
+    else:
+        logging.info("\n- PASS, job ID %s successfully marked completed, detailed final job status results\n" % job_id)
+        for i in status.data.items():
+            pprint(i)
+        logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
 
 def loop_check_final_job_status():
-    # Loop to check final job status, either marked completed or failed. 
-    retry_count = 1
-    while True:
-        if retry_count == 20:
-            logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
-            sys.exit(0)
-        check_idrac_connection()
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.info("- INFO, GET request failed due to connection error, retry")
-            time.sleep(10)
-            retry_count += 1
-            continue 
-        current_time = str((datetime.now()-start_time))[0:7]
-        if response.status_code != 200:
-            logging.error("\n- FAIL, GET command failed to check job status, return code %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(response.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "0:50:00":
-            logging.error("\n- FAIL: Timeout of 50 minutes has been hit, script stopped\n")
-            sys.exit(0)
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or "fail" in data['JobState'] or "Fail" in data['JobState']:
-            logging.error("- FAIL: job ID %s failed" % job_id)
-            sys.exit(0)
-        elif "completed successfully" in data['Message']:
-            logging.info("\n- PASS, job ID %s successfully marked completed" % job_id)
-            logging.info("\n- Final detailed job results -\n")
-            for i in data.items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            break
-        else:
-            logging.info("- INFO, %s, execution time: %s" % (data['Message'].rstrip("."), current_time))
-            time.sleep(15)
+    # Loop to check final job status, either marked completed or failed.
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, %s, execution time: %s" % ((status.message or "").rstrip("."), str(datetime.now()-start_time)[0:7]))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=50), until=lambda data: "fail" in data.get("Message", "").lower(), on_update=job_status_update)
+    current_time = datetime.now()-start_time
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 50 minutes has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, GET command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed" % job_id)
+        sys.exit(0)
+    logging.info("\n- PASS, job ID %s successfully marked completed" % job_id)
+    logging.info("\n- Final detailed job results -\n")
+    for i in status.data.items():
+        pprint(i)
+    logging.info("\n- JOB ID %s completed in %s" % (job_id, str(current_time)[0:7]))
 
 def reboot_server():
     # Reboot the server once update job is marked scheduled. This function will only be called if iDRAC version is 4.x or older. 
@@ -333,11 +309,11 @@ def reboot_server():
             else:
                 response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time >= "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 if args["x"]:
@@ -394,80 +370,24 @@ def reboot_server():
         logging.error("- FAIL, unable to get current server power state to perform either reboot or power on")
         sys.exit(0)
 
-def check_idrac_connection():
-    # Check iDRAC connection during looping job status. If connection is lost, retry will occur. 
-    run_network_connection_function = ""
-    if platform.system().lower() == "windows":
-        ping_command = "ping -n 3 %s" % idrac_ip
-    elif platform.system().lower() == "linux":
-        ping_command = "ping -c 3 %s" % idrac_ip
-    else:
-        logging.error("- FAIL, unable to determine OS type, check iDRAC connection function will not execute")
-        run_network_connection_function = "fail"
-    execute_command = subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-    if execute_command != 0:
-        ping_status = "lost"
-    else:
-        ping_status = "good"
-        pass
-    if ping_status == "lost":
-            logging.info("- INFO, iDRAC network connection lost due to slow network response, waiting 30 seconds to access iDRAC again")
-            time.sleep(30)
-            while True:
-                if run_network_connection_function == "fail":
-                    break
-                execute_command=subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-                if execute_command != 0:
-                    ping_status = "lost"
-                else:
-                    ping_status = "good"
-                if ping_status == "lost":
-                    logging.info("- INFO, unable to ping iDRAC IP, script will wait 30 seconds and try again")
-                    time.sleep(30)
-                    continue
-                else:
-                    break
-            while True:
-                try:
-                    if args["x"]:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                    else:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-                except requests.ConnectionError as error_message:
-                    logging.info("- INFO, GET request failed due to connection error, retry")
-                    time.sleep(10)
-                    continue
-                break
-
 def validate_new_version_installed():
     # Once update job ID is marked completed, code will get current version installed and compare against the package version, validate firmware applied was successful.
     logging.info("- INFO, getting new version installed to compare against available package version")
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/UpdateService/FirmwareInventory' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/UpdateService/FirmwareInventory' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- ERROR, GET request failed to get current firmware version details, error: \n%s" % data)
+    forget_firmware_inventory(idrac_ip)
+    try:
+        firmware_inventory = get_cached_firmware_inventory()
+    except (requests.RequestException, ValueError) as error_message:
+        logging.error("\n- ERROR, GET request failed to get current firmware version details, error: \n%s" % error_message)
         sys.exit(0)
-    for i in data["Members"]:
-        for ii in i.items():
-            if "installed" in ii[1].lower():
-                if args["x"]:
-                    response = requests.get('https://%s%s' % (idrac_ip, ii[1]), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+    for data in firmware_inventory:
+        if "installed" in data["Id"].lower():
+            installed_entry_details = {"Name": data["Name"], "Version": data["Version"]}
+            if available_entry_details["Name"] == installed_entry_details["Name"]:
+                if available_entry_details["Version"] == installed_entry_details["Version"]:
+                    logging.info("\n- PASS, successfully updated %s to version %s" % (installed_entry_details["Name"], installed_entry_details["Version"]))
+                    sys.exit(0)
                 else:
-                    response = requests.get('https://%s%s' % (idrac_ip, ii[1]), verify=verify_cert, auth=(idrac_username, idrac_password))
-                    data = response.json()
-                    if response.status_code != 200:
-                        logging.error("\n- ERROR, GET request failed to get URI details for Name and Version, error: \n%s" % data)
-                        sys.exit(0)
-                    installed_entry_details = {"Name": data["Name"], "Version": data["Version"]}
-                    if available_entry_details["Name"] == installed_entry_details["Name"]:
-                        if available_entry_details["Version"] == installed_entry_details["Version"]:
-                            logging.info("\n- PASS, successfully updated %s to version %s" % (installed_entry_details["Name"], installed_entry_details["Version"]))
-                            sys.exit(0)
-                        else:
-                            logging.error("- FAIL, %s not updated to version %s, current installed version detected %s" % (installed_entry_details["Name"], available_entry_details["Version"], installed_entry_details["Version"]))
+                    logging.error("- FAIL, %s not updated to version %s, current installed version detected %s" % (installed_entry_details["Name"], available_entry_details["Version"], installed_entry_details["Version"]))
         
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -478,7 +398,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -494,6 +414,7 @@ if __name__ == "__main__":
         sys.exit(0)
     if args["location"] and args["image"]:
         get_idrac_version()
+        check_package_version_before_upload()
         download_image_payload()
         get_available_entry_version_compare_current_version()
         install_image_payload()
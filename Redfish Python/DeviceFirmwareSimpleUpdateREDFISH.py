@@ -16,20 +16,20 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
-import platform
 import re
 import requests
-import subprocess
 import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.upload import post_multipart
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -43,6 +43,7 @@ parser.add_argument('--ssl', help='SSL cert verification for all Redfish calls,
 parser.add_argument('--script-examples', action="store_true", help='Prints script examples')
 parser.add_argument('--get', help='Get current supported devices for firmware updates and their current firmware versions', action="store_true", required=False)
 parser.add_argument('--location', help='Pass in the local directory location of the firmware image', required=False)
+parser.add_argument('--max-upload-rate', help='Pass in max upload bandwidth in MB per second for uploading the firmware image. Use this to limit network usage when updating multiple servers at the same time, by default upload bandwidth is not limited. Upload progress and MB/s are reported while uploading', required=False, dest='max_upload_rate', type=float)
 parser.add_argument('--image', help='Pass in the firmware image name', required=False)
 parser.add_argument('--reboot', help='Reboot the server to apply the update if needed. if argument not passed in, job ID will still be in scheduled state and execute on next manual server reboot. Note: If the update gets applied with no server reboot (Example: iDRAC, DIAGs, Driver pack), you don\'t need to pass in this argument. For more details on which devices update immediately, refer to Lifecycle Controller User Guide Update section.', action="store_true", required=False)
 parser.add_argument('--final-shutdown', help='Shutdown the server once the firmware update completes', dest="final_shutdown", required=False)
@@ -121,10 +122,10 @@ def download_image_payload():
     files = {'file': (filename, open(ImagePath, 'rb'), 'multipart/form-data')}
     if args["x"]:
         headers = {'X-Auth-Token': args["x"], "if-match": ETag}
-        response = requests.post(url, files=files, headers=headers, verify=verify_cert)
+        response = post_multipart(url, files, max_rate=args["max_upload_rate"], headers=headers, verify=verify_cert)
     else:
         headers = {"if-match": ETag}
-        response = requests.post(url, files=files, verify=verify_cert,auth=(idrac_username,idrac_password), headers=headers)
+        response = post_multipart(url, files, max_rate=args["max_upload_rate"], verify=verify_cert,auth=(idrac_username,idrac_password), headers=headers)
     post_command_response_output = response.json()
     if response.status_code == 201:
         logging.info("\n- PASS: POST command passed successfully to download image")
@@ -162,13 +163,10 @@ def install_image_payload():
     logging.info("- PASS, update job ID %s successfully created, script will now loop polling the job status\n" % job_id)
 
 def check_job_status():
-    retry_count = 1
-    schedule_job_status_count = 1
-    while True:
-        check_idrac_connection()
-        if retry_count == 20:
-            logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
-            sys.exit(0)
+    scheduled_time = []
+    task = {}
+    def get_task_details():
+        # User intervention needed to apply the firmware (server reboot or virtual a/c cycle) is only reported by the task state
         try:
             if args["x"]:
                 response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
@@ -176,106 +174,82 @@ def check_job_status():
                 response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
         except requests.ConnectionError as error_message:
             logging.info("- INFO, GET request failed due to connection error, retry")
-            time.sleep(10)
-            retry_count += 1
-            continue
-        data = response.json()
-        current_time = str(datetime.now()-start_time)[0:7]   
-        message_string = data["Messages"]
+            return
         if response.status_code == 200 or response.status_code == 202:
-            time.sleep(1)
-        else:
-            logging.error("\n- ERROR, GET request failed to get job ID details, status code %s returned, error: \n%s" % (response.status_code, data))
-            sys.exit(0)
-        if data["TaskState"] == "Completed" and data["Oem"]["Dell"]["JobState"]:
-            logging.info("\n- INFO, job completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            sys.exit(0)
-        if data["TaskState"] == "UserIntervention" and data["PercentComplete"] == 100:
-            logging.info("\n- JOB ID %s completed in %s but user intervention is needed, final job message: %s" % (job_id, current_time, message_string[0]["Message"].rstrip(".")))
-            if args["reboot"]:
-                if "reboot" in message_string[0]["Message"].lower():
-                    logging.info("- INFO, rebooting server for the new firmware installed to become effective")
-                    reboot_server()
-                if "virtual" in message_string[0]["Message"].lower():
-                    logging.info("- INFO, server virtual a/c cycle is needed for the new firmware installed to become effective")
-            sys.exit(0)
-        if data["TaskState"] == "Completed":
-            logging.info("\n- PASS, job ID successfuly marked completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            sys.exit(0)
-        if str(current_time)[0:7] >= "0:30:00":
-            logging.error("\n- FAIL: Timeout of 30 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
-            sys.exit(0)
-        elif "failed" in data['Oem']['Dell']['Message'] or "completed with errors" in data['Oem']['Dell']['Message'] or "Failed" in data['Oem']['Dell']['Message']:
-            logging.error("- FAIL: Job failed, current message: %s" % data["Messages"])
+            task.update(response.json())
+    def job_finished(data):
+        message = data.get("Message", "")
+        if "scheduled" in message:
+            # Update job can be marked scheduled shortly before it starts running, only accept the scheduled state after 15 seconds
+            scheduled_time.append(datetime.now())
+            return datetime.now() - scheduled_time[0] >= timedelta(seconds=15)
+        if data.get("PercentComplete") == 100:
+            get_task_details()
+            if task.get("TaskState") == "UserIntervention":
+                return True
+        return "failed" in message.lower() or "completed with errors" in message or "completed successfully" in message
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES and "scheduled" not in (status.message or ""):
+            logging.info("- INFO: %s, execution time: %s" % ((status.message or "").rstrip("."), str(datetime.now()-start_time)[0:7]))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=30), until=job_finished, on_update=job_status_update)
+    current_time = datetime.now()-start_time
+    message = status.message or ""
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 30 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- ERROR, GET request failed to get job ID details, %s" % status.error)
+        sys.exit(0)
+    if status.job_state == "Completed":
+        logging.info("\n- INFO, job completed, detailed final job status results\n")
+        for i in status.data.items():
+            pprint(i)
+        logging.info("\n- JOB ID %s completed in %s" % (job_id, str(current_time)[0:7]))
+        sys.exit(0)
+    elif task.get("TaskState") == "UserIntervention":
+        message_string = task["Messages"]
+        logging.info("\n- JOB ID %s completed in %s but user intervention is needed, final job message: %s" % (job_id, str(current_time)[0:7], message_string[0]["Message"].rstrip(".")))
+        if args["reboot"]:
+            if "reboot" in message_string[0]["Message"].lower():
+                logging.info("- INFO, rebooting server for the new firmware installed to become effective")
+                reboot_server()
+            if "virtual" in message_string[0]["Message"].lower():
+                logging.info("- INFO, server virtual a/c cycle is needed for the new firmware installed to become effective")
+        sys.exit(0)
+    elif status.failed or "completed with errors" in message:
+        logging.error("- FAIL: Job failed, current message: %s" % message)
+        sys.exit(0)
+    elif "scheduled" in message:
+        print("- PASS, job ID %s successfully marked as scheduled" % job_id)
+        if not args["reboot"]:
+            logging.warning("- WARNING, missing argument --reboot for rebooting the server. Job is still scheduled and will be applied on next manual server reboot")
             sys.exit(0)
-        elif "scheduled" in data['Oem']['Dell']['Message']:
-            if schedule_job_status_count == 1:
-                time.sleep(15)
-                schedule_job_status_count += 1
-                continue
-            else:
-                print("- PASS, job ID %s successfully marked as scheduled" % data["Id"])
-                if not args["reboot"]:
-                    logging.warning("- WARNING, missing argument --reboot for rebooting the server. Job is still scheduled and will be applied on next manual server reboot")
-                    sys.exit(0)
-                else:
-                    break
-        elif "completed successfully" in data['Oem']['Dell']['Message']:
-            logging.info("\n- PASS, job ID %s successfully marked completed, detailed final job status results\n")
-            for i in data['Oem']['Dell'].items():
-                pprint(i)
-            logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
-            break
-        else:
-            logging.info("- INFO: %s, execution time: %s" % (message_string[0]["Message"].rstrip("."), current_time))
-            time.sleep(1)
-            continue
+    else:
+        logging.info("\n- PASS, job ID %s successfully marked completed, detailed final job status results\n" % job_id)
+        for i in status.data.items():
+            pprint(i)
+        logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
 
 def loop_check_final_job_status():
-    retry_count = 1
-    while True:
-        if retry_count == 20:
-            logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
-            sys.exit(0)
-        check_idrac_connection()
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.info("- INFO, GET request failed due to connection error, retry")
-            time.sleep(10)
-            retry_count += 1
-            continue 
-        current_time = str((datetime.now()-start_time))[0:7]
-        if response.status_code != 200:
-            logging.error("\n- FAIL, GET command failed to check job status, return code %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(response.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "0:50:00":
-            logging.error("\n- FAIL: Timeout of 50 minutes has been hit, script stopped\n")
-            sys.exit(0)
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or "fail" in data['JobState'] or "Fail" in data['JobState']:
-            logging.error("- FAIL: job ID %s failed" % job_id)
-            sys.exit(0)
-        elif "completed successfully" in data['Message']:
-            logging.info("\n- PASS, job ID %s successfully marked completed" % job_id)
-            logging.info("\n- Final detailed job results -\n")
-            for i in data.items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            break
-        else:
-            logging.info("- INFO, %s, execution time: %s" % (data['Message'].rstrip("."), current_time))
-            time.sleep(10)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, %s, execution time: %s" % ((status.message or "").rstrip("."), str(datetime.now()-start_time)[0:7]))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=50), until=lambda data: "fail" in data.get("Message", "").lower(), on_update=job_status_update)
+    current_time = datetime.now()-start_time
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 50 minutes has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, GET command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed" % job_id)
+        sys.exit(0)
+    logging.info("\n- PASS, job ID %s successfully marked completed" % job_id)
+    logging.info("\n- Final detailed job results -\n")
+    for i in status.data.items():
+        pprint(i)
+    logging.info("\n- JOB ID %s completed in %s" % (job_id, str(current_time)[0:7]))
 
 def reboot_server():
     if args["x"]:
@@ -308,11 +282,11 @@ def reboot_server():
             else:
                 response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time >= "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 if args["x"]:
@@ -369,50 +343,6 @@ def reboot_server():
         logging.error("- FAIL, unable to get current server power state to perform either reboot or power on")
         sys.exit(0)
 
-def check_idrac_connection():
-    run_network_connection_function = ""
-    if platform.system().lower() == "windows":
-        ping_command = "ping -n 3 %s" % idrac_ip
-    elif platform.system().lower() == "linux":
-        ping_command = "ping -c 3 %s" % idrac_ip
-    else:
-        logging.error("- FAIL, unable to determine OS type, check iDRAC connection function will not execute")
-        run_network_connection_function = "fail"
-    execute_command = subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-    if execute_command != 0:
-        ping_status = "lost"
-    else:
-        ping_status = "good"
-        pass
-    if ping_status == "lost":
-            logging.info("- INFO, iDRAC network connection lost due to slow network response, waiting 30 seconds to access iDRAC again")
-            time.sleep(30)
-            while True:
-                if run_network_connection_function == "fail":
-                    break
-                execute_command=subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-                if execute_command != 0:
-                    ping_status = "lost"
-                else:
-                    ping_status = "good"
-                if ping_status == "lost":
-                    logging.info("- INFO, unable to ping iDRAC IP, script will wait 30 seconds and try again")
-                    time.sleep(30)
-                    continue
-                else:
-                    break
-            while True:
-                try:
-                    if args["x"]:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                    else:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-                except requests.ConnectionError as error_message:
-                    logging.info("- INFO, GET request failed due to connection error, retry")
-                    time.sleep(10)
-                    continue
-                break
-
 def shutdown_server():
     logging.info("- INFO, argument -S detected to shutdown the server after firmware update completes")
     url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % idrac_ip
@@ -439,7 +369,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
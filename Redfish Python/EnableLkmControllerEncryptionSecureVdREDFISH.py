@@ -15,7 +15,7 @@
 #
 # Pseudo code workflow
 #
-# 1. Confirm IP address can be pinged.
+# 1. Confirm iDRAC IP address is reachable.
 # 2. Check remote API status, confirm LC and RT status both report ready.
 # 3. Get storage controllers which support enabling local key management (LKM).
 # 4. Enable LKM if not already enabled.
@@ -55,13 +55,14 @@ import platform
 import random
 import re
 import requests
-import subprocess
 import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.probe import probe_idrac
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -110,7 +111,7 @@ def get_remote_services(idrac_ip):
     global get_remote_service_failure
     get_remote_service_failure = "no"
     start_time = datetime.now()
-    current_time = str(datetime.now()-start_time)[0:7]
+    current_time = datetime.now()-start_time
     while True:
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.GetRemoteServicesAPIStatus' % idrac_ip
         headers = {'content-type': 'application/json'}
@@ -121,7 +122,7 @@ def get_remote_services(idrac_ip):
             logger.error("FAIL, POST command failed for GetRemoteServicesAPIStatus method, status code %s returned" % response.status_code)
             get_remote_service_failure = "yes"
             break
-        elif current_time >= "0:30:00":
+        elif current_time >= timedelta(minutes=30):
             logger.error("FAIL, Max timeout of 30 minutes reached to poll checking RT and LT ready status, no configuration operations executed. Make sure server is ON and outpof POST in idle state.")
             get_remote_service_failure = "yes"
             break     
@@ -256,51 +257,36 @@ def get_secure_vds_new_status(idrac_ip, vd_FQDD):
 
 def loop_job_status(idrac_ip):
     # Function to loop job status until marked completed
-    start_time = datetime.now()
-    while True:
-        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=False,auth=(idrac_username, idrac_password))
-        current_time = (datetime.now()-start_time)
-        if response.status_code != 200:
-            logger.error("GET command failed to check job status, return code %s" % response.status_code)
-            return
-        data = response.json()
-        if str(current_time)[0:7] >= "2:00:00":
-            logger.error("Timeout of 2 hours has been hit, script stopped\n")
-            return
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed":
-            logger.error("Job ID %s failed, failed message is: %s" % (job_id, data['Message']))
-            return
-        elif data['JobState'] == "Completed":
-            logger.info("PASS, job %s successfully marked completed" % job_id)
-            # Delete job ID
-            url = "https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellJobService/Actions/DellJobService.DeleteJobQueue" % idrac_ip
-            payload = {"JobID":job_id}
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False,auth=(idrac_username,idrac_password))
-            if response.status_code == 200:
-                logger.debug("PASS, successfully deleted job ID %s" % job_id)
-                break
-            else:
-                logger.error("Unable to delete job ID %s, status code %s returned" % (job_id, response.status_code))
-                break
-        else:
-            logger.info("Job status not completed, current status: \"%s\"" % data['Message'].strip("."))
-            time.sleep(10)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logger.info("Job status not completed, current status: \"%s\"" % (status.message or "").strip("."))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password, timeout=timedelta(hours=2), until=lambda data: "fail" in data.get("Message", "").lower(), on_update=job_status_update)
+    if status.timed_out:
+        logger.error("Timeout of 2 hours has been hit, script stopped\n")
+        return
+    elif status.error:
+        logger.error("GET command failed to check job status, %s" % status.error)
+        return
+    elif status.failed:
+        logger.error("Job ID %s failed, failed message is: %s" % (job_id, status.message))
+        return
+    logger.info("PASS, job %s successfully marked completed" % job_id)
+    # Delete job ID
+    url = "https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellJobService/Actions/DellJobService.DeleteJobQueue" % idrac_ip
+    payload = {"JobID":job_id}
+    headers = {'content-type': 'application/json'}
+    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False,auth=(idrac_username,idrac_password))
+    if response.status_code == 200:
+        logger.debug("PASS, successfully deleted job ID %s" % job_id)
+    else:
+        logger.error("Unable to delete job ID %s, status code %s returned" % (job_id, response.status_code))
 
 def ping_confirm_valid_ip(idrac_ip):
-    # Check ping connection, valid IP address on the network
+    # Check iDRAC connection using HTTPS probe (works when ICMP is blocked), valid IP address on the network
     global ping_success 
     ping_success = "yes"
-    if platform.system().lower() == "windows":
-        ping_command = "ping -n 3 %s" % idrac_ip
-    elif platform.system().lower() == "linux":
-        ping_command = "ping -c 3 %s" % idrac_ip
-    else:
-        logger.error("Unable to determine OS type, check iDRAC connection function will not execute")
-        ping_success = "no"
-    execute_command = subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-    if execute_command != 0:
-        logger.error("Ping request failed for IP %s, script will skip using this IP" % idrac_ip)
+    if not probe_idrac(idrac_ip, verify_cert=False):
+        logger.error("Connection check failed for IP %s, script will skip using this IP" % idrac_ip)
         ping_success = "no"
                                                                             
 if __name__ == "__main__":
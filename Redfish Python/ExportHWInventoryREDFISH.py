@@ -18,18 +18,19 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
 import requests
 import sys
-import time
 import urllib.parse
 import warnings
 
-from datetime import datetime
+from datetime import timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -144,37 +145,27 @@ def export_hw_inventory():
 
 def loop_job_status():
     """
-    Job ID returned from DellLCService.ExportHWInventory action, this will loop checking the job status until marked completed. 
+    Job ID returned from DellLCService.ExportHWInventory action, this will loop checking the job status until marked completed.
     """
-    start_time = datetime.now()
-    while True:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        current_time = (datetime.now() - start_time)
-        if response.status_code != 200:
-            logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(response.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "0:05:00":
-            logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
-            sys.exit(0)
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed" or "Unable" in data['Message']:
-            logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, data['Message']))
-            sys.exit(0)
-        elif data['JobState'] == "Completed":
-            if data['Message'] == "Hardware Inventory Export was successful":
-                logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
-            else:
-                logging.error("\n--- FAIL, Final Detailed Job Status Results ---\n")
-            for i in data.items():
-                pprint(i)
-            break
-        else:
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
             logging.info("- INFO, job state not marked completed, current job status is running, polling again")
-            time.sleep(2)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=5), until=lambda data: "fail" in data.get("Message", "").lower() or "Unable" in data.get("Message", ""), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed or "Unable" in status.message:
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    if status.message == "Hardware Inventory Export was successful":
+        logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
+    else:
+        logging.error("\n--- FAIL, Final Detailed Job Status Results ---\n")
+    for i in status.data.items():
+        pprint(i)
 
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -185,7 +176,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -195,6 +186,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
@@ -25,11 +24,15 @@ import re
 import requests
 import subprocess
 import sys
-import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from xml.parsers.expat import ExpatError
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.scp import read_task_response, write_scp_json, write_scp_xml
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -87,7 +90,7 @@ def get_target_values():
 def export_scp_file_locally():
     url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Actions/Oem/EID_674_Manager.ExportSystemConfiguration' % idrac_ip
     if not args["format_type"]:
-        args["format_type"]="XML"    
+        args["format_type"]="XML"
     payload = {"ExportFormat":args["format_type"].upper(),"ShareParameters":{"Target":args["target"]}}
     if args["export_use"]:
         payload["ExportUse"] = args["export_use"]
@@ -118,109 +121,51 @@ def export_scp_file_locally():
         logging.error("- FAIL, unable to find job ID in headers POST response, headers output is:\n%s" % response.headers)
         sys.exit(0)
     logging.info("\n- Job ID \"%s\" successfully created for ExportSystemConfiguration method\n" % job_id)
-    start_time = datetime.now()
-    while True:
-        current_time = (datetime.now()-start_time)
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-        dict_output = response.__dict__
-        if args["format_type"] == "XML":
-            if "<SystemConfiguration Model" in str(dict_output):
-                logging.info("\n- Export locally job ID %s successfully completed. Attributes exported:\n" % job_id)
-                regex_search = re.search("<SystemConfiguration.+</SystemConfiguration>",str(dict_output)).group()
-                try:
-                    security_string = re.search('<Attribute Name="GUI.1#SecurityPolicyMessage">.+?>', regex_search).group()
-                except:
-                    pass          
-                #Below code is needed to parse the string to set up in pretty XML format
-                replace_variable = regex_search.replace("\\n"," ")
-                replace_variable = replace_variable.replace("<!--  ","<!--")
-                replace_variable = replace_variable.replace(" -->","-->")
-                del_attribute = '<Attribute Name="SerialRedirection.1#QuitKey">^\\\\</Attribute>'
-                try:
-                    replace_variable = replace_variable.replace(del_attribute,"")
-                except:
-                    pass
-                try:
-                    replace_variable = replace_variable.replace(security_string,"")
-                except:
-                    pass
-                create_list = replace_variable.split("> ")
-                export_xml = []
-                for i in create_list:
-                    create_string = i+">"
-                    export_xml.append(create_string)
-                export_xml[-1] = "</SystemConfiguration>"
-                get_date_info = datetime.now()
-                if args["directory_path"]:
-                    filename = "%s\%s-%s-%s_%s%s%s_export.xml"% (args["directory_path"],get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                else:
-                    filename = "%s-%s-%s_%s%s%s_export.xml"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                open_file = open(filename,"w")
-                for i in export_xml:
-                    open_file.writelines("%s \n" % i)
-                open_file.close()
-                for i in export_xml:
-                    print(i)
-                print("\n")
-                if args["x"]:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                else:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-                data = response.json()
-                print("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
-                for i in data.items():
-                    pprint(i)
-                logging.info("\n- Exported attributes also saved in file: %s" % filename)
-                sys.exit(0)
-        elif args["format_type"] == "JSON":
-            if "SystemConfiguration" in str(dict_output):
-                data = response.json()
-                json_format = json.dumps(data)
-                get_date_info = datetime.now()
-                if args["directory_path"]:
-                    filename = "%s\%s-%s-%s_%s%s%s_export.json"% (args["directory_path"],get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                else:
-                    filename = "%s-%s-%s_%s%s%s_export.json"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                open_file = open(filename,"w")
-                open_file.write(json.dumps(json.loads(json_format), indent=4))
-                open_file.close()
-                if args["x"]:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                else:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-                data = response.json()
-                logging.info("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
-                for i in data.items():
-                    pprint(i)
-                logging.info("\n- Exported attributes saved to file: %s" % filename)
-                sys.exit(0)
-        data = response.json()
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, \"%s\", percent complete: %s" % (status.message, status.percent_complete))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=10), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL, Timeout of 10 minutes has been reached before marking the job completed.")
+        sys.exit(0)
+    elif status.error:
+        logging.error("- ERROR:, GET job ID details failed, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL, job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    if args["x"]:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]}, stream=True)
+    else:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password), stream=True)
+    # Exported profile is returned as the task response body once the job completes, body is read as bytes and
+    # streamed to the file instead of searching the response repr
+    try:
+        export_format, data = read_task_response(response)
+    except ValueError:
+        logging.error("- FAIL, unable to parse GET task response, status code %s returned" % response.status_code)
+        sys.exit(0)
+    if not export_format:
+        logging.error("- FAIL, exported profile not returned in GET task response, status code %s returned" % response.status_code)
+        sys.exit(0)
+    get_date_info = datetime.now()
+    filename = "%s-%s-%s_%s%s%s_export.%s"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second,export_format.lower())
+    if args["directory_path"]:
+        filename = os.path.join(args["directory_path"], filename)
+    if export_format == "XML":
+        logging.info("\n- Export locally job ID %s successfully completed. Attributes exported:\n" % job_id)
         try:
-            message_string = data["Messages"]
-        except:
-            logging.error("- FAIL, unable to locate message string in JSON output")
-            sys.exit(0)
-        current_time = (datetime.now()-start_time)
-        if response.status_code == 202 or response.status_code == 200:
-            time.sleep(1)
-        else:
-            logging.error("- ERROR:, GET job ID details failed, error code: %s" % response.status_code)
-            logging.error(data)
+            scp_export = write_scp_xml(data, filename, echo=sys.stdout)
+        except ExpatError as error:
+            logging.error("\n- FAIL, unable to parse exported XML profile, error: %s" % error)
             sys.exit(0)
-        if str(current_time)[0:7] >= "0:10:00":
-            logging.error("\n- FAIL, Timeout of 10 minutes has been reached before marking the job completed.")
-            sys.exit(0)
-        else:
-            try:
-                logging.info("- INFO, \"%s\", percent complete: %s" % (data['Oem']['Dell']['Message'],data['Oem']['Dell']['PercentComplete']))
-                time.sleep(1)
-            except:
-                logging.info("- INFO, unable to print job status message, trying again")
-                time.sleep(1)
-            continue
+        print("\n")
+    else:
+        scp_export = write_scp_json(data, filename)
+    logging.info("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
+    for i in status.data.items():
+        pprint(i)
+    logging.info("\n- %s attributes exported (%s bytes), saved to file: %s" % (scp_export.attributes, scp_export.size, filename))
 
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -231,7 +176,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -241,6 +186,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+#
+# FirmwareComplianceREDFISH. Python script using Redfish API to compare firmware inventory of multiple iDRACs against a Dell catalog offline and report the updates each server needs.
+#
+# _author_ = Texas Roemer <Texas_Roemer@Dell.com>
+# _version_ = 1.0
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+
+import argparse
+import logging
+import sys
+import time
+
+from IdracRedfishSupport.compliance import DEFAULT_COLLECT_WORKERS, collect_inventories, compliance_summary, device_records, load_inventories, plan_fleet, read_catalog, save_inventories
+from IdracRedfishSupport.fleet import expand_idrac_ips, read_idrac_password, read_inventory_file
+from IdracRedfishSupport.output import add_output_arguments, open_output
+
+parser = argparse.ArgumentParser(description="Python script using Redfish API to check firmware compliance of multiple iDRACs against a Dell catalog (Catalog.xml) without staging the catalog on any iDRAC. Firmware inventory is collected with one request per iDRAC and can be saved to a file, update plans are then computed locally and can be computed again offline from the saved inventory for any catalog.")
+parser.add_argument('-u', help='iDRAC username, same user is used for every iDRAC', required=False)
+parser.add_argument('-p', help='iDRAC password. If you do not pass in argument -p, script will prompt to enter user password which will not be echoed to the screen.', required=False)
+parser.add_argument('--ssl', help='SSL cert verification for all Redfish calls, pass in value \"true\" or \"false\". By default, this argument is not required and script ignores validating SSL cert for all Redfish calls.', required=False)
+parser.add_argument('--script-examples', action="store_true", help='Prints script examples')
+parser.add_argument('--hosts', help='Pass in iDRAC inventory to collect firmware inventory from. Supported values are iDRAC IP or hostname, last octet range (example: 192.168.0.130-140), range across subnets (example: 192.168.0.250-192.168.1.10) or CIDR network (example: 192.168.0.0/28). Use a comma separator to pass in multiple values.', required=False)
+parser.add_argument('--hosts-file', help='Pass in inventory file. Either a text file with one or more --hosts values per line (# starts a comment) or an INI file with idrac_ips setting in the Parameters section.', dest="hosts_file", required=False)
+parser.add_argument('--max-hosts', help='Max number of iDRACs firmware inventory is collected from at the same time, default is %s' % DEFAULT_COLLECT_WORKERS, dest="max_hosts", type=int, default=DEFAULT_COLLECT_WORKERS, required=False)
+parser.add_argument('--save-inventory', help='Pass in file name to save collected firmware inventory (NDJSON), use it later with argument --inventory to check compliance offline', dest="save_inventory", required=False)
+parser.add_argument('--inventory', help='Pass in firmware inventory file(s) saved with argument --save-inventory to check compliance offline with no iDRAC access. Use a comma separator to pass in multiple files.', required=False)
+parser.add_argument('--catalog', help='Pass in Dell catalog file (Catalog.xml or Catalog.xml.gz) or a catalog index saved with argument --save-catalog-index', required=False)
+parser.add_argument('--save-catalog-index', help='Pass in file name to save the parsed catalog index, pass it to argument --catalog next time to skip parsing the catalog', dest="save_catalog_index", required=False)
+parser.add_argument('--all', help='Pass in this argument to write every device with argument --output-format (status UPDATE, COMPLIANT, NEWER or NOT_IN_CATALOG). By default only devices needing an update are written.', action="store_true", required=False)
+add_output_arguments(parser)
+
+args = vars(parser.parse_args())
+# Records written to stdout with --output-format, script messages are then logged to stderr. force replaces the stdout handler IdracRedfishSupport configures on import
+logging.basicConfig(format='%(message)s', stream=sys.stderr if args["output_format"] and not args["output_file"] else sys.stdout, level=logging.INFO, force=True)
+
+def script_examples():
+    print("""\n- FirmwareComplianceREDFISH.py --hosts-file idracs.txt -u root -p calvin --save-inventory fleet_inventory.ndjson, this example will collect firmware inventory of every iDRAC and save it to file, no catalog is needed.
+    \n- FirmwareComplianceREDFISH.py --inventory fleet_inventory.ndjson --catalog Catalog.xml.gz, this example will print the update plan of every iDRAC offline from the saved inventory.
+    \n- FirmwareComplianceREDFISH.py --hosts 192.168.0.0/24 -u root --catalog Catalog.xml --output-format csv --output-file updates.csv, this example will prompt for iDRAC user password once, collect firmware inventory and write one row per device needing an update to CSV file.""")
+    sys.exit(0)
+
+def get_idrac_ips():
+    idrac_ips = []
+    try:
+        if args["hosts"]:
+            idrac_ips.extend(expand_idrac_ips(args["hosts"]))
+        if args["hosts_file"]:
+            idrac_ips.extend(read_inventory_file(args["hosts_file"]))
+    except (IOError, OSError, ValueError) as error_message:
+        logging.error("\n- FAIL, unable to get iDRAC inventory, detailed error information: %s" % error_message)
+        sys.exit(1)
+    idrac_ips = list(dict.fromkeys(idrac_ips))
+    if not idrac_ips:
+        logging.error("\n- FAIL, no iDRAC IPs detected in inventory")
+        sys.exit(1)
+    return idrac_ips
+
+def get_catalog():
+    start_time = time.time()
+    try:
+        catalog = read_catalog(args["catalog"])
+    except (IOError, OSError, ValueError) as error_message:
+        logging.error("\n- FAIL, unable to read catalog, detailed error information: %s" % error_message)
+        sys.exit(1)
+    logging.info("\n- INFO, catalog version %s loaded in %s seconds, %s firmware packages for %s systems" % (catalog.version, round(time.time() - start_time, 2), len(catalog.components), len(catalog.models)))
+    if args["save_catalog_index"]:
+        catalog.save(args["save_catalog_index"])
+        logging.info("- INFO, catalog index saved to file \"%s\"" % args["save_catalog_index"])
+    return catalog
+
+def get_inventories():
+    if args["inventory"]:
+        try:
+            inventories = list(load_inventories([i.strip() for i in args["inventory"].split(",")]))
+        except (IOError, OSError, ValueError, KeyError) as error_message:
+            logging.error("\n- FAIL, unable to read inventory file, detailed error information: %s" % error_message)
+            sys.exit(1)
+        logging.info("\n- INFO, firmware inventory of %s iDRAC(s) loaded" % len(inventories))
+        return inventories
+    idrac_ips = get_idrac_ips()
+    if not args["u"]:
+        logging.error("\n- FAIL, argument -u is required to collect firmware inventory")
+        sys.exit(1)
+    if args["p"]:
+        idrac_password = args["p"]
+    else:
+        idrac_password = read_idrac_password(args["u"])
+    if args["ssl"] and args["ssl"].lower() == "true":
+        verify_cert = True
+    else:
+        verify_cert = False
+    logging.info("\n- INFO, collecting firmware inventory of %s iDRAC(s), max %s at the same time" % (len(idrac_ips), args["max_hosts"]))
+    start_time = time.time()
+    inventories = []
+    for inventory in collect_inventories(idrac_ips, args["u"], idrac_password, verify_cert=verify_cert, max_workers=args["max_hosts"]):
+        inventories.append(inventory)
+        if inventory.error:
+            logging.error("- FAIL, iDRAC %s, %s (%s/%s)" % (inventory.idrac_ip, inventory.error, len(inventories), len(idrac_ips)))
+    inventories.sort(key=lambda x: idrac_ips.index(x.idrac_ip))
+    logging.info("- INFO, firmware inventory collected in %s seconds" % round(time.time() - start_time, 1))
+    if args["save_inventory"]:
+        save_inventories(inventories, args["save_inventory"])
+        logging.info("- INFO, firmware inventory saved to file \"%s\"" % args["save_inventory"])
+    return inventories
+
+def print_plans(plans):
+    for plan in plans:
+        if plan.error:
+            logging.info("\n- iDRAC %s: ERROR, %s" % (plan.idrac_ip, plan.error))
+            continue
+        if not plan.packages:
+            logging.info("\n- iDRAC %s (%s, system ID %s): compliant" % (plan.idrac_ip, plan.model, plan.system_id))
+            continue
+        logging.info("\n- iDRAC %s (%s, system ID %s): %s package(s) to apply in this order" % (plan.idrac_ip, plan.model, plan.system_id, len(plan.packages)))
+        for package in plan.packages:
+            installed = sorted(set(i.installed_version for i in plan.devices if i.component is package))
+            logging.info("    %s, installed %s, catalog %s" % (package.path, ", ".join(installed), package.version))
+
+def check_compliance():
+    catalog = get_catalog() if args["catalog"] else None
+    inventories = get_inventories()
+    if catalog is None:
+        return
+    start_time = time.time()
+    plans = list(plan_fleet(catalog, inventories))
+    plan_seconds = round(time.time() - start_time, 2)
+    if args["output_format"]:
+        with open_output(args["output_format"], args["output_file"]) as writer:
+            for plan in plans:
+                writer.write_all(device_records(plan, None if args["all"] else ("UPDATE",)))
+        logging.info("\n- INFO, %s device record(s) written%s" % (writer.records, " to \"%s\" file" % args["output_file"] if args["output_file"] else ""))
+    else:
+        print_plans(plans)
+    summary = compliance_summary(plans)
+    logging.info("\n- Summary, %s iDRAC(s) checked in %s seconds -\n" % (summary["total"], plan_seconds))
+    logging.info("Compliant: %s" % summary["compliant"])
+    logging.info("Updates needed: %s" % summary["updates_needed"])
+    logging.info("Errors: %s" % summary["errors"])
+    if summary["packages"]:
+        logging.info("\n- Packages needed by most iDRACs -\n")
+        for path, count in summary["packages"][:10]:
+            logging.info("%s: %s iDRAC(s)" % (path, count))
+    if summary["errors"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    if args["script_examples"]:
+        script_examples()
+    elif args["inventory"] and args["catalog"]:
+        check_compliance()
+    elif (args["hosts"] or args["hosts_file"]) and (args["catalog"] or args["save_inventory"]):
+        check_compliance()
+    else:
+        logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
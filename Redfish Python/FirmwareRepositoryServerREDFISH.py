@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+#
+# FirmwareRepositoryServerREDFISH. Python script to serve a local directory of Dell Update Packages over HTTP or HTTPS so iDRACs pull firmware images from this system.
+#
+# _author_ = Texas Roemer <Texas_Roemer@Dell.com>
+# _version_ = 1.0
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+
+import argparse
+import logging
+import os
+import ssl
+import sys
+
+from IdracRedfishSupport.repository import DEFAULT_REPOSITORY_PORT, DupRepository, RepositoryError, RepositoryServer
+
+parser = argparse.ArgumentParser(description="Python script to serve a local directory of Dell Update Packages (DUPs) and catalogs over HTTP or HTTPS. Script prints the ImageURI for each package to use with DeviceFirmwareSimpleUpdateTransferProtocolREDFISH.py and the share values to use with InstallFromRepositoryREDFISH.py, then serves until stopped with Ctrl+C. Packages are hash verified against the catalog and copied to a content-addressed cache, any number of iDRACs can download at the same time.")
+parser.add_argument('--script-examples', action="store_true", help='Prints script examples')
+parser.add_argument('--location', help='Pass in the full directory path of the directory which contains the DUPs and optionally a catalog. Sub directories are served with the same relative paths.', required=False)
+parser.add_argument('--host', help='Pass in the local IP address to listen on, by default server listens on all interfaces', default="", required=False)
+parser.add_argument('--port', help='Pass in the port to listen on, default is %s' % DEFAULT_REPOSITORY_PORT, type=int, default=DEFAULT_REPOSITORY_PORT, required=False)
+parser.add_argument('--advertise', help='Pass in the IP address or hostname iDRACs use to reach this system, used in ImageURI and share values printed. By default the listen address or the address used to reach argument --idrac-ip is used.', required=False)
+parser.add_argument('--idrac-ip', help='Pass in an iDRAC IP to detect the local address iDRACs use to reach this system', dest="idrac_ip", required=False)
+parser.add_argument('--cert', help='Pass in certificate file (PEM) to serve over HTTPS', required=False)
+parser.add_argument('--key', help='Pass in private key file (PEM) for argument --cert, not needed if the key is in the certificate file', required=False)
+parser.add_argument('--max-client-rate', help='Pass in max download bandwidth in MB per second per iDRAC, by default bandwidth is not limited', dest="max_client_rate", type=float, required=False)
+
+args = vars(parser.parse_args())
+logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
+
+def script_examples():
+    print("""\n- FirmwareRepositoryServerREDFISH.py --location /repo/R750 --idrac-ip 192.168.0.120, this example will serve all DUPs in directory /repo/R750 over HTTP on port %s and print the ImageURI of each package.
+    \n- FirmwareRepositoryServerREDFISH.py --location /repo/R750 --port 443 --cert server.pem --key server.key --max-client-rate 20, this example will serve the repository over HTTPS limiting each iDRAC to 20 MB per second.""" % DEFAULT_REPOSITORY_PORT)
+    sys.exit(0)
+
+def serve_repository():
+    if not os.path.isdir(args["location"]):
+        logging.error("\n- FAIL, value detected for argument --location is not a directory")
+        sys.exit(1)
+    logging.info("\n- INFO, hash verifying and caching files in directory %s" % args["location"])
+    repository = DupRepository()
+    try:
+        packages = repository.add_directory(args["location"])
+    except (RepositoryError, IOError, OSError) as error_message:
+        logging.error("\n- FAIL, unable to add repository files, detailed error information: %s" % error_message)
+        sys.exit(1)
+    if not packages:
+        logging.error("\n- FAIL, directory %s is empty" % args["location"])
+        sys.exit(1)
+    max_client_rate = args["max_client_rate"] * 1024 * 1024 if args["max_client_rate"] else None
+    try:
+        server = RepositoryServer(repository, host=args["host"], port=args["port"], certfile=args["cert"], keyfile=args["key"], max_client_rate=max_client_rate, advertise_address=args["advertise"])
+    except (IOError, OSError, ssl.SSLError) as error_message:
+        logging.error("\n- FAIL, unable to start repository server, detailed error information: %s" % error_message)
+        sys.exit(1)
+    logging.info("\n- INFO, ImageURI for SimpleUpdate (TransferProtocol %s) -\n" % server.protocol)
+    for package in packages:
+        if package.path not in repository.catalogs:
+            logging.info(server.image_uri(package, args["idrac_ip"]))
+    if repository.catalogs:
+        logging.info("\n- INFO, InstallFromRepository share values -\n")
+        for key, value in server.share_parameters(args["idrac_ip"]).items():
+            logging.info("%s: %s" % (key, value))
+    logging.info("\n- INFO, serving %s file(s) on port %s, press Ctrl+C to stop" % (len(packages), server.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    logging.info("\n- INFO, repository server stopped -\n")
+    for i in server.client_statistics():
+        logging.info("%s: %s request(s), %s MB sent" % (i.client_ip, i.requests, round(i.bytes_sent / 1024.0 / 1024.0, 1)))
+
+if __name__ == "__main__":
+    if args["script_examples"]:
+        script_examples()
+    elif args["location"]:
+        serve_repository()
+    else:
+        logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
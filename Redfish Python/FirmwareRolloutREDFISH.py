@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+#
+# FirmwareRolloutREDFISH. Python script using Redfish API to apply a local directory of Dell Update Packages to multiple iDRACs in canary and rollout waves.
+#
+# _author_ = Texas Roemer <Texas_Roemer@Dell.com>
+# _version_ = 1.0
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from datetime import datetime
+from IdracRedfishSupport.fleet import DEFAULT_OUTPUT_DIRECTORY, expand_idrac_ips, read_idrac_password, read_inventory_file
+from IdracRedfishSupport.rollout import DEFAULT_CANARY_HOSTS, DEFAULT_MAX_FAILED_PERCENT, DEFAULT_MAX_HOSTS, DEFAULT_MAX_UPLOADS, DEFAULT_WAVE_SIZE, plan_waves, read_repository, rollout_summary, run_rollout
+
+parser = argparse.ArgumentParser(description="Python script using Redfish API to apply a local directory of Dell Update Packages (DUPs) to multiple iDRACs. iDRACs are updated in waves, first a canary wave then the remaining iDRACs, rollout halts if a wave fails. For every iDRAC the same update order as FirmwareUpdateLocalRepoREDFISH.py is used: all other packages first with one server reboot, then CPLD and iDRAC last. Packages already installed are skipped. Uploads from this system are limited by max concurrent uploads and a combined bandwidth limit, run one rollout per jump host or share server to apply limits per system.")
+parser.add_argument('-u', help='iDRAC username, same user is used for every iDRAC', required=False)
+parser.add_argument('-p', help='iDRAC password. If you do not pass in argument -p, script will prompt to enter user password which will not be echoed to the screen.', required=False)
+parser.add_argument('--ssl', help='SSL cert verification for all Redfish calls, pass in value \"true\" or \"false\". By default, this argument is not required and script ignores validating SSL cert for all Redfish calls.', required=False)
+parser.add_argument('--script-examples', action="store_true", help='Prints script examples')
+parser.add_argument('--hosts', help='Pass in iDRAC inventory. Supported values are iDRAC IP or hostname, last octet range (example: 192.168.0.130-140), range across subnets (example: 192.168.0.250-192.168.1.10) or CIDR network (example: 192.168.0.0/28). Use a comma separator to pass in multiple values. iDRACs are updated in this order.', required=False)
+parser.add_argument('--hosts-file', help='Pass in inventory file. Either a text file with one or more --hosts values per line (# starts a comment) or an INI file with idrac_ips setting in the Parameters section.', dest="hosts_file", required=False)
+parser.add_argument('--location', help='Pass in the full directory path of the directory which contains the Dell update packages (DUP). Note: only Windows DUPs are supported. iDRAC and CPLD packages are detected by the words idrac and cpld in the DUP file name.', required=False)
+parser.add_argument('--canary', help='Number of iDRACs updated in the first (canary) wave, rollout halts if any canary iDRAC fails. Pass in 0 to not use a canary wave, default is %s' % DEFAULT_CANARY_HOSTS, type=int, default=DEFAULT_CANARY_HOSTS, required=False)
+parser.add_argument('--wave-size', help='Number of iDRACs per wave after the canary wave, default is %s' % DEFAULT_WAVE_SIZE, dest="wave_size", type=int, default=DEFAULT_WAVE_SIZE, required=False)
+parser.add_argument('--max-hosts', help='Max number of iDRACs of a wave updated at the same time, default is %s' % DEFAULT_MAX_HOSTS, dest="max_hosts", type=int, default=DEFAULT_MAX_HOSTS, required=False)
+parser.add_argument('--max-uploads', help='Max number of package uploads from this system at the same time across all iDRACs, default is %s' % DEFAULT_MAX_UPLOADS, dest="max_uploads", type=int, default=DEFAULT_MAX_UPLOADS, required=False)
+parser.add_argument('--max-upload-rate', help='Pass in max upload bandwidth in MB per second for all uploads from this system combined, by default upload bandwidth is not limited', dest="max_upload_rate", type=float, required=False)
+parser.add_argument('--max-failed-percent', help='Rollout halts once more than this percent of the iDRACs in a wave failed, default is %s' % DEFAULT_MAX_FAILED_PERCENT, dest="max_failed_percent", type=float, default=DEFAULT_MAX_FAILED_PERCENT, required=False)
+parser.add_argument('--force', help='Pass in this argument to upload and apply every package detected in the directory. By default each package version is compared against installed version before uploading and packages already installed are skipped', action="store_true", required=False)
+parser.add_argument('--plan', help='Print rollout waves and packages detected without updating any iDRAC', action="store_true", required=False)
+parser.add_argument('--output-dir', help='Pass in directory path to save the rollout summary file, default is \"%s\"' % DEFAULT_OUTPUT_DIRECTORY, dest="output_dir", default=DEFAULT_OUTPUT_DIRECTORY, required=False)
+
+args = vars(parser.parse_args())
+logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
+
+def script_examples():
+    print("""\n- FirmwareRolloutREDFISH.py --hosts-file idracs.txt -u root -p calvin --location /repo/R750 --plan, this example will print rollout waves and DUP packages detected without updating any iDRAC.
+    \n- FirmwareRolloutREDFISH.py --hosts-file idracs.txt -u root -p calvin --location /repo/R750 --canary 2 --wave-size 50 --max-hosts 50 --max-uploads 8 --max-upload-rate 80, this example will update 2 canary iDRACs first, then the remaining iDRACs 50 at a time with at most 8 uploads running at the same time using 80 MB/s combined.
+    \n- FirmwareRolloutREDFISH.py --hosts 192.168.0.120-150 -u root --location C:\\Users\\administrator\\Downloads\\R740xd_repo --max-failed-percent 0, this example will prompt for iDRAC user password once and halt the rollout as soon as any iDRAC of a wave fails.""")
+    sys.exit(0)
+
+def get_idrac_ips():
+    idrac_ips = []
+    try:
+        if args["hosts"]:
+            idrac_ips.extend(expand_idrac_ips(args["hosts"]))
+        if args["hosts_file"]:
+            idrac_ips.extend(read_inventory_file(args["hosts_file"]))
+    except (IOError, OSError, ValueError) as error_message:
+        logging.error("\n- FAIL, unable to get iDRAC inventory, detailed error information: %s" % error_message)
+        sys.exit(1)
+    idrac_ips = list(dict.fromkeys(idrac_ips))
+    if not idrac_ips:
+        logging.error("\n- FAIL, no iDRAC IPs detected in inventory")
+        sys.exit(1)
+    return idrac_ips
+
+def get_repository_packages():
+    if not os.path.isdir(args["location"]):
+        logging.error("\n- FAIL, value detected for argument --location is not a directory")
+        sys.exit(1)
+    packages = read_repository(args["location"])
+    if not packages.standard and not packages.cpld and not packages.idrac:
+        logging.error("\n- FAIL, either directory path is empty or directory contains no valid Windows Dell Update Packages.")
+        sys.exit(1)
+    return packages
+
+def print_rollout_plan(idrac_ips, packages):
+    logging.info("\n- INFO, packages detected in order applied per iDRAC -\n")
+    for package_type, filenames in (("Package", packages.standard), ("CPLD package", packages.cpld), ("iDRAC package", packages.idrac)):
+        for i in filenames:
+            logging.info("%s: %s" % (package_type, os.path.basename(i)))
+    waves = plan_waves(idrac_ips, args["canary"], args["wave_size"])
+    logging.info("\n- INFO, %s iDRAC(s) in %s wave(s) -\n" % (len(idrac_ips), len(waves)))
+    for wave_number, wave in enumerate(waves, 1):
+        logging.info("%s %s: %s" % ("Canary wave" if args["canary"] and wave_number == 1 else "Wave", wave_number, ", ".join(wave)))
+
+def rollout_firmware():
+    idrac_ips = get_idrac_ips()
+    packages = get_repository_packages()
+    if args["plan"]:
+        print_rollout_plan(idrac_ips, packages)
+        return
+    if not args["u"]:
+        logging.error("\n- FAIL, argument -u is required to update iDRACs")
+        sys.exit(1)
+    if args["p"]:
+        idrac_password = args["p"]
+    else:
+        idrac_password = read_idrac_password(args["u"])
+    if args["ssl"] and args["ssl"].lower() == "true":
+        verify_cert = True
+    else:
+        verify_cert = False
+    if not os.path.isdir(args["output_dir"]):
+        os.makedirs(args["output_dir"])
+    logging.info("\n- INFO, applying %s package(s) to %s iDRAC(s), max %s iDRACs and %s uploads at the same time" % (len(packages.standard) + len(packages.cpld) + len(packages.idrac), len(idrac_ips), args["max_hosts"], args["max_uploads"]))
+    start_time = time.time()
+    results = []
+    for result in run_rollout(idrac_ips, packages, args["u"], idrac_password, verify_cert=verify_cert, canary_hosts=args["canary"], wave_size=args["wave_size"], max_hosts=args["max_hosts"],
+                              max_uploads=args["max_uploads"], max_upload_rate=args["max_upload_rate"], max_failed_percent=args["max_failed_percent"], force=args["force"]):
+        results.append(result)
+        if result.status == "PASS":
+            logging.info("- PASS, iDRAC %s completed in %s seconds, %s package(s) applied, %s already installed (%s/%s)" % (result.idrac_ip, round(result.elapsed, 1), len(result.applied), len(result.skipped), len(results), len(idrac_ips)))
+        elif result.status != "HALTED":
+            logging.error("- FAIL, iDRAC %s status %s, %s (%s/%s)" % (result.idrac_ip, result.status, result.error, len(results), len(idrac_ips)))
+    summary = rollout_summary(results)
+    summary["location"] = args["location"]
+    summary["total_seconds"] = round(time.time() - start_time, 1)
+    summary["results"] = [{"idrac_ip": i.idrac_ip, "wave": i.wave, "status": i.status, "applied": i.applied, "skipped": i.skipped, "failed": i.failed, "elapsed_seconds": round(i.elapsed, 1), "error": i.error} for i in sorted(results, key=lambda x: idrac_ips.index(x.idrac_ip))]
+    summary_filename = os.path.join(args["output_dir"], "rollout_summary_%s.json" % datetime.now().strftime("%Y%m%d-%H%M%S"))
+    with open(summary_filename, "w") as open_file:
+        json.dump(summary, open_file, indent=4)
+    logging.info("\n- Summary, %s iDRAC(s) completed in %s seconds, %s package(s) applied, %s already installed -\n" % (summary["total"], summary["total_seconds"], summary["packages_applied"], summary["packages_skipped"]))
+    for status, count in summary["status"].items():
+        logging.info("%s: %s" % (status, count))
+    if summary["failed"]:
+        logging.info("\n- iDRACs not passed -\n")
+        for i in summary["failed"]:
+            logging.info("%s: %s, %s" % (i["idrac_ip"], i["status"], i["error"]))
+    logging.info("\n- INFO, summary saved to file \"%s\"" % summary_filename)
+    if summary["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    if args["script_examples"]:
+        script_examples()
+    elif args["location"] and (args["hosts"] or args["hosts_file"]):
+        rollout_firmware()
+    else:
+        logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
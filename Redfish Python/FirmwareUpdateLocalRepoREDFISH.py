@@ -14,7 +14,6 @@
 #
 
 import argparse
-import getpass
 import glob
 import json
 import logging
@@ -22,14 +21,17 @@ import os
 import platform
 import re
 import requests
-import subprocess
 import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from pprint import pprint
+from IdracRedfishSupport.upload import post_multipart
+from IdracRedfishSupport.firmware import dup_update_needed
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -42,11 +44,14 @@ parser.add_argument('--ssl', help='SSL cert verification for all Redfish calls,
 parser.add_argument('--script-examples', action="store_true", help='Prints script examples')
 parser.add_argument('--get', help='Get current supported devices for firmware updates and their current firmware versions', action="store_true", required=False)
 parser.add_argument('--location', help='Pass in the full directory path location of the directory which contains all Dell update packages (DUP). Note: only Windows DUPs are supported by iDRAC interfaces to perform updates. Note: make sure only DUPs are in this directory and no other files, directories. Note: If planning to update iDRAC, make sure the DUP name package contains the word idrac (default DUP name does contain wording iDRAC, recommended not to change it)', required=False)
+parser.add_argument('--max-upload-rate', help='Pass in max upload bandwidth in MB per second for uploading the firmware image. Use this to limit network usage when updating multiple servers at the same time, by default upload bandwidth is not limited. Upload progress and MB/s are reported while uploading', required=False, dest='max_upload_rate', type=float)
+parser.add_argument('--force', help='Pass in this argument to upload and apply every package detected in the directory. By default each package version is compared against installed version before uploading and packages already installed are skipped', action="store_true", required=False)
 args = vars(parser.parse_args())
 logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
 
 def script_examples():
-    print("""\n- FirmwareUpdateLocalRepoREDFISH.py -ip 192.168.0.120 -u root -p calvin --location C:\\Users\\administrator\\Downloads\\R740xd_repo, this example will apply updates for all DUP packages detected in this directory path.""")
+    print("""\n- FirmwareUpdateLocalRepoREDFISH.py -ip 192.168.0.120 -u root -p calvin --location C:\\Users\\administrator\\Downloads\\R740xd_repo, this example will apply updates for all DUP packages detected in this directory path. Packages with the same version already installed are skipped without uploading.
+    \n- FirmwareUpdateLocalRepoREDFISH.py -ip 192.168.0.120 -u root -p calvin --location C:\\Users\\administrator\\Downloads\\R740xd_repo --force, this example will upload and apply all DUP packages detected in this directory path even if same version is already installed.""")
     sys.exit(0)
 
 # Example of local directory contents containing Dell DUPs:
@@ -87,6 +92,20 @@ def get_FW_inventory():
         pprint(i)
         print("\n")
 
+def package_update_needed(firmware_image_device):
+    # Compare package version against installed version before uploading the package, firmware inventory is fetched once and reused for every package.
+    # Package is uploaded if versions are different or the compare can't be done locally.
+    if args["x"]:
+        version_check = dup_update_needed(firmware_image_device, idrac_ip, x_auth_token=args["x"], verify_cert=verify_cert)
+    else:
+        version_check = dup_update_needed(firmware_image_device, idrac_ip, idrac_username, idrac_password, verify_cert=verify_cert)
+    if version_check.update_needed is False:
+        logging.info("\n- INFO, skipping package \"%s\", %s" % (os.path.basename(firmware_image_device), version_check.reason))
+        return False
+    if version_check.update_needed is None:
+        logging.debug("- INFO, unable to compare package version before upload, %s" % version_check.reason)
+    return True
+
 def download_image_create_update_job(firmware_image_device):
     global job_id
     global idrac_dup_package
@@ -114,9 +133,9 @@ def download_image_create_update_job(firmware_image_device):
         }
         if args["x"]:
             headers = {'X-Auth-Token': args["x"]}
-            response = requests.post(url, files=files, headers=headers, verify=verify_cert)
+            response = post_multipart(url, files, max_rate=args["max_upload_rate"], headers=headers, verify=verify_cert)
         else:
-            response = requests.post(url, files=files, verify=verify_cert,auth=(idrac_username,idrac_password))
+            response = post_multipart(url, files, max_rate=args["max_upload_rate"], verify=verify_cert,auth=(idrac_username,idrac_password))
         
         if response.status_code != 202:
             data = response.json()
@@ -146,9 +165,9 @@ def idrac_cpld_update(firmware_image_device):
     }
     if args["x"]:
         headers = {'X-Auth-Token': args["x"]}
-        response = requests.post(url, files=files, headers=headers, verify=verify_cert)
+        response = post_multipart(url, files, max_rate=args["max_upload_rate"], headers=headers, verify=verify_cert)
     else:
-        response = requests.post(url, files=files, verify=verify_cert,auth=(idrac_username,idrac_password))
+        response = post_multipart(url, files, max_rate=args["max_upload_rate"], verify=verify_cert,auth=(idrac_username,idrac_password))
     
     if response.status_code != 202:
         data = response.json()
@@ -162,95 +181,48 @@ def idrac_cpld_update(firmware_image_device):
     logging.info("- PASS, update job ID %s successfully created for firmware package \"%s\"" % (update_job_id, firmware_image_device.split("\\")[-1]))
 
 def check_job_status(download_job_id):
-    retry_count = 1
-    start_time = datetime.now()
-    while True:
-        check_idrac_connection()
-        if retry_count == 10:
-            logging.warning("- WARNING, GET command retry count of 10 has been reached, script will exit")
-            sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, download_job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, download_job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.info("- INFO, GET request failed due to connection error, retry")
-            time.sleep(10)
-            retry_count += 1
-            continue
-        data = response.json()
-        current_time = str(datetime.now()-start_time)[0:7]   
-        message_string = data["Messages"]
-        if response.status_code == 200 or response.status_code == 202:
-            time.sleep(1)
-        else:
-            logging.error("\n- ERROR, GET request failed to get job ID details, status code %s returned, error: \n%s" % (response.status_code, data))
-            sys.exit(0)
-        if "fail" in data['Oem']['Dell']['Message'].lower() or "error" in data['Oem']['Dell']['Message'].lower() or "fail" in data['Oem']['Dell']['JobState'].lower():
-            logging.error("- FAIL: Job ID %s failed, current message: %s" % (download_job_id, data['Oem']['Dell']['Message']))
-            time.sleep(30)
-            return
-        elif data["TaskState"] == "Completed" and data["Oem"]["Dell"]["JobState"] or data["TaskState"] == "Completed" or "completed successfully" in data['Oem']['Dell']['Message'].lower():
-            try:
-                logging.info("- PASS, %s job %s successfully marked completed" % (data["Oem"]["Dell"]["Name"].replace(":",""), download_job_id))
-            except:
-                logging.info("- PASS, %s job %s successfully marked completed" % (data["Name"].replace(":",""), download_job_id))
-            time.sleep(30)
-            break
-        elif str(current_time)[0:7] >= "0:50:00":
-            logging.error("\n- FAIL: Timeout of 50 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
-            return
-        elif "schedule" in data['Oem']['Dell']['Message'].lower():
-            print("- PASS, %s successfully marked as scheduled, server reboot needed to apply the update" % data["Id"])
-            update_jobs_need_server_reboot.append(download_job_id)
-            time.sleep(30)
-            break
-        else:
-            logging.info("- INFO, %s job status: %s" % (download_job_id, message_string[0]["Message"].rstrip(".")))
-            time.sleep(2)
-            continue
+    def job_finished(data):
+        message = data.get("Message", "").lower()
+        return "fail" in message or "error" in message or "completed successfully" in message or "schedule" in message
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, %s job status: %s" % (download_job_id, (status.message or "").rstrip(".")))
+    status = wait_for_job(idrac_ip, download_job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=50), until=job_finished, on_update=job_status_update)
+    message = status.message or ""
+    if status.error:
+        logging.error("\n- ERROR, GET request failed to get job ID details, %s" % status.error)
+        sys.exit(0)
+    elif status.failed and not status.timed_out or "error" in message.lower():
+        logging.error("- FAIL: Job ID %s failed, current message: %s" % (download_job_id, message))
+        time.sleep(30)
+        return
+    elif status.job_state == "Completed" or "completed successfully" in message.lower():
+        logging.info("- PASS, %s job %s successfully marked completed" % (status.data.get("Name", "").replace(":",""), download_job_id))
+        time.sleep(30)
+    elif status.timed_out:
+        logging.error("\n- FAIL: Timeout of 50 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
+        return
+    else:
+        print("- PASS, %s successfully marked as scheduled, server reboot needed to apply the update" % download_job_id)
+        update_jobs_need_server_reboot.append(download_job_id)
+        time.sleep(30)
 
 def loop_check_final_job_status(reboot_update_job_id):
-    start_time = datetime.now()
-    retry_count = 1
-    while True:
-        if retry_count == 20:
-            logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
-            sys.exit(0)
-        check_idrac_connection()
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, reboot_update_job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, reboot_update_job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.info("- INFO, GET request failed due to connection error, retry")
-            time.sleep(30)
-            retry_count += 1
-            continue 
-        current_time = str((datetime.now()-start_time))[0:7]
-        if response.status_code != 200:
-            logging.error("\n- FAIL, GET command failed to check job status, return code %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(response.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "0:50:00":
-            logging.error("\n- FAIL: Timeout of 50 minutes has been hit, script stopped\n")
-            return
-        elif "fail" in data['Message'].lower() or "fail" in data['JobState'].lower():
-            logging.error("- FAIL: job ID %s failed, error results: \n%s" % (job_id, data['Message']))
-            return
-        elif "completed successfully" in data['Message']:
-            try:
-                logging.info("- PASS, %s job %s successfully marked completed" % (data["Oem"]["Dell"]["Name"].replace(":",""), reboot_update_job_id))
-            except:
-                logging.info("- PASS, %s job %s successfully marked completed" % (data["Name"].replace(":",""), reboot_update_job_id))
-            time.sleep(30)
-            break
-        else:
-            logging.info("- INFO, %s job status not completed, current status: \"%s\"" % (reboot_update_job_id, data['Message'].rstrip(".")))
-            time.sleep(60)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, %s job status not completed, current status: \"%s\"" % (reboot_update_job_id, (status.message or "").rstrip(".")))
+    status = wait_for_job(idrac_ip, reboot_update_job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=50), until=lambda data: "fail" in data.get("Message", "").lower(), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 50 minutes has been hit, script stopped\n")
+        return
+    elif status.error:
+        logging.error("\n- FAIL, GET command failed to check job status, %s" % status.error)
+        return
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed, error results: \n%s" % (reboot_update_job_id, status.message))
+        return
+    logging.info("- PASS, %s job %s successfully marked completed" % (status.data.get("Name", "").replace(":",""), reboot_update_job_id))
+    time.sleep(30)
 
 def reboot_server():
     logging.info("- INFO, rebooting the server now to apply firmware update(s)")
@@ -284,11 +256,11 @@ def reboot_server():
             else:
                 response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time >= "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 time.sleep(60)
@@ -347,50 +319,6 @@ def reboot_server():
         logging.error("- FAIL, unable to get current server power state to perform either reboot or power on")
         sys.exit(0)
 
-def check_idrac_connection():
-    run_network_connection_function = ""
-    if platform.system().lower() == "windows":
-        ping_command = "ping -n 3 %s" % idrac_ip
-    elif platform.system().lower() == "linux":
-        ping_command = "ping -c 3 %s" % idrac_ip
-    else:
-        logging.error("- FAIL, unable to determine OS type, check iDRAC connection function will not execute")
-        run_network_connection_function = "fail"
-    execute_command = subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-    if execute_command != 0:
-        ping_status = "lost"
-    else:
-        ping_status = "good"
-        pass
-    if ping_status == "lost":
-            logging.info("- INFO, iDRAC network connection lost due to slow network response or iDRAC reboot, waiting 30 seconds to access iDRAC again")
-            time.sleep(30)
-            while True:
-                if run_network_connection_function == "fail":
-                    break
-                execute_command=subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-                if execute_command != 0:
-                    ping_status = "lost"
-                else:
-                    ping_status = "good"
-                if ping_status == "lost":
-                    logging.info("- INFO, unable to ping iDRAC IP, script will wait 30 seconds and try again")
-                    time.sleep(30)
-                    continue
-                else:
-                    break
-            while True:
-                try:
-                    if args["x"]:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                    else:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-                except requests.ConnectionError as error_message:
-                    logging.info("- INFO, GET request failed due to connection error, retry")
-                    time.sleep(10)
-                    continue
-                break
-
 if __name__ == "__main__":
     if args["script_examples"]:
         script_examples()
@@ -400,7 +328,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -438,6 +366,8 @@ if __name__ == "__main__":
                     i = str(directory_path) + "/" + i
                 if platform.system().lower() == "windows":
                     i = str(directory_path) + "\\" + i
+            if not args["force"] and not package_update_needed(i):
+                continue
             download_image_create_update_job(i)
             if job_id_created == "no":
                 continue
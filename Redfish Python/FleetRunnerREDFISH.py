@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+#
+# FleetRunnerREDFISH. Python script to execute any Redfish Python script against multiple iDRACs in parallel.
+#
+# _author_ = Texas Roemer <Texas_Roemer@Dell.com>
+# _version_ = 1.0
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from datetime import datetime
+from IdracRedfishSupport.fleet import DEFAULT_MAX_WORKERS, DEFAULT_OUTPUT_DIRECTORY, expand_idrac_ips, fleet_summary, read_idrac_password, read_inventory_file, run_fleet
+
+parser = argparse.ArgumentParser(description="Python script to execute any Redfish Python script against multiple iDRACs in parallel. Any argument not listed below is passed to the script being executed for every iDRAC (example: -u, -p, --ssl and the script workflow arguments). Output for each iDRAC is saved to its own log file and a summary is returned once all iDRACs have completed.", allow_abbrev=False)
+parser.add_argument('--script', help='Pass in the Redfish Python script to execute for every iDRAC. Pass in either the script file name (scripts located in the same directory as this script are also found) or a module:function entry point.', required=False)
+parser.add_argument('--hosts', help='Pass in iDRAC inventory. Supported values are iDRAC IP or hostname, last octet range (example: 192.168.0.130-140), range across subnets (example: 192.168.0.250-192.168.1.10) or CIDR network (example: 192.168.0.0/28). Use a comma separator to pass in multiple values.', required=False)
+parser.add_argument('--hosts-file', help='Pass in inventory file. Either a text file with one or more --hosts values per line (# starts a comment) or an INI file with idrac_ips setting in the Parameters section.', dest="hosts_file", required=False)
+parser.add_argument('--max-workers', help='Max number of iDRACs the script is executed against at the same time, default is %s' % DEFAULT_MAX_WORKERS, dest="max_workers", type=int, default=DEFAULT_MAX_WORKERS, required=False)
+parser.add_argument('--timeout', help='Max time in minutes allowed for the script to complete for one iDRAC. If the timeout is hit, the script is stopped and iDRAC is reported as TIMEOUT. By default no timeout is used.', type=float, required=False)
+parser.add_argument('--output-dir', help='Pass in directory path to save per iDRAC script output log files and the summary file, default is \"%s\". Script for each iDRAC is executed in sub directory <output-dir>/<iDRAC IP>, files written by the script are saved there.' % DEFAULT_OUTPUT_DIRECTORY, dest="output_dir", default=DEFAULT_OUTPUT_DIRECTORY, required=False)
+parser.add_argument('--script-examples', help='Get executing script examples', action="store_true", dest="script_examples", required=False)
+
+args, script_arguments = parser.parse_known_args()
+args = vars(args)
+logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
+
+def script_examples():
+    print("""\n- FleetRunnerREDFISH.py --script GetFirmwareInventoryREDFISH.py --hosts 192.168.0.120-150 -u root -p calvin, this example will get firmware inventory for iDRACs 192.168.0.120 up to 192.168.0.150, running the script against 16 iDRACs at the same time.
+    \n- FleetRunnerREDFISH.py --script GetSetBiosAttributesREDFISH.py --hosts-file idracs.txt --max-workers 50 --timeout 60 -u root --attribute-names MemTest --attribute-values Disabled --reboot, this example will prompt for iDRAC user password once, set BIOS attribute for every iDRAC in the inventory file running 50 at the same time and stop the script for any iDRAC which hasn't completed within 60 minutes.
+    \n- FleetRunnerREDFISH.py --script GetSystemHWInventoryREDFISH.py --hosts 192.168.0.0/24,192.168.10.5-20 --output-dir C:\\fleet_logs -u root -p calvin --get-memory, this example will get memory inventory for all iDRACs in the 192.168.0.0/24 network and 192.168.10.5 up to 192.168.10.20, output for each iDRAC is saved in C:\\fleet_logs directory.""")
+    sys.exit(0)
+
+def get_script_path():
+    script = args["script"]
+    if script.endswith(".py") and not os.path.exists(script):
+        script_directory_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
+        if os.path.exists(script_directory_path):
+            return script_directory_path
+        logging.error("\n- FAIL, unable to locate script %s" % script)
+        sys.exit(1)
+    return script
+
+def get_idrac_ips():
+    idrac_ips = []
+    try:
+        if args["hosts"]:
+            idrac_ips.extend(expand_idrac_ips(args["hosts"]))
+        if args["hosts_file"]:
+            idrac_ips.extend(read_inventory_file(args["hosts_file"]))
+    except (IOError, OSError, ValueError) as error_message:
+        logging.error("\n- FAIL, unable to get iDRAC inventory, detailed error information: %s" % error_message)
+        sys.exit(1)
+    idrac_ips = list(dict.fromkeys(idrac_ips))
+    if not idrac_ips:
+        logging.error("\n- FAIL, no iDRAC IPs detected in inventory")
+        sys.exit(1)
+    return idrac_ips
+
+def run_script_all_idracs():
+    script = get_script_path()
+    idrac_ips = get_idrac_ips()
+    # Password is passed to the script processes in an environment variable, on their command line any local user could read it for the whole run
+    idrac_password = None
+    if "-p" in script_arguments:
+        index = script_arguments.index("-p")
+        idrac_password = script_arguments[index + 1] if index + 1 < len(script_arguments) else None
+        del script_arguments[index:index + 2]
+    elif "-u" in script_arguments and "-x" not in script_arguments:
+        idrac_username = script_arguments[script_arguments.index("-u") + 1]
+        idrac_password = read_idrac_password(idrac_username)
+    if args["timeout"]:
+        timeout = args["timeout"] * 60
+    else:
+        timeout = None
+    logging.info("\n- INFO, executing %s against %s iDRAC(s), max %s at the same time. Output for each iDRAC will be saved in directory \"%s\"\n" % (os.path.basename(script), len(idrac_ips), args["max_workers"], args["output_dir"]))
+    start_time = time.time()
+    results = []
+    for result in run_fleet(script, idrac_ips, script_arguments, max_workers=args["max_workers"], timeout=timeout, output_directory=args["output_dir"], password=idrac_password):
+        results.append(result)
+        if result.status == "PASS":
+            logging.info("- PASS, iDRAC %s completed in %s seconds (%s/%s)" % (result.idrac_ip, round(result.elapsed, 1), len(results), len(idrac_ips)))
+        else:
+            logging.error("- FAIL, iDRAC %s status %s, %s, see %s (%s/%s)" % (result.idrac_ip, result.status, result.error, result.output_file, len(results), len(idrac_ips)))
+    summary = fleet_summary(results)
+    summary["script"] = os.path.basename(script)
+    summary["total_seconds"] = round(time.time() - start_time, 1)
+    summary["results"] = [{"idrac_ip": i.idrac_ip, "status": i.status, "exit_code": i.exit_code, "elapsed_seconds": round(i.elapsed, 1), "output_file": i.output_file} for i in sorted(results, key=lambda x: idrac_ips.index(x.idrac_ip))]
+    summary_filename = os.path.join(args["output_dir"], "fleet_summary_%s.json" % datetime.now().strftime("%Y%m%d-%H%M%S"))
+    with open(summary_filename, "w") as open_file:
+        json.dump(summary, open_file, indent=4)
+    logging.info("\n- Summary, %s iDRAC(s) completed in %s seconds -\n" % (summary["total"], summary["total_seconds"]))
+    for status, count in summary["status"].items():
+        logging.info("%s: %s" % (status, count))
+    if summary["failed"]:
+        logging.info("\n- iDRACs not passed -\n")
+        for i in summary["failed"]:
+            logging.info("%s: %s, %s" % (i["idrac_ip"], i["status"], i["error"]))
+    logging.info("\n- INFO, summary saved to file \"%s\"" % summary_filename)
+    if summary["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    if args["script_examples"]:
+        script_examples()
+    elif args["script"] and (args["hosts"] or args["hosts_file"]):
+        run_script_all_idracs()
+    else:
+        logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
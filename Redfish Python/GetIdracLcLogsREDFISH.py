@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
@@ -29,6 +28,10 @@ import warnings
 
 from pprint import pprint
 from datetime import datetime
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.logs import download_log_entries, sync_log_entries, route_log_entries, FAILURE_KEYWORDS, LogClassifier, NdjsonSink, WatermarkError
+from IdracRedfishSupport.paging import CollectionError, RedfishCollection
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -48,6 +51,10 @@ parser.add_argument('--end-date', help='Pass in the end date for the date range
 parser.add_argument('--get-fail', help='Get only failed entries from LC logs (searches for keywords unable, error, fault or fail',  action="store_true", dest="get_fail", required=False)
 parser.add_argument('--get-message-id', help='Get only entries for a specific message ID. To get the correct message ID string format to pass in use argument --get-all to return complete LC logs. iDRAC9 examples of correct message string ID value to pass in: IDRAC.2.9.PDR1001, IDRAC.2.9.LC011. Note: You can also pass in an abbreviated message ID value, example: IDRAC.2.9.LC which will return any message ID that starts with LC. Note: iDRAC8 has a different message ID format, run --get-all argument to see string format.', dest="get_message_id", required=False)
 parser.add_argument('--dump-to-json-file', help='Pass in this argument to dump LC log entries to JSON file(s) which you can then parse the JSON output. Note: Multiple JSON files may be created due to the LC logs file size since Redfish can only report 50 entries at a time.', dest="dump_to_json_file", action="store_true", required=False)
+parser.add_argument('--ndjson-file', help='Pass in file name to write LC log entries to a single NDJSON file (one JSON entry per line, in LC log order) instead of printing them. LC log pages are downloaded in parallel and written as they arrive. File name ending with .gz will be gzip compressed. Supported with arguments --get-all, --get-severity, --get-category, --get-date-range, --get-message-id and --get-fail.', dest="ndjson_file", required=False)
+parser.add_argument('--gzip', help='Gzip compress the file passed in with argument --ndjson-file', action="store_true", required=False)
+parser.add_argument('--workers', help='Number of LC log pages downloaded in parallel when using argument --ndjson-file, default is 4', type=int, default=4, required=False)
+parser.add_argument('--incremental', help='Pass in this argument with --get-all and --ndjson-file to append only LC log entries created since the last run for this iDRAC to the NDJSON file. Highest entry Id and Created timestamp are stored per iDRAC under ~/.idrac_redfish/log_watermarks, complete LC log is appended again if the LC log was cleared.', action="store_true", required=False)
 args = vars(parser.parse_args())
 logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
 
@@ -58,6 +65,9 @@ def script_examples():
     \n- GetIdracLcLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-severity critical, this example will return only critical entries detected.
     \n- GetIdracLcLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-severity warning, this example will return only warning entries detected and also redirect output in JSON format to a directory folder created by the script.
     \n- GetIdracLcLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-category systemhealth, this example will return only system health category entries detected.
+    \n- GetIdracLcLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-all --ndjson-file lc_logs.ndjson.gz, this example will download complete iDRAC LC logs in parallel to gzip compressed NDJSON file lc_logs.ndjson.gz.
+    \n- GetIdracLcLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-all --ndjson-file lc_logs.ndjson --incremental, this example will append only LC log entries created since the last run to NDJSON file lc_logs.ndjson.
+    \n- GetIdracLcLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-fail --get-category storage --get-message-id IDRAC.2.9.PDR --dump-to-json-file, this example will download LC logs once and create failure, storage category and PDR message ID reports together, each report copied to its own JSON file.
     \n- GetIdracLcLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-date-range --start-date 2023-03-15T14:55:10-05:00 --end-date 2023-03-15T14:57:07-05:00, this example will return only LC Log entries within this start and date range.""")
     sys.exit(0)
 
@@ -93,293 +103,111 @@ def get_iDRAC_version():
     else:
         iDRAC_version = "new"
 
-def get_specific_severity_logs():
-    if args["dump_to_json_file"]:
-        try:
-            shutil.rmtree("%s_LC_log_JSON_files" % idrac_ip)
-        except:
-            logging.debug("- INFO, directory does not exist, skipping")
-        directory_name = "%s_LC_log_JSON_files" % idrac_ip
-        directory_path = os.mkdir(directory_name)
-    if iDRAC_version == "old":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/Logs/Lclog"
-    elif iDRAC_version == "new":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Lclog/Entries"
-    logging.info("\n- INFO, this may take 30 seconds to 1 minute to collect all iDRAC LC logs depending on log file size")
-    if args["get_severity"].lower() == "informational":
-        filter_uri = "%s?$filter=Severity eq 'OK'" % uri
-    elif args["get_severity"].lower() == "critical":
-        filter_uri = "%s?$filter=Severity eq 'Critical'" % uri
-    elif args["get_severity"].lower() == "warning":
-        filter_uri = "%s?$filter=Severity eq 'Warning'" % uri
-    else:
-        logging.error("\n- WARNING, invalid value passed in for argument --get-severity")
-        sys.exit(0)
+def get_collection(uri):
     if args["x"]:
-        response = requests.get('https://%s/%s' % (idrac_ip, filter_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/%s' % (idrac_ip, filter_uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-    lc_logs_list = []
-    data = response.json()
-    if response.status_code == 401:
-        logging.warning("\n- WARNING, status code %s returned. Incorrect iDRAC username/password or invalid privilege detected." % response.status_code)
-        sys.exit(0)
-    elif response.status_code != 200:
-        logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
-        sys.exit(0)
-    elif "Members" not in data.keys():
-        logging.warning("- WARNING, 'Members' key not detected in JSON response, unable to get LC logs. Manually check iDRAC interfaces to confirm you can view LC logs")
-        sys.exit(0)
-    elif data["Members"] == []:
-        logging.info("\n- WARNING, no \"%s\" severity entries detected in iDRAC LC logs" % args["get_severity"])
-        sys.exit(0)
+        return RedfishCollection(idrac_ip, uri, x_auth_token=args["x"], verify_cert=verify_cert)
     else:
-        lc_logs_list.append(data)
-        if args["dump_to_json_file"]:
-            filename = directory_name + "/lclog_entries_1.json"
-            open_file = open(filename,"w")
-            json.dump(data, open_file)
-            open_file.close()
-            file_count = 2
-    if "Members@odata.nextLink" in data.keys():
-        skip_uri = data["Members@odata.nextLink"]
-        number_list = [i for i in range (1,100001) if i % 50 == 0]
-        for seq in number_list:
-            skip_uri = re.sub("skip=.*","skip=%s" % seq, skip_uri)
-            if args["x"]:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-            data = response.json()
-            if "Members" not in data.keys():
-                logging.debug("-WARNING, 'Members' key not detected in JSON response, script will exit loop for skip query")
-                break
-            if response.status_code == 500:
-                break
-            elif response.status_code != 200:
-                if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                    break
-                else:
-                    logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
-                    sys.exit(0)
-            elif "Members" in data.keys():
-                if data["Members"] == []:
-                    break
-            lc_logs_list.append(data)
-            if args["dump_to_json_file"]:
-                filename = directory_name + "/lclog_entries_%s.json" % file_count
-                open_file = open(filename, "w")
-                json.dump(data, open_file)
-                open_file.close()
-                file_count += 1
-    pprint(lc_logs_list)
-    if args["dump_to_json_file"]:
-        logging.info("\n- INFO, JSON dump log files copied to directory %s" % directory_name)
+        return RedfishCollection(idrac_ip, uri, username=idrac_username, password=idrac_password, verify_cert=verify_cert)
 
-def get_date_range():
-    if args["dump_to_json_file"]:
-        try:
-            shutil.rmtree("%s_LC_log_JSON_files" % idrac_ip)
-        except:
-            logging.debug("- INFO, directory does not exist, skipping")
-        directory_name = "%s_LC_log_JSON_files" % idrac_ip
-        directory_path = os.mkdir(directory_name)
-    logging.info("\n- INFO, this may take 30 seconds to 1 minute to collect all iDRAC LC logs depending on log file size")
+def get_lc_log_uri():
     if iDRAC_version == "old":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/Logs/Lclog"
-    elif iDRAC_version == "new":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Lclog/Entries"
-    date_range_uri = "%s?$filter=Created ge '%s' and Created le '%s'" % (uri, args["start_date"], args["end_date"])
-    if args["x"]:
-        response = requests.get('https://%s/%s' % (idrac_ip, date_range_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+        return "redfish/v1/Managers/iDRAC.Embedded.1/Logs/Lclog"
     else:
-        response = requests.get('https://%s/%s' % (idrac_ip, date_range_uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    lc_logs_list = []
-    if response.status_code == 401:
-        logging.warning("\n- WARNING, status code %s returned. Incorrect iDRAC username/password or invalid privilege detected." % response.status_code)
-        sys.exit(0)
-    elif response.status_code != 200:
-        logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
-        sys.exit(0)
-    elif "Members" not in data.keys():
+        return "redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Lclog/Entries"
+
+def create_json_directory():
+    directory_name = "%s_LC_log_JSON_files" % idrac_ip
+    try:
+        shutil.rmtree(directory_name)
+    except:
+        logging.debug("- INFO, directory does not exist, skipping")
+    os.mkdir(directory_name)
+    return directory_name
+
+def collection_error(error, first_page):
+    if error.status_code == 401:
+        logging.warning("\n- WARNING, status code %s returned. Incorrect iDRAC username/password or invalid privilege detected." % error.status_code)
+    elif error.status_code == 200:
         logging.warning("- WARNING, 'Members' key not detected in JSON response, unable to get LC logs. Manually check iDRAC interfaces to confirm you can view LC logs")
+    elif first_page:
+        logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
+    else:
+        logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (error.status_code, error.data))
+    sys.exit(0)
+
+def download_ndjson_file(uri, no_entries_message, match_entry=None):
+    logging.info("\n- INFO, downloading iDRAC LC logs to file \"%s\", %s pages downloaded in parallel" % (args["ndjson_file"], args["workers"]))
+    try:
+        if args["x"]:
+            download = download_log_entries(idrac_ip, uri, args["ndjson_file"], x_auth_token=args["x"], verify_cert=verify_cert, workers=args["workers"], compress=args["gzip"] or None, match=match_entry)
+        else:
+            download = download_log_entries(idrac_ip, uri, args["ndjson_file"], username=idrac_username, password=idrac_password, verify_cert=verify_cert, workers=args["workers"], compress=args["gzip"] or None, match=match_entry)
+    except CollectionError as error:
+        collection_error(error, True)
+    if download.entries == 0:
+        logging.warning(no_entries_message)
         sys.exit(0)
-    elif data["Members"] == []:
-        logging.info("- WARNING, no iDRAC LC logs detected within the date range specified")
+    logging.info("- PASS, %s LC log entries (%s pages) copied to file \"%s\" in %.1f seconds" % (download.entries, download.pages, download.filename, download.seconds))
+
+def sync_ndjson_file(uri):
+    logging.info("\n- INFO, appending iDRAC LC log entries created since the last sync to file \"%s\"" % args["ndjson_file"])
+    try:
+        if args["x"]:
+            log_sync = sync_log_entries(idrac_ip, uri, args["ndjson_file"], x_auth_token=args["x"], verify_cert=verify_cert, workers=args["workers"], compress=args["gzip"] or None)
+        else:
+            log_sync = sync_log_entries(idrac_ip, uri, args["ndjson_file"], username=idrac_username, password=idrac_password, verify_cert=verify_cert, workers=args["workers"], compress=args["gzip"] or None)
+    except CollectionError as error:
+        collection_error(error, "$skip" not in error.uri)
+    except WatermarkError as error_message:
+        logging.error("\n- FAIL, incremental sync not possible, %s" % error_message)
         sys.exit(0)
+    if log_sync.full_resync:
+        logging.info("- PASS, complete LC log synced, %s LC log entries appended to file \"%s\", last entry Id %s" % (log_sync.entries, log_sync.filename, log_sync.last_id))
     else:
-        lc_logs_list.append(data)
-        if args["dump_to_json_file"]:
-            filename = directory_name + "/lclog_entries_1.json"
-            open_file = open(filename,"w")
-            json.dump(data, open_file)
-            open_file.close()
-            file_count = 2
-    if "Members@odata.nextLink" in data.keys():
-        skip_uri = data["Members@odata.nextLink"]
-        number_list = [i for i in range (1,100001) if i % 50 == 0]
-        for seq in number_list:
-            skip_uri = re.sub("skip=.*","skip=%s" % seq, skip_uri)
-            if args["x"]:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-            data = response.json()
-            if "Members" not in data.keys():
-                logging.debug("- WARNING, 'Members' key not detected in JSON response, script will exit skip query loop.")
-                break
-            elif response.status_code == 500:
-                break
-            elif response.status_code != 200:
-                if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                    break
-                else:
-                    logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
-                    sys.exit(0)
-            elif "Members" in data.keys():
-                if data["Members"] == []:
-                    break
-            lc_logs_list.append(data)
-            if args["dump_to_json_file"]:
-                filename = directory_name + "/lclog_entries_%s.json" % file_count
-                open_file = open(filename, "w")
-                json.dump(data, open_file)
-                open_file.close()
-                file_count += 1
-    pprint(lc_logs_list)
-    if args["dump_to_json_file"]:
-        logging.info("\n- INFO, JSON dump log files copied to directory %s" % directory_name)
+        logging.info("- PASS, %s new LC log entries appended to file \"%s\", last entry Id %s" % (log_sync.entries, log_sync.filename, log_sync.last_id))
 
-        
-def get_LC_logs():
+def get_lc_log_pages(uri, no_entries_message):
+    if args["ndjson_file"]:
+        download_ndjson_file(uri, no_entries_message)
+        return
+    # Each page is printed and dumped to its own JSON file as soon as it is received, next page is fetched in the background
     if args["dump_to_json_file"]:
-        try:
-            shutil.rmtree("%s_LC_log_JSON_files" % idrac_ip)
-        except:
-            logging.debug("- INFO, directory does not exist, skipping")
-        directory_name = "%s_LC_log_JSON_files" % idrac_ip
-        directory_path = os.mkdir(directory_name)
+        directory_name = create_json_directory()
     logging.info("\n- INFO, this may take 30 seconds to 1 minute to collect all iDRAC LC logs depending on log file size")
-    if iDRAC_version == "old":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/Logs/Lclog"
-    elif iDRAC_version == "new":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Lclog/Entries"
-    if args["x"]:
-        response = requests.get('https://%s/%s' % (idrac_ip, uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/%s' % (idrac_ip, uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-    lc_logs_list = []
-    data = response.json()
-    if "Members" not in data.keys():
-        logging.warning("- WARNING, 'Members' key not detected in JSON response, unable to get LC logs. Manually check iDRAC interfaces to confirm you can view LC logs")
-        sys.exit(0)
-    elif response.status_code == 401:
-        logging.warning("\n- WARNING, status code %s returned. Incorrect iDRAC username/password or invalid privilege detected." % response.status_code)
-        sys.exit(0)
-    elif response.status_code != 200:
-        logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
-        sys.exit(0)
-    elif data["Members"] == []:
-        logging.info("\n- WARNING, 'Members' collection is empty, no LC logs detected, script will exit")
-        sys.exit(0)
-    else:
-        lc_logs_list.append(data)
-        if args["dump_to_json_file"]:
-            filename = directory_name + "/lclog_entries_1.json"
-            open_file = open(filename,"w")
-            json.dump(data, open_file)
-            open_file.close()
-            file_count = 2
-    if "Members@odata.nextLink" in data.keys():
-        skip_uri = data["Members@odata.nextLink"]
-        number_list = [i for i in range (1,100001) if i % 50 == 0]
-        for seq in number_list:
-            skip_uri = re.sub("skip=.*","skip=%s" % seq, skip_uri)
-            if args["x"]:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-            data = response.json()
-            if "Members" not in data.keys():
-                logging.debug("- WARNING, 'Members' key not detected in JSON response, script will exit looping skip query")
-                break
-            elif response.status_code == 500:
-                break
-            elif response.status_code != 200:
-                if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                    break
-                else:
-                    logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
-                    sys.exit(0)
-            elif "Members" in data.keys():
-                if data["Members"] == []:
-                    break
-            lc_logs_list.append(data)
+    collection = get_collection(uri)
+    try:
+        for data in collection.pages():
+            if collection.pages_fetched == 1 and data["Members"] == []:
+                logging.info(no_entries_message)
+                sys.exit(0)
+            pprint(data)
             if args["dump_to_json_file"]:
-                filename = directory_name + "/lclog_entries_%s.json" % file_count
+                filename = directory_name + "/lclog_entries_%s.json" % collection.pages_fetched
                 open_file = open(filename, "w")
                 json.dump(data, open_file)
                 open_file.close()
-                file_count += 1
-    pprint(lc_logs_list)
+    except CollectionError as error:
+        collection_error(error, collection.pages_fetched == 0)
     if args["dump_to_json_file"]:
-        logging.info("\n- INFO, JSON dump log files copied to directory %s" % directory_name)      
+        logging.info("\n- INFO, JSON dump log files copied to directory %s" % directory_name)
 
-def get_LC_log_failures():
+def get_matching_entries(match_entry, no_entries_message):
+    if args["ndjson_file"]:
+        download_ndjson_file(get_lc_log_uri(), no_entries_message, match_entry)
+        return
     if args["dump_to_json_file"]:
-        try:
-            shutil.rmtree("%s_LC_log_JSON_files" % idrac_ip)
-        except:
-            logging.debug("- INFO, directory does not exist, skipping")
-        directory_name = "%s_LC_log_JSON_files" % idrac_ip
-        directory_path = os.mkdir(directory_name)
+        directory_name = create_json_directory()
     logging.info("\n- INFO, this may take 30 seconds to 1 minute to collect all iDRAC LC logs depending on log file size\n")
-    if iDRAC_version == "old":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/Logs/Lclog"
-    elif iDRAC_version == "new":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Lclog/Entries"
-    if args["x"]:
-        response = requests.get('https://%s/%s' % (idrac_ip, uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/%s' % (idrac_ip, uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
+    collection = get_collection(get_lc_log_uri())
     lc_logs_list = []
-    if "Members" not in data.keys():
-        logging.warning("- WARNING, 'Members' key not detected in JSON response, unable to get LC logs. Manually check iDRAC interfaces to confirm you can view LC logs")
-        sys.exit(0)
-    for i in data['Members']:
-        if "unable" in i["Message"].lower() or "fail" in i["Message"].lower() or "error" in i["Message"].lower() or "fault" in i["Message"].lower():
-            lc_logs_list.append(i)
-    if "Members@odata.nextLink" in data.keys():
-        skip_uri = data["Members@odata.nextLink"]
-        number_list = [i for i in range (1,100001) if i % 50 == 0]
-        for seq in number_list:
-            skip_uri = re.sub("skip=.*","skip=%s" % seq, skip_uri)
-            if args["x"]:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-            data = response.json()
-            if "Members" not in data.keys():
-                logging.debug("- WARNING, 'Members' key not detected in JSON response, script will exit loop skip query")
-                sys.exit(0)
-            elif response.status_code == 500:
-                break
-            elif response.status_code != 200:
-                if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                    break
-                else:
-                    logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
-                    sys.exit(0)
-            elif "Members" in data.keys():
-                if data["Members"] == []:
-                    break
-            for i in data['Members']:
-                if "unable" in i["Message"].lower() or "fail" in i["Message"].lower() or "fail" in i["Message"].lower() or "error" in i["Message"].lower():
-                    lc_logs_list.append(i)
+    try:
+        for i in collection:
+            if match_entry(i):
+                lc_logs_list.append(i)
+    except CollectionError as error:
+        collection_error(error, collection.pages_fetched == 0)
     if lc_logs_list == []:
-        logging.warning("\n- WARNING, no LC log events detected with keywords unable, fail or error in message string")
+        logging.warning(no_entries_message)
         sys.exit(0)
     pprint(lc_logs_list)
     if args["dump_to_json_file"]:
@@ -387,147 +215,99 @@ def get_LC_log_failures():
         open_file = open(filename,"w")
         json.dump(lc_logs_list, open_file)
         open_file.close()
-        logging.info("\n- INFO, JSON dump log files copied to directory %s" % directory_name)      
+        logging.info("\n- INFO, JSON dump log files copied to directory %s" % directory_name)
 
-def get_message_id():
-    if args["dump_to_json_file"]:
-        try:
-            shutil.rmtree("%s_LC_log_JSON_files" % idrac_ip)
-        except:
-            logging.debug("- INFO, directory does not exist, skipping")
-        directory_name = "%s_LC_log_JSON_files" % idrac_ip
-        directory_path = os.mkdir(directory_name)
-    logging.info("\n- INFO, this may take 30 seconds to 1 minute to collect all iDRAC LC logs depending on log file size\n")
-    if iDRAC_version == "old":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/Logs/Lclog"
-    elif iDRAC_version == "new":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Lclog/Entries"
-    uri = "%s?$filter=MessageId eq '%s'" % (uri, args["get_message_id"])
-    if args["x"]:
-        response = requests.get('https://%s/%s' % (idrac_ip, uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+def get_specific_severity_logs():
+    if args["get_severity"].lower() == "informational":
+        filter_uri = "%s?$filter=Severity eq 'OK'" % get_lc_log_uri()
+    elif args["get_severity"].lower() == "critical":
+        filter_uri = "%s?$filter=Severity eq 'Critical'" % get_lc_log_uri()
+    elif args["get_severity"].lower() == "warning":
+        filter_uri = "%s?$filter=Severity eq 'Warning'" % get_lc_log_uri()
     else:
-        response = requests.get('https://%s/%s' % (idrac_ip, uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    lc_logs_list = []
-    if "Members" not in data.keys():
-        logging.warning("- WARNING, 'Members' key not detected in JSON response, unable to get LC logs. Manually check iDRAC interfaces to confirm you can view LC logs")
-        sys.exit(0)
-    elif response.status_code == 401:
-        logging.warning("\n- WARNING, status code %s returned. Incorrect iDRAC username/password or invalid privilege detected." % response.status_code)
-        sys.exit(0)
-    elif response.status_code != 200:
-        logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
-        sys.exit(0)
-    elif data["Members"] == []:
-        logging.info("- WARNING, no iDRAC LC logs detected with message ID %s" % args["get_message_id"])
+        logging.error("\n- WARNING, invalid value passed in for argument --get-severity")
         sys.exit(0)
-    else:
-        lc_logs_list.append(data)
-        if args["dump_to_json_file"]:
-            filename = directory_name + "/lclog_entries_1.json"
-            open_file = open(filename,"w")
-            json.dump(data, open_file)
-            open_file.close()
-            file_count = 2
-    if "Members@odata.nextLink" in data.keys():
-        skip_uri = data["Members@odata.nextLink"]
-        number_list = [i for i in range (1,100001) if i % 50 == 0]
-        for seq in number_list:
-            skip_uri = re.sub("skip=.*","skip=%s" % seq, skip_uri)
-            if args["x"]:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-            data = response.json()
-            if "Members" not in data.keys():
-                logging.debug("- WARNING, 'Members' key not detected in JSON response, script will exit loop skip query")
-                break
-            elif response.status_code == 500:
-                break
-            elif response.status_code != 200:
-                if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                    break
-                else:
-                    logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
-                    sys.exit(0)
-            elif "Members" in data.keys():
-                if data["Members"] == []:
-                    break
-            lc_logs_list.append(data)
-            if args["dump_to_json_file"]:
-                filename = directory_name + "/lclog_entries_%s.json" % file_count
-                open_file = open(filename, "w")
-                json.dump(data, open_file)
-                open_file.close()
-                file_count += 1
-    pprint(lc_logs_list)
-    if args["dump_to_json_file"]:
-        logging.info("\n- INFO, JSON dump log files copied to directory %s" % directory_name)    
+    get_lc_log_pages(filter_uri, "\n- WARNING, no \"%s\" severity entries detected in iDRAC LC logs" % args["get_severity"])
+
+def get_date_range():
+    date_range_uri = "%s?$filter=Created ge '%s' and Created le '%s'" % (get_lc_log_uri(), args["start_date"], args["end_date"])
+    get_lc_log_pages(date_range_uri, "- WARNING, no iDRAC LC logs detected within the date range specified")
+
+def get_LC_logs():
+    if args["incremental"]:
+        sync_ndjson_file(get_lc_log_uri())
+        return
+    get_lc_log_pages(get_lc_log_uri(), "\n- WARNING, 'Members' collection is empty, no LC logs detected, script will exit")
+
+def get_LC_log_failures():
+    classifier = LogClassifier().add_rule("failures", keywords=FAILURE_KEYWORDS)
+    get_matching_entries(classifier.matches, "\n- WARNING, no LC log events detected with keywords unable, fail or error in message string")
+
+def get_message_id():
+    uri = "%s?$filter=MessageId eq '%s'" % (get_lc_log_uri(), args["get_message_id"])
+    get_lc_log_pages(uri, "- WARNING, no iDRAC LC logs detected with message ID %s" % args["get_message_id"])
 
 def get_category_entries():
     if args["get_category"].lower() not in ["audit", "configuration", "updates", "systemhealth", "storage"]:
         logging.info("\n- WARNING, invalid value entered for argument --get-category, see help text for supported values")
         sys.exit(0)
+    classifier = LogClassifier().add_rule("category", categories=[args["get_category"]])
+    get_matching_entries(classifier.matches, "\n- WARNING, no LC log events detected for category %s" % args["get_category"])
+
+def get_report_filename(report_name):
+    # lc.ndjson.gz -> lc_failures.ndjson.gz
+    filename = args["ndjson_file"]
+    compressed_extension = ".gz" if filename.lower().endswith(".gz") else ""
+    base_name, extension = os.path.splitext(filename[:len(filename) - len(compressed_extension)])
+    return "%s_%s%s%s" % (base_name, report_name, extension, compressed_extension)
+
+def get_lc_log_reports():
+    # LC logs are downloaded once, each entry is classified once and routed to every report (--get-fail, --get-category, --get-message-id, --get-severity) it matches
+    severity_values = {"informational": "OK", "critical": "Critical", "warning": "Warning"}
+    classifier = LogClassifier()
+    if args["get_fail"]:
+        classifier.add_rule("failures", keywords=FAILURE_KEYWORDS)
+    if args["get_category"]:
+        if args["get_category"].lower() not in ["audit", "configuration", "updates", "systemhealth", "storage"]:
+            logging.info("\n- WARNING, invalid value entered for argument --get-category, see help text for supported values")
+            sys.exit(0)
+        classifier.add_rule("category_%s" % args["get_category"].lower(), categories=[args["get_category"]])
+    if args["get_message_id"]:
+        classifier.add_rule("message_id_%s" % args["get_message_id"], message_id_prefixes=[args["get_message_id"]])
+    if args["get_severity"]:
+        if args["get_severity"].lower() not in severity_values:
+            logging.error("\n- WARNING, invalid value passed in for argument --get-severity")
+            sys.exit(0)
+        classifier.add_rule("severity_%s" % args["get_severity"].lower(), severities=[severity_values[args["get_severity"].lower()]])
     if args["dump_to_json_file"]:
-        try:
-            shutil.rmtree("%s_LC_log_JSON_files" % idrac_ip)
-        except:
-            logging.debug("- INFO, directory does not exist, skipping")
-        directory_name = "%s_LC_log_JSON_files" % idrac_ip
-        directory_path = os.mkdir(directory_name)
-    logging.info("\n- INFO, this may take 30 seconds to 1 minute to collect all iDRAC LC logs depending on log file size\n")
-    if iDRAC_version == "old":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/Logs/Lclog"
-    elif iDRAC_version == "new":
-        uri = "redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Lclog/Entries"
-    if args["x"]:
-        response = requests.get('https://%s/%s' % (idrac_ip, uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+        directory_name = create_json_directory()
+    logging.info("\n- INFO, this may take 30 seconds to 1 minute to collect all iDRAC LC logs depending on log file size, %s reports will be created from one LC log download\n" % len(classifier.rules))
+    collection = get_collection(get_lc_log_uri())
+    if args["ndjson_file"]:
+        sinks = dict((rule.name, NdjsonSink(get_report_filename(rule.name), args["gzip"] or None)) for rule in classifier.rules)
     else:
-        response = requests.get('https://%s/%s' % (idrac_ip, uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    lc_logs_list = []
-    if "Members" not in data.keys():
-        logging.warning("- WARNING, 'Members' key not detected in JSON response, unable to get LC logs. Manually check iDRAC interfaces to confirm you can view LC logs")
-        sys.exit(0)
-    for i in data['Members']:
-        if i["Oem"]["Dell"]["Category"].lower() == args["get_category"].lower():
-            lc_logs_list.append(i)
-    if "Members@odata.nextLink" in data.keys():
-        skip_uri = data["Members@odata.nextLink"]
-        number_list = [i for i in range (1,100001) if i % 50 == 0]
-        for seq in number_list:
-            skip_uri = re.sub("skip=.*","skip=%s" % seq, skip_uri)
-            if args["x"]:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s%s' % (idrac_ip, skip_uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-            data = response.json()
-            if "Members" not in data.keys():
-                logging.warning("- WARNING, 'Members' key not detected in JSON response, script will exit loop skip query")
-                break
-            elif response.status_code == 500:
-                break
-            elif response.status_code != 200:
-                if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                    break
-                else:
-                    logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
-                    sys.exit(0)
-            elif "Members" in data.keys():
-                if data["Members"] == []:
-                    break
-            for i in data['Members']:
-                if i["Oem"]["Dell"]["Category"].lower() == args["get_category"].lower():
-                    lc_logs_list.append(i)
-    if lc_logs_list == []:
-        logging.warning("\n- WARNING, no LC log events detected for category %s" % args["get_category"])
-        sys.exit(0)
-    pprint(lc_logs_list)
+        reports = dict((rule.name, []) for rule in classifier.rules)
+        sinks = dict((name, reports[name].append) for name in reports)
+    try:
+        report_counts = route_log_entries(collection, classifier, sinks)
+    except CollectionError as error:
+        collection_error(error, collection.pages_fetched == 0)
+    finally:
+        if args["ndjson_file"]:
+            for sink in sinks.values():
+                sink.close()
+    for report_name, entry_count in report_counts.items():
+        if args["ndjson_file"]:
+            logging.info("- PASS, report \"%s\", %s LC log entries copied to file \"%s\"" % (report_name, entry_count, sinks[report_name].filename))
+            continue
+        logging.info("\n- INFO, report \"%s\", %s LC log entries detected\n" % (report_name, entry_count))
+        if entry_count:
+            pprint(reports[report_name])
+        if args["dump_to_json_file"]:
+            open_file = open("%s/%s.json" % (directory_name, report_name), "w")
+            json.dump(reports[report_name], open_file)
+            open_file.close()
     if args["dump_to_json_file"]:
-        filename = directory_name + "/lclog_entries_1.json"
-        open_file = open(filename,"w")
-        json.dump(lc_logs_list, open_file)
-        open_file.close()
         logging.info("\n- INFO, JSON dump log files copied to directory %s" % directory_name)
         
 
@@ -540,7 +320,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -550,12 +330,19 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
         get_iDRAC_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
         sys.exit(0)
-    if args["get_fail"]:
+    if args["incremental"] and not (args["get_all"] and args["ndjson_file"]):
+        logging.error("\n- FAIL, argument --incremental is only supported with arguments --get-all and --ndjson-file")
+        sys.exit(0)
+    if len([i for i in ["get_fail", "get_category", "get_message_id", "get_severity"] if args[i]]) > 1:
+        get_lc_log_reports()
+    elif args["get_fail"]:
         get_LC_log_failures()
     elif args["get_date_range"] and args["start_date"] and args["end_date"]:
         get_date_range()    
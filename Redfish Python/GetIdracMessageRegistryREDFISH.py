@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
@@ -28,6 +27,10 @@ import warnings
 
 from pprint import pprint
 from datetime import datetime
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.registry import MESSAGE_REGISTRY_URI, MessageRegistryIndex, RegistryError, get_registry, load_message_index
+from IdracRedfishSupport.output import add_output_arguments, open_output
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -39,41 +42,69 @@ parser.add_argument('-x', help='Pass in X-Auth session token for executing Redfi
 parser.add_argument('--ssl', help='SSL cert verification for all Redfish calls, pass in value \"true\" or \"false\". By default, this argument is not required and script ignores validating SSL cert for all Redfish calls.', required=False)
 parser.add_argument('--script-examples', help='Get executing script examples', action="store_true", dest="script_examples", required=False) 
 parser.add_argument('--get', help='Get message registry details', action="store_true", required=False)
-parser.add_argument('--message-id', help='Get information for only a specific message id, pass in the message ID string', dest="message_id", required=False)
+parser.add_argument('--message-id', help='Get information for only a specific message id, pass in the message ID string. Registry prefix is optional (example: IDRAC.2.9.LC011 or LC011), if no exact match is found all message IDs starting with the value are returned (example: IDRAC.2.9.LC)', dest="message_id", required=False)
+parser.add_argument('--message-args', help='Pass in message arguments (MessageArgs of the LC log entry) using a comma separator along with argument --message-id to get the complete message text and recommended action', dest="message_args", required=False)
+parser.add_argument('--save-index', help='Save message registry index to a file, pass in the file name. Pass in this file with argument --index-file to get message details without connecting to iDRAC', dest="save_index", required=False)
+parser.add_argument('--index-file', help='Use message registry index file created with argument --save-index instead of getting the message registry from iDRAC. iDRAC IP and credentials are not needed', dest="index_file", required=False)
+add_output_arguments(parser)
 
 args = vars(parser.parse_args())
-logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
+# Records written to stdout with --output-format, script messages are then logged to stderr. force replaces the stdout handler IdracRedfishSupport configures on import
+logging.basicConfig(format='%(message)s', stream=sys.stderr if args["output_format"] and not args["output_file"] else sys.stdout, level=logging.INFO, force=True)
 
 def script_examples():
     print("""\n- GetIdracMessageRegistryREDFISH.py -ip 192.168.0.120 -u root -p calvin --get, this example will get the complete message registry, print to the screen and also capture in a text file.
-    \n- GetIdracMessageRegistryREDFISH.py -ip 192.168.0.120 -u root -p calvin --message-id SYS409, this example will return information for only message ID SYS409.""")
+    \n- GetIdracMessageRegistryREDFISH.py -ip 192.168.0.120 -u root -p calvin --message-id SYS409, this example will return information for only message ID SYS409.
+    \n- GetIdracMessageRegistryREDFISH.py -ip 192.168.0.120 -u root -p calvin --message-id IDRAC.2.9.LC, this example will return information for all message IDs starting with LC.
+    \n- GetIdracMessageRegistryREDFISH.py -ip 192.168.0.120 -u root -p calvin --save-index message_index.bin, this example will save the message registry index to file message_index.bin.
+    \n- GetIdracMessageRegistryREDFISH.py --index-file message_index.bin --message-id IDRAC.2.9.USR0030 --message-args root,192.168.0.10,GUI, this example will return the complete message text and recommended action using the saved index without connecting to iDRAC.
+    \n- GetIdracMessageRegistryREDFISH.py -ip 192.168.0.120 -u root -p calvin --get --output-format csv --output-file message_registry.csv, this example will write the complete message registry to CSV file message_registry.csv, one row per message ID.""")
     sys.exit(0)
 
-def check_supported_idrac_version():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code == 401:
-        logging.warning("\n- WARNING, status code %s returned. Incorrect iDRAC username/password or invalid privilege detected." % response.status_code)
-        sys.exit(0)
-    elif response.status_code != 200:
-        logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
+def get_registry_data():
+    # Message registry is read from the versioned registry cache, only downloaded once per server model and iDRAC version
+    try:
+        if args["x"]:
+            return get_registry(idrac_ip, MESSAGE_REGISTRY_URI, x_auth_token=args["x"], verify_cert=verify_cert)
+        else:
+            return get_registry(idrac_ip, MESSAGE_REGISTRY_URI, username=idrac_username, password=idrac_password, verify_cert=verify_cert)
+    except RegistryError as error:
+        if error.status_code == 401:
+            logging.warning("\n- WARNING, status code %s returned. Incorrect iDRAC username/password or invalid privilege detected." % error.status_code)
+        else:
+            logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
         sys.exit(0)
 
+def get_message_index():
+    global message_index
+    # Index is built once, message ID lookups are then dictionary lookups and prefix searches a binary search
+    if message_index is None:
+        if args["index_file"]:
+            try:
+                message_index = load_message_index(args["index_file"])
+            except (IOError, OSError, ValueError) as error:
+                logging.error("\n- FAIL, unable to load message registry index file, detailed error information: %s" % error)
+                sys.exit(0)
+        else:
+            message_index = MessageRegistryIndex(get_registry_data())
+    return message_index
+
+def check_supported_idrac_version():
+    get_registry_data()
+
 def get_message_registry():
+    if args["output_format"]:
+        with open_output(args["output_format"], args["output_file"]) as writer:
+            writer.write_all(dict([("MessageId", i[0])] + list(i[1].items())) for i in get_message_index().messages.items())
+        if args["output_file"]:
+            logging.info("\n- INFO, %s message IDs written to \"%s\" file" % (writer.records, args["output_file"]))
+        return
     try:
         os.remove("message_registry.txt")
     except:
         logging.info("- INFO, unable to locate file %s, skipping step" % "message_registry.txt")
     open_file = open("message_registry.txt","w")
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    for i in data['Messages'].items():
+    for i in get_message_index().messages.items():
         pprint(i), print("\n")
         message = "Message ID: %s" % i[0]
         open_file.writelines("\n%s"% message)
@@ -86,30 +117,49 @@ def get_message_registry():
     logging.info("\n- INFO, output also captured in \"message_registry.txt\" file")
 
 def get_specific_message_id():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    for i in data['Messages'].items():
-        if i[0].lower() == args["message_id"].lower():
-            logging.info("\nMessage ID: %s" % i[0])
-            for ii in i[1].items():
+    message = get_message_index().get(args["message_id"])
+    if message:
+        logging.info("\nMessage ID: %s" % message[0])
+        for i in message[1].items():
+            print("%s: %s" % (i[0], i[1]))
+        print("\n")
+        if args["message_args"]:
+            resolved_message = get_message_index().resolve(message[0], args["message_args"].split(","))
+            logging.info("- Message: %s" % resolved_message.message)
+            logging.info("- Recommended action: %s\n" % resolved_message.resolution)
+        sys.exit(0)
+    message_ids = get_message_index().search(args["message_id"])
+    if message_ids:
+        logging.info("\n- INFO, %s message IDs starting with \"%s\" detected" % (len(message_ids), args["message_id"]))
+        for i in message_ids:
+            logging.info("\nMessage ID: %s" % i)
+            for ii in get_message_index().messages[i].items():
                 print("%s: %s" % (ii[0], ii[1]))
-            print("\n")
-            sys.exit(0)
+        print("\n")
+        sys.exit(0)
     logging.error("\n - FAIL, either invalid message ID was passed in or message ID does not exist on this iDRAC version")
+
+def save_message_index():
+    try:
+        get_message_index().save(args["save_index"])
+    except (IOError, OSError) as error:
+        logging.error("\n- FAIL, unable to save message registry index, detailed error information: %s" % error)
+        sys.exit(0)
+    logging.info("\n- PASS, message registry index for %s message IDs saved to \"%s\" file" % (len(get_message_index()), args["save_index"]))
     
 if __name__ == "__main__":
+    message_index = None
     if args["script_examples"]:
         script_examples()
-    if args["ip"] and args["ssl"] or args["u"] or args["p"] or args["x"]:
+    if args["index_file"]:
+        logging.info("\n- INFO, using message registry index file \"%s\", iDRAC connection not needed" % args["index_file"])
+    elif args["ip"] and args["ssl"] or args["u"] or args["p"] or args["x"]:
         idrac_ip=args["ip"]
         idrac_username=args["u"]
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -119,6 +169,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -127,5 +179,7 @@ if __name__ == "__main__":
         get_message_registry()
     elif args["message_id"]:
         get_specific_message_id()
+    elif args["save_index"]:
+        save_message_index()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
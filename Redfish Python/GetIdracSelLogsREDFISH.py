@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
@@ -28,6 +27,11 @@ import warnings
 
 from pprint import pprint
 from datetime import datetime
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.logs import download_log_entries, sync_log_entries, WatermarkError
+from IdracRedfishSupport.paging import CollectionError, RedfishCollection
+from IdracRedfishSupport.output import add_output_arguments, open_output
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -40,21 +44,33 @@ parser.add_argument('--ssl', help='SSL cert verification for all Redfish calls,
 parser.add_argument('--script-examples', help='Get executing script examples', action="store_true", dest="script_examples", required=False)
 parser.add_argument('--get', help='Get current iDRAC SEL log', action="store_true", required=False)
 parser.add_argument('--clear', help='Clear iDRAC SEL log', action="store_true", required=False)
+parser.add_argument('--ndjson-file', help='Pass in file name with argument --get to write SEL entries to a single NDJSON file (one JSON entry per line) instead of printing them. File name ending with .gz will be gzip compressed.', dest="ndjson_file", required=False)
+parser.add_argument('--gzip', help='Gzip compress the file passed in with argument --ndjson-file', action="store_true", required=False)
+parser.add_argument('--workers', help='Number of SEL pages downloaded in parallel with argument --get, default is 1 (next page is downloaded in the background while the current page is written). Pass in a higher value for concurrent mode on hosts with large SEL logs.', type=int, default=1, required=False)
+parser.add_argument('--incremental', help='Pass in this argument with --ndjson-file to append only SEL entries created since the last run for this iDRAC to the NDJSON file. Highest entry Id and Created timestamp are stored per iDRAC under ~/.idrac_redfish/log_watermarks, complete SEL is appended again if the SEL was cleared.', action="store_true", required=False)
+add_output_arguments(parser)
 args = vars(parser.parse_args())
-logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
+# Records written to stdout with --output-format, script messages are then logged to stderr. force replaces the stdout handler IdracRedfishSupport configures on import
+logging.basicConfig(format='%(message)s', stream=sys.stderr if args["output_format"] and not args["output_file"] else sys.stdout, level=logging.INFO, force=True)
 
 def script_examples():
     print("""\n- GetIdracSelLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get, this example will get the complete iDRAC system event log.
+    \n- GetIdracSelLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get --ndjson-file sel.ndjson.gz --workers 4, this example will download the complete iDRAC system event log with 4 pages downloaded in parallel to gzip compressed NDJSON file sel.ndjson.gz.
+    \n- GetIdracSelLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get --ndjson-file sel.ndjson --incremental, this example will append only SEL entries created since the last run to NDJSON file sel.ndjson.
+    \n- GetIdracSelLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --get --output-format csv --output-file sel.csv, this example will write the complete iDRAC system event log to CSV file sel.csv, one row per entry.
     \n- GetIdracSelLogsREDFISH.py -ip 192.168.0.120 -u root -p calvin --clear, this example will clear iDRAC system event log.""")
     sys.exit(0)
 
 def get_iDRAC_version():
     global iDRAC_version
-    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % idrac_ip, verify=False,auth=(idrac_username,idrac_password))
+    if args["x"]:
+        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+    else:
+        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % idrac_ip, verify=verify_cert, auth=(idrac_username,idrac_password))
     data = response.json()
     if response.status_code == 401:
         print("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
-        return
+        sys.exit(0)
     elif response.status_code != 200:
         print("\n- WARNING, unable to get current iDRAC version installed")
         sys.exit(0)
@@ -77,6 +93,16 @@ def check_supported_idrac_version():
         logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
         sys.exit(0)
 
+def get_SEL_collection():
+    if iDRAC_version == "old":
+        uri = "/redfish/v1/Managers/iDRAC.Embedded.1/Logs/Sel"
+    elif iDRAC_version == "new":
+        uri = "/redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Sel/Entries"
+    if args["x"]:
+        return RedfishCollection(idrac_ip, uri, x_auth_token=args["x"], verify_cert=verify_cert, prefetch=args["workers"])
+    else:
+        return RedfishCollection(idrac_ip, uri, username=idrac_username, password=idrac_password, verify_cert=verify_cert, prefetch=args["workers"])
+
 def get_SEL_logs():
     try:
         os.remove("iDRAC_SEL_logs.txt")
@@ -88,46 +114,71 @@ def get_SEL_logs():
     current_date_time = "- Data collection timestamp: %s-%s-%s  %s:%s:%s\n" % (date_timestamp.month, date_timestamp.day, date_timestamp.year, date_timestamp.hour, date_timestamp.minute, date_timestamp.second)
     open_file.writelines(current_date_time)
     open_file.writelines("\n\n")
-    if iDRAC_version == "old":
-        uri = "/redfish/v1/Managers/iDRAC.Embedded.1/Logs/Sel"
-    elif iDRAC_version == "new":
-        uri = "/redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Sel/Entries"
-    if args["x"]:
-        response = requests.get('https://%s%s' % (idrac_ip, uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s%s' % (idrac_ip, uri), verify=verify_cert, auth=(idrac_username, idrac_password))
-    if response.status_code != 200:
-        logging.error("\n- ERROR, GET command failed to get iDRAC SEL entries, status code %s returned" % response.status_code)
-        sys.exit(0)
-    data = response.json()
-    for i in data['Members']:
-        for ii in i.items():
-            SEL_log_entry = ("%s: %s" % (ii[0],ii[1]))
-            print(SEL_log_entry)
-            open_file.writelines("%s\n" % SEL_log_entry)
-        print("\n")
-        open_file.writelines("\n")
-    if iDRAC_version == "old":
-        number_list = [i for i in range (1,100001) if i % 50 == 0]
-        for seq in number_list:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Logs/Sel?$skip=%s' % (idrac_ip, seq), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Logs/Sel?$skip=%s' % (idrac_ip, seq), verify=verify_cert, auth=(idrac_username, idrac_password))
-            data = response.json()
-            if "Members" not in data or data["Members"] == [] or response.status_code == 400:
-                break
-            for i in data['Members']:
+    # SEL entries are written and flushed to the file page by page as they are received, on every iDRAC version pages are
+    # followed using Members@odata.nextLink with --workers pages downloaded in parallel
+    collection = get_SEL_collection()
+    entry_count = 0
+    try:
+        for data in collection.pages():
+            for i in data["Members"]:
                 for ii in i.items():
-                    SEL_log_entry = ("%s: %s" % (ii[0], ii[1]))
+                    SEL_log_entry = ("%s: %s" % (ii[0],ii[1]))
                     print(SEL_log_entry)
                     open_file.writelines("%s\n" % SEL_log_entry)
                 print("\n")
                 open_file.writelines("\n")
-    logging.info("\n- INFO, system event logs also captured in \"iDRAC_SEL_logs.txt\" file")
+            entry_count += len(data["Members"])
+            open_file.flush()
+    except CollectionError as error:
+        logging.error("\n- ERROR, GET command failed to get iDRAC SEL entries, status code %s returned" % error.status_code)
+        sys.exit(0)
+    logging.info("\n- INFO, %s system event log entries (%s pages) also captured in \"iDRAC_SEL_logs.txt\" file" % (entry_count, collection.pages_fetched))
     open_file.close()
     sys.exit(0)
 
+def get_SEL_logs_output():
+    # SEL entries are written as structured records as they are received
+    logging.info("\n- INFO, getting iDRAC SEL details, this may take 15-30 seconds to complete depending on log size")
+    collection = get_SEL_collection()
+    try:
+        with open_output(args["output_format"], args["output_file"]) as writer:
+            writer.write_all(collection)
+    except CollectionError as error:
+        logging.error("\n- ERROR, GET command failed to get iDRAC SEL entries, status code %s returned" % error.status_code)
+        sys.exit(0)
+    logging.info("\n- INFO, %s system event log entries (%s pages) written%s" % (writer.records, collection.pages_fetched, " to \"%s\" file" % args["output_file"] if args["output_file"] else ""))
+    sys.exit(0)
+
+def get_SEL_logs_ndjson():
+    if iDRAC_version == "old":
+        uri = "/redfish/v1/Managers/iDRAC.Embedded.1/Logs/Sel"
+    elif iDRAC_version == "new":
+        uri = "/redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Sel/Entries"
+    if args["incremental"]:
+        logging.info("\n- INFO, appending iDRAC SEL entries created since the last sync to file \"%s\"" % args["ndjson_file"])
+        save_log_entries = sync_log_entries
+    else:
+        logging.info("\n- INFO, downloading iDRAC SEL entries to file \"%s\", %s pages downloaded in parallel" % (args["ndjson_file"], args["workers"]))
+        save_log_entries = download_log_entries
+    try:
+        if args["x"]:
+            result = save_log_entries(idrac_ip, uri, args["ndjson_file"], x_auth_token=args["x"], verify_cert=verify_cert, workers=args["workers"], compress=args["gzip"] or None)
+        else:
+            result = save_log_entries(idrac_ip, uri, args["ndjson_file"], username=idrac_username, password=idrac_password, verify_cert=verify_cert, workers=args["workers"], compress=args["gzip"] or None)
+    except CollectionError as error:
+        logging.error("\n- ERROR, GET command failed to get iDRAC SEL entries, status code %s returned" % error.status_code)
+        sys.exit(0)
+    except WatermarkError as error_message:
+        logging.error("\n- FAIL, incremental sync not possible, %s" % error_message)
+        sys.exit(0)
+    if not args["incremental"]:
+        logging.info("- PASS, %s SEL entries copied to file \"%s\"" % (result.entries, result.filename))
+    elif result.full_resync:
+        logging.info("- PASS, complete SEL synced, %s SEL entries appended to file \"%s\", last entry Id %s" % (result.entries, result.filename, result.last_id))
+    else:
+        logging.info("- PASS, %s new SEL entries appended to file \"%s\", last entry Id %s" % (result.entries, result.filename, result.last_id))
+    sys.exit(0)
+
 def clear_SEL():
     url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Sel/Actions/LogService.ClearLog' % (idrac_ip)
     payload = {}
@@ -155,7 +206,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -165,10 +216,19 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
         get_iDRAC_version()
     if args["clear"]:
         clear_SEL()
+    elif args["get"] and args["ndjson_file"]:
+        get_SEL_logs_ndjson()
+    elif args["get"] and args["incremental"]:
+        logging.error("\n- FAIL, argument --incremental is only supported with argument --ndjson-file")
+        sys.exit(0)
+    elif args["get"] and args["output_format"]:
+        get_SEL_logs_output()
     elif args["get"]:
         get_SEL_logs()
     else:
@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
@@ -28,6 +27,9 @@ import warnings
 
 from datetime import datetime
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.paging import CollectionError, RedfishCollection
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -62,6 +64,27 @@ def check_supported_idrac_version():
         logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
         sys.exit(0)
 
+def get_slot_members():
+    # Members are yielded one at a time, following pages are fetched in the background while entries are written
+    if args["x"]:
+        collection = RedfishCollection(idrac_ip, "redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection", x_auth_token=args["x"], verify_cert=verify_cert)
+    else:
+        collection = RedfishCollection(idrac_ip, "redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection", username=idrac_username, password=idrac_password, verify_cert=verify_cert)
+    member_count = 0
+    try:
+        for i in collection:
+            member_count += 1
+            yield i
+    except CollectionError as error:
+        if collection.pages_fetched == 0:
+            logging.error("\n- FAIL, GET request failed, status code %s returned. Detailed error results: \n%s" % (error.status_code, error.data))
+        else:
+            logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (error.status_code, error.data))
+        sys.exit(0)
+    if member_count == 0:
+        logging.error("- FAIL, no data detected for Members property. Manually execute GET on URI 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' in browser to check. If no data detected, reboot server and run Collecting Inventory to refresh the configuration database for iDRAC, try GET again." % idrac_ip)
+        sys.exit(0)
+
 def get_server_slot_info():
     try:
         os.remove(idrac_ip + "_server_slot_info.txt")
@@ -72,46 +95,12 @@ def get_server_slot_info():
     current_date_time = "- Data collection timestamp: %s-%s-%s  %s:%s:%s\n" % (get_datetime.month, get_datetime.day, get_datetime.year, get_datetime.hour, get_datetime.minute, get_datetime.second)
     open_file.writelines(current_date_time)
     open_file.writelines("\n\n")
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-    else:
-        response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- FAIL, GET request failed, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))
-        sys.exit(0)
-    if data['Members'] == []:
-        logging.error("- FAIL, no data detected for Members property. Manually execute GET on URI 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' in browser to check. If no data detected, reboot server and run Collecting Inventory to refresh the configuration database for iDRAC, try GET again." % idrac_ip)
-        sys.exit(0)
-    for i in data['Members']:
+    for i in get_slot_members():
         pprint(i), print("\n")
         for ii in i.items():
             server_slot_entry = ("%s: %s" % (ii[0],ii[1]))
             open_file.writelines("%s\n" % server_slot_entry)
         open_file.writelines("\n")
-    number_list = [i for i in range (1,100001) if i % 50 == 0]
-    for seq in number_list:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (idrac_ip, seq), verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (idrac_ip, seq), verify=verify_cert,auth=(idrac_username, idrac_password))
-        data = response.json()
-        if response.status_code != 200:
-            if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                open_file.close()
-                logging.info("\n- INFO, iDRAC Server Slot Information also captured in \"%s_server_slot_info.txt\" file" % idrac_ip)
-                sys.exit(0)
-            else:
-                logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
-                sys.exit(0)
-        if "Members" not in data or data["Members"] == [] or response.status_code == 400:
-            break
-        for i in data['Members']:
-            pprint(i), print("\n")
-            for ii in i.items():
-                server_slot_entry = ("%s: %s" % (ii[0],ii[1]))
-                open_file.writelines("%s\n" % server_slot_entry)
-            open_file.writelines("\n")
     logging.info("\n- INFO, iDRAC Server Slot Information also captured in \"%s_server_slot_info.txt\" file" % idrac_ip)
     open_file.close()
 
@@ -123,18 +112,7 @@ def get_server_slot_info_xml():
         pass
     open_file = open("%s_server_slot_info.xml" % idrac_ip,"a")
     open_file.writelines("<CIM>\n")
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-    else:
-        response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- FAIL, GET request failed, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))
-        sys.exit(0)
-    if data['Members'] == []:
-        logging.error("- FAIL, no data detected for Members property. Manually execute GET on URI 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' in browser to check. if no data detected, reboot server and run Collecting Inventory to refresh the configuration database for iDRAC" % idrac_ip)
-        sys.exit(0)
-    for i in data['Members']:
+    for i in get_slot_members():
         create_dict = {}
         for ii in i.items():
             if ii[0] == "Id":
@@ -148,38 +126,6 @@ def get_server_slot_info_xml():
                     create_dict["Slot Number"] = str(ii[1])
         create_string = "<VALUE.NAMEDINSTANCE>\n<INSTANCENAME DEVICENAME=\""+create_dict["Id"]+"\">\n<KEYBINDING PROPERTY=\"Slot Number\">\n<VALUE>"+create_dict["Slot Number"]+"</VALUE>\n</KEYBINDING>\n</INSTANCENAME>\n<PROPERTY PROPERTY=\"EmptySlot\">\n<VALUE>"+create_dict["EmptySlot"]+"</VALUE>\n</PROPERTY>\n</VALUE.NAMEDINSTANCE>"  
         open_file.writelines(create_string)
-    number_list = [i for i in range (1,100001) if i % 50 == 0]
-    for seq in number_list:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (idrac_ip, seq), verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (idrac_ip, seq), verify=verify_cert,auth=(idrac_username, idrac_password))
-        data = response.json()
-        if response.status_code != 200:
-            if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                open_file.writelines("\n</CIM>")
-                open_file.close()
-                logging.info("\n- PASS, iDRAC Server Slot Information captured in \"%s_server_slot_info.xml\" file" % idrac_ip)
-                sys.exit(0)
-            else:
-                logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
-                sys.exit(0)
-        if "Members" not in data or data["Members"] == [] or response.status_code == 400:
-            break
-        if data['Members'] == []:
-            logging.error("- FAIL, no data detected for Members property. Manually execute GET on URI 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' in browser to check. If no data detected, reboot server and run Collecting Inventory to refresh the configuration database for iDRAC, try GET again." % idrac_ip)
-            sys.exit(0)
-        for i in data['Members']:
-            create_dict = {}
-            for ii in i.items():
-                if ii[0] == "Id":
-                    create_dict[ii[0]] = str(ii[1])
-                elif ii[0] == "EmptySlot":
-                    create_dict[ii[0]] = str(ii[1])
-                elif ii[0] == "NumberDescription":
-                    create_dict["Slot Number"] = str(ii[1])
-            create_string = "<VALUE.NAMEDINSTANCE>\n<INSTANCENAME DEVICENAME=\""+create_dict["Id"]+"\">\n<KEYBINDING PROPERTY=\"Slot Number\">\n<VALUE>"+create_dict["Slot Number"]+"</VALUE>\n</KEYBINDING>\n</INSTANCENAME>\n<PROPERTY PROPERTY=\"EmptySlot\">\n<VALUE>"+create_dict["EmptySlot"]+"</VALUE>\n</PROPERTY>\n</VALUE.NAMEDINSTANCE>"  
-            open_file.writelines(create_string)
     logging.info("\n- INFO, iDRAC Server Slot Information captured in \"%s_server_slot_info.xml\" file" % idrac_ip)
     open_file.writelines("\n</CIM>")
     open_file.close()
@@ -193,7 +139,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -203,6 +149,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
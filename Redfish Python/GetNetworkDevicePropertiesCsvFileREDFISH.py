@@ -15,7 +15,7 @@
 #
 # Pseudo code workflow
 #
-# 1. Confirm IP address can be pinged.
+# 1. Confirm iDRAC IP address is reachable.
 # 2. Check remote API status, confirm LC status report ready.
 # 3. Get network device properties for the network device fQDD passed in the INI file.
 # 4. Write network property headers to CSV file.
@@ -58,6 +58,8 @@
 #
 # This example shows passing in range of iDRAC IPs. Script will loop through IPs starting at 192.168.0.130 up to 192.168.0.140.
 #
+# idrac_ips also supports range across subnets (example: 192.168.0.250-192.168.1.10), CIDR network (example: 192.168.0.0/28) or a combination of values using a comma separator.
+#
 # NOTES: All iDRAC IPs passed in the INI file must have the same username and password
 #        INI file name used to run this script must be "network_device_config.ini" and located in the same directory you're running the script from. 
 
@@ -69,13 +71,14 @@ import os
 import platform
 import re
 import requests
-import subprocess
 import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.fleet import expand_idrac_ips
+from IdracRedfishSupport.probe import probe_idrac
 
 warnings.filterwarnings("ignore")
 
@@ -115,21 +118,7 @@ if "," in network_device_properties:
 else:
     network_device_properties = [network_device_properties]    
 
-if "," in idrac_ips:
-    idrac_ips = idrac_ips.split(",")
-elif "-" in idrac_ips:
-    idrac_ips = idrac_ips.split("-")
-    build_ip_list = [idrac_ips[0]]
-    first_range_number = idrac_ips[0].split(".")[-1]
-    second_range_number = idrac_ips[1]
-    subnet = idrac_ips[0].split(".")[0]+"."+idrac_ips[0].split(".")[1]+"."+idrac_ips[0].split(".")[2]+"."
-    create_range = range(int(first_range_number)+1,int(second_range_number)+1)
-    for i in create_range:
-        create_string = subnet + str(i)
-        build_ip_list.append(create_string)
-    idrac_ips = build_ip_list
-else:
-    idrac_ips = [idrac_ips]
+idrac_ips = expand_idrac_ips(idrac_ips)
 
 def get_network_device_fqdds(idrac_ip):
     response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/NetworkAdapters' % idrac_ip, verify=False,auth=(idrac_username, idrac_password))
@@ -152,7 +141,7 @@ def get_remote_services(idrac_ip):
     global get_remote_service_failure
     get_remote_service_failure = "no"
     start_time = datetime.now()
-    current_time = str(datetime.now()-start_time)[0:7]
+    current_time = datetime.now()-start_time
     while True:
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.GetRemoteServicesAPIStatus' % idrac_ip
         headers = {'content-type': 'application/json'}
@@ -163,7 +152,7 @@ def get_remote_services(idrac_ip):
             logger.error("POST command failed for GetRemoteServicesAPIStatus method, status code %s returned" % response.status_code)
             get_remote_service_failure = "yes"
             return
-        elif current_time >= "0:30:00":
+        elif current_time >= timedelta(minutes=30):
             logger.error("FAIL, Max timeout of 30 minutes reached to poll checking LT ready status, no configuration operations executed. Make sure server is ON and outpof POST in idle state.")
             get_remote_service_failure = "yes"
             return   
@@ -175,19 +164,11 @@ def get_remote_services(idrac_ip):
             time.sleep(5)
 
 def ping_confirm_valid_ip(idrac_ip):
-    # Check ping connection, valid IP address on the network
+    # Check iDRAC connection using HTTPS probe (works when ICMP is blocked), valid IP address on the network
     global ping_success 
     ping_success = "yes"
-    if platform.system().lower() == "windows":
-        ping_command = "ping -n 3 %s" % idrac_ip
-    elif platform.system().lower() == "linux":
-        ping_command = "ping -c 3 %s" % idrac_ip
-    else:
-        logger.error("Unable to determine OS type, check iDRAC connection function will not execute")
-        ping_success = "no"
-    execute_command = subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-    if execute_command != 0:
-        logger.error("Ping request failed for IP %s, script will skip using this IP" % idrac_ip)
+    if not probe_idrac(idrac_ip, verify_cert=False):
+        logger.error("Connection check failed for IP %s, script will skip using this IP" % idrac_ip)
         ping_success = "no"
     
 def get_network_device_properties(idrac_ip):
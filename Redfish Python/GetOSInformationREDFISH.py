@@ -16,16 +16,17 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
 import requests
 import sys
-import time
 import warnings
 
-from datetime import datetime
+from datetime import timedelta
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -75,41 +76,30 @@ def get_OS_info():
         logging.error("- FAIL, unable to find job ID in headers POST response, headers output is:\n%s" % response.headers)
         sys.exit(0)
     logging.info("\n- INFO, getting Operation System information, this may take 5-10 seconds to complete")
-    start_time = datetime.now()
-    while True:
-        current_time = (datetime.now()-start_time)
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-
-        create_dict = response.__dict__
-        if "<SystemConfiguration Model" in str(create_dict):
-            logging.info("\n- INFO, current Operation System information for iDRAC %s -\n" % idrac_ip)
-            get_attributes = re.findall("ServerOS.+?->",str(create_dict))
-            for i in get_attributes:
-                i = i.replace("</Attribute> -->","")
-                print(i.replace(">"," = "))
-            break
-        else:    
-            data = response.json()
-            try:
-                message_string = data["Messages"]
-            except:
-                logging.error("- FAIL, unable to get task details, status code %s returned" % response.status_code)
-                sys.exit(0)
-            current_time = (datetime.now()-start_time)
-            if response.status_code == 200 or response.status_code == 202:
-                logging.debug("- PASS, GET command passed to get task details")
-            else:
-                logging.error("- FAIL, execute job ID command failed, error code: %s" % response.status_code)
-                sys.exit(0)
-            if str(current_time)[0:7] >= "0:10:00":
-                logging.error("\n- FAIL, timeout of 10 minutes has been reached before marking the job completed.")
-                sys.exit(0)
-            else:
-                time.sleep(3)
-                continue
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=10))
+    if status.timed_out:
+        logging.error("\n- FAIL, timeout of 10 minutes has been reached before marking the job completed.")
+        sys.exit(0)
+    elif status.error:
+        logging.error("- ERROR:, GET job ID details failed, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL, job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    # Exported profile is returned in the task response once the job completes
+    if args["x"]:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+    else:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
+    create_dict = response.__dict__
+    if "<SystemConfiguration Model" not in str(create_dict):
+        logging.error("- FAIL, exported profile not returned in GET task response, status code %s returned" % response.status_code)
+        sys.exit(0)
+    logging.info("\n- INFO, current Operation System information for iDRAC %s -\n" % idrac_ip)
+    get_attributes = re.findall("ServerOS.+?->",str(create_dict))
+    for i in get_attributes:
+        i = i.replace("</Attribute> -->","")
+        print(i.replace(">"," = "))
 
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -120,7 +110,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password=args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -130,6 +120,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -17,7 +17,6 @@
 
 import argparse
 import configparser
-import getpass
 import json
 import logging
 import re
@@ -26,8 +25,14 @@ import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.bios import attribute_set, validate_bios_attributes
+from IdracRedfishSupport.fleet import expand_idrac_ips, read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, JobWatcher, wait_for_job
+from IdracRedfishSupport.registry import BIOS_REGISTRY_URI, RegistryError, get_registry
+from IdracRedfishSupport.output import add_output_arguments, open_output
 
 warnings.filterwarnings("ignore")
 
@@ -51,16 +56,22 @@ parser.add_argument('--maintenance-reboot', help='Pass in the type of maintenanc
 parser.add_argument('--start-time', help='Maintenance window start date/time, pass it in this format \"YYYY-MM-DDTHH:MM:SS(+/-)HH:MM\"', dest="start_time", required=False)
 parser.add_argument('--duration-time', help='Maintenance window duration time(amount of time allowed to execute and complete the config job), pass in a value in seconds', dest="duration_time", required=False)
 parser.add_argument('--config-file', help='Pass in the directory path and name of the config ini file. Execute --config-ini-file-examples argument to see ini file format examples.', dest="config_file", required=False)
+parser.add_argument('--validate-only', help='Pass in this argument with --attribute-names and --attribute-values to only validate the attribute values against the BIOS registry and current BIOS values, no changes are sent to iDRAC. Attribute values are always validated before setting attributes.', action="store_true", dest="validate_only", required=False)
+add_output_arguments(parser)
 
 args = vars(parser.parse_args())
-logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
+# Records written to stdout with --output-format, script messages are then logged to stderr. force replaces the stdout handler IdracRedfishSupport configures on import
+logging.basicConfig(format='%(message)s', stream=sys.stderr if args["output_format"] and not args["output_file"] else sys.stdout, level=logging.INFO, force=True)
 
 def script_examples():
     print("""\n- GetSetBiosAttributesREDFISH.py -ip 192.168.0.120 -u root -p calvin --get, this example will get all BIOS attributes.
     \n- GetSetBiosAttributesREDFISH.py -ip 192.168.0.120 -u root --get-attribute SetBootOrderEn, this example will first prompt to enter iDRAC user password, then return details for this specific attribute.
     \n- GetSetBiosAttributesREDFISH.py -ip 192.168.0.120 -x 3fe2401de68b718b5ce2761cb0651aac --get-registry, this example using iDRAC X-auth token session will return attribute registry details. 
+    \n- GetSetBiosAttributesREDFISH.py -ip 192.168.0.120 -u root -p calvin --get --output-format csv --output-file bios_attributes.csv, this example will write all BIOS attributes to CSV file bios_attributes.csv, one row per attribute.
+    \n- GetSetBiosAttributesREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-registry --output-format ndjson, this example will print the BIOS attribute registry as NDJSON, one JSON attribute per line.
     \n- GetSetBiosAttributesREDFISH.py -ip 192.168.0.120 -u root -p calvin --attribute-names MemTest --attribute-values Disabled --maintenance-reboot autoreboot --start-time "2018-10-30T20:10:10-05:00" --duration-time 600, this example shows setting BIOS attribute using scheduled start time with maintenance window. Once the scheduled time has elapsed, server will auto reboot to execute config job.
     \n- GetSetBiosAttributesREDFISH.py -ip 192.168.0.120 -u root -p calvin --attribute-names EmbSata,NvmeMode --attribute-values RaidMode,Raid --reboot, this example shows setting multiple BIOS attributes with reboot now to apply.
+    \n- GetSetBiosAttributesREDFISH.py -ip 192.168.0.120 -u root -p calvin --attribute-names SysProfile,ProcCStates --attribute-values Custom,Disabled --validate-only, this example will check the attribute values against the BIOS registry, read only attributes and attribute dependencies without creating a config job.
     \n- GetSetBiosAttributesREDFISH.py --config-file C:\Python310\bios_config.ini, this example shows using config ini file to set BIOS attributes.""")
     sys.exit(0)
 
@@ -84,6 +95,8 @@ def config_ini_file_examples():
 
     This example shows passing in range of iDRAC IPs to set one BIOS attribute. Script will loop through IPs starting at 192.168.0.130 up to 192.168.0.140.\n
 
+    idrac_ips also supports range across subnets (example: 192.168.0.250-192.168.1.10), CIDR network (example: 192.168.0.0/28) or a combination of values using a comma separator.\n
+
     NOTES: All iDRAC IPs passed in the INI file must have the same username and password.""")
     sys.exit(0)
 
@@ -100,12 +113,14 @@ def check_supported_idrac_version(idrac_ip=""):
         logging.warning("\n- WARNING, iDRAC version installed does not support this feature using Redfish API")
         sys.exit(0)
 
+def write_output(records, description):
+    # Records are streamed as NDJSON, CSV or JSON instead of printed and captured in a text file
+    with open_output(args["output_format"], args["output_file"]) as writer:
+        writer.write_all(records)
+    if args["output_file"]:
+        logging.info("\n- INFO, %s %s written to \"%s\" file" % (writer.records, description, args["output_file"]))
+
 def get_bios_attributes():
-    try:
-        os.remove("bios_attributes.txt")
-    except:
-        pass
-    open_file = open("bios_attributes.txt","w")
     if args["x"]:
         response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
     else:
@@ -115,6 +130,14 @@ def get_bios_attributes():
         logging.error("\n- FAIL, GET command failed to get BIOS attributes, status code %s returned" % response.status_code)
         logging.error(data)
         sys.exit(0)
+    if args["output_format"]:
+        write_output(({"AttributeName": i[0], "CurrentValue": i[1]} for i in data['Attributes'].items()), "BIOS attributes")
+        return
+    try:
+        os.remove("bios_attributes.txt")
+    except:
+        pass
+    open_file = open("bios_attributes.txt","w")
     get_datetime = datetime.now()
     current_date_time = "- Data collection timestamp: %s-%s-%s  %s:%s:%s\n" % (get_datetime.year, get_datetime.month, get_datetime.day, get_datetime.hour, get_datetime.minute, get_datetime.second)
     open_file.writelines(current_date_time)
@@ -147,21 +170,28 @@ def get_specific_bios_attribute():
     logging.error("\n- ERROR, unable to get attribute current value. Either attribute doesn't exist for this BIOS version, typo in attribute name or case incorrect")
     sys.exit(0)
 
+def get_bios_registry(idrac_ip):
+    # BIOS registry is read from the versioned registry cache, only downloaded once per server model and BIOS version
+    try:
+        if args["x"]:
+            return get_registry(idrac_ip, BIOS_REGISTRY_URI, x_auth_token=args["x"], verify_cert=verify_cert)
+        else:
+            return get_registry(idrac_ip, BIOS_REGISTRY_URI, username=idrac_username, password=idrac_password, verify_cert=verify_cert)
+    except RegistryError as error:
+        logging.error("\n- FAIL, GET command failed to get BIOS attribute registry, status code %s returned" % error.status_code)
+        logging.error(error.data)
+        sys.exit(0)
+
 def bios_registry():
+    if args["output_format"]:
+        write_output(get_bios_registry(idrac_ip)['RegistryEntries']['Attributes'], "BIOS attribute registry entries")
+        return
     try:
         os.remove("bios_attribute_registry.txt")
     except:
         pass
     open_file = open("bios_attribute_registry.txt","a")
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- FAIL, GET command failed to get BIOS attribute registry, status code %s returned" % response.status_code)
-        logging.error(data)
-        sys.exit(0)
+    data = get_bios_registry(idrac_ip)
     for i in data['RegistryEntries']['Attributes']:
         for ii in i.items():
             pprint(i)
@@ -176,20 +206,15 @@ def bios_registry():
     open_file.close()
 
 def bios_registry_dependencies():
+    if args["output_format"]:
+        write_output(get_bios_registry(idrac_ip)['RegistryEntries']['Dependencies'], "BIOS attribute registry dependencies")
+        return
     try:
         os.remove("bios_attribute_dependencies.txt")
     except:
         pass
     open_file = open("bios_attribute_dependencies.txt","a")
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- FAIL, GET command failed to get BIOS attribute registry, status code %s returned" % response.status_code)
-        logging.error(data)
-        sys.exit(0)
+    data = get_bios_registry(idrac_ip)
     for i in data['RegistryEntries']['Dependencies']:
         for ii in i.items():
             pprint(i)
@@ -205,15 +230,7 @@ def bios_registry_dependencies():
 
 def bios_registry_get_specific_attribute():
     logging.info("\n- INFO, searching BIOS registry for attribute \"%s\"" % args["get_registry_attribute"])
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- FAIL, GET command failed to get BIOS attribute registry, status code %s returned" % response.status_code)
-        logging.error(data)
-        sys.exit(0)
+    data = get_bios_registry(idrac_ip)
     for i in data['RegistryEntries']['Attributes']:
         if args["get_registry_attribute"] in i.values():
             logging.info("\n- Attribute Registry information for attribute \"%s\" -\n" % args["get_registry_attribute"])
@@ -222,38 +239,51 @@ def bios_registry_get_specific_attribute():
                 return
     logging.error("\n- FAIL, unable to locate attribute \"%s\" in the registry. Make sure you typed the attribute name correct since its case sensitive" % args["get_registry_attribute"])
     
+def validate_attributes(idrac_ip, attributes):
+    # Attribute set is checked against the cached BIOS registry and current BIOS values before the PATCH, an invalid set fails here instead of in the config job after a reboot
+    try:
+        if args["x"]:
+            return validate_bios_attributes(idrac_ip, attributes, x_auth_token=args["x"], verify_cert=verify_cert)
+        else:
+            return validate_bios_attributes(idrac_ip, attributes, username=idrac_username, password=idrac_password, verify_cert=verify_cert)
+    except RegistryError as error:
+        logging.error("\n- FAIL, GET command failed for %s, status code %s returned" % (error.uri, error.status_code))
+        logging.error(error.data)
+        sys.exit(0)
+
 def create_bios_attribute_dict(idrac_ip="",attribute_names="", attribute_values=""):
-    global bios_attribute_payload
     global start_time
     start_time = datetime.now()
-    bios_attribute_payload = {"Attributes":{}}
-    if args["config_file"]:
-        attribute_names = attribute_names.split(",")
-        attribute_values = attribute_values.split(",")
-    else:
-        attribute_names = args["attribute_names"].split(",")
-        attribute_values = args["attribute_values"].split(",")
-    for i,ii in zip(attribute_names, attribute_values):
-        bios_attribute_payload["Attributes"][i] = ii
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
+    bios_attribute_payload = None
+    if not args["config_file"]:
+        attribute_names = args["attribute_names"]
+        attribute_values = args["attribute_values"]
+    try:
+        attributes = attribute_set(attribute_names, attribute_values)
+    except ValueError as error_message:
+        logging.error("\n- FAIL, %s" % error_message)
+        return None
+    validation = validate_attributes(idrac_ip, attributes)
+    for i in validation.unchanged:
+        logging.info("- INFO, attribute %s is already set to %s for iDRAC %s, not included in the config job" % (i, attributes[i], idrac_ip))
+    if validation.errors:
+        logging.error("\n- FAIL, BIOS attribute(s) failed validation against the BIOS registry of iDRAC %s, no changes sent -\n" % idrac_ip)
+        for i in validation.errors:
+            logging.error("Attribute Name: %s, value: %s, %s" % (i.attribute, i.value, i.reason))
+        return None
+    if not validation.attributes:
+        logging.info("\n- INFO, all BIOS attribute(s) are already set to the new values for iDRAC %s, config job not created" % idrac_ip)
+        return None
+    bios_attribute_payload = {"Attributes": validation.attributes}
+    if args["validate_only"]:
+        logging.info("\n- PASS, BIOS attribute(s) passed validation for iDRAC %s -\n" % idrac_ip)
     else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- FAIL, GET command failed to get BIOS attribute registry, status code %s returned" % response.status_code)
-        logging.error(data)
-        sys.exit(0)
+        logging.info("\n- INFO, setting BIOS attribute(s) for iDRAC %s -\n" % idrac_ip)
     for i in bios_attribute_payload["Attributes"].items():
-        for ii in data['RegistryEntries']['Attributes']:
-            if i[0] in ii.values():
-                if ii['Type'] == "Integer":
-                    bios_attribute_payload['Attributes'][i[0]] = int(i[1])
-    logging.info("\n- INFO, setting BIOS attribute(s) for iDRAC %s -\n" % idrac_ip)
-    for i in bios_attribute_payload["Attributes"].items():
-        logging.info("Attribute Name: %s, setting new value to: %s" % (i[0], i[1]))
+        logging.info("Attribute Name: %s, %s: %s" % (i[0], "new value" if args["validate_only"] else "setting new value to", i[1]))
+    return bios_attribute_payload
     
-def create_next_boot_config_job(idrac_ip=""):
+def create_next_boot_config_job(idrac_ip="", bios_attribute_payload=None):
     global job_id
     url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Bios/Settings' % (idrac_ip)
     payload = {"@Redfish.SettingsApplyTime":{"ApplyTime":"OnReset"}}
@@ -278,7 +308,7 @@ def create_next_boot_config_job(idrac_ip=""):
         sys.exit(0)
     logging.info("- PASS, BIOS config job ID %s successfully created" % job_id)
 
-def create_schedule_config_job(idrac_ip=""):
+def create_schedule_config_job(idrac_ip="", bios_attribute_payload=None):
     global job_id
     url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Bios/Settings' % (idrac_ip)
     if args["maintenance_reboot"] == "noreboot":
@@ -323,76 +353,52 @@ def create_schedule_config_job(idrac_ip=""):
         logging.info("\n- PASS %s maintenance window config jid successfully created.\n\n- INFO, autoreboot value detected, config job will go to scheduled state once start time has elapsed and automatically reboot the server to apply the configuration job" % job_id) 
 
 def get_job_status_scheduled(idrac_ip=""):
-    count = 0
-    while True:
-        if count == 5:
-            logging.error("- FAIL, GET job status retry count of 5 has been reached, script will exit")
-            sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.error(error_message)
-            logging.info("\n- INFO, GET request will try again to poll job status")
-            time.sleep(5)
-            count += 1
-            continue
-        if response.status_code == 200:
-            time.sleep(5)
-        else:
-            logging.error("\n- FAIL, Command failed to check job status, return code %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(response.json()))
-            return
-        data = response.json()
-        if data['Message'] == "Task successfully scheduled.":
-            logging.info("- INFO, staged config job marked as scheduled")
-            break
-        else:
-            logging.info("- INFO: job status not scheduled, current status: %s" % data['Message'])
+    def job_status_update(status):
+        if status.message != "Task successfully scheduled.":
+            logging.info("- INFO: job status not scheduled, current status: %s" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=10), until=lambda data: data.get("Message") == "Task successfully scheduled.", on_update=job_status_update)
+    if status.error:
+        logging.error("\n- FAIL, unable to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.timed_out:
+        logging.error("- FAIL, job ID %s not marked as scheduled within 10 minutes, current status: %s" % (job_id, status.message))
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    logging.info("- INFO, staged config job marked as scheduled")
 
 def loop_job_status_final(idrac_ip=""):
-    start_time = datetime.now()
-    retry_count = 1
-    while True:
-        if retry_count == 20:
-            logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
-            sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logging.info("- INFO, GET request failed due to connection error, retry")
-            if "powercyclerequest" in args["attribute_names"].lower():
-                logging.info("- INFO, PowerCycleRequest attribute detected, virtual a/c cycle is running. Script will sleep for 180 seconds, retry")
-                time.sleep(180)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job status not completed, current status: \"%s\"" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(hours=2), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 2 hours has been hit, script stopped\n")
+    elif status.error:
+        logging.error("\n- FAIL, GET command failed to check job status, %s" % status.error)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+    else:
+        logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
+        for i in status.data.items():
+            pprint(i)
+
+def loop_job_status_final_all_idracs(idrac_job_ids):
+    # Check final job status for all iDRACs at the same time, one Jobs request per iDRAC each poll
+    logging.info("\n- INFO, checking final job status for %s iDRAC(s)" % len(idrac_job_ids))
+    with JobWatcher(idrac_username, idrac_password, verify_cert=verify_cert, timeout=timedelta(hours=2)) as watcher:
+        for idrac_address, idrac_job_id in idrac_job_ids.items():
+            watcher.watch(idrac_address, idrac_job_id)
+        for status in watcher.results():
+            if status.timed_out:
+                logging.error("- FAIL, iDRAC %s job ID %s, timeout of 2 hours has been hit, current status: %s" % (status.idrac_ip, status.job_id, status.message))
+            elif status.error:
+                logging.error("- FAIL, iDRAC %s job ID %s, unable to check job status, %s" % (status.idrac_ip, status.job_id, status.error))
+            elif status.failed:
+                logging.error("- FAIL, iDRAC %s job ID %s failed, failed message is: %s" % (status.idrac_ip, status.job_id, status.message))
             else:
-                time.sleep(60)
-            retry_count += 1
-            continue
-        current_time = (datetime.now()-start_time)
-        if response.status_code != 200:
-            logging.error("\n- FAIL, GET command failed to check job status, return code is %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(req.json()))
-            return
-        data = response.json()
-        if str(current_time)[0:7] >= "2:00:00":
-            logging.error("\n- FAIL: Timeout of 2 hours has been hit, script stopped\n")
-            return
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed":
-            logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, data['Message']))
-            return
-        elif data['JobState'] == "Completed":
-            logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
-            for i in data.items():
-                pprint(i)
-            break
-        else:
-            logging.info("- INFO, job status not completed, current status: \"%s\"" % data['Message'])
-            time.sleep(10)
+                logging.info("- PASS, iDRAC %s job ID %s marked completed in %s" % (status.idrac_ip, status.job_id, str(status.elapsed)[0:7]))
 
 def reboot_server(idrac_ip=""):
     if args["x"]:
@@ -425,11 +431,11 @@ def reboot_server(idrac_ip=""):
             else:
                 response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time == "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 if args["x"]:
@@ -505,28 +511,26 @@ def use_config_file():
         verify_cert = False
     else:
         verify_cert = False
-    if "," in idrac_ips:
-        idrac_ips = idrac_ips.split(",")
-    elif "-" in idrac_ips:
-        idrac_ips = idrac_ips.split("-")
-        build_ip_list = [idrac_ips[0]]
-        first_range_number = idrac_ips[0].split(".")[-1]
-        second_range_number = idrac_ips[1]
-        subnet = idrac_ips[0].split(".")[0]+"."+idrac_ips[0].split(".")[1]+"."+idrac_ips[0].split(".")[2]+"."
-        create_range = range(int(first_range_number)+1,int(second_range_number)+1)
-        for i in create_range:
-            create_string = subnet + str(i)
-            build_ip_list.append(create_string)
-        idrac_ips = build_ip_list
-    else:
-        idrac_ips = [idrac_ips]
+    idrac_ips = expand_idrac_ips(idrac_ips)
+    # Every iDRAC is validated before the first PATCH, an invalid attribute set doesn't cost a reboot on any server
+    bios_attribute_payloads = {}
     for idrac_address in idrac_ips:
         check_supported_idrac_version(idrac_address)
-        create_bios_attribute_dict(idrac_address,attribute_names, attribute_values)
-        create_next_boot_config_job(idrac_address)
+        payload = create_bios_attribute_dict(idrac_address,attribute_names, attribute_values)
+        if payload:
+            bios_attribute_payloads[idrac_address] = payload
+    if not bios_attribute_payloads:
+        logging.info("\n- INFO, no config job needed for any iDRAC")
+        return
+    if args["validate_only"]:
+        return
+    idrac_job_ids = {}
+    for idrac_address, payload in bios_attribute_payloads.items():
+        create_next_boot_config_job(idrac_address, payload)
         get_job_status_scheduled(idrac_address)
         reboot_server(idrac_address)
-        loop_job_status_final(idrac_address)
+        idrac_job_ids[idrac_address] = job_id
+    loop_job_status_final_all_idracs(idrac_job_ids)
         
 
 if __name__ == "__main__":
@@ -543,7 +547,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -553,6 +557,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version(idrac_ip)
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -568,16 +574,18 @@ if __name__ == "__main__":
     elif args["get_registry"]:
         bios_registry() 
     elif args["attribute_names"] and args["attribute_values"]:
-        create_bios_attribute_dict(idrac_ip)
+        bios_attribute_payload = create_bios_attribute_dict(idrac_ip)
+        if not bios_attribute_payload or args["validate_only"]:
+            sys.exit(0)
         if args["maintenance_reboot"] and args["start_time"] and args["duration_time"]:
-            create_schedule_config_job(idrac_ip)
+            create_schedule_config_job(idrac_ip, bios_attribute_payload)
         elif args["reboot"]:
-            create_next_boot_config_job(idrac_ip)
+            create_next_boot_config_job(idrac_ip, bios_attribute_payload)
             get_job_status_scheduled(idrac_ip)
             reboot_server(idrac_ip)
             loop_job_status_final(idrac_ip)
         else:
-            create_next_boot_config_job(idrac_ip)
+            create_next_boot_config_job(idrac_ip, bios_attribute_payload)
             get_job_status_scheduled(idrac_ip)
             logging.info("- INFO, argument --reboot not detected, server will not auto reboot. Config job is still scheduled and will execute on next server manual reboot.")
     else:
@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
@@ -29,6 +28,9 @@ import warnings
 
 from datetime import datetime
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.inventory import DEFAULT_INVENTORY_WORKERS, RedfishInventory
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -47,6 +49,7 @@ parser.add_argument('--powersupply', help='Get power supply information', action
 parser.add_argument('--storage', help='Get storage information', action="store_true", required=False)
 parser.add_argument('--network', help='Get network device information', action="store_true", required=False)
 parser.add_argument('--all', help='Get all system/device information', action="store_true", required=False)
+parser.add_argument('--workers', help='Number of concurrent Redfish GET requests used to collect inventory, default is %s. Pass in 1 to execute requests one at a time' % DEFAULT_INVENTORY_WORKERS, type=int, default=DEFAULT_INVENTORY_WORKERS, required=False)
 args = vars(parser.parse_args())
 logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
 
@@ -56,12 +59,33 @@ def script_examples():
     \n- GetSystemHWInventoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --all, this example will get all system information: general system information, processor, memory, fans, power supplies, hard drives, storage controllers, network devices""")
     sys.exit(0)
 
-def check_supported_idrac_version():
+def create_inventory():
+    global inventory
     if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+        inventory = RedfishInventory(idrac_ip, x_auth_token=args["x"], verify_cert=verify_cert, workers=args["workers"])
     else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
+        inventory = RedfishInventory(idrac_ip, username=idrac_username, password=idrac_password, verify_cert=verify_cert, workers=args["workers"])
+
+def prefetch_inventory():
+    # Top level resources for every selected section are fetched concurrently while system information is printed.
+    # Memory, processor and storage collections are read using $expand so members don't need one GET each.
+    collections = []
+    uris = []
+    if args["memory"] or args["all"]:
+        collections.append("/redfish/v1/Systems/System.Embedded.1/Memory")
+    if args["processor"] or args["all"]:
+        collections.append("/redfish/v1/Systems/System.Embedded.1/Processors")
+    if args["storage"] or args["all"]:
+        collections.append("/redfish/v1/Systems/System.Embedded.1/Storage")
+        uris.append("/redfish/v1/Chassis")
+    if args["network"] or args["all"]:
+        uris.append("/redfish/v1/Systems/System.Embedded.1/NetworkAdapters")
+    inventory.prefetch_collections(collections)
+    inventory.prefetch(uris)
+
+def check_supported_idrac_version():
+    response = inventory.get("/redfish/v1/Systems/System.Embedded.1")
+    data = response.data
     if response.status_code == 401:
         logging.warning("\n- WARNING, status code %s returned. Incorrect iDRAC username/password or invalid privilege detected." % response.status_code)
         sys.exit(0)
@@ -70,11 +94,8 @@ def check_supported_idrac_version():
         sys.exit(0)
 
 def get_system_information():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
+    response = inventory.get("/redfish/v1/Systems/System.Embedded.1")
+    data = response.data
     if response.status_code != 200:
         print("\n- FAIL, get command failed, error: %s" % data)
         sys.exit(0)
@@ -98,11 +119,8 @@ def get_system_information():
                 print(message)
     
 def get_memory_information():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Memory' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Memory' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
+    response = inventory.get_collection("/redfish/v1/Systems/System.Embedded.1/Memory")
+    data = response.data
     if response.status_code != 200:
         logging.error("\n- FAIL, get command failed, error: %s" % data)
         sys.exit(0)
@@ -118,11 +136,8 @@ def get_memory_information():
         except:
             logging.error("\n- FAIL, unable to get dimm slot info")
             sys.exit(0)
-        if args["x"]:
-            response = requests.get('https://%s%s' % (idrac_ip, i['@odata.id']), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s%s' % (idrac_ip, i['@odata.id']), verify=verify_cert, auth=(idrac_username, idrac_password))
-        sub_data = response.json()
+        response = inventory.get(i['@odata.id'])
+        sub_data = response.data
         if response.status_code != 200:
             logging.error("\n- FAIL, get command failed, error: %s" % sub_data)
             sys.exit(0)
@@ -146,11 +161,8 @@ def get_memory_information():
                     print(message)
     
 def get_cpu_information():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Processors' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Processors' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
+    response = inventory.get_collection("/redfish/v1/Systems/System.Embedded.1/Processors")
+    data = response.data
     if response.status_code != 200:
         logging.error("\n- FAIL, get command failed, error: %s" % data)
         sys.exit(0)
@@ -161,11 +173,8 @@ def get_cpu_information():
         print(message)
     for i in data['Members']:
         cpu = i['@odata.id'].split("/")[-1]
-        if args["x"]:
-            response = requests.get('https://%s%s' % (idrac_ip, i['@odata.id']), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s%s' % (idrac_ip, i['@odata.id']), verify=verify_cert, auth=(idrac_username, idrac_password))
-        sub_data = response.json()
+        response = inventory.get(i['@odata.id'])
+        sub_data = response.data
         if response.status_code != 200:
             print("\n- FAIL, get command failed, error: %s" % sub_data)
             sys.exit(0)
@@ -192,11 +201,8 @@ def get_cpu_information():
                     print(message)
 
 def get_fan_information():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
+    response = inventory.get("/redfish/v1/Systems/System.Embedded.1")
+    data = response.data
     if response.status_code != 200:
         print("\n- FAIL, get command failed, error: %s" % data)
         sys.exit(0)
@@ -212,16 +218,14 @@ def get_fan_information():
         for i in data['Links']['CooledBy']:
             for ii in i.items():
                 fan_list.append(ii[1])
+        inventory.prefetch(fan_list)
         for i in fan_list:
-            if args["x"]:
-                response = requests.get('https://%s%s' % (idrac_ip, i), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s%s' % (idrac_ip, i), verify=verify_cert, auth=(idrac_username, idrac_password))
+            response = inventory.get(i)
             if response.status_code != 200:
                 logging.error("\n- FAIL, get command failed, error: %s" % data)
                 sys.exit(0)
             else:
-                data_get = response.json()
+                data_get = response.data
                 if "Fans" not in data_get.keys():
                     for ii in data_get.items():
                         message = "%s: %s" %  (ii[0], ii[1])
@@ -252,11 +256,8 @@ def get_fan_information():
                                 open_file.writelines(message)
                                 
 def get_ps_information():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
+    response = inventory.get("/redfish/v1/Systems/System.Embedded.1")
+    data = response.data
     if response.status_code != 200:
         logging.error("\n- FAIL, get command failed, error: %s" % data)
         sys.exit(0)
@@ -268,17 +269,15 @@ def get_ps_information():
     if data['Links']['PoweredBy'] == []:
         logging.error("- WARNING, no power supplies detected for system")       
     else:
+        inventory.prefetch([ii[1] for i in data['Links']['PoweredBy'] for ii in i.items()])
         for i in data['Links']['PoweredBy']:
             for ii in i.items():
-                if args["x"]:
-                    response = requests.get('https://%s%s' % (idrac_ip, ii[1]), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                else:
-                    response = requests.get('https://%s%s' % (idrac_ip, ii[1]), verify=verify_cert, auth=(idrac_username, idrac_password))
+                response = inventory.get(ii[1])
                 if response.status_code != 200:
                     logging.error("\n- FAIL, get command failed, error: %s" % data)
                     sys.exit(0)
                 else:
-                    data_get = response.json()
+                    data_get = response.data
                     if "PowerSupplies" not in data_get.keys():
                         message = "\n- Details for %s -\n" % data_get["Name"]
                         open_file.writelines(message)
@@ -380,23 +379,17 @@ def get_storage_controller_information():
     open_file.writelines("\n")
     print(message)
     controller_list = []
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
+    response = inventory.get_collection("/redfish/v1/Systems/System.Embedded.1/Storage")
     if response.status_code != 200:
         logging.error("\n- FAIL, get command failed, error: %s" % data)
         sys.exit(0)
-    data = response.json()
+    data = response.data
     for i in data["Members"]:
         for ii in i.items():
             controller_list.append(ii[1])
     for i in controller_list:
-        if args["x"]:
-            response = requests.get('https://%s%s' % (idrac_ip, i), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s%s' % (idrac_ip, i), verify=verify_cert, auth=(idrac_username, idrac_password))
-        data = response.json()
+        response = inventory.get(i)
+        data = response.data
         message = "\n - Detailed controller information for %s -\n" % i.split("/")[-1]
         open_file.writelines(message)
         open_file.writelines("\n")
@@ -440,12 +433,13 @@ def get_storage_disks_information():
     open_file.writelines(message)
     open_file.writelines("\n")
     print(message)
+    # Drive details for all controllers are fetched concurrently, then printed in controller and drive order
+    for i in inventory.get_many(controller_list):
+        if i.status_code == 200:
+            inventory.prefetch([ii['@odata.id'] for ii in i.data.get('Drives', [])])
     for i in controller_list:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (idrac_ip, i.split("/")[-1]), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (idrac_ip, i.split("/")[-1]), verify=verify_cert, auth=(idrac_username, idrac_password))
-        data = response.json()
+        response = inventory.get('/redfish/v1/Systems/System.Embedded.1/Storage/%s' % i.split("/")[-1])
+        data = response.data
         if response.status_code != 200:
             logging.error("- FAIL, GET command failed, detailed error information: %s" % data)
             sys.exit(0)
@@ -457,11 +451,8 @@ def get_storage_disks_information():
         else:
             for i in data['Drives']:
                 for ii in i.items():
-                    if args["x"]:
-                        response = requests.get('https://%s%s' % (idrac_ip, ii[1]), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                    else:
-                        response = requests.get('https://%s%s' % (idrac_ip, ii[1]), verify=verify_cert, auth=(idrac_username, idrac_password))
-                    data = response.json()
+                    response = inventory.get(ii[1])
+                    data = response.data
                     message = "\n - Detailed drive information for %s -\n" % ii[1].split("/")[-1]
                     open_file.writelines(message)
                     open_file.writelines("\n")
@@ -486,11 +477,8 @@ def get_storage_disks_information():
                             print(message)
                 
 def get_backplane_information():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Chassis' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Chassis' % idrac_ip, verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
+    response = inventory.get("/redfish/v1/Chassis")
+    data = response.data
     if response.status_code != 200:
         logging.error("\n- FAIL, get command failed, error is: %s" % data)
         sys.exit(0)
@@ -509,9 +497,10 @@ def get_backplane_information():
         open_file.writelines("\n")
         print(message)
         sys.exit()
+    inventory.prefetch(backplane_URI_list)
     for i in backplane_URI_list:
-        response = requests.get('https://%s%s' % (idrac_ip, i),verify=False,auth=(idrac_username, idrac_password))
-        data = response.json()
+        response = inventory.get(i)
+        data = response.data
         message = "\n- Detailed backplane information for %s -\n" % i.split("/")[-1]
         open_file.writelines(message)
         open_file.writelines("\n")
@@ -530,33 +519,27 @@ def get_backplane_information():
                 print(message)   
 
 def get_network_information():
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/NetworkAdapters' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/NetworkAdapters' % idrac_ip, verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
+    response = inventory.get("/redfish/v1/Systems/System.Embedded.1/NetworkAdapters")
+    data = response.data
     network_device_list = []
     for i in data['Members']:
         for ii in i.items():
             network_device = ii[1].split("/")[-1]
             network_device_list.append(network_device)
+    inventory.prefetch(['/redfish/v1/Systems/System.Embedded.1/NetworkAdapters/%s/NetworkDeviceFunctions' % i for i in network_device_list])
+    inventory.prefetch(['/redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/%s' % i for i in network_device_list])
     for i in network_device_list:
         port_list = []
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/NetworkAdapters/%s/NetworkDeviceFunctions' % (idrac_ip, i), verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/NetworkAdapters/%s/NetworkDeviceFunctions' % (idrac_ip, i), verify=verify_cert,auth=(idrac_username, idrac_password))
-        data = response.json()
+        response = inventory.get('/redfish/v1/Systems/System.Embedded.1/NetworkAdapters/%s/NetworkDeviceFunctions' % i)
+        data = response.data
         for i in data['Members']:
             for ii in i.items():
                 port_list.append(ii[1].split("/")[-1])
+    inventory.prefetch(['/redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/%s/NetworkDeviceFunctions/%s' % (re.search("\w+.\w+.\w", i).group(), i) for i in port_list])
     for i in network_device_list:
         device_id = re.search("\w+.\w+.\w", i).group()
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/%s' % (idrac_ip, i), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/%s' % (idrac_ip, i), verify=verify_cert, auth=(idrac_username, idrac_password))
-        data = response.json()
+        response = inventory.get('/redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/%s' % i)
+        data = response.data
         if response.status_code != 200:
             logging.error("\n- FAIL, get command failed, error is: %s" % data)
             sys.exit(0)
@@ -579,11 +562,8 @@ def get_network_information():
     for i in port_list:
         device_id = re.search("\w+.\w+.\w", i).group()
         # redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/NIC.Embedded.1/NetworkDeviceFunctions/NIC.Embedded.1-1-1
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/%s/NetworkDeviceFunctions/%s' % (idrac_ip, device_id, i), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/%s/NetworkDeviceFunctions/%s' % (idrac_ip, device_id, i), verify=verify_cert, auth=(idrac_username, idrac_password))
-        data = response.json()
+        response = inventory.get('/redfish/v1/Chassis/System.Embedded.1/NetworkAdapters/%s/NetworkDeviceFunctions/%s' % (device_id, i))
+        data = response.data
         if response.status_code != 200:
             logging.error("\n- FAIL, get command failed, error is: %s" % data)
             sys.exit(0)
@@ -613,7 +593,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -623,7 +603,11 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
+        create_inventory()
         check_supported_idrac_version()
+        prefetch_inventory()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
         sys.exit(0)
@@ -662,3 +646,4 @@ if __name__ == "__main__":
         get_backplane_information()
         get_network_information()
     open_file.close()
+    inventory.close()
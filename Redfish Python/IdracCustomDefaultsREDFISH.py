@@ -14,7 +14,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
@@ -23,11 +22,12 @@ import re
 import requests
 import subprocess
 import sys
-import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -89,109 +89,87 @@ def create_scp_file():
         logging.error("- FAIL, unable to find job ID in headers POST response, headers output is:\n%s" % response.headers)
         sys.exit(0)
     logging.info("\n- Job ID \"%s\" successfully created for ExportSystemConfiguration method\n" % job_id)
-    start_time = datetime.now()
-    while True:
-        current_time = (datetime.now()-start_time)
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-        dict_output = response.__dict__
-        if format_type == "XML":
-            if "<SystemConfiguration Model" in str(dict_output):
-                logging.info("\n- Export locally job ID %s successfully completed. Attributes exported:\n" % job_id)
-                regex_search = re.search("<SystemConfiguration.+</SystemConfiguration>",str(dict_output)).group()
-                try:
-                    security_string = re.search('<Attribute Name="GUI.1#SecurityPolicyMessage">.+?>', regex_search).group()
-                except:
-                    pass          
-                #Below code is needed to parse the string to set up in pretty XML format
-                replace_variable = regex_search.replace("\\n"," ")
-                replace_variable = replace_variable.replace("<!--  ","<!--")
-                replace_variable = replace_variable.replace(" -->","-->")
-                del_attribute = '<Attribute Name="SerialRedirection.1#QuitKey">^\\\\</Attribute>'
-                try:
-                    replace_variable = replace_variable.replace(del_attribute,"")
-                except:
-                    pass
-                try:
-                    replace_variable = replace_variable.replace(security_string,"")
-                except:
-                    pass
-                create_list = replace_variable.split("> ")
-                export_xml = []
-                for i in create_list:
-                    create_string = i+">"
-                    export_xml.append(create_string)
-                export_xml[-1] = "</SystemConfiguration>"
-                get_date_info = datetime.now()
-                if args["directory_path"]:
-                    filename = "%s\%s-%s-%s_%s%s%s_export.xml"% (args["directory_path"],get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                else:
-                    filename = "%s-%s-%s_%s%s%s_export.xml"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                open_file = open(filename,"w")
-                for i in export_xml:
-                    open_file.writelines("%s \n" % i)
-                open_file.close()
-                for i in export_xml:
-                    print(i)
-                print("\n")
-                if args["x"]:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                else:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-                data = response.json()
-                print("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
-                for i in data.items():
-                    pprint(i)
-                logging.info("\n- Exported attributes also saved in file: %s" % filename)
-                sys.exit(0)
-        elif format_type == "JSON":
-            if "SystemConfiguration" in str(dict_output):
-                data = response.json()
-                json_format = json.dumps(data)
-                get_date_info = datetime.now()
-                if args["directory_path"]:
-                    filename = "%s\%s-%s-%s_%s%s%s_export.json"% (args["directory_path"],get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                else:
-                    filename = "%s-%s-%s_%s%s%s_export.json"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                open_file = open(filename,"w")
-                open_file.write(json.dumps(json.loads(json_format), indent=4))
-                open_file.close()
-                if args["x"]:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                else:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-                data = response.json()
-                logging.info("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
-                for i in data.items():
-                    pprint(i)
-                logging.info("\n- Exported attributes saved to file: %s" % filename)
-                sys.exit(0)
-        data = response.json()
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, \"%s\", percent complete: %s" % (status.message, status.percent_complete))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=10), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL, Timeout of 10 minutes has been reached before marking the job completed.")
+        sys.exit(0)
+    elif status.error:
+        logging.error("- ERROR:, GET job ID details failed, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL, job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    # Exported profile is returned in the task response once the job completes
+    if args["x"]:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+    else:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
+    dict_output = response.__dict__
+    if format_type == "XML" and "<SystemConfiguration Model" in str(dict_output):
+        logging.info("\n- Export locally job ID %s successfully completed. Attributes exported:\n" % job_id)
+        regex_search = re.search("<SystemConfiguration.+</SystemConfiguration>",str(dict_output)).group()
         try:
-            message_string = data["Messages"]
+            security_string = re.search('<Attribute Name="GUI.1#SecurityPolicyMessage">.+?>', regex_search).group()
         except:
-            logging.error("- FAIL, unable to locate message string in JSON output")
-            sys.exit(0)
-        current_time = (datetime.now()-start_time)
-        if response.status_code == 202 or response.status_code == 200:
-            time.sleep(1)
+            pass          
+        #Below code is needed to parse the string to set up in pretty XML format
+        replace_variable = regex_search.replace("\\n"," ")
+        replace_variable = replace_variable.replace("<!--  ","<!--")
+        replace_variable = replace_variable.replace(" -->","-->")
+        del_attribute = '<Attribute Name="SerialRedirection.1#QuitKey">^\\\\</Attribute>'
+        try:
+            replace_variable = replace_variable.replace(del_attribute,"")
+        except:
+            pass
+        try:
+            replace_variable = replace_variable.replace(security_string,"")
+        except:
+            pass
+        create_list = replace_variable.split("> ")
+        export_xml = []
+        for i in create_list:
+            create_string = i+">"
+            export_xml.append(create_string)
+        export_xml[-1] = "</SystemConfiguration>"
+        get_date_info = datetime.now()
+        if args["directory_path"]:
+            filename = "%s\%s-%s-%s_%s%s%s_export.xml"% (args["directory_path"],get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
         else:
-            logging.error("- ERROR:, GET job ID details failed, error code: %s" % response.status_code)
-            logging.error(data)
-            sys.exit(0)
-        if str(current_time)[0:7] >= "0:10:00":
-            logging.error("\n- FAIL, Timeout of 10 minutes has been reached before marking the job completed.")
-            sys.exit(0)
+            filename = "%s-%s-%s_%s%s%s_export.xml"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
+        open_file = open(filename,"w")
+        for i in export_xml:
+            open_file.writelines("%s \n" % i)
+        open_file.close()
+        for i in export_xml:
+            print(i)
+        print("\n")
+        print("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
+        for i in status.data.items():
+            pprint(i)
+        logging.info("\n- Exported attributes also saved in file: %s" % filename)
+        sys.exit(0)
+    elif format_type == "JSON" and "SystemConfiguration" in str(dict_output):
+        data = response.json()
+        json_format = json.dumps(data)
+        get_date_info = datetime.now()
+        if args["directory_path"]:
+            filename = "%s\%s-%s-%s_%s%s%s_export.json"% (args["directory_path"],get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
         else:
-            try:
-                logging.info("- INFO, \"%s\", percent complete: %s" % (data['Oem']['Dell']['Message'],data['Oem']['Dell']['PercentComplete']))
-                time.sleep(1)
-            except:
-                logging.info("- INFO, unable to print job status message, trying again")
-                time.sleep(1)
-            continue
+            filename = "%s-%s-%s_%s%s%s_export.json"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
+        open_file = open(filename,"w")
+        open_file.write(json.dumps(json.loads(json_format), indent=4))
+        open_file.close()
+        logging.info("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
+        for i in status.data.items():
+            pprint(i)
+        logging.info("\n- Exported attributes saved to file: %s" % filename)
+        sys.exit(0)
+    else:
+        logging.error("- FAIL, exported profile not returned in GET task response, status code %s returned" % response.status_code)
+        sys.exit(0)
 
 def set_custom_defaults():
     try:
@@ -223,86 +201,57 @@ def set_custom_defaults():
         logging.error("- FAIL, unable to find job ID in headers POST response, headers output is:\n%s" % response.headers)
         sys.exit(0)
     logging.info("\n- PASS, %s successfully created for DellManager.SetCustomDefaults method\n" % (job_id))
-    start_job_message = ""
-    start_time = datetime.now()
-    count = 1
-    get_job_status_count = 1
-    while True:
-        if count == 10:
-            logging.error("- FAIL, 10 attempts at getting job status failed, script will exit")
-            sys.exit(0)
-        if get_job_status_count == 10:
-            logging.warning("- WARNING, retry count of 10 has been hit for retry job status GET request, script will exit")
-            sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, args["p"]))
-        except requests.ConnectionError as error_message:
-            logging.warning("- WARNING, requests command failed to GET job status, detailed error information: \n%s" % error_message)
-            logging.info("- INFO, script will attempt to get job status again")
-            time.sleep(10)
-            count += 1
-            continue
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, \"%s\", percent complete: %s" % (status.message, status.percent_complete))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, on_update=job_status_update)
+    if status.timed_out or status.error:
+        logging.error("- FAIL, unable to get final job status for job ID %s, %s" % (job_id, status.error or "timeout of 2 hours has been hit"))
+        sys.exit(0)
+    # Detailed configuration results are only reported in the task Messages, get them once the job is done
+    try:
+        if args["x"]:
+            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+        else:
+            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
         data = response.json()
+    except (requests.ConnectionError, ValueError) as error_message:
+        logging.warning("- WARNING, requests command failed to GET job results, detailed error information: \n%s" % error_message)
+        data = {}
+    current_time = status.elapsed
+    job_message = (status.message or "").lower()
+    if status.job_state == "Failed" or status.job_state == "CompletedWithErrors":
+        logging.info("\n- INFO, job ID %s status marked as \"%s\"" % (job_id, status.job_state))
+        logging.info("\n- Detailed configuration changes and job results for \"%s\"\n" % job_id)
         try:
-            current_job_message = data['Oem']['Dell']['Message']
+            for i in data["Messages"]:
+                pprint(i)
         except:
-            logging.info("- INFO, unable to get job ID message string from JSON output, retry")
-            count += 1
-            continue
-        current_time = (datetime.now()-start_time)
-        if response.status_code == 202 or response.status_code == 200:
-            time.sleep(1)
-        else:
-            logging.info("- INFO, GET command failed to get job ID details, error code: %s, retry" % response.status_code)
-            count += 1
-            time.sleep(5)
-            continue
-        if "Oem" not in data:
-            logging.info("- INFO, unable to locate OEM data in JSON response, retry")
-            get_job_status_count += 1
-            time.sleep(5)
-            continue
-        if data['Oem']['Dell']['JobState'] == "Failed" or data['Oem']['Dell']['JobState'] == "CompletedWithErrors":
-            logging.info("\n- INFO, job ID %s status marked as \"%s\"" % (job_id, data['Oem']['Dell']['JobState']))
-            logging.info("\n- Detailed configuration changes and job results for \"%s\"\n" % job_id)
-            try:
-                for i in data["Messages"]:
-                    pprint(i)
-            except:
-                logging.error("- FAIL, unable to get configuration results for job ID, returning only final job results\n")
-                for i in data['Oem']['Dell'].items():
-                    print("%s: %s" % (i[0], i[1]))
-            logging.info("- %s completed in: %s" % (job_id, str(current_time)[0:7]))
-            sys.exit(0)
-        elif data['Oem']['Dell']['JobState'] == "Completed":
-            if "fail" in data['Oem']['Dell']['Message'].lower() or "error" in data['Oem']['Dell']['Message'].lower() or "not" in data['Oem']['Dell']['Message'].lower() or "unable" in data['Oem']['Dell']['Message'].lower() or "no device configuration" in data['Oem']['Dell']['Message'].lower() or "time" in data['Oem']['Dell']['Message'].lower():
-                logging.error("- FAIL, Job ID %s marked as %s but detected issue(s). See detailed job results below for more information on failure\n" % (job_id, data['Oem']['Dell']['JobState']))
-            elif "success" in data['Oem']['Dell']['Message'].lower():
-                logging.info("- PASS, job ID %s successfully marked completed\n" % job_id)
-            elif "no changes" in data['Oem']['Dell']['Message'].lower():
-                logging.info("\n- PASS, job ID %s marked completed\n" % job_id)
-                logging.info("- Detailed job results for job ID %s\n" % job_id)
-                for i in data['Oem']['Dell'].items():
-                    pprint(i)
-                sys.exit(0)
-            logging.info("- Detailed configuration changes and job results for \"%s\"\n" % job_id)
-            try:
-                for i in data["Messages"]:
-                    pprint(i)
-            except:
-                logging.error("- FAIL, unable to get configuration results for job ID, returning only final job results\n")
-                for i in data['Oem']['Dell'].items():
-                    pprint(i)
-            logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
-            sys.exit(0)
-        else:
-            if start_job_message != current_job_message:
-                logging.info("- INFO, \"%s\", percent complete: %s" % (data['Oem']['Dell']['Message'],data['Oem']['Dell']['PercentComplete']))
-                start_job_message = current_job_message
-                continue
+            logging.error("- FAIL, unable to get configuration results for job ID, returning only final job results\n")
+            for i in status.data.items():
+                print("%s: %s" % (i[0], i[1]))
+        logging.info("- %s completed in: %s" % (job_id, str(current_time)[0:7]))
+        sys.exit(0)
+    if "fail" in job_message or "error" in job_message or "not" in job_message or "unable" in job_message or "no device configuration" in job_message or "time" in job_message:
+        logging.error("- FAIL, Job ID %s marked as %s but detected issue(s). See detailed job results below for more information on failure\n" % (job_id, status.job_state))
+    elif "success" in job_message:
+        logging.info("- PASS, job ID %s successfully marked completed\n" % job_id)
+    elif "no changes" in job_message:
+        logging.info("\n- PASS, job ID %s marked completed\n" % job_id)
+        logging.info("- Detailed job results for job ID %s\n" % job_id)
+        for i in status.data.items():
+            pprint(i)
+        sys.exit(0)
+    logging.info("- Detailed configuration changes and job results for \"%s\"\n" % job_id)
+    try:
+        for i in data["Messages"]:
+            pprint(i)
+    except:
+        logging.error("- FAIL, unable to get configuration results for job ID, returning only final job results\n")
+        for i in status.data.items():
+            pprint(i)
+    logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
+    sys.exit(0)
 
 def download_custom_defaults():
     logging.info("\n- INFO, downloading custom defaults, this may take a few seconds to complete")
@@ -376,7 +325,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -25,8 +25,9 @@ import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -370,25 +371,23 @@ def create_next_boot_config_job(x):
     logging.info("- PASS, BIOS config job ID \"%s\" successfully created" % (job_id))
 
 def check_job_status_schedule(x):
-    while True:
-        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), auth=(idrac_username, x), verify=False)
-        if response.status_code == 202 or response.status_code == 200:
-            time.sleep(10)
-        else:
-            logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(req.json()))
-            sys.exit(0)
-        data = response.json()
-        if data['Messages'][0]['Message'] == "Task successfully scheduled.":
-            logging.info("- PASS, %s job id successfully scheduled, rebooting the server to apply boot option changes" % job_id)
-            break
-        if "Lifecycle Controller in use" in data['Messages'][0]['Message']:
-            logging.info("- INFO, Lifecycle Controller in use, this job will start when Lifecycle Controller is available. Check overall jobqueue to make sure no other jobs are running and make sure server is either off or out of POST")
-            sys.exit(0)
-        else:
-            logging.info("- INFO: JobStatus not scheduled, current status is: %s" % data['Messages'][0]['Message'])
-            time.sleep(1)
-            continue
+    def job_status_update(status):
+        if status.message != "Task successfully scheduled." and "Lifecycle Controller in use" not in (status.message or ""):
+            logging.info("- INFO: JobStatus not scheduled, current status is: %s" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, x, timeout=timedelta(minutes=10), until=lambda data: data.get("Message") == "Task successfully scheduled." or "Lifecycle Controller in use" in data.get("Message", ""), on_update=job_status_update)
+    if status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.timed_out:
+        logging.error("- FAIL, job ID %s not marked as scheduled within 10 minutes, current status: %s" % (job_id, status.message))
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    elif "Lifecycle Controller in use" in (status.message or ""):
+        logging.info("- INFO, Lifecycle Controller in use, this job will start when Lifecycle Controller is available. Check overall jobqueue to make sure no other jobs are running and make sure server is either off or out of POST")
+        sys.exit(0)
+    logging.info("- PASS, %s job id successfully scheduled, rebooting the server to apply boot option changes" % job_id)
 
 def reboot_server(x):
     response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/' % idrac_ip,verify=False,auth=(idrac_username, x))
@@ -411,11 +410,11 @@ def reboot_server(x):
         while True:
             response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/' % idrac_ip,verify=False,auth=(idrac_username, x))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logging.info("- PASS, GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time == "0:05:00":
+            elif current_time >= timedelta(minutes=5):
                 logging.info("- INFO, unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 headers = {'content-type': 'application/json'}
@@ -458,33 +457,25 @@ def reboot_server(x):
         sys.exit(0)
 
 def check_final_job_status(x):
-    start_time = datetime.now()
-    time.sleep(1)
-    while True:
-        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), auth=(idrac_username, x), verify=False)
-        current_time = str((datetime.now()-start_time))[0:7]
-        if response.status_code != 200:
-            logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(req.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "0:30:00":
-            logging.error("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
-            sys.exit(0)
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or "fail" in data['JobState'] or "Fail" in data['JobState']:
-            logging.error("- FAIL: %s failed" % job_id)
-            logging.error(data)
-            sys.exit(0)
-        elif "completed successfully" in data['Message']:
-            logging.info("\n- PASS, job ID %s successfully marked completed" % job_id)
-            logging.info("\n- Final detailed job results -\n")
-            for i in data.items():
-                pprint(i)
-            logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
-            break
-        else:
-            logging.info("- INFO, job status not marked completed, current status: \"%s\"" % (data['Message']))
-            time.sleep(5)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job status not marked completed, current status: \"%s\"" % (status.message))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, x, timeout=timedelta(minutes=30), until=lambda data: "fail" in data.get("Message", "").lower() or "completed successfully" in data.get("Message", ""), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL: %s failed" % job_id)
+        logging.error(status.data)
+        sys.exit(0)
+    logging.info("\n- PASS, job ID %s successfully marked completed" % job_id)
+    logging.info("\n- Final detailed job results -\n")
+    for i in status.data.items():
+        pprint(i)
+    logging.info("\n- JOB ID %s completed in %s" % (job_id, str(status.elapsed)[0:7]))
 
 def verify_internal_USB_bios_attribute_off(x):
     time.sleep(15)
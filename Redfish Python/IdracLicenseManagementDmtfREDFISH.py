@@ -17,18 +17,19 @@
 
 import argparse
 import base64
-import getpass
 import json
 import logging
 import os
 import re
 import requests
 import sys
-import time
 import warnings
 
-from datetime import datetime
+from datetime import timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -188,31 +189,20 @@ def import_idrac_license_local():
         sys.exit(0)   
 
 def loop_job_status():
-    start_time = datetime.now()
-    time.sleep(1)
-    while True:
-        if args["x"]:
-            response = requests.get('https://%s%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        current_time = (datetime.now()-start_time)
-        if response.status_code != 200:
-            logging.error("\n- FAIL, Command failed to check job status, return code %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(req.json()))
-            sys.exit(0)
-        time.sleep(3)
-        data = response.json()
-        if str(current_time)[0:7] >= "0:05:00":
-            logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
-            sys.exit(0)
-        elif data["Oem"]["Dell"]["JobState"] == "Failed":
-            logging.error("- FAIL: job ID %s failed, detailed error results: \n%s" % (job_id.split("/")[-1], data))
-            sys.exit(0)
-        elif data["Oem"]["Dell"]["JobState"] == "Completed":
-            logging.info("\n- PASS, iDRAC license successfully imported from network share")
-            break
-        else:
-            logging.info("- INFO, job status not completed, execution time: \"%s\"" % (str(current_time)[0:7]))
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job status not completed, execution time: \"%s\"" % (str(status.elapsed)[0:7]))
+    status = wait_for_job(idrac_ip, job_id.split("/")[-1], idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=5), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.job_state != "Completed":
+        logging.error("- FAIL: job ID %s failed, detailed error results: \n%s" % (job_id.split("/")[-1], status.data))
+        sys.exit(0)
+    logging.info("\n- PASS, iDRAC license successfully imported from network share")
 
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -223,7 +213,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -233,6 +223,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
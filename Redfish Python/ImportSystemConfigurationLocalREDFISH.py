@@ -25,11 +25,12 @@ import json
 import logging
 import requests
 import sys
-import time
 import warnings
 
-from datetime import datetime
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -87,115 +88,81 @@ def scp_import_local():
         logging.error("- FAIL, unable to find job ID in headers POST response, headers output is:\n%s" % response.headers)
         sys.exit(0)
     logging.info("\n- PASS, %s successfully created for ImportSystemConfiguration method\n" % (job_id))
-    start_job_message = ""
-    start_time = datetime.now()
-    count = 1
-    get_job_status_count = 1
-    new_password_set = "no"
-    while True:
-        if count == 10:
-            logging.error("- FAIL, 10 attempts at getting job status failed, script will exit")
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, \"%s\", percent complete: %s" % (status.message, status.percent_complete))
+    new_password = args["new_password"]
+    if new_password == "":
+        new_password = getpass.getpass("- INFO, empty value detected for argument --new-password, pass in new password being set by SCP: ")
+    password = idrac_password if not args["x"] else None
+    status = wait_for_job(idrac_ip, job_id, idrac_username, password, args["x"], verify_cert, until=lambda data: "No reboot Server" in data.get("Message", ""), on_update=job_status_update)
+    if status.error and "status code 401" in status.error:
+        # SCP import can change the password of the iDRAC user checking the job
+        if not new_password:
+            logging.info("- INFO, status code 401 still detected for iDRAC user \"%s\". Check SCP file to see if iDRAC user \"%s\" password was changed for import" % (idrac_username, idrac_username))
             sys.exit(0)
-        if get_job_status_count == 10:
-            logging.warning("- WARNING, retry count of 10 has been hit for retry job status GET request, script will exit")
+        if args["x"]:
+            logging.warning("- WARNING, X-auth token session detected along with new password changed, script will exit. Manually check the overall job queue for completed job status. X-auth token session is no longer valid, recreate the token using new password set.")
             sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, args["p"]))
-        except requests.ConnectionError as error_message:
-            logging.warning("- WARNING, requests command failed to GET job status, detailed error information: \n%s" % error_message)
-            logging.info("- INFO, script will attempt to get job status again")
-            time.sleep(10)
-            count += 1
-            continue
-        if args["new_password"] == "" and new_password_set == "no":
-            args["p"] = getpass.getpass("- INFO, empty value detected for argument --new-password, pass in new password being set by SCP: ")
-            new_password_set = "yes"
-        if response.status_code == 401 and args["new_password"]:
-            if args["x"]:
-                logging.warning("- WARNING, X-auth token session detected along with new password changed, script will exit. Manually check the overall job queue for completed job status. X-auth token session is no longer valid, recreate the token using new password set.")
-                sys.exit(0)
-            logging.info("- INFO, status code 401 and argument --new-password detected. Script will now query job status using iDRAC user \"%s\" new password set by SCP import" % idrac_username)
-            time.sleep(5)
-            args["p"] = args["new_password"]
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, args["p"]))
-            if response.status_code == 401:
-                logging.info("- INFO, new password passed in for argument --new-password still failed with status code 401 for idrac user \"%s\", unable to check job status" % idrac_username)
-                sys.exit(0)
-            else:
-                continue
-        elif response.status_code == 401:
-            logging.info("- INFO, status code 401 still detected for iDRAC user \"%s\". Check SCP file to see if iDRAC user \"%s\" password was changed for import" % (idrac_username, idrac_username))
+        logging.info("- INFO, status code 401 and argument --new-password detected. Script will now query job status using iDRAC user \"%s\" new password set by SCP import" % idrac_username)
+        password = new_password
+        status = wait_for_job(idrac_ip, job_id, idrac_username, password, None, verify_cert, until=lambda data: "No reboot Server" in data.get("Message", ""), on_update=job_status_update)
+        if status.error and "status code 401" in status.error:
+            logging.info("- INFO, new password passed in for argument --new-password still failed with status code 401 for idrac user \"%s\", unable to check job status" % idrac_username)
             sys.exit(0)
+    if status.timed_out or status.error:
+        logging.error("- FAIL, unable to get final job status for job ID %s, %s" % (job_id, status.error or "timeout of 2 hours has been hit"))
+        sys.exit(0)
+    if "No reboot Server" in (status.message or "") and status.job_state not in FINAL_JOB_STATES:
+        logging.info("- PASS, job ID %s successfully marked completed. NoReboot value detected and config changes will not be applied until next manual server reboot\n" % job_id)
+        logging.info("\n- Detailed job results for job ID %s\n" % job_id)
+        for i in status.data.items():
+            print("%s: %s" % (i[0], i[1]))
+        sys.exit(0)
+    # Detailed configuration results are only reported in the task Messages, get them once the job is done
+    try:
+        if args["x"]:
+            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+        else:
+            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, password))
         data = response.json()
+    except (requests.ConnectionError, ValueError) as error_message:
+        logging.warning("- WARNING, requests command failed to GET job results, detailed error information: \n%s" % error_message)
+        data = {}
+    current_time = status.elapsed
+    job_message = (status.message or "").lower()
+    if status.job_state == "Failed" or status.job_state == "CompletedWithErrors":
+        logging.info("\n- INFO, job ID %s status marked as \"%s\"" % (job_id, status.job_state))
+        logging.info("\n- Detailed configuration changes and job results for \"%s\"\n" % job_id)
         try:
-            current_job_message = data['Oem']['Dell']['Message']
+            for i in data["Messages"]:
+                pprint(i)
         except:
-            logging.info("- INFO, unable to get job ID message string from JSON output, retry")
-            count += 1
-            continue
-        current_time = (datetime.now()-start_time)
-        if response.status_code == 202 or response.status_code == 200:
-            time.sleep(1)
-        else:
-            logging.info("- INFO, GET command failed to get job ID details, error code: %s, retry" % response.status_code)
-            count += 1
-            time.sleep(5)
-            continue
-        if "Oem" not in data:
-            logging.info("- INFO, unable to locate OEM data in JSON response, retry")
-            get_job_status_count += 1
-            time.sleep(5)
-            continue
-        if data['Oem']['Dell']['JobState'] == "Failed" or data['Oem']['Dell']['JobState'] == "CompletedWithErrors":
-            logging.info("\n- INFO, job ID %s status marked as \"%s\"" % (job_id, data['Oem']['Dell']['JobState']))
-            logging.info("\n- Detailed configuration changes and job results for \"%s\"\n" % job_id)
-            try:
-                for i in data["Messages"]:
-                    pprint(i)
-            except:
-                logging.error("- FAIL, unable to get configuration results for job ID, returning only final job results\n")
-                for i in data['Oem']['Dell'].items():
-                    print("%s: %s" % (i[0], i[1]))
-            logging.info("- %s completed in: %s" % (job_id, str(current_time)[0:7]))
-            sys.exit(0)
-        elif data['Oem']['Dell']['JobState'] == "Completed":
-            if "fail" in data['Oem']['Dell']['Message'].lower() or "error" in data['Oem']['Dell']['Message'].lower() or "not" in data['Oem']['Dell']['Message'].lower() or "unable" in data['Oem']['Dell']['Message'].lower() or "no device configuration" in data['Oem']['Dell']['Message'].lower() or "time" in data['Oem']['Dell']['Message'].lower():
-                logging.error("- FAIL, Job ID %s marked as %s but detected issue(s). See detailed job results below for more information on failure\n" % (job_id, data['Oem']['Dell']['JobState']))
-            elif "success" in data['Oem']['Dell']['Message'].lower():
-                logging.info("- PASS, job ID %s successfully marked completed\n" % job_id)
-            elif "no changes" in data['Oem']['Dell']['Message'].lower():
-                logging.info("\n- PASS, job ID %s marked completed\n" % job_id)
-                logging.info("- Detailed job results for job ID %s\n" % job_id)
-                for i in data['Oem']['Dell'].items():
-                    pprint(i)
-                sys.exit(0)
-            logging.info("- Detailed configuration changes and job results for \"%s\"\n" % job_id)
-            try:
-                for i in data["Messages"]:
-                    pprint(i)
-            except:
-                logging.error("- FAIL, unable to get configuration results for job ID, returning only final job results\n")
-                for i in data['Oem']['Dell'].items():
-                    pprint(i)
-            logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
-            sys.exit(0)
-        elif "No reboot Server" in data['Oem']['Dell']['Message']:
-            logging.info("- PASS, job ID %s successfully marked completed. NoReboot value detected and config changes will not be applied until next manual server reboot\n" % job_id)
-            logging.info("\n- Detailed job results for job ID %s\n" % job_id)
-            for i in data['Oem']['Dell'].items():
+            logging.error("- FAIL, unable to get configuration results for job ID, returning only final job results\n")
+            for i in status.data.items():
                 print("%s: %s" % (i[0], i[1]))
-            sys.exit(0)
-        else:
-            if start_job_message != current_job_message:
-                logging.info("- INFO, \"%s\", percent complete: %s" % (data['Oem']['Dell']['Message'],data['Oem']['Dell']['PercentComplete']))
-                start_job_message = current_job_message
-                continue
+        logging.info("- %s completed in: %s" % (job_id, str(current_time)[0:7]))
+        sys.exit(0)
+    if "fail" in job_message or "error" in job_message or "not" in job_message or "unable" in job_message or "no device configuration" in job_message or "time" in job_message:
+        logging.error("- FAIL, Job ID %s marked as %s but detected issue(s). See detailed job results below for more information on failure\n" % (job_id, status.job_state))
+    elif "success" in job_message:
+        logging.info("- PASS, job ID %s successfully marked completed\n" % job_id)
+    elif "no changes" in job_message:
+        logging.info("\n- PASS, job ID %s marked completed\n" % job_id)
+        logging.info("- Detailed job results for job ID %s\n" % job_id)
+        for i in status.data.items():
+            pprint(i)
+        sys.exit(0)
+    logging.info("- Detailed configuration changes and job results for \"%s\"\n" % job_id)
+    try:
+        for i in data["Messages"]:
+            pprint(i)
+    except:
+        logging.error("- FAIL, unable to get configuration results for job ID, returning only final job results\n")
+        for i in status.data.items():
+            pprint(i)
+    logging.info("\n- %s completed in: %s" % (job_id, str(current_time)[0:7]))
+    sys.exit(0)
             
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -206,7 +173,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
             args["p"] = idrac_password
         if args["ssl"]:
             if args["ssl"].lower() == "true":
@@ -217,6 +184,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
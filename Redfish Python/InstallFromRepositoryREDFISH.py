@@ -16,20 +16,26 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
 import platform
 import re
 import requests
+import ssl
 import subprocess
 import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import timedelta
 from pprint import pprint
+from xml.parsers.expat import ExpatError
+from IdracRedfishSupport.output import add_output_arguments, open_output
+from IdracRedfishSupport.packagelist import CRITICALITY, parse_package_list, update_record
+from IdracRedfishSupport.repository import DEFAULT_REPOSITORY_PORT, DupRepository, RepositoryError, RepositoryServer
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -55,17 +61,25 @@ parser.add_argument('--ignorecertwarning', help='Supported values are Off and On
 parser.add_argument('--applyupdate', help='Pass in True if you want to apply the updates. Pass in False will not apply updates but you can get the repo update list now. NOTE: This argument is optional. If you don\'t pass in the argument, default value is True.', required=False)
 parser.add_argument('--rebootneeded', help='Pass in True to reboot the server to apply updates which need a server reboot. False means the updates will get staged but not get applied until next manual server reboot. NOTE: This argument is optional. If you don\'t pass in this argument, default value is False', required=False)
 parser.add_argument('--catalogfile', help='Name of the catalog file on the repository. If the catalog file name is Catalog.xml on the network share, you don\'t need to pass in this argument', required=False)
+parser.add_argument('--serve-repository', help='Pass in the full directory path of a local repository (catalog and DUPs) to serve it from this system over HTTP instead of a network share. Packages are verified against the catalog hashes before serving. Arguments --shareip, --sharetype and --sharename are not needed, iDRAC must be able to reach this system on argument --serve-port.', dest="serve_repository", required=False)
+parser.add_argument('--serve-port', help='Pass in the port used with argument --serve-repository, default is %s. Use port 80 (or 443 with argument --serve-cert) if your iDRAC version does not accept a port in the share IP address.' % DEFAULT_REPOSITORY_PORT, dest="serve_port", type=int, default=DEFAULT_REPOSITORY_PORT, required=False)
+parser.add_argument('--serve-cert', help='Pass in certificate file (PEM) to serve argument --serve-repository over HTTPS', dest="serve_cert", required=False)
+parser.add_argument('--serve-key', help='Pass in private key file (PEM) for argument --serve-cert, not needed if the key is in the certificate file', dest="serve_key", required=False)
+add_output_arguments(parser)
 
 args=vars(parser.parse_args())
-logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
+# Records written to stdout with --output-format, script messages are then logged to stderr. force replaces the stdout handler IdracRedfishSupport configures on import
+logging.basicConfig(format='%(message)s', stream=sys.stderr if args["output_format"] and not args["output_file"] else sys.stdout, level=logging.INFO, force=True)
 
 def script_examples():
     print("""\n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-firmware, this example will get current firmware versions for devices installed.
     \n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-repo-list, this example will get repo update list details.
     \n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-critical-info, this example will get critical information from repo update list. 
+    \n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-repo-list --output-format ndjson --output-file 192.168.0.120_updates.ndjson, this example will write one record per repository update (component ID, device name, current and target version, criticality, reboot type and package path) to NDJSON file. Files of multiple iDRACs can be loaded into one index with IdracRedfishSupport.packagelist.load_update_index().
     \n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --install --shareip 192.168.0.130 --sharename cifs_share_vm\R740xd_repo --username administrator --password password --applyupdate False --sharetype CIFS, this example to going to download the catalog file from the CIFS share repostiory but not install any updates. It\'s recommmended now to execute the script with --get-repo-list argument to verify the repo update list.
     \n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --install --shareip 192.168.0.130 --sharename cifs_share_vm\R740xd_repo --username administrator --password password --applyupdate True --sharetype CIFS --rebootneeded True, this example is going to install updates from the CIFS share repository and apply them. If updates need a server reboot to apply, it will also reboot the server.
-    \n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --install --shareip downloads.dell.com --sharetype HTTPS --applyupdate True --rebootneeded True, this example shows using Dell HTTPS downloads repository which is recommended to use. This repository is updated with the latest firmware versions for all devices iDRAC supports for updates.""")
+    \n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --install --shareip downloads.dell.com --sharetype HTTPS --applyupdate True --rebootneeded True, this example shows using Dell HTTPS downloads repository which is recommended to use. This repository is updated with the latest firmware versions for all devices iDRAC supports for updates.
+    \n- InstallFromRepositoryREDFISH.py -ip 192.168.0.120 -u root -p calvin --install --serve-repository /repo/R740xd --serve-port 80 --applyupdate True --rebootneeded True, this example will serve the local repository directory from this system over HTTP and install updates from it.""")
     sys.exit(0)
 
 def check_supported_idrac_version():
@@ -108,12 +122,7 @@ def get_FW_inventory():
         pprint(i)
         print("\n")  
 
-def get_repo_based_update_list():
-    try:
-        os.remove("repo_based_update_list.xml")
-    except:
-        logging.info("- INFO, unable to locate file %s, skipping step to delete" % "repo_based_update_list.xml")
-    open_file = open("repo_based_update_list.xml","w")
+def get_package_list():
     url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSoftwareInstallationService/Actions/DellSoftwareInstallationService.GetRepoBasedUpdateList' % (idrac_ip)
     payload = {}
     if args["x"]:
@@ -129,55 +138,81 @@ def get_repo_based_update_list():
         logging.error("\n- FAIL, POST command failed to get repo update list, status code is %s" % (response.status_code))
         logging.error("\n- POST command failure results:\n %s" % data)
         sys.exit(0)
+    return data['PackageList']
+
+def write_update_records(package_list):
+    try:
+        with open_output(args["output_format"], args["output_file"]) as writer:
+            writer.write_all(update_record(update, idrac_ip) for update in parse_package_list(package_list))
+    except ExpatError as error_message:
+        logging.error("\n- FAIL, unable to parse repo update list XML, detailed error information: %s" % error_message)
+        sys.exit(0)
+    logging.info("\n- INFO, %s repository update(s) written%s" % (writer.records, " to \"%s\" file" % args["output_file"] if args["output_file"] else ""))
+
+def get_repo_based_update_list():
+    package_list = get_package_list()
+    if args["output_format"]:
+        write_update_records(package_list)
+        sys.exit(0)
+    try:
+        os.remove("repo_based_update_list.xml")
+    except:
+        logging.info("- INFO, unable to locate file %s, skipping step to delete" % "repo_based_update_list.xml")
+    open_file = open("repo_based_update_list.xml","w")
     logging.info("\n- Repo Based Update List in XML format\n")
-    logging.info(data['PackageList'])
-    open_file.writelines(data['PackageList'])
+    logging.info(package_list)
+    open_file.writelines(package_list)
     open_file.close()
     logging.info("\n- INFO, get repo based update list data is also copied to file \"repo_based_update_list.xml\"")
     sys.exit(0)
 
 def get_device_name_criticality_info():
+    package_list = get_package_list()
+    if args["output_format"]:
+        write_update_records(package_list)
+        return
     logging.info("\n- Device Name and Criticality Details for Updatable Devices -\n")
-    url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSoftwareInstallationService/Actions/DellSoftwareInstallationService.GetRepoBasedUpdateList' % (idrac_ip)
-    payload = {}
-    if args["x"]:
-        headers = {'content-type': 'application/json', 'X-Auth-Token': args["x"]}
-        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=verify_cert)
-    else:
-        headers = {'content-type': 'application/json'}
-        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=verify_cert,auth=(idrac_username,idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- FAIL, POST command failed to get repo update list, status code is %s" % (response.status_code))
-        logging.error("\n- POST command failure results:\n %s" % data)
+    try:
+        for update in parse_package_list(package_list):
+            criticality = update.properties.get("Criticality")
+            print("DeviceName = %s" % update.display_name)
+            if criticality in CRITICALITY:
+                print("Criticality = (%s)%s" % (criticality, CRITICALITY[criticality]))
+            else:
+                print("Criticality = NA")
+            print("\n")
+    except ExpatError as error_message:
+        logging.error("- FAIL, unable to parse repo update list XML, detailed error information: %s" % error_message)
+        sys.exit(0)
+
+def start_repository_server():
+    global repository_server
+    if not os.path.isdir(args["serve_repository"]):
+        logging.error("\n- FAIL, value detected for argument --serve-repository is not a directory")
         sys.exit(0)
+    repository = DupRepository()
     try:
-        get_all_devices = re.findall("Criticality.+BaseLocation",data["PackageList"])
-    except:
-        logging.error("- FAIL, regex was unable to parse the XML to get criticality data")
+        repository.add_directory(args["serve_repository"])
+    except (RepositoryError, IOError, OSError) as error_message:
+        logging.error("\n- FAIL, unable to add repository files, detailed error information: %s" % error_message)
         sys.exit(0)
-    for i in get_all_devices:
-        get_critical_value = re.search("Criticality.+?/",i).group()
-        if "1" in get_critical_value:
-            critical_string_value = "Criticality = (1)Recommended"
-        elif "2" in get_critical_value:
-            critical_string_value = "Criticality = (2)Urgent"
-        elif "3" in get_critical_value:
-            critical_string_value = "Criticality = (3)Optional"
-        else:
-            critical_string_value = "Criticality = NA"
-        try:
-            get_display_name = re.search("DisplayName.+?/VALUE",i).group()
-            get_display_name = re.sub("DisplayName\" TYPE=\"string\"><VALUE>","",get_display_name)
-            get_display_name = re.sub("</VALUE","",get_display_name)
-        except:
-            logging.error("- FAIL, regex was unable to parse the XML to get device name")
-            sys.exit(0)
-        get_display_name = "DeviceName = " + get_display_name
-        print(get_display_name)
-        print(critical_string_value)
-        print("\n")
-        
+    if not repository.catalogs and not args["catalogfile"]:
+        logging.error("\n- FAIL, no catalog file detected in directory %s" % args["serve_repository"])
+        sys.exit(0)
+    try:
+        repository_server = RepositoryServer(repository, port=args["serve_port"], certfile=args["serve_cert"], keyfile=args["serve_key"]).start()
+    except (IOError, OSError, ssl.SSLError) as error_message:
+        logging.error("\n- FAIL, unable to start repository server, detailed error information: %s" % error_message)
+        sys.exit(0)
+    share_parameters = repository_server.share_parameters(idrac_ip, args["catalogfile"])
+    args["shareip"] = share_parameters["IPAddress"]
+    args["sharetype"] = share_parameters["ShareType"]
+    args["sharename"] = share_parameters["ShareName"]
+    args["catalogfile"] = share_parameters["CatalogFile"]
+    if "IgnoreCertWarning" in share_parameters and not args["ignorecertwarning"]:
+        args["ignorecertwarning"] = share_parameters["IgnoreCertWarning"]
+    logging.info("\n- INFO, serving repository %s from this system, iDRAC will download catalog %s from %s://%s/%s" % (args["serve_repository"], args["catalogfile"], args["sharetype"].lower(), args["shareip"], args["sharename"]))
+
 def install_from_repository():
     global current_jobstore_job_ids
     global repo_job_id
@@ -279,74 +314,49 @@ def get_update_job_ids():
     new_job_ids.remove(repo_job_id)
         
 def loop_job_status(x):
-    print_message_count = 1
-    start_time = datetime.now()
-    time.sleep(1)
-    while True:
-        count = 0
-        while count != 5:
-            try:
-                if args["x"]:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, x), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-                else:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, x), verify=verify_cert, auth=(idrac_username, idrac_password))
-                break
-            except requests.ConnectionError as error_message:
-                logging.error("- FAIL, requests command failed to GET job status, detailed error information: \n%s" % error_message)
-                count += 1
-                logging.info("- INFO, Script will wait 10 seconds and try to check job status again")
-                time.sleep(10)
-                continue
-        if count == 5:
-            logging.error("- FAIL, unable to get job status after 5 attempts, script will exit")
-            sys.exit(0)
-        current_time = str((datetime.now()-start_time))[0:7]
-        if response.status_code != 200:
-            logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
-            logging.error("Extended Info Message: {0}".format(response.json()))
-            sys.exit(0)
-        data = response.json()
-        if str(current_time)[0:7] >= "2:00:00":
-            logging.error("\n- FAIL: Timeout of 2 hours has been reached, script stopped\n")
-            sys.exit(0)
-        elif "completed successfully" in data['Message'].lower() or "pending" in data['Message'].lower():
-            logging.info("\n- INFO, job ID %s successfully marked completed" % x)
-            logging.info("\n- Final detailed job results -\n")
-            for i in data.items():
-                pprint(i)
-            print("\n")
-            if data['JobType'] == "RepositoryUpdate":
-                if args["applyupdate"] == "False":
-                    logging.info("\n- INFO, \"ApplyUpdate = False\" selected, execute script with argument --get-repo-list to view the repo update list which will report devices detected for firmware updates")
-                    sys.exit(0)   
-                else:
-                    if args["rebootneeded"] == "False" or not args["rebootneeded"]:
-                        logging.info("\n- INFO, \"RebootNeeded = False\" detected or argument not passed in. Check the overall Job Queue for update jobs using --get-jobqueue argument. Next server manual reboot, any scheduled update job(s) will execute.\n")
-                        sys.exit(0)
-                    else:
-                        logging.info("\n- INFO, repository update job marked completed. Script will now check to see if any update job(s) were created due to different firmware version change detected")
-                        return
-            else:
-                break
-        elif "fail" in data['Message'].lower() or "invalid" in data['Message'].lower() or "unable" in data['Message'].lower() or "not" in data['Message'].lower() or "cancel" in data['Message'].lower():
-            logging.error("- FAIL: Job ID %s failed, detailed error message: %s" % (x, data['Message']))
-            break
-        elif data['Message'] == "Job for this device is already present.":
-            break
-        elif "Package successfully downloaded" in data['Message'] and args["rebootneeded"] == "False" or not args["rebootneeded"]:
-            logging.info("\n- INFO, repository package successfully downloaded, \"RebootNeeded = False\" detected or argument not passed in. Check the overall Job Queue for update jobs using --get-jobqueue argument. Next server manual reboot, any scheduled update job(s) will execute.\n")
-            logging.info("\n- INFO, if iDRAC update is detected, this update job will not get created and execute until all scheduled update jobs have been completed")
-            sys.exit(0)
-        elif "Package successfully downloaded" in data['Message'] and print_message_count == 1:
-            logging.info("\n- INFO, repository package successfully downloaded. If version changed detected for any device, update job ID will get created and execute for that device\n")
-            time.sleep(5)
-            print_message_count = 2
-        else:
-            logging.info("- INFO, %s, %s execution time: %s" % (data['Message'].rstrip("."), x, str(current_time)[0:7]))
-            if "idrac" in data['Name'].lower() or "idrac" in data['Message'].lower():
-                time.sleep(1)
+    def reboot_not_needed():
+        return args["rebootneeded"] == "False" or not args["rebootneeded"]
+    def job_finished(data):
+        message = data.get("Message", "")
+        if "Package successfully downloaded" in message:
+            return reboot_not_needed()
+        return "completed successfully" in message.lower() or "pending" in message.lower() or "fail" in message.lower() or "invalid" in message.lower() or "unable" in message.lower() or "not" in message.lower() or "cancel" in message.lower() or message == "Job for this device is already present."
+    def job_status_update(status):
+        message = status.message or ""
+        if "Package successfully downloaded" in message:
+            if not reboot_not_needed():
+                logging.info("\n- INFO, repository package successfully downloaded. If version changed detected for any device, update job ID will get created and execute for that device\n")
+        elif status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, %s, %s execution time: %s" % (message.rstrip("."), x, str(status.elapsed)[0:7]))
+    status = wait_for_job(idrac_ip, x, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(hours=2), until=job_finished, on_update=job_status_update)
+    message = status.message or ""
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 2 hours has been reached, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif "completed successfully" in message.lower() or "pending" in message.lower():
+        logging.info("\n- INFO, job ID %s successfully marked completed" % x)
+        logging.info("\n- Final detailed job results -\n")
+        for i in status.data.items():
+            pprint(i)
+        print("\n")
+        if status.data.get("JobType") == "RepositoryUpdate":
+            if args["applyupdate"] == "False":
+                logging.info("\n- INFO, \"ApplyUpdate = False\" selected, execute script with argument --get-repo-list to view the repo update list which will report devices detected for firmware updates")
+                sys.exit(0)
+            elif reboot_not_needed():
+                logging.info("\n- INFO, \"RebootNeeded = False\" detected or argument not passed in. Check the overall Job Queue for update jobs using --get-jobqueue argument. Next server manual reboot, any scheduled update job(s) will execute.\n")
+                sys.exit(0)
             else:
-                time.sleep(15)
+                logging.info("\n- INFO, repository update job marked completed. Script will now check to see if any update job(s) were created due to different firmware version change detected")
+    elif status.failed or "invalid" in message.lower() or "unable" in message.lower() or "not" in message.lower() or "cancel" in message.lower():
+        logging.error("- FAIL: Job ID %s failed, detailed error message: %s" % (x, message))
+    elif "Package successfully downloaded" in message:
+        logging.info("\n- INFO, repository package successfully downloaded, \"RebootNeeded = False\" detected or argument not passed in. Check the overall Job Queue for update jobs using --get-jobqueue argument. Next server manual reboot, any scheduled update job(s) will execute.\n")
+        logging.info("\n- INFO, if iDRAC update is detected, this update job will not get created and execute until all scheduled update jobs have been completed")
+        sys.exit(0)
 
 def check_schedule_update_job():
     count = 0
@@ -392,7 +402,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -414,7 +424,9 @@ if __name__ == "__main__":
         get_repo_based_update_list()
     elif args["get_critical_info"]:
         get_device_name_criticality_info()
-    elif args["install"] and args["shareip"] and args["sharetype"]:
+    elif args["install"] and ((args["shareip"] and args["sharetype"]) or args["serve_repository"]):
+        if args["serve_repository"]:
+            start_repository_server()
         install_from_repository()
         logging.info("- INFO, script will now loop checking the repo update job status")
         loop_job_status(repo_job_id)
@@ -14,7 +14,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
@@ -23,8 +22,11 @@ import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -104,78 +106,69 @@ def generate_import_buffer_string_for_SCP_import(alert_target):
         logging.error("- FAIL, unable to find job ID in headers POST response, headers output is:\n%s" % response.headers)
         sys.exit(0)
     logging.debug("\n- Job ID \"%s\" successfully created for ExportSystemConfiguration method\n" % job_id)
-    start_time = datetime.now()
-    while True:
-        current_time = (datetime.now()-start_time)
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=10))
+    if status.timed_out:
+        logging.error("\n- FAIL, Timeout of 10 minutes has been reached before marking the job completed.")
+        sys.exit(0)
+    elif status.error:
+        logging.error("- ERROR:, GET job ID details failed, %s" % status.error)
+        sys.exit(0)
+    elif status.failed:
+        logging.error("- FAIL, job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    # Exported profile is returned in the task response once the job completes
+    if args["x"]:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+    else:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
+    dict_output = response.__dict__
+    if "<SystemConfiguration Model" not in str(dict_output):
+        logging.error("- FAIL, exported profile not returned in GET task response, status code %s returned" % response.status_code)
+        sys.exit(0)
+    import_buffer_string = dict_output["_content"].decode("utf-8") 
+    if "," in args["severity"]:
+        severity_list = args["severity"].split(",")
+    elif "all" in args["severity"].lower():
+        severity_list = ["informational", "warning", "critical"]    
+    else:
+        severity_list = [args["severity"]]
+    if "all" in args["receive"].lower():
+        args["receive"] = "email, snmp, ipmi, syslog, wsevent, oslog, redfish"
+    for i in severity_list:
+        if i == "informational".lower():
+            severity_index = "3"
+        elif i == "warning".lower():
+            severity_index = "2"
+        elif i == "critical".lower():
+            severity_index = "1"
         else:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-        dict_output = response.__dict__
-        if "<SystemConfiguration Model" in str(dict_output):
-            import_buffer_string = dict_output["_content"].decode("utf-8") 
-            if "," in args["severity"]:
-                severity_list = args["severity"].split(",")
-            elif "all" in args["severity"].lower():
-                severity_list = ["informational", "warning", "critical"]    
-            else:
-                severity_list = [args["severity"]]
-            if "all" in args["receive"].lower():
-                args["receive"] = "email, snmp, ipmi, syslog, wsevent, oslog, redfish"
-            for i in severity_list:
-                if i == "informational".lower():
-                    severity_index = "3"
-                elif i == "warning".lower():
-                    severity_index = "2"
-                elif i == "critical".lower():
-                    severity_index = "1"
-                else:
-                    logging.error("\n- WARNING, invalid value passed in for argument --severity")
-                    sys.exit(0)
-                if args["setting"].lower() == "enabled":
-                    old_setting_value = "Disabled"
-                    new_setting_value = "Enabled"
-                elif args["setting"].lower() == "disabled":
-                    old_setting_value = "Enabled"
-                    new_setting_value = "Disabled"
-                else:
-                    logging.warning("- WARNING, invalid value passed in for argument --setting")
-                    sys.exit(0)
-                if "email" in args["receive"].lower():
-                    import_buffer_string = import_buffer_string.replace("%s#Alert#Email\">%s" % (severity_index, old_setting_value),"%s#Alert#Email\">%s" % (severity_index, new_setting_value))
-                if "snmp" in args["receive"].lower():
-                    import_buffer_string = import_buffer_string.replace("%s#Alert#SNMP\">%s" % (severity_index, old_setting_value),"%s#Alert#SNMP\">%s" % (severity_index, new_setting_value))
-                if "ipmi" in args["receive"].lower():
-                    import_buffer_string = import_buffer_string.replace("%s#Alert#IPMI\">%s" % (severity_index, old_setting_value),"%s#Alert#IPMI\">%s" % (severity_index, new_setting_value))
-                if "syslog" in args["receive"].lower():
-                    import_buffer_string = import_buffer_string.replace("%s#Alert#SysLog\">%s" % (severity_index, old_setting_value),"%s#Alert#SysLog\">%s" % (severity_index, new_setting_value))
-                if "wsevent" in args["receive"].lower():
-                    import_buffer_string = import_buffer_string.replace("%s#Alert#WSEventing\">%s" % (severity_index, old_setting_value),"%s#Alert#WSEventing\">%s" % (severity_index, new_setting_value))
-                if "oslog" in args["receive"].lower():
-                    import_buffer_string = import_buffer_string.replace("%s#Alert#OSLog\">%s" % (severity_index, old_setting_value),"%s#Alert#OSLog\">%s" % (severity_index, new_setting_value))
-                if "redfish" in args["receive"].lower():
-                    import_buffer_string = import_buffer_string.replace("%s#Alert#RedfishEventing\">%s" % (severity_index, old_setting_value),"%s#Alert#RedfishEventing\">%s" % (severity_index, new_setting_value))
-            delete_jobID(job_id)
-            time.sleep(5)
-            break
-        data = response.json()
-        try:
-            message_string = data["Messages"]
-        except:
-            logging.error("- FAIL, unable to locate message string in JSON output")
+            logging.error("\n- WARNING, invalid value passed in for argument --severity")
             sys.exit(0)
-        current_time = (datetime.now()-start_time)
-        if response.status_code == 202 or response.status_code == 200:
-            time.sleep(1)
+        if args["setting"].lower() == "enabled":
+            old_setting_value = "Disabled"
+            new_setting_value = "Enabled"
+        elif args["setting"].lower() == "disabled":
+            old_setting_value = "Enabled"
+            new_setting_value = "Disabled"
         else:
-            logging.error("- ERROR:, GET job ID details failed, error code: %s" % response.status_code)
-            logging.error(data)
-            sys.exit(0)
-        if str(current_time)[0:7] >= "0:10:00":
-            logging.error("\n- FAIL, Timeout of 10 minutes has been reached before marking the job completed.")
+            logging.warning("- WARNING, invalid value passed in for argument --setting")
             sys.exit(0)
-        else:
-            continue
+        if "email" in args["receive"].lower():
+            import_buffer_string = import_buffer_string.replace("%s#Alert#Email\">%s" % (severity_index, old_setting_value),"%s#Alert#Email\">%s" % (severity_index, new_setting_value))
+        if "snmp" in args["receive"].lower():
+            import_buffer_string = import_buffer_string.replace("%s#Alert#SNMP\">%s" % (severity_index, old_setting_value),"%s#Alert#SNMP\">%s" % (severity_index, new_setting_value))
+        if "ipmi" in args["receive"].lower():
+            import_buffer_string = import_buffer_string.replace("%s#Alert#IPMI\">%s" % (severity_index, old_setting_value),"%s#Alert#IPMI\">%s" % (severity_index, new_setting_value))
+        if "syslog" in args["receive"].lower():
+            import_buffer_string = import_buffer_string.replace("%s#Alert#SysLog\">%s" % (severity_index, old_setting_value),"%s#Alert#SysLog\">%s" % (severity_index, new_setting_value))
+        if "wsevent" in args["receive"].lower():
+            import_buffer_string = import_buffer_string.replace("%s#Alert#WSEventing\">%s" % (severity_index, old_setting_value),"%s#Alert#WSEventing\">%s" % (severity_index, new_setting_value))
+        if "oslog" in args["receive"].lower():
+            import_buffer_string = import_buffer_string.replace("%s#Alert#OSLog\">%s" % (severity_index, old_setting_value),"%s#Alert#OSLog\">%s" % (severity_index, new_setting_value))
+        if "redfish" in args["receive"].lower():
+            import_buffer_string = import_buffer_string.replace("%s#Alert#RedfishEventing\">%s" % (severity_index, old_setting_value),"%s#Alert#RedfishEventing\">%s" % (severity_index, new_setting_value))
+    delete_jobID(job_id)
+    time.sleep(5)
 
 def delete_jobID(job_id_string):
     url = "https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellJobService/Actions/DellJobService.DeleteJobQueue" % idrac_ip
@@ -214,64 +207,19 @@ def scp_import_local():
         logging.error("- FAIL, unable to find job ID in headers POST response, headers output is:\n%s" % response.headers)
         sys.exit(0)
     logging.debug("\n- PASS, %s successfully created for ImportSystemConfiguration method\n" % (job_id))
-    start_job_message = ""
-    start_time = datetime.now()
-    count = 1
-    get_job_status_count = 1
-    new_password_set = "no"
-    while True:
-        if count == 10:
-            logging.error("- FAIL, 10 attempts at getting job status failed, script will exit")
-            sys.exit(0)
-        if get_job_status_count == 10:
-            logging.warning("- WARNING, retry count of 10 has been hit for retry job status GET request, script will exit")
-            sys.exit(0)
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, args["p"]))
-        except requests.ConnectionError as error_message:
-            logging.warning("- WARNING, requests command failed to GET job status, detailed error information: \n%s" % error_message)
-            logging.info("- INFO, script will attempt to get job status again")
-            time.sleep(10)
-            count += 1
-            continue
-        data = response.json()
-        try:
-            current_job_message = data['Oem']['Dell']['Message']
-        except:
-            logging.info("- INFO, unable to get job ID message string from JSON output, retry")
-            count += 1
-            continue
-        current_time = (datetime.now()-start_time)
-        if response.status_code == 202 or response.status_code == 200:
-            time.sleep(1)
-        else:
-            logging.info("- INFO, GET command failed to get job ID details, error code: %s, retry" % response.status_code)
-            count += 1
-            time.sleep(5)
-            continue
-        if "Oem" not in data:
-            logging.info("- INFO, unable to locate OEM data in JSON response, retry")
-            get_job_status_count += 1
-            time.sleep(5)
-            continue
-        if data['Oem']['Dell']['JobState'] == "Failed":
-            logging.error("\n- FAIL, quick alert configuration failed to apply, check iDRAC LC logs for more details")
-            delete_jobID(job_id)
-            break
-        elif data['Oem']['Dell']['JobState'] == "Completed" or data['Oem']['Dell']['JobState'] == "CompletedWithErrors":
-            if "success" in data['Oem']['Dell']['Message'].lower():
-                logging.info("\n- PASS, quick alert settings successfully applied")
-                delete_jobID(job_id)
-            elif "no changes" in data['Oem']['Dell']['Message'].lower():
-                logging.info("\n- INFO, no quick alert changes applied, either current configuration matched or severity/receive not supported for the category.")
-                delete_jobID(job_id)
-            break
-        else:
-            if start_job_message != current_job_message:
-                continue
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert)
+    if status.timed_out or status.error:
+        logging.error("- FAIL, unable to get final job status for job ID %s, %s" % (job_id, status.error or "timeout of 2 hours has been hit"))
+        sys.exit(0)
+    if status.job_state == "Failed":
+        logging.error("\n- FAIL, quick alert configuration failed to apply, check iDRAC LC logs for more details")
+        delete_jobID(job_id)
+    elif "success" in (status.message or "").lower():
+        logging.info("\n- PASS, quick alert settings successfully applied")
+        delete_jobID(job_id)
+    elif "no changes" in (status.message or "").lower():
+        logging.info("\n- INFO, no quick alert changes applied, either current configuration matched or severity/receive not supported for the category.")
+        delete_jobID(job_id)
 
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -282,7 +230,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
             args["p"] = idrac_password
         if args["ssl"]:
             if args["ssl"].lower() == "true":
@@ -293,6 +241,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     if args["category"] and args["severity"] and args["receive"] and args["setting"]:
         enable_global_alert_setting()
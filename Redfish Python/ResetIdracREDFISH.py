@@ -18,17 +18,17 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
-import platform
 import re
 import requests
-import subprocess
 import sys
 import time
 import warnings
 
+from IdracRedfishSupport.probe import wait_for_idrac
+from IdracRedfishSupport.fleet import read_idrac_password
+
 warnings.filterwarnings("ignore")
 
 parser = argparse.ArgumentParser(description='Python script using Redfish API to reset(reboot) iDRAC')
@@ -77,47 +77,35 @@ def reset_idrac():
     logging.info("- INFO, iDRAC will now reset and be back online within a few minutes.")
 
 def check_idrac_connection():
-    logging.info("- INFO, argument --check detected, script will start ping requests in 1 minute")
+    logging.info("- INFO, argument --check detected, script will start checking iDRAC connection in 1 minute")
     time.sleep(60)
-    if platform.system().lower() == "windows":
-        ping_command = "ping -n 3 %s" % idrac_ip
-    elif platform.system().lower() == "linux":
-        ping_command = "ping -c 3 %s" % idrac_ip
-    else:
-        logging.error("- FAIL, unable to determine OS type, check iDRAC connection function will not execute")
-        sys.exit(0)
     while True:
-        execute_command = subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-        if execute_command != 0:
-            logging.info("- INFO, unable to ping iDRAC IP, script will wait 30 seconds and try again")
-            time.sleep(30)
-            continue
+        wait_for_idrac(idrac_ip, verify_cert)
+        logging.info("- PASS, iDRAC IP is reachable, script will now check to validate iDRAC is fully up and ready")
+        time.sleep(15)
+        url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.GetRemoteServicesAPIStatus' % (idrac_ip)
+        method = "GetRemoteServicesAPIStatus"
+        payload = {}
+        if args["x"]:
+            headers = {'content-type': 'application/json', 'X-Auth-Token': args["x"]}
+            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=verify_cert)
         else:
-            logging.info("- PASS, ping command successful to iDRAC IP, script will now check to validate iDRAC is fully up and ready")
-            time.sleep(15)
-            url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.GetRemoteServicesAPIStatus' % (idrac_ip)
-            method = "GetRemoteServicesAPIStatus"
-            payload = {}
-            if args["x"]:
-                headers = {'content-type': 'application/json', 'X-Auth-Token': args["x"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=verify_cert)
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=verify_cert,auth=(idrac_username,idrac_password))
-            data=response.json()
-            if response.status_code == 200:
-                logging.debug("\n- PASS: POST command passed for %s method, status code 200 returned\n" % method)
-            else:
-                logging.error("\n- FAIL, POST command failed for %s method, status code %s returned" % (method, response.status_code))
-                data = response.json()
-                logging.error("\n- POST command failure results:\n %s" % data)
-                sys.exit(0)
-            if data["Status"] == "Ready":
-                logging.info("- PASS, iDRAC is fully up and in ready state")
-                return
-            else:
-                logging.info("- INFO, iDRAC not fully up and ready, script will wait 30 seconds and try again")
-                time.sleep(30)
+            headers = {'content-type': 'application/json'}
+            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=verify_cert,auth=(idrac_username,idrac_password))
+        data=response.json()
+        if response.status_code == 200:
+            logging.debug("\n- PASS: POST command passed for %s method, status code 200 returned\n" % method)
+        else:
+            logging.error("\n- FAIL, POST command failed for %s method, status code %s returned" % (method, response.status_code))
+            data = response.json()
+            logging.error("\n- POST command failure results:\n %s" % data)
+            sys.exit(0)
+        if data["Status"] == "Ready":
+            logging.info("- PASS, iDRAC is fully up and in ready state")
+            return
+        else:
+            logging.info("- INFO, iDRAC not fully up and ready, script will wait 30 seconds and try again")
+            time.sleep(30)
 
            
     
@@ -130,7 +118,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
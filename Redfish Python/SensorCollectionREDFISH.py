@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
@@ -27,6 +26,10 @@ import warnings
 
 from datetime import datetime
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.paging import CollectionError, RedfishCollection
+from IdracRedfishSupport.output import add_output_arguments, open_output
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -41,12 +44,15 @@ parser.add_argument('--get-numeric', help='Get all Dell Numeric Sensor Collectio
 parser.add_argument('--get-power', help='Get all Dell PS(power supply) Numeric Sensor Collection data', action="store_true", required=False)
 parser.add_argument('--get-status', help='Get all Dell Presence And Status Sensor Collection data', action="store_true", required=False)
 parser.add_argument('--get-sensor', help='Get all Dell Sensor Collection data', action="store_true", required=False)
+add_output_arguments(parser)
 args = vars(parser.parse_args())
-logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
+# Records written to stdout with --output-format, script messages are then logged to stderr. force replaces the stdout handler IdracRedfishSupport configures on import
+logging.basicConfig(format='%(message)s', stream=sys.stderr if args["output_format"] and not args["output_file"] else sys.stdout, level=logging.INFO, force=True)
 
 def script_examples():
     print("""\n- SensorCollectionREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-numeric, this example will return Dell numeric sensor data information.
-    \n- SensorCollectionREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-sensor, this example will return Dell sensor data information.""")
+    \n- SensorCollectionREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-sensor, this example will return Dell sensor data information.
+    \n- SensorCollectionREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-numeric --output-format csv --output-file numeric_sensors.csv, this example will write Dell numeric sensor data to CSV file numeric_sensors.csv, one row per sensor.""")
     sys.exit(0)
 
 def check_supported_idrac_version():
@@ -67,11 +73,6 @@ def check_supported_idrac_version():
         logging.debug("- INFO, file not detected, skipping step to delete")
 
 def get_sensor_data():
-    open_file = open("sensor_collection.txt","a")
-    get_time = datetime.now()
-    current_date_time = "- Data collection timestamp: %s-%s-%s  %s:%s:%s\n" % (get_time.month, get_time.day, get_time.year, get_time.hour, get_time.minute, get_time.second)
-    open_file.writelines(current_date_time)
-    open_file.writelines("\n\n")
     if args["get_numeric"]:
         sensor_key = "DellNumericSensorCollection"
     elif args["get_power"]:
@@ -83,52 +84,56 @@ def get_sensor_data():
     else:
         logging.error("- FAIL, you must pass in at least one parameter to get sensor collection data")
         sys.exit(0)
+    # Entries are written as they are received, following pages are fetched in the background using Members@odata.nextLink
     if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/%s' % (idrac_ip, sensor_key), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+        collection = RedfishCollection(idrac_ip, "redfish/v1/Dell/Systems/System.Embedded.1/%s" % sensor_key, x_auth_token=args["x"], verify_cert=verify_cert)
     else:
-        response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/%s' % (idrac_ip, sensor_key), verify=verify_cert, auth=(idrac_username, idrac_password))
-    data = response.json()
-    if response.status_code != 200:
-        logging.error("\n- FAIL, GET command failed, status code %s returned" % response.status_code)
-        logging.error(data)
-        sys.exit(0)
-    logging.info("\n- Data collection data for \"%s\"\n" % sensor_key) 
-    if data['Members'] == []:
-        logging.warning("- WARNING, no data available for URI \"redfish/v1/Dell/Systems/System.Embedded.1/%s\"" % sensor_key)
-        sys.exit(0)
-    for i in data['Members']:
-        for ii in i.items():
-            sensor_entry = ("%s: %s" % (ii[0],ii[1]))
-            print(sensor_entry)
-            open_file.writelines("%s\n" % sensor_entry)
-        print("\n")
-        open_file.writelines("\n")
-    if 'Members@odata.nextLink' in data:
-        number_list = [i for i in range (1,100001) if i % 50 == 0]
-        for seq in number_list:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (idrac_ip, seq), verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-            else:
-                response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (idrac_ip, seq), verify=verify_cert,auth=(idrac_username, idrac_password))
-            data = response.json()
-            if response.status_code != 200:
-                if "query parameter $skip is out of range" in data["error"]["@Message.ExtendedInfo"][0]["Message"]:
-                    open_file.close()
-                    logging.info("\n- INFO, iDRAC Server Slot Information also captured in \"%s_server_slot_info.txt\" file" % idrac_ip)
-                    sys.exit(0)
-                else:
-                    logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (response.status_code,data))    
+        collection = RedfishCollection(idrac_ip, "redfish/v1/Dell/Systems/System.Embedded.1/%s" % sensor_key, username=idrac_username, password=idrac_password, verify_cert=verify_cert)
+    if args["output_format"]:
+        get_sensor_data_output(collection, sensor_key)
+        return
+    open_file = open("sensor_collection.txt","a")
+    get_time = datetime.now()
+    current_date_time = "- Data collection timestamp: %s-%s-%s  %s:%s:%s\n" % (get_time.month, get_time.day, get_time.year, get_time.hour, get_time.minute, get_time.second)
+    open_file.writelines(current_date_time)
+    open_file.writelines("\n\n")
+    try:
+        for data in collection.pages():
+            if collection.pages_fetched == 1:
+                logging.info("\n- Data collection data for \"%s\"\n" % sensor_key)
+                if data['Members'] == []:
+                    logging.warning("- WARNING, no data available for URI \"redfish/v1/Dell/Systems/System.Embedded.1/%s\"" % sensor_key)
                     sys.exit(0)
-            if "Members" not in data or data["Members"] == [] or response.status_code == 400:
-                break
             for i in data['Members']:
-                pprint(i), print("\n")
                 for ii in i.items():
-                    server_slot_entry = ("%s: %s" % (ii[0],ii[1]))
-                    open_file.writelines("%s\n" % server_slot_entry)
+                    sensor_entry = ("%s: %s" % (ii[0],ii[1]))
+                    print(sensor_entry)
+                    open_file.writelines("%s\n" % sensor_entry)
+                print("\n")
                 open_file.writelines("\n")
+    except CollectionError as error:
+        if collection.pages_fetched == 0:
+            logging.error("\n- FAIL, GET command failed, status code %s returned" % error.status_code)
+            logging.error(error.data)
+        else:
+            logging.error("\n- FAIL, GET request failed using skip query parameter, status code %s returned. Detailed error results: \n%s" % (error.status_code, error.data))
+        sys.exit(0)
     logging.info("\n- INFO, \"%s\" data also captured in \"sensor_collection.txt\" file" % sensor_key)
     open_file.close()
+
+def get_sensor_data_output(collection, sensor_key):
+    # Sensors are written as structured records as they are received
+    try:
+        with open_output(args["output_format"], args["output_file"]) as writer:
+            writer.write_all(collection)
+    except CollectionError as error:
+        logging.error("\n- FAIL, GET command failed, status code %s returned" % error.status_code)
+        logging.error(error.data)
+        sys.exit(0)
+    if writer.records == 0:
+        logging.warning("- WARNING, no data available for URI \"redfish/v1/Dell/Systems/System.Embedded.1/%s\"" % sensor_key)
+    elif args["output_file"]:
+        logging.info("\n- INFO, %s \"%s\" records written to \"%s\" file" % (writer.records, sensor_key, args["output_file"]))
         
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -139,7 +144,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -149,6 +154,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
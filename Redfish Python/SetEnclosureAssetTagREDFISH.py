@@ -16,7 +16,8 @@
 
 import requests, json, sys, re, time, warnings, argparse
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -160,55 +161,43 @@ def create_staged_config_job():
 start_time=datetime.now()
 
 def loop_job_status():
-    start_time = datetime.now()
-    while True:
-        req = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), auth=(idrac_username, idrac_password), verify=False)
-        current_time=(datetime.now()-start_time)
-        statusCode = req.status_code
-        if statusCode == 200:
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            print("- WARNING, JobStatus not completed, current status is: \"%s\", percent completion is: \"%s\"" % (status.message, status.percent_complete))
+            print("\n- WARNING, current job execution time is: %s" % str(status.elapsed)[0:7])
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password, timeout=timedelta(minutes=30), until=lambda data: "fail" in data.get("Message", "").lower() or data.get("Message") == "Job completed successfully.", on_update=job_status_update)
+    if status.timed_out:
+        print("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
+        sys.exit()
+    elif status.error:
+        print("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit()
+    elif status.failed:
+        print("- FAIL: %s failed" % job_id)
+        sys.exit()
+    print("\n--- PASS, Final Detailed Job Status Results ---\n")
+    for i in status.data.items():
+        if "odata" in i[0] or "MessageArgs" in i[0] or "TargetSettingsURI" in i[0]:
             pass
         else:
-            print("\n- FAIL, Command failed to check job status, return code is %s" % statusCode)
-            print("Extended Info Message: {0}".format(req.json()))
-            sys.exit()
-        data = req.json()
-        if str(current_time)[0:7] >= "0:30:00":
-            print("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
-            sys.exit()
-        elif "Fail" in data[u'Message'] or "fail" in data[u'Message']:
-            print("- FAIL: %s failed" % job_id)
-            sys.exit()
-        elif data[u'Message'] == "Job completed successfully.":
-            print("\n--- PASS, Final Detailed Job Status Results ---\n")
-            for i in data.items():
-                if "odata" in i[0] or "MessageArgs" in i[0] or "TargetSettingsURI" in i[0]:
-                    pass
-                else:
-                    print("%s: %s" % (i[0],i[1]))
-            print("- WARNING, job creation to completion time is: %s" % str(datetime.now()-start_time)[0:7])
-            break
-        else:
-            print("- WARNING, JobStatus not completed, current status is: \"%s\", percent completion is: \"%s\"" % (data[u'Message'],data[u'PercentComplete']))
-            print("\n- WARNING, current job execution time is: %s" % str(datetime.now()-start_time)[0:7])
-            time.sleep(1)
+            print("%s: %s" % (i[0],i[1]))
+    print("- WARNING, job creation to completion time is: %s" % str(status.elapsed)[0:7])
 
 def get_job_status():
-    while True:
-        req = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), auth=(idrac_username, idrac_password), verify=False)
-        statusCode = req.status_code
-        if statusCode == 200:
-            #print("- PASS, Command passed to check job status, code 200 returned")
-            time.sleep(5)
-        else:
-            print("\n- FAIL, Command failed to check job status, return code is %s" % statusCode)
-            print("Extended Info Message: {0}".format(req.json()))
-            sys.exit()
-        data = req.json()
-        if data[u'Message'] == "Task successfully scheduled.":
-            print("\n- WARNING, staged config job marked as scheduled, rebooting the system\n")
-            break
-        else:
-            print("- WARNING: JobStatus not scheduled, current status is: %s" % data[u'Message'])
+    def job_status_update(status):
+        if status.message != "Task successfully scheduled.":
+            print("- WARNING: JobStatus not scheduled, current status is: %s" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password, timeout=timedelta(minutes=10), until=lambda data: data.get("Message") == "Task successfully scheduled.", on_update=job_status_update)
+    if status.error:
+        print("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit()
+    elif status.timed_out:
+        print("- FAIL, job ID %s not marked as scheduled within 10 minutes, current status: %s" % (job_id, status.message))
+        sys.exit()
+    elif status.failed:
+        print("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit()
+    print("\n- WARNING, staged config job marked as scheduled, rebooting the system\n")
 
                                                                           
 def reboot_server():
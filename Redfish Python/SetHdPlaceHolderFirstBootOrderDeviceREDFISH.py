@@ -14,7 +14,7 @@
 #
 # Pseudo code workflow
 #
-# 1. Confirm IP address can be pinged.
+# 1. Confirm iDRAC IP address is reachable.
 # 2. Check remote API status, confirm LC status report ready.
 # 3. Get BIOS attribute HD placeholder current value.
 # 4. If HD placeholder attribute is set to Disabled, BIOS config job will get created to enable this attribute.
@@ -54,13 +54,14 @@ import platform
 import random
 import re
 import requests
-import subprocess
 import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.probe import probe_idrac
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -109,7 +110,7 @@ def get_remote_services(idrac_ip):
     global get_remote_service_failure
     get_remote_service_failure = "no"
     start_time = datetime.now()
-    current_time = str(datetime.now()-start_time)[0:7]
+    current_time = datetime.now()-start_time
     while True:
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.GetRemoteServicesAPIStatus' % idrac_ip
         headers = {'content-type': 'application/json'}
@@ -120,7 +121,7 @@ def get_remote_services(idrac_ip):
             logger.error("POST command failed for GetRemoteServicesAPIStatus method, status code %s returned" % response.status_code)
             get_remote_service_failure = "yes"
             return
-        elif current_time >= "0:30:00":
+        elif current_time >= timedelta(minutes=30):
             logger.error("FAIL, Max timeout of 30 minutes reached to poll checking LT ready status, no configuration operations executed. Make sure server is ON and outpof POST in idle state.")
             get_remote_service_failure = "yes"
             return   
@@ -175,73 +176,49 @@ def set_pending_value_create_job(idrac_ip, attribute_name, attribute_value):
 
 def get_job_status_scheduled(idrac_ip):
     # Function to check BIOS config job status until marked scheduled
-    count = 0
-    while True:
-        if count == 5:
-            logging.error("FAIL, GET job status retry count of 5 has been reached, script will exit")
-            return
-        try:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=False,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logger.error(error_message)
-            logger.info("GET request will try again to poll job status")
-            time.sleep(5)
-            count += 1
-            continue
-        if response.status_code == 200:
-            time.sleep(5)
-        else:
-            logger.error("FAIL, Command failed to check job status, return code %s" % response.status_code)
-            logger.error("Extended Info Message: {0}".format(response.json()))
-            return
-        data = response.json()
-        if data['Message'] == "Task successfully scheduled.":
-            logger.info("Staged config job marked as scheduled")
-            break
-        else:
-            logger.info("Job status not scheduled, current status: %s" % data['Message'])
+    def job_status_update(status):
+        if status.message != "Task successfully scheduled.":
+            logger.info("Job status not scheduled, current status: %s" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password, timeout=timedelta(minutes=10), until=lambda data: data.get("Message") == "Task successfully scheduled.", on_update=job_status_update)
+    if status.error:
+        logger.error("FAIL, Command failed to check job status, %s" % status.error)
+        return
+    elif status.timed_out:
+        logger.error("FAIL, job ID %s not marked as scheduled within 10 minutes, current status: %s" % (job_id, status.message))
+        return
+    elif status.failed:
+        logger.error("FAIL, job ID %s failed, failed message: %s" % (job_id, status.message))
+        return
+    logger.info("Staged config job marked as scheduled")
 
 
 
 def loop_job_status(idrac_ip):
     # Function to loop job status until marked completed
-    start_time = datetime.now()
-    while True:
-        try:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=False,auth=(idrac_username, idrac_password))
-        except requests.ConnectionError as error_message:
-            logger.error(error_message)
-            logger.info("GET request will try again to poll job status")
-            time.sleep(10)
-            continue
-        current_time = (datetime.now()-start_time)
-        if response.status_code != 200:
-            logger.error("GET command failed to check job status, return code %s" % response.status_code)
-            return
-        data = response.json()
-        if str(current_time)[0:7] >= "2:00:00":
-            logger.error("Timeout of 2 hours has been hit, script stopped\n")
-            return
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed":
-            logger.error("Job ID %s failed, failed message: %s" % (job_id, data['Message']))
-            return
-        elif data['JobState'] == "Completed":
-            logger.info("Job %s successfully marked completed" % job_id)
-            time.sleep(60)
-            # Delete job ID
-            url = "https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellJobService/Actions/DellJobService.DeleteJobQueue" % idrac_ip
-            payload = {"JobID":job_id}
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False,auth=(idrac_username,idrac_password))
-            if response.status_code == 200:
-                logger.debug("PASS, successfully deleted job ID %s" % job_id)
-                break
-            else:
-                logger.error("Unable to delete job ID %s, status code %s returned" % (job_id, response.status_code))
-                break
-        else:
-            logger.info("Job status not completed, current status: \"%s\"" % data['Message'].strip("."))
-            time.sleep(10)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logger.info("Job status not completed, current status: \"%s\"" % (status.message or "").strip("."))
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password, timeout=timedelta(hours=2), until=lambda data: "fail" in data.get("Message", "").lower(), on_update=job_status_update)
+    if status.timed_out:
+        logger.error("Timeout of 2 hours has been hit, script stopped\n")
+        return
+    elif status.error:
+        logger.error("GET command failed to check job status, %s" % status.error)
+        return
+    elif status.failed:
+        logger.error("Job ID %s failed, failed message: %s" % (job_id, status.message))
+        return
+    logger.info("Job %s successfully marked completed" % job_id)
+    time.sleep(60)
+    # Delete job ID
+    url = "https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellJobService/Actions/DellJobService.DeleteJobQueue" % idrac_ip
+    payload = {"JobID":job_id}
+    headers = {'content-type': 'application/json'}
+    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False,auth=(idrac_username,idrac_password))
+    if response.status_code == 200:
+        logger.debug("PASS, successfully deleted job ID %s" % job_id)
+    else:
+        logger.error("Unable to delete job ID %s, status code %s returned" % (job_id, response.status_code))
 
 def reboot_server(idrac_ip):
     # Function to reboot the server for executing BIOS config job
@@ -265,11 +242,11 @@ def reboot_server(idrac_ip):
         while True:
             response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % idrac_ip, verify=False,auth=(idrac_username, idrac_password))
             data = response.json()
-            current_time = str(datetime.now() - start_time)[0:7]
+            current_time = datetime.now() - start_time
             if data['PowerState'] == "Off":
                 logger.info("GET command passed to verify graceful shutdown was successful and server is in OFF state")
                 break
-            elif current_time == "0:03:00":
+            elif current_time >= timedelta(minutes=3):
                 logger.info("Unable to perform graceful shutdown, server will now perform forced shutdown")
                 payload = {'ResetType': 'ForceOff'}
                 headers = {'content-type': 'application/json'}
@@ -312,19 +289,11 @@ def reboot_server(idrac_ip):
         return
         
 def ping_confirm_valid_ip(idrac_ip):
-    # Check ping connection, valid IP address on the network
+    # Check iDRAC connection using HTTPS probe (works when ICMP is blocked), valid IP address on the network
     global ping_success 
     ping_success = "yes"
-    if platform.system().lower() == "windows":
-        ping_command = "ping -n 3 %s" % idrac_ip
-    elif platform.system().lower() == "linux":
-        ping_command = "ping -c 3 %s" % idrac_ip
-    else:
-        logger.error("Unable to determine OS type, check iDRAC connection function will not execute")
-        ping_success = "no"
-    execute_command = subprocess.call(ping_command, stdout=subprocess.PIPE, shell=True)
-    if execute_command != 0:
-        logger.error("Ping request failed for IP %s, script will skip using this IP" % idrac_ip)
+    if not probe_idrac(idrac_ip, verify_cert=False):
+        logger.error("Connection check failed for IP %s, script will skip using this IP" % idrac_ip)
         ping_success = "no"
 
 def get_current_boot_order(idrac_ip):
@@ -18,7 +18,6 @@
 
 import argparse
 import json
-import getpass
 import logging
 import os
 import platform
@@ -29,6 +28,10 @@ import time
 import warnings
 
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.events import DEFAULT_PORT, EventReceiver
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -47,6 +50,11 @@ parser.add_argument('--destination-uri', help='Pass in destination HTTPS URI pat
 parser.add_argument('--format-type', help='Pass in Event Format Type for creating a subscription. Supported values: Event, MetricReport or None', required=False, dest='format_type')
 parser.add_argument('--event-type', help='The EventType value for either create subscription or send test event. Supported values: StatusChange, ResourceUpdated, ResourceAdded, ResourceRemoved, Alert or MetricReport.', required=False, dest='event_type')
 parser.add_argument('--message-id', help='Pass in MessageID for sending test event. Example: TMP0118', required=False, dest='message_id')
+parser.add_argument('--receive-events', help='Start local HTTPS event listener, create a subscription on the iDRAC pointing to the listener and print every event received. Press Ctrl+C to stop, the subscription is deleted when the listener stops. If iDRAC attribute IPMILan.1.AlertEnable is Disabled it is enabled while listening for Alert events and set back to Disabled when the listener stops. Arguments --cert-file and --key-file are required.', required=False, dest='receive_events', action="store_true")
+parser.add_argument('--cert-file', help='Pass in certificate file (PEM format) used by the local HTTPS event listener', required=False, dest='cert_file')
+parser.add_argument('--key-file', help='Pass in private key file (PEM format) for the certificate used by the local HTTPS event listener. Not needed if the key is included in --cert-file', required=False, dest='key_file')
+parser.add_argument('--listen-port', help='Pass in port number for the local HTTPS event listener, default is %s' % DEFAULT_PORT, required=False, dest='listen_port', type=int, default=DEFAULT_PORT)
+parser.add_argument('--listener-host', help='Pass in IP or hostname iDRAC uses to reach the local event listener. By default the local IP address used to reach the iDRAC is used', required=False, dest='listener_host')
 parser.add_argument('--delete', help='Pass in complete service subscription URI to delete. Execute --get-subscriptions argument if needed to get subscription URIs', required=False)
 
 args = vars(parser.parse_args())
@@ -56,7 +64,8 @@ def script_examples():
     print("""\n- SubscriptionManagementREDFISH.py -ip 192.168.0.120 -u root -p calvin --get-subscriptions, this example will get current subscription URIs and details.
     \n- SubscriptionManagementREDFISH.py -ip 192.168.0.120 -u root -p calvin --create-subscription --destination-uri https://192.168.0.130 --event-type Alert --format-type MetricReport, this example will create a MetricReport subscription for alert events which will use 192.168.0.130 Redfish event listener.
     \n- SubscriptionManagementREDFISH.py -ip 192.168.0.120 -u root --delete /redfish/v1/EventService/Subscriptions/c1a71140-ba1d-11e9-842f-d094662a05e6, this example will first prompt to enter iDRAC user password, then delete a subscription.
-    \n- SubscriptionManagementREDFISH.py -ip 192.168.0.120 -u root -p calvin --test-event --destination-uri https://192.168.0.130 --event-type Alert --message-id CPU0001, this example shows submitting test event to subscription destination.""")
+    \n- SubscriptionManagementREDFISH.py -ip 192.168.0.120 -u root -p calvin --test-event --destination-uri https://192.168.0.130 --event-type Alert --message-id CPU0001, this example shows submitting test event to subscription destination.
+    \n- SubscriptionManagementREDFISH.py -ip 192.168.0.120 -u root -p calvin --receive-events --cert-file listener_cert.pem --key-file listener_key.pem, this example will start a local HTTPS event listener on port %s, create an Alert subscription on the iDRAC pointing to the listener and print events as they are received until Ctrl+C is pressed.""" % DEFAULT_PORT)
     sys.exit(0)
 
 def check_supported_idrac_version():
@@ -132,44 +141,46 @@ def scp_set_idrac_attribute():
         sys.exit(0)
     else:
         logging.info("- %s successfully created for ImportSystemConfiguration method\n" % (job_id))
-    while True:
-        if args["x"]:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-        else:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
-        data = response.json()
-        message_string = data["Messages"]
-        final_message_string = str(message_string)
-        if response.status_code == 202 or response.status_code == 200:
-            time.sleep(1)
-        else:
-            print("- FAIL, GET job ID details failed, error code %s returned" % response.status_code)
-            sys.exit(0)
-        if "failed" in final_message_string or "completed with errors" in final_message_string or "Not one" in final_message_string:
-            logging.error("\n- FAIL, detailed job message: %s" % data["Messages"])
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job not marked completed, current status: %s" % status.job_state)
+            logging.info("- Message: %s\n" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, until=lambda data: "Not one" in data.get("Message", ""), on_update=job_status_update)
+    if status.timed_out or status.error:
+        logging.error("- FAIL, unable to get final job status for job ID %s, %s" % (job_id, status.error or "timeout of 2 hours has been hit"))
+        sys.exit(0)
+    # Detailed import results are only reported in the task Messages, get them once the job is done
+    if args["x"]:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+    else:
+        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (idrac_ip, job_id), verify=verify_cert, auth=(idrac_username, idrac_password))
+    if response.status_code != 200 and response.status_code != 202:
+        print("- FAIL, GET job ID details failed, error code %s returned" % response.status_code)
+        sys.exit(0)
+    data = response.json()
+    message_string = data["Messages"]
+    final_message_string = str(message_string)
+    if "failed" in final_message_string or "completed with errors" in final_message_string or "Not one" in final_message_string:
+        logging.error("\n- FAIL, detailed job message: %s" % data["Messages"])
+        sys.exit(0)
+    elif "Successfully imported" in final_message_string:
+        logging.info("- Job ID = "+data["Id"])
+        logging.info("- Name = "+data["Name"])
+        try:
+            logging.info("- Message = \n" + message_string[0]["Message"])
+        except:
+            logging.info("- Message = %s\n" % message_string[len(message_string)-1]["Message"])
+    elif "No changes" in final_message_string:
+        logging.info("- Job ID = "+data["Id"])
+        logging.info("- Name = "+data["Name"])
+        try:
+            logging.info("- Message = " + message_string[0]["Message"])
+        except:
+            logging.info("- Message = %s" % message_string[len(message_string)-1]["Message"])
             sys.exit(0)
-        elif "Successfully imported" in final_message_string or "completed with errors" in final_message_string or "Successfully imported" in final_message_string:
-            logging.info("- Job ID = "+data["Id"])
-            logging.info("- Name = "+data["Name"])
-            try:
-                logging.info("- Message = \n" + message_string[0]["Message"])
-            except:
-                logging.info("- Message = %s\n" % message_string[len(message_string)-1]["Message"])
-            break
-        elif "No changes" in final_message_string:
-            logging.info("- Job ID = "+data["Id"])
-            logging.info("- Name = "+data["Name"])
-            try:
-                logging.info("- Message = " + message_string[0]["Message"])
-            except:
-                logging.info("- Message = %s" % message_string[len(message_string)-1]["Message"])
-                sys.exit(0)
-            break
-        else:
-            logging.info("- INFO, job not marked completed, current status: %s" % data["TaskState"])
-            logging.info("- Message: %s\n" % message_string[0]["Message"])
-            time.sleep(1)
-            continue
+    else:
+        logging.error("\n- FAIL, job ID %s marked as %s, detailed job message: %s" % (job_id, status.job_state, data["Messages"]))
+        sys.exit(0)
     
 def get_set_ipmi_alert_iDRAC_setting():
     if args["x"]:
@@ -235,6 +246,26 @@ def submit_test_event():
         logging.error("\n- FAIL, POST command failed to submit test event, status code %s returned, error: %s" % (response.status_code, response.__dict__["_content"]))
         sys.exit(0)
     
+def receive_events():
+    try:
+        receiver = EventReceiver(port=args["listen_port"], certfile=args["cert_file"], keyfile=args["key_file"], destination_host=args["listener_host"])
+    except (IOError, OSError, ValueError) as error_message:
+        logging.error("\n- FAIL, unable to start local event listener, detailed error information: %s" % error_message)
+        sys.exit(0)
+    with receiver:
+        event_types = [args["event_type"]] if args["event_type"] else ["Alert"]
+        subscription_uri = receiver.subscribe(idrac_ip, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, event_types=event_types, enable_alerts=True)
+        if not subscription_uri:
+            logging.error("\n- FAIL, unable to create subscription for local event listener %s" % receiver.destination_uri(idrac_ip))
+            sys.exit(0)
+        logging.info("\n- PASS, subscription %s created, listening for events on %s. Press Ctrl+C to stop\n" % (subscription_uri, receiver.destination_uri(idrac_ip)))
+        receiver.add_listener(lambda event: logging.info("%s, %s, %s, %s" % (event.timestamp, event.event_type, event.message_id, event.message)))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logging.info("\n- INFO, stopping event listener and deleting subscription %s" % subscription_uri)
+
 if __name__ == "__main__":
     if args["script_examples"]:
         script_examples()
@@ -244,7 +275,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -254,6 +285,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -267,6 +300,8 @@ if __name__ == "__main__":
         create_subscription()
     elif args["test_event"] and args["destination_uri"] and args["event_type"] and args["message_id"]:
         submit_test_event()
+    elif args["receive_events"] and args["cert_file"]:
+        receive_events()
     elif args["delete"]:
         delete_subscriptions()
     else:
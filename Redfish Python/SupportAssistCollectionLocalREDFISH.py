@@ -15,7 +15,6 @@
 # http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
 
 import argparse
-import getpass
 import json
 import logging
 import re
@@ -25,8 +24,11 @@ import time
 import urllib.parse
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -245,63 +247,51 @@ def support_assist_register():
         sys.exit(0)
 
 def loop_job_status():
-    loop_count = 0
-    while True:
-        if loop_count == 20:
-            logging.info("- INFO, retry count for GET request has been elapsed, script will exit. Manually check the job queue for final job status results")
-            sys.exit(0)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, Job status not marked completed, polling job status again, execution time: %s" % str(datetime.now()-start_time)[0:7])
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(minutes=30), until=lambda data: "fail" in data.get("Message", "").lower() or "error" in data.get("Message", "").lower() or "complete" in data.get("Message", "").lower(), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.info("- INFO, unable to get job status, %s. Manually check the job queue for final job status results" % status.error)
+        sys.exit(0)
+    # Once the collection finished, the job GET returns the collection zip file URI in the Location header
+    if args["x"]:
+        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+    else:
+        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
+    if response.headers.get('Location') == "/redfish/v1/Dell/sacollect.zip" or response.headers.get('Location') == "/redfish/v1/Oem/Dell/sacollect.zip":
+        logging.info("- PASS, job ID %s successfully marked completed" % job_id)
         if args["x"]:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
+            response = requests.get('https://%s%s' % (idrac_ip, response.headers['Location']), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
         else:
-             response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        current_time = (datetime.now()-start_time)
-        data = response.json()
-        if response.status_code != 200:
-            logging.error("- FAIL, status code %s returned, GET command will retry" % response.status_code)
-            time.sleep(10)
-            loop_count += 1
-            continue
-        try:
-            if response.headers['Location'] == "/redfish/v1/Dell/sacollect.zip" or response.headers['Location'] == "/redfish/v1/Oem/Dell/sacollect.zip":
-                logging.info("- PASS, job ID %s successfully marked completed" % job_id)
-                if args["x"]:
-                    response = requests.get('https://%s%s' % (idrac_ip, response.headers['Location']), verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
-                else:
-                    response = requests.get('https://%s%s' % (idrac_ip, response.headers['Location']), verify=verify_cert,auth=(idrac_username, idrac_password))
-                if args["filename"]:
-                    SA_export_filename = args["filename"]
-                else:
-                    SA_export_filename = "sacollect.zip"    
-                with open(SA_export_filename, "wb") as output:
-                    output.write(response.content)
-                logging.info("\n- INFO, check your local directory for SupportAssist collection zip file \"%s\"" % SA_export_filename)
-                sys.exit(0)
-            else:
-                data = response.json()
-                logging.error("- ERROR, unable to locate SA collection URI in headers output, JSON response: \n%s" % data)
-                sys.exit(0)
-        except:
-            if str(current_time)[0:7] >= "0:30:00":
-                logging.error("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
-                sys.exit(0)
-            elif data['JobState'] == "CompletedWithErrors":
-                logging.info("\n- INFO, SA collection completed with errors, please check iDRAC Lifecycle Logs for more details")
-                sys.exit(0)
-            elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed" or "error" in data['Message'] or "Error" in data['Message']:
-                logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, data['Message']))
-                sys.exit(0)
-            elif data['JobState'] == "Completed" or "complete" in data['Message'].lower():
-                if "local path" in data['Message']:
-                    logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
-                else:
-                    logging.warning("- WARNING, unable to detect final job status message. Manually run GET on URI \"%s\" using browser to see if SA zip collection is available to download." % response.headers['Location'])
-                    sys.exit(0)
-                for i in data.items():
-                    pprint(i)
-                break
-            else:
-                logging.info("- INFO, Job status not marked completed, polling job status again, execution time: %s" % str(current_time)[0:7])
-                time.sleep(5)
+            response = requests.get('https://%s%s' % (idrac_ip, response.headers['Location']), verify=verify_cert,auth=(idrac_username, idrac_password))
+        if args["filename"]:
+            SA_export_filename = args["filename"]
+        else:
+            SA_export_filename = "sacollect.zip"
+        with open(SA_export_filename, "wb") as output:
+            output.write(response.content)
+        logging.info("\n- INFO, check your local directory for SupportAssist collection zip file \"%s\"" % SA_export_filename)
+        sys.exit(0)
+    elif response.headers.get('Location'):
+        logging.error("- ERROR, unable to locate SA collection URI in headers output, JSON response: \n%s" % response.json())
+        sys.exit(0)
+    elif status.job_state == "CompletedWithErrors":
+        logging.info("\n- INFO, SA collection completed with errors, please check iDRAC Lifecycle Logs for more details")
+        sys.exit(0)
+    elif status.failed or "error" in status.message.lower():
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    if "local path" in status.message:
+        logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
+    else:
+        logging.warning("- WARNING, unable to detect final job status message. Manually run GET on URI \"/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s\" using browser to see if SA zip collection is available to download." % job_id)
+        sys.exit(0)
+    for i in status.data.items():
+        pprint(i)
             
 
     
@@ -315,7 +305,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- INFO, argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -325,6 +315,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
             verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import os
@@ -26,8 +25,10 @@ import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import timedelta
 from pprint import pprint
+from IdracRedfishSupport.fleet import read_idrac_password
+from IdracRedfishSupport.jobs import FINAL_JOB_STATES, wait_for_job
 
 warnings.filterwarnings("ignore")
 
@@ -134,141 +135,109 @@ def system_erase():
     logging.info("- PASS, job ID %s successfuly created for %s method. Script will now loop polling job status until marked completed\n" % (job_id, method))    
 
 def loop_job_status():
-    start_time = datetime.now()
-    count_number = 0
-    if args["x"]:
-        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-    else:
-        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-    data = response.json()
-    logging.info("- INFO, JobStatus not completed, current status: \"%s\"" % (data['Message']))
-    start_job_status_message = data['Message']
-    retry_count = 1
-    while True:
-        try:
-            if args["x"]:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert, headers={'X-Auth-Token': args["x"]})
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (idrac_ip, job_id), verify=verify_cert,auth=(idrac_username, idrac_password))
-        except:
-            if retry_count == 10:
-                logging.info("- INFO, retry count of 10 has been reached to communicate with iDRAC, script will exit")
-                sys.exit(0)
-            else:
-                logging.info("- INFO, lost iDRAC network connection, retry GET request after 10 second sleep delay")
-                retry_count += 1
-                time.sleep(15)
-                continue
-        current_time = (datetime.now()-start_time)
-        if response.status_code == 200:
-            current_job_status = data['Message']
-        else:
-            logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
-            sys.exit(0)
-        data = response.json()
-        new_job_status_message = data['Message']
-        if str(current_time)[0:7] >= "2:00:00":
-            logging.error("\n- FAIL: Timeout of 2 hours has been hit, script stopped\n")
-            sys.exit(0)
-        elif data['JobState'] == "Failed" or "fail" in data['Message'].lower() or "unable" in data['Message'].lower() or "invalid" in data['Message'].lower() or "cannot" in data['Message'].lower():
-            logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, data['Message']))
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job status not completed, current status: \"%s\"" % status.message)
+    status = wait_for_job(idrac_ip, job_id, idrac_username, idrac_password if not args["x"] else None, args["x"], verify_cert, timeout=timedelta(hours=2), until=lambda data: any(i in data.get("Message", "").lower() for i in ("fail", "unable", "invalid", "cannot")), on_update=job_status_update)
+    if status.timed_out:
+        logging.error("\n- FAIL: Timeout of 2 hours has been hit, script stopped\n")
+        sys.exit(0)
+    elif status.error:
+        logging.error("\n- FAIL, Command failed to check job status, %s" % status.error)
+        sys.exit(0)
+    elif status.failed or any(i in status.message.lower() for i in ("unable", "invalid", "cannot")):
+        logging.error("- FAIL: job ID %s failed, failed message is: %s" % (job_id, status.message))
+        sys.exit(0)
+    logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
+    for i in status.data.items():
+        pprint(i)
+    logging.info("\n- INFO, server is in OFF state due to System Erase process completed, iDRAC will now reboot.")
+    if args["poweron"]:
+        if args["x"]:
+            logging.warning("- WARNING, X-auth token session was deleted due to iDRAC reboot, unable to power on server.")
             sys.exit(0)
-        elif data['Message'] == "Job completed successfully.":
-            logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
-            for i in data.items():
-                pprint(i)
-            logging.info("\n- INFO, server is in OFF state due to System Erase process completed, iDRAC will now reboot.")
-            if args["poweron"]:
+        logging.info("- INFO, user selected to automatically power ON the server once iDRAC reboot is complete. Script will wait 6 minutes for iDRAC to come back up and attempt to power ON the server")
+        time.sleep(360)
+        count = 0
+        while True:
+            url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % idrac_ip
+            payload = {'ResetType': 'On'}
+            headers = {'content-type': 'application/json'}
+            if "IDRAC" in args["erase"]:
                 if args["x"]:
-                    logging.warning("- WARNING, X-auth token session was deleted due to iDRAC reboot, unable to power on server.")
+                    logging.warning("- WARNING, X-auth token session was deleted due to iDRAC reset to default, unable to power on server.")
                     sys.exit(0)
-                logging.info("- INFO, user selected to automatically power ON the server once iDRAC reboot is complete. Script will wait 6 minutes for iDRAC to come back up and attempt to power ON the server")
-                time.sleep(360)
-                count = 0
-                while True:
-                    url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % idrac_ip
-                    payload = {'ResetType': 'On'}
-                    headers = {'content-type': 'application/json'}
-                    if "IDRAC" in args["erase"]:
-                        if args["x"]:
-                            logging.warning("- WARNING, X-auth token session was deleted due to iDRAC reset to default, unable to power on server.")
-                            sys.exit(0)
-                        logging.info("- INFO, iDRAC component selected. Default iDRAC username/password will be used to attempt power on server")
-                        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=("root", "calvin"))
-                    else:
-                        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=(idrac_username, idrac_password))   
-                    if count == 5:
-                        logging.error("- FAIL, 5 attempts at powering ON the server has failed, script will exit")
+                logging.info("- INFO, iDRAC component selected. Default iDRAC username/password will be used to attempt power on server")
+                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=("root", "calvin"))
+            else:
+                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=(idrac_username, idrac_password))
+            if count == 5:
+                logging.error("- FAIL, 5 attempts at powering ON the server has failed, script will exit")
+                sys.exit(0)
+            if response.status_code == 204 or response.status_code == 202 or response.status_code == 200:
+                logging.info("- PASS, POST command passed to power ON server")
+                time.sleep(30)
+                if "BIOS" in args["erase"]:
+                    if args["x"]:
+                        logging.warning("- WARNING, X-auth token session was deleted due to iDRAC reboot, unable to power on server.")
                         sys.exit(0)
-                    if response.status_code == 204 or response.status_code == 202 or response.status_code == 200:
-                        logging.info("- PASS, POST command passed to power ON server")
-                        time.sleep(30)
-                        if "BIOS" in args["erase"]:
-                            if args["x"]:
-                                logging.warning("- WARNING, X-auth token session was deleted due to iDRAC reboot, unable to power on server.")
+                    logging.info("- INFO, BIOS component selected. Server will power off one more time and automatically power back onto complete the process.")
+                    count = 0
+                    while True:
+                        url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.GetRemoteServicesAPIStatus' % idrac_ip
+                        payload = {}
+                        headers = {'content-type': 'application/json'}
+                        if "IDRAC" in args["erase"]:
+                            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=("root","calvin"))
+                        else:
+                            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=(idrac_username, idrac_password))
+                        statusCode = response.status_code
+                        data = response.json()
+                        if response.status_code == 204 or response.status_code == 202 or response.status_code == 200:
+                            logging.info("- PASS, POST command passed to get server status")
+                        else:
+                            logging.error("- FAIL, unable to get current server status, status code %s returned." % response.status_code)
+                            logging.error("- Detailed error message: %s" % data)
+                            sys.exit(0)
+                        if data['ServerStatus'] == "PoweredOff":
+                            logging.info("- PASS, verified server is in OFF state, executing power ON operation")
+                            url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % idrac_ip
+                            payload = {'ResetType': 'On'}
+                            headers = {'content-type': 'application/json'}
+                            if "IDRAC" in args["erase"]:
+                                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=("root","calvin"))
+                            else:
+                                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=(idrac_username, idrac_password))
+                            statusCode = response.status_code
+                            if statusCode == 204 or statusCode == 202 or statusCode == 200:
+                                logging.info("- PASS, POST command passed to power ON server")
+                                return
+                            else:
+                                logging.error("- FAIL, unable to power ON server, status code return is %s" %response.status_code)
+                                logging.error("- Detailed error message: %s" % data)
                                 sys.exit(0)
-                            logging.info("- INFO, BIOS component selected. Server will power off one more time and automatically power back onto complete the process.")
-                            count = 0
-                            while True:
-                                url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.GetRemoteServicesAPIStatus' % idrac_ip
-                                payload = {}
-                                headers = {'content-type': 'application/json'}
-                                if "IDRAC" in args["erase"]:
-                                    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=("root","calvin"))
-                                else:
-                                    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=(idrac_username, idrac_password))    
-                                statusCode = response.status_code
-                                data = response.json()
-                                if response.status_code == 204 or response.status_code == 202 or response.status_code == 200:
-                                    logging.info("- PASS, POST command passed to get server status")
-                                else:
-                                    logging.error("- FAIL, unable to get current server status, status code %s returned." % response.status_code)
-                                    logging.error("- Detailed error message: %s" % data)
-                                    sys.exit(0)
-                                if data['ServerStatus'] == "PoweredOff":
-                                    logging.info("- PASS, verified server is in OFF state, executing power ON operation")
-                                    url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % idrac_ip
-                                    payload = {'ResetType': 'On'}
-                                    headers = {'content-type': 'application/json'}
-                                    if "IDRAC" in args["erase"]:
-                                        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=("root","calvin"))
-                                    else:
-                                        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=False, auth=(idrac_username, idrac_password))    
-                                    statusCode = response.status_code
-                                    if statusCode == 204 or statusCode == 202 or statusCode == 200:
-                                        logging.info("- PASS, POST command passed to power ON server")
-                                        return
-                                    else:
-                                        logging.error("- FAIL, unable to power ON server, status code return is %s" %response.status_code)
-                                        logging.error("- Detailed error message: %s" % data)
-                                        sys.exit(0)
-                                elif count == 10:
-                                    logging.info("- INFO, server still in POST/ON state after 10 attempts checking power state. Check the iDRAC Lifecycle logs, server to debug issue")
-                                    sys.exit(0)
-                                else:
-                                    logging.info("- INFO, server still in POST/ON state, waiting for server to power down before executing power ON operation")
-                                    time.sleep(60)
-                                    count += 1   
+                        elif count == 10:
+                            logging.info("- INFO, server still in POST/ON state after 10 attempts checking power state. Check the iDRAC Lifecycle logs, server to debug issue")
+                            sys.exit(0)
                         else:
-                            return
-                    else:
-                        logging.info("\n- FAIL, POST command failed to power ON server, status code: %s\n" % response.status_code)
-                        logging.info("Extended Info Message: {0}".format(response.json()))
-                        logging.info("- INFO, script will wait 1 minute and attempt power ON operation again")
-                        time.sleep(60)
-                        count += 1
-                        continue
-            else:
-                if "BIOS" in args["erase"]:
-                    logging.error("- INFO, BIOS component selected. Manually power on the server for BIOS to complete reset to defaults. Server will power off one more time, process is complete.")
-                    return
+                            logging.info("- INFO, server still in POST/ON state, waiting for server to power down before executing power ON operation")
+                            time.sleep(60)
+                            count += 1
                 else:
                     return
+            else:
+                logging.info("\n- FAIL, POST command failed to power ON server, status code: %s\n" % response.status_code)
+                logging.info("Extended Info Message: {0}".format(response.json()))
+                logging.info("- INFO, script will wait 1 minute and attempt power ON operation again")
+                time.sleep(60)
+                count += 1
+                continue
+    else:
+        if "BIOS" in args["erase"]:
+            logging.error("- INFO, BIOS component selected. Manually power on the server for BIOS to complete reset to defaults. Server will power off one more time, process is complete.")
+            return
         else:
-            if start_job_status_message != new_job_status_message:
-                logging.info("- INFO, job status not completed, current status: \"%s\"" % (data['Message']))
-                start_job_status_message = new_job_status_message
-            continue
+            return
             
 if __name__ == "__main__":
     if args["script_examples"]:
@@ -279,7 +248,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
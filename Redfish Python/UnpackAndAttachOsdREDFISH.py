@@ -16,7 +16,6 @@
 #
 
 import argparse
-import getpass
 import json
 import logging
 import re
@@ -25,8 +24,10 @@ import sys
 import time
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from IdracRedfishSupport.token_cache import get_cached_x_auth_token
+from IdracRedfishSupport.fleet import read_idrac_password
 
 warnings.filterwarnings("ignore")
 
@@ -150,7 +151,7 @@ def check_concrete_job_status():
             response = requests.get('https://%s%s' % (idrac_ip, concrete_job_uri), verify=verify_cert, headers={'X-Auth-Token': args["x"]})   
         else:
             response = requests.get('https://%s%s' % (idrac_ip, concrete_job_uri), verify=verify_cert,auth=(idrac_username, idrac_password))
-        current_time = str((datetime.now()-start_time))[0:7]
+        current_time = (datetime.now()-start_time)
         if response.status_code == 200 or response.status_code == 202:
             logging.debug("- PASS, GET command passed to get task details")
         else:
@@ -158,7 +159,7 @@ def check_concrete_job_status():
             logging.error("Extended Info Message: {0}".format(response.json()))
             sys.exit(0)
         data = response.json()
-        if str(current_time)[0:7] >= "0:30:00":
+        if current_time >= timedelta(minutes=30):
             logging.error("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
             sys.exit(0)
         elif data['TaskState'] == "Completed":
@@ -170,7 +171,7 @@ def check_concrete_job_status():
                 logging.info("\n- Final detailed task results -\n")
                 for i in data.items():
                     pprint(i)
-                logging.info("\n- INFO, task completion time: %s" % (current_time))
+                logging.info("\n- INFO, task completion time: %s" % (str(current_time)[0:7]))
                 break
             else:
                 logging.error("- FAIL, unable to get final task message string")
@@ -181,7 +182,7 @@ def check_concrete_job_status():
                 pprint(i)
             sys.exit(0)
         else:
-            logging.info("- INFO, task not completed, current status: \"%s\", job execution time: \"%s\"" % (data['TaskState'], current_time))
+            logging.info("- INFO, task not completed, current status: \"%s\", job execution time: \"%s\"" % (data['TaskState'], str(current_time)[0:7]))
             time.sleep(10)    
 
 def check_attach_status(x):
@@ -214,7 +215,7 @@ if __name__ == "__main__":
         if args["p"]:
             idrac_password = args["p"]
         if not args["p"] and not args["x"] and args["u"]:
-            idrac_password = getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % args["u"])
+            idrac_password = read_idrac_password(args["u"])
         if args["ssl"]:
             if args["ssl"].lower() == "true":
                 verify_cert = True
@@ -224,6 +225,8 @@ if __name__ == "__main__":
                 verify_cert = False
         else:
                 verify_cert = False
+        if args["u"] and not args["x"]:
+            args["x"] = get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert)
         check_supported_idrac_version()
     else:
         logging.error("\n- FAIL, invalid argument values or not all required parameters passed in. See help text or argument --script-examples for more details.")
@@ -24,52 +24,81 @@ import re
 import requests
 import sys
 import time
+import types
 import warnings
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pprint import pprint
+from xml.parsers.expat import ExpatError
+
+from .bios import attribute_set, validate_bios_attributes
+from .events import DEFAULT_PORT as EVENT_RECEIVER_PORT, EventReceiver
+from .jobs import FINAL_JOB_STATES, JobWatcher
+from .registry import BIOS_REGISTRY_URI, IDRAC_REGISTRY_URI, MESSAGE_REGISTRY_URI, RegistryError, get_message_index, get_registry
+from .scp import read_task_response, write_scp_json, write_scp_xml
+from .transport import RedfishTransport
+from .upload import post_multipart
 
 warnings.filterwarnings("ignore")
 logging.basicConfig(format='%(message)s', stream=sys.stdout, level=logging.INFO)
 
+# Pooled keep-alive transport shared by all workflow functions, created by set_iDRAC_script_session() or start_iDRAC_script_session()
+transport = None
+# Event receiver started by start_iDRAC_event_receiver(), job and power state waits are event driven while it is running
+event_receiver = None
+
 def set_iDRAC_script_session(script_examples=""):
     """Function to set iDRAC session used to execute all workflows for this session: pass in iDRAC IP, iDRAC username and iDRAC password. It will also prompt for SSL certificate verification for all Redfish calls and finally prompt to create X-auth token session. By creating X-auth token session, all Redfish calls executed will use this X-auth token session for authentication instead of username/password."""
-    global creds
-    global x_auth_token
     if script_examples:
         print("\n- IdracRedfishSupport.set_iDRAC_script_session(), this example will prompt the user to input iDRAC IP, iDRAC username, iDRAC password, SSL cert verification and create X-auth token session")
     else:
-        x_auth_token = "no"
-        creds = {}
         idrac_ip = input(str("- Enter iDRAC IP: "))
-        creds["idrac_ip"] = idrac_ip
         idrac_username = input(str("- Enter iDRAC username: "))
-        creds["idrac_username"] = idrac_username
         idrac_password = getpass.getpass("- Enter iDRAC %s password: " % idrac_username)
-        creds["idrac_password"] = idrac_password
         verify_cert = input(str("- Verify SSL certificate, pass in True to verify or False to ignore: "))
         if verify_cert.lower() == "true":
-            creds["verify_cert"] = True
+            verify_cert = True
         elif verify_cert.lower() == "false":
-            creds["verify_cert"] = False
+            verify_cert = False
         else:
             logging.info("- INFO, invalid value entered to verify SSL certificate")
             return
         user_response = input(str("- Create iDRAC X-auth token session? Pass in \"y\" for yes or \"n\" for no. Creating iDRAC X-auth token session, all Redfish commands will be executed using this X-auth token for auth instead of username/password: "))
         if user_response.lower() == "y":
-            x_auth_token = "yes"
-            response = requests.get('https://%s/redfish/v1' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-            data = response.json()
+            create_x_auth_token = True
+        elif user_response.lower() == "n":
+            create_x_auth_token = False
+        else:
+            logging.error("- ERROR, invalid value entered to create iDRAC x-auth token session")
+            return
+        start_iDRAC_script_session(idrac_ip=idrac_ip, idrac_username=idrac_username, idrac_password=idrac_password, verify_cert=verify_cert, create_x_auth_token=create_x_auth_token)
+
+def start_iDRAC_script_session(script_examples="", idrac_ip="", idrac_username="", idrac_password="", verify_cert=False, create_x_auth_token=False):
+    """Function to set iDRAC session used to execute all workflows for this session without prompting for input. Supported function arguments: idrac_ip, idrac_username, idrac_password, verify_cert (supported values: True and False) and create_x_auth_token (supported value: True, all Redfish calls will use X-auth token session for authentication instead of username/password)."""
+    global creds
+    global x_auth_token
+    global transport
+    global event_receiver
+    if script_examples:
+        print("\n- IdracRedfishSupport.start_iDRAC_script_session(idrac_ip='192.168.0.120', idrac_username='root', idrac_password='calvin', create_x_auth_token=True), this example will set iDRAC session for 192.168.0.120 and create X-auth token session without prompting for input")
+    else:
+        x_auth_token = "no"
+        creds = {"idrac_ip": idrac_ip, "idrac_username": idrac_username, "idrac_password": idrac_password, "verify_cert": verify_cert}
+        if event_receiver:
+            event_receiver.close()
+            event_receiver = None
+        if transport:
+            transport.close()
+        transport = RedfishTransport(creds["idrac_ip"], verify_cert=creds["verify_cert"], username=creds["idrac_username"], password=creds["idrac_password"])
+        if create_x_auth_token:
+            response = transport.get('https://%s/redfish/v1' % creds["idrac_ip"])
             if response.status_code == 401:
                 logging.error("\n- ERROR, GET request failed, status code %s returned, check login credentials" % (response.status_code))
                 return
-            else:
-                data = response.json()
-            if response.status_code != 200:
+            elif response.status_code != 200:
                 logging.warning("\n- WARNING, GET request failed to get Redfish version, status code %s returned" % response.status_code)
                 return
-            else:
-                pass
+            data = response.json()
             redfish_version = int(data["RedfishVersion"].replace(".",""))
             if redfish_version >= 160:
                 session_uri = "redfish/v1/SessionService/Sessions"
@@ -81,7 +110,7 @@ def set_iDRAC_script_session(script_examples=""):
             url = 'https://%s/%s' % (creds["idrac_ip"], session_uri)
             payload = {"UserName":creds["idrac_username"],"Password":creds["idrac_password"]}
             headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code == 201:
                 logging.info("\n- PASS, iDRAC X auth token successfully created. X auth sessions URI \"%s\"" % response.headers["Location"])
@@ -91,10 +120,9 @@ def set_iDRAC_script_session(script_examples=""):
                 except:
                     logging.error("\n- ERROR, unable to create X-auth_token session, status code %s returned" % (response.status_code))
                 return
+            x_auth_token = "yes"
             creds["idrac_x_auth_token"] = response.headers["X-Auth-Token"]
-        elif user_response.lower() != "n":
-            logging.error("- ERROR, invalid value entered to create iDRAC x-auth token session")
-            return
+            transport.set_auth(x_auth_token=creds["idrac_x_auth_token"])
 
 def return_iDRAC_script_session_details(script_examples=""):
     """Function to return iDRAC IP and iDRAC username session information that was captured by get_iDRAC_creds()"""
@@ -104,15 +132,96 @@ def return_iDRAC_script_session_details(script_examples=""):
         print("iDRAC IP: %s" % creds["idrac_ip"])
         print("iDRAC username: %s" % creds["idrac_username"])
     
+def get_session_request_statistics(script_examples="", reset=""):
+    """Function to get request latency statistics for all Redfish calls executed using the current iDRAC script session. All Redfish calls for the session reuse the same pooled keep-alive connection to the iDRAC. Supported function argument: reset (supported value: True, statistics will be cleared after they are returned)"""
+    if script_examples:
+        print("\n- IdracRedfishSupport.get_session_request_statistics(), this example will return number of Redfish calls executed, failures and average/min/max latency for the current iDRAC script session.")
+    else:
+        statistics = transport.statistics()
+        logging.info("\n- Redfish request statistics for iDRAC %s -\n" % creds["idrac_ip"])
+        for i in statistics.items():
+            print("%s: %s" % (i[0], i[1]))
+        if reset:
+            transport.reset_statistics()
+
+def start_iDRAC_event_receiver(script_examples="", cert_file="", key_file="", port=EVENT_RECEIVER_PORT, listener_host=""):
+    """Function to start a local HTTPS event listener and create an EventService subscription on the iDRAC of the current iDRAC script session. While the listener is running, job status and server power state waits of the workflow functions poll when iDRAC pushes an event instead of on a fixed interval, polling every 60 seconds remains as fallback. Supported function arguments: cert_file and key_file (certificate and key for this host, iDRAC only sends events to HTTPS destinations), port (optional, default is 8443) and listener_host (optional, IP or hostname iDRAC uses to reach this host, default is the local IP used to reach the iDRAC). The subscription is deleted by stop_iDRAC_event_receiver()."""
+    global event_receiver
+    if script_examples:
+        print("\n- IdracRedfishSupport.start_iDRAC_event_receiver(cert_file=\"listener_cert.pem\", key_file=\"listener_key.pem\"), this example will start a local HTTPS event listener on port %s and create a subscription on the iDRAC pointing to the listener, job and power state waits will be event driven until stop_iDRAC_event_receiver() is executed." % EVENT_RECEIVER_PORT)
+    else:
+        if event_receiver:
+            event_receiver.close()
+            event_receiver = None
+        try:
+            receiver = EventReceiver(port=int(port), certfile=cert_file, keyfile=key_file or None, destination_host=listener_host or None)
+        except (IOError, OSError, ValueError) as error_message:
+            logging.error("\n- ERROR, unable to start local event listener, detailed error information: %s" % error_message)
+            return
+        subscription_uri = receiver.subscribe(creds["idrac_ip"], transport=transport, enable_alerts=True)
+        if not subscription_uri:
+            logging.error("\n- ERROR, unable to create subscription for local event listener %s, job and power state waits will keep polling" % receiver.destination_uri(creds["idrac_ip"]))
+            receiver.close()
+            return
+        event_receiver = receiver
+        logging.info("\n- PASS, subscription %s created, listening for events on %s" % (subscription_uri, receiver.destination_uri(creds["idrac_ip"])))
+
+def stop_iDRAC_event_receiver(script_examples=""):
+    """Function to delete the subscription created by start_iDRAC_event_receiver() and stop the local event listener, job and power state waits go back to polling"""
+    global event_receiver
+    if script_examples:
+        print("\n- IdracRedfishSupport.stop_iDRAC_event_receiver(), this example will delete the iDRAC event subscription and stop the local event listener.")
+    elif event_receiver:
+        event_receiver.close()
+        event_receiver = None
+        logging.info("\n- PASS, event subscription deleted and local event listener stopped")
+    else:
+        logging.info("\n- INFO, local event listener not running")
+
+def _event_receiver():
+    # Event receiver subscribed to the session iDRAC, None when waits have to poll
+    if event_receiver and creds["idrac_ip"] in event_receiver.subscriptions:
+        return event_receiver
+    return None
+
+def _watch_jobs(job_ids, timeout, until=None, on_update=None):
+    # Yield JobStatus as each job finishes, jobs are polled when an event for the job arrives if the event receiver is running
+    receiver = _event_receiver()
+    if receiver:
+        watcher = receiver.job_watcher(timeout=timeout)
+    else:
+        watcher = JobWatcher(timeout=timeout)
+        watcher.add_host(creds["idrac_ip"], transport=transport)
+    try:
+        for i in job_ids:
+            watcher.watch(creds["idrac_ip"], i, until=until, on_update=on_update)
+        for status in watcher.results():
+            yield status
+    finally:
+        if receiver:
+            receiver.detach(watcher)
+        watcher.close()
+
+def _wait_for_power_state(power_state, timeout, interval):
+    # Returns True once server PowerState is power_state, False if timeout in seconds is reached. PowerState is read on every event if the event receiver is running, otherwise every interval seconds
+    receiver = _event_receiver()
+    if receiver:
+        return receiver.wait_for_power_state(creds["idrac_ip"], power_state, timeout=timeout, transport=transport)
+    deadline = time.time() + timeout
+    while True:
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"])
+        if response.status_code == 200 and response.json().get("PowerState") == power_state:
+            return True
+        if time.time() >= deadline:
+            return False
+        time.sleep(interval)
+    
 def get_storage_controllers(script_examples=""):
     """Function to get server storage controller FQDDs"""
     if script_examples:
         print("\n- IdracRedfishSupport.get_storage_controllers(), this example will return current storage controller FQDDs detected. These FQDDs can be used to execute other storage functions to get physcial disks, virtual disks, reset controller are some examples.")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -133,10 +242,7 @@ def get_storage_controller_details(script_examples="", controller_fqdd=""):
     if script_examples:
         print("\n- IdracRedfishSupport.get_storage_controller_details(controller_fqdd='RAID.Integrated.1-1'), this example will return detailed information for storage controller RAID.Integrated.1-1")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -153,10 +259,7 @@ def get_storage_disks(script_examples="", controller_fqdd=""):
     if script_examples:
         print("\n- IdracRedfishSupport.get_storage_disks(controller_fqdd='RAID.Integrated.1-1'), this example will return disk FQDDs detected for storage controller RAID.Integrated.1-1")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         drive_list=[]
         if response.status_code == 401:
@@ -172,10 +275,7 @@ def get_storage_disks(script_examples="", controller_fqdd=""):
             logging.info("\n- Drive(s) detected for %s -\n" % controller_fqdd)
             for i in data['Drives']:
                 drive_list.append(i['@odata.id'].split("/")[-1])
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Drives/%s' % (creds["idrac_ip"], i['@odata.id'].split("/")[-1]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Drives/%s' % (creds["idrac_ip"], i['@odata.id'].split("/")[-1]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Drives/%s' % (creds["idrac_ip"], i['@odata.id'].split("/")[-1]))
                 data = response.json()
                 if response.status_code != 200:
                     logging.error("- ERROR, GET command failed, detailed error information: %s" % data)
@@ -188,10 +288,7 @@ def get_storage_disk_details(script_examples="", controller_fqdd=""):
     if script_examples:
         print("\n- IdracRedfishSupport.get_storage_disk_details(controller_fqdd='RAID.Integrated.1-1'), this example will return detailed information for all disks behind storage controller RAID.Integrated.1-1")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         drive_list=[]
         if response.status_code == 401:
@@ -207,10 +304,7 @@ def get_storage_disk_details(script_examples="", controller_fqdd=""):
             logging.info("\n- Drive(s) detected for %s -\n" % controller_fqdd)
             for i in data['Drives']:
                 drive_list.append(i['@odata.id'].split("/")[-1])
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Drives/%s' % (creds["idrac_ip"], i['@odata.id'].split("/")[-1]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Drives/%s' % (creds["idrac_ip"], i['@odata.id'].split("/")[-1]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Drives/%s' % (creds["idrac_ip"], i['@odata.id'].split("/")[-1]))
                 data = response.json()
                 if response.status_code != 200:
                     logging.error("- ERROR, GET command failed, detailed error information: %s" % data)
@@ -224,10 +318,7 @@ def get_storage_enclosures(script_examples=""):
     if script_examples:
         print("\n- IdracRedfishSupport.get_storage_enclosures(), this example will return all server storage enclosures detected.")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Chassis' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Chassis' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Chassis' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -246,10 +337,7 @@ def get_storage_enclosures(script_examples=""):
                     print(ii[1])
                     backplane_uris.append(ii[1])
         for i in backplane_uris:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s%s' % (creds["idrac_ip"], i),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})
-            else:
-                response = requests.get('https://%s%s' % (creds["idrac_ip"], i),verify=False,auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s%s' % (creds["idrac_ip"], i))
             logging.info("\n----- Detailed information for URI \"%s\" -----\n" % i)
             data = response.json()
             if response.status_code != 200:
@@ -263,10 +351,7 @@ def get_virtual_disks(script_examples="", controller_fqdd=""):
     if script_examples:
         print("\n- IdracRedfishSupport.get_virtual_disks(controller_fqdd='RAID.SL.3-1'), this example will return all virtual disks detected for controller RAID.SL.3-1")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         vd_list=[]
         if response.status_code == 401:
@@ -283,10 +368,7 @@ def get_virtual_disks(script_examples="", controller_fqdd=""):
                 vd_list.append(i['@odata.id'].split("/")[-1])
         logging.info("\n- Volume(s) detected for %s controller -\n" % controller_fqdd)
         for ii in vd_list:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], ii),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], ii),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], ii))
             data = response.json()
             try:
                 print("%s, Volume type: %s, RAID type: %s" % (ii, data["VolumeType"], data["RAIDType"]))
@@ -298,10 +380,7 @@ def get_virtual_disk_details(script_examples="", controller_fqdd=""):
     if script_examples:
         print("\n- IdracRedfishSupport.get_virtual_disks(controller_fqdd='RAID.SL.3-1'), this example will return detailed virtual disk information for all VDs detected behind controller RAID.SL.3-1")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         vd_list=[]
         if response.status_code == 401:
@@ -319,10 +398,7 @@ def get_virtual_disk_details(script_examples="", controller_fqdd=""):
                 vd_list.append(i['@odata.id'].split("/")[-1])
                 print(i['@odata.id'].split("/")[-1])
         for ii in vd_list:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], ii),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], ii),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], ii))
             data = response.json()
             if response.status_code != 200:
                 logging.error("- ERROR, GET command failed, detailed error information: %s" % data)
@@ -340,12 +416,8 @@ def reset_controller(script_examples="", controller_fqdd=""):
         payload={"TargetFQDD": controller_fqdd}
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.ResetConfig' % (creds["idrac_ip"])
         method = "ResetConfig"
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -364,10 +436,7 @@ def reset_controller(script_examples="", controller_fqdd=""):
             logging.info("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if response.status_code != 200:
             logging.error("- ERROR, GET command failed, detailed error information: %s" % data)
@@ -392,12 +461,8 @@ def change_virtual_disk_attributes(script_examples="", vd_fqdd="", diskcachepoli
         if writecachepolicy:
             payload["WriteCachePolicy"] = writecachepolicy
         url = "https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes/%s/Settings" % (creds["idrac_ip"], vd_fqdd.split(":")[-1], vd_fqdd)
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -415,10 +480,7 @@ def change_virtual_disk_attributes(script_examples="", vd_fqdd="", diskcachepoli
             logging.info("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if response.status_code != 200:
             logging.error("- ERROR, GET command failed, detailed error information: %s" % data)
@@ -432,40 +494,28 @@ def change_virtual_disk_attributes(script_examples="", vd_fqdd="", diskcachepoli
 
 def loop_job_status_final():
     """Function to loop checking final job status, this function cannot be called individually and is leveraged only by other functions after POST action is executed to create a job ID"""
-    start_time = datetime.now()
-    while True:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-        current_time=(datetime.now()-start_time)
-        if response.status_code == 401:
-            logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
-            return
-        elif response.status_code != 200:
-            logging.error("\n- ERROR, Command failed to check job status, return code is %s" % response.status_code)
-            logging.info("Extended Info Message: {0}".format(response.json()))
-            return
-        data = response.json()
-        if str(current_time)[0:7] >= "2:00:00":
-            logging.error("\n- ERROR: Timeout of 2 hours has been hit, script stopped\n")
-            return
-        elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed":
-            logging.error("- ERROR, job ID %s failed, final job status message: %s" % (job_id, data['Message']))
-            logging.info("- INFO, check iDRAC Lifecycle Logs for more details about the job failure")
-            return
-        elif "Lifecycle Controller in use" in data["Message"]:
-            logging.warning("- WARNING, Lifecycle Controller in use detected, job will start when Lifecycle Controller is available. Check server state to make sure it is out of POST and iDRAC job queue to confirm no jobs are already executing.")
-            return
-        elif data['JobState'] == "Completed":
-            logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
-            for i in data.items():
-                if "odata" not in i[0] or "MessageArgs" not in i[0] or "TargetSettingsURI" not in i[0]:
-                    print("%s: %s" % (i[0],i[1]))
-            break
-        else:
-            logging.info("- INFO, job status not completed, current status: \"%s\"" % (data['Message'].strip(".")))
-            time.sleep(3)
+    def job_status_update(status):
+        if status.job_state not in FINAL_JOB_STATES:
+            logging.info("- INFO, job status not completed, current status: \"%s\"" % (status.message or "").strip("."))
+    status = list(_watch_jobs([job_id], timedelta(hours=2), until=lambda data: "Lifecycle Controller in use" in data.get("Message", ""), on_update=job_status_update))[0]
+    data = status.data
+    if status.timed_out:
+        logging.error("\n- ERROR: Timeout of 2 hours has been hit, script stopped\n")
+        return
+    elif status.error:
+        logging.error("- ERROR, unable to check job status, %s. If using X-auth token, confirm the session is still active." % status.error)
+        return
+    elif status.failed:
+        logging.error("- ERROR, job ID %s failed, final job status message: %s" % (job_id, data['Message']))
+        logging.info("- INFO, check iDRAC Lifecycle Logs for more details about the job failure")
+        return
+    elif "Lifecycle Controller in use" in data["Message"]:
+        logging.warning("- WARNING, Lifecycle Controller in use detected, job will start when Lifecycle Controller is available. Check server state to make sure it is out of POST and iDRAC job queue to confirm no jobs are already executing.")
+        return
+    logging.info("\n--- PASS, Final Detailed Job Status Results ---\n")
+    for i in data.items():
+        if "odata" not in i[0] or "MessageArgs" not in i[0] or "TargetSettingsURI" not in i[0]:
+            print("%s: %s" % (i[0],i[1]))
             
 def create_virtual_disk(script_examples="", controller_fqdd="", disk_fqdds="", raid_level="", vd_name="", vd_size="", vd_stripesize="", secure="", diskcachepolicy="", readcachepolicy="", writecachepolicy=""):
     """Function to create virtual disk. Function arguments: controller_fqdd, disk_fqdds (if you\'re passing in multiple drives for VD creation, pass them in as a list), raid_level, supported integer values: 0, 1, 5, 6, 10, 50 and 60 (not all RAID levels are supported on each storage contoller), vd_name is optional (if not passed in, controller will set using default name), vd_size is optional (integer value in bytes) and if not passed in VD creation will use the full disk size, vd_stripesize is optional (integer value in bytes) and if not passed in controller will assign the default stripesize for the RAID level, secure is optional (pass in value of True to secure the VD during VD creation), diskcachepolicy is optional (possible values: Enabled and Disabled), readcachepolicy is optional (Off, ReadAhead and AdaptiveReadAhead), writecachepolicy (ProtectedWriteBack, UnprotectedWriteBack and WriteThrough)."""
@@ -475,10 +525,7 @@ def create_virtual_disk(script_examples="", controller_fqdd="", disk_fqdds="", r
         print("""\n- IdracRedfishSupport.create_virtual_disk(controller_fqdd="RAID.Mezzanine.1-1", disk_fqdds="Disk.Bay.13:Enclosure.Internal.0-1:RAID.Mezzanine.1-1", raid_level=0, vd_name="RAID_ZERO", vd_size=107374182400, vd_stripesize=131072), this example will create 100GB RAID 0 with stripesize 128KB
         \n- IdracRedfishSupport.create_virtual_disk(controller_fqdd="RAID.Mezzanine.1-1", disk_fqdds=["Disk.Bay.19:Enclosure.Internal.0-1:RAID.Mezzanine.1-1","Disk.Bay.20:Enclosure.Internal.0-1:RAID.Mezzanine.1-1"],raid_level=1), this example will create RAID 1 using full disk size""")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % (creds["idrac_ip"]))
         if response.status_code != 200:
             logging.error("\n- ERROR, GET command failed, status code %s returned" % response.status_code)
             logging.info("Extended Info Message: {0}".format(response.json()))
@@ -529,12 +576,8 @@ def create_virtual_disk(script_examples="", controller_fqdd="", disk_fqdds="", r
             payload["ReadCachePolicy"] = readcachepolicy
         if writecachepolicy:
             payload["WriteCachePolicy"] = writecachepolicy
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -553,10 +596,7 @@ def create_virtual_disk(script_examples="", controller_fqdd="", disk_fqdds="", r
             logging.error("\n- ERROR, unable to locate job ID in the headers response, check job queue if job ID was created.")
             return
             
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             job_type = "staged"
@@ -568,10 +608,7 @@ def create_virtual_disk(script_examples="", controller_fqdd="", disk_fqdds="", r
             logging.info("- INFO, staged config job detected, server will validate scheduled job status before rebooting the server")
             while True:
                 try:
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 except requests.ConnectionError as error_message:
                     print(error_message)
                     return
@@ -602,21 +639,14 @@ def create_virtual_disk(script_examples="", controller_fqdd="", disk_fqdds="", r
 
 def reboot_server():
     """Function to reboot the server to execute configuration or updates jobs that require server reboot to apply. This function cannot be called directly and will be called by other functions after POST action is executed to create a job ID"""
-    if x_auth_token == "yes":
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-    else:
-        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+    response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"])
     data = response.json()
     logging.info("\n- INFO, Current server power state is: %s" % data['PowerState'])
     if data['PowerState'] == "On":
         url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % creds["idrac_ip"]
         payload = {'ResetType': 'GracefulShutdown'}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -627,45 +657,24 @@ def reboot_server():
             logging.error("\n- ERROR, Command failed to gracefully power OFF server, status code is: %s\n" % response.status_code)
             logging.info("Extended Info Message: {0}".format(response.json()))
             return
-        count = 0
-        while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-            data = response.json()
-            if data['PowerState'] == "Off":
-                logging.info("- PASS, GET command passed to verify server is in OFF state")
-                break
-            elif count == 20:
-                logging.info("- INFO, unable to graceful shutdown the server, will perform forced shutdown now")
-                url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % creds["idrac_ip"]
-                payload = {'ResetType': 'ForceOff'}
-                if x_auth_token == "yes":
-                    headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-                else:
-                    headers = {'content-type': 'application/json'}
-                    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
-                if response.status_code == 204:
-                    logging.info("- PASS, POST action passed to forcefully power OFF server")
-                    time.sleep(15)
-                    break
-                else:
-                    logging.error("\n- ERROR, Command failed to gracefully power OFF server, status code: %s\n" % response.status_code)
-                    logging.info("Extended Info Message: {0}".format(response.json()))
-                    return
-            else:
-                time.sleep(2)
-                count+=1
-                continue
-        payload = {'ResetType': 'On'}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
+        if _wait_for_power_state("Off", timeout=40, interval=2):
+            logging.info("- PASS, GET command passed to verify server is in OFF state")
         else:
+            logging.info("- INFO, unable to graceful shutdown the server, will perform forced shutdown now")
+            url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % creds["idrac_ip"]
+            payload = {'ResetType': 'ForceOff'}
             headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
+            if response.status_code == 204:
+                logging.info("- PASS, POST action passed to forcefully power OFF server")
+                time.sleep(15)
+            else:
+                logging.error("\n- ERROR, Command failed to gracefully power OFF server, status code: %s\n" % response.status_code)
+                logging.info("Extended Info Message: {0}".format(response.json()))
+                return
+        payload = {'ResetType': 'On'}
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 204:
             logging.info("- PASS, POST action passed to power ON server")
         else:
@@ -675,12 +684,8 @@ def reboot_server():
     elif data['PowerState'] == "Off":
         url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % creds["idrac_ip"]
         payload = {'ResetType': 'On'}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 204:
             logging.info("- PASS, POST action passed to power ON server")
         else:
@@ -697,10 +702,7 @@ def get_current_server_power_state(script_examples=""):
     if script_examples:
         print("\n- IdracRedfishSupport.get_current_server_power_state(), this example will get current server power state and possible supported values for executing set_server_power_state()")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -724,12 +726,8 @@ def set_server_power_state(script_examples="", power_state_value=""):
         logging.info("\n- INFO, setting new server power state value: %s" % (power_state_value))
         url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Actions/ComputerSystem.Reset' % creds["idrac_ip"]
         payload = {'ResetType': power_state_value}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -749,12 +747,8 @@ def get_remote_service_api_status(script_examples=""):
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.GetRemoteServicesAPIStatus' % (creds["idrac_ip"])
         method = "GetRemoteServicesAPIStatus"
         payload={}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data=response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -778,12 +772,8 @@ def delete_virtual_disk(script_examples="", virtual_disk_fqdd=""):
         print("\n- IdracRedfishSupport.delete_virtual_disk(virtual_disk_fqdd='Disk.Virtual.1:RAID.Mezzanine.1-1'), this example will delete VD 1 for controller RAID.Mezzanine.1-1")
     else:
         url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], virtual_disk_fqdd)
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.delete(url, headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.delete(url, headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.delete(url, headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -801,10 +791,7 @@ def delete_virtual_disk(script_examples="", virtual_disk_fqdd=""):
         except:
             logging.error("\n- ERROR, unable to locate job ID in the headers response, check job queue if job ID was created.")
             return          
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             job_type = "staged"
@@ -816,10 +803,7 @@ def delete_virtual_disk(script_examples="", virtual_disk_fqdd=""):
             print("- INFO, staged config job detected, server will validate scheduled job status before rebooting the server")
             while True:
                 try:
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 except requests.ConnectionError as error_message:
                     logging.error(error_message)
                     return
@@ -857,12 +841,8 @@ def initialize_virtual_disk(script_examples="", virtual_disk_fqdd="", init_type=
         controller = virtual_disk_fqdd.split(":")[-1]
         payload={"InitializeType":init_type}
         url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes/%s/Actions/Volume.Initialize' % (creds["idrac_ip"], controller, virtual_disk_fqdd)
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -880,10 +860,7 @@ def initialize_virtual_disk(script_examples="", virtual_disk_fqdd="", init_type=
         except:
             logging.error("\n- ERROR, unable to locate job ID in the headers response, check job queue if job ID was created.")
             return   
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             job_type = "staged"
@@ -895,10 +872,7 @@ def initialize_virtual_disk(script_examples="", virtual_disk_fqdd="", init_type=
             logging.info("- INFO, staged config job detected, server will validate scheduled job status before rebooting the server")
             while True:
                 try:
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 except requests.ConnectionError as error_message:
                     logging.error(error_message)
                     return
@@ -935,12 +909,8 @@ def secure_erase_disk(script_examples="", controller_fqdd="", disk_fqdd=""):
     else:
         payload={}
         url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Drives/%s/Actions/Drive.SecureErase' % (creds["idrac_ip"], controller_fqdd, disk_fqdd)
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -958,10 +928,7 @@ def secure_erase_disk(script_examples="", controller_fqdd="", disk_fqdd=""):
         except:
             logging.error("\n- ERROR, unable to locate job ID in the headers response, check job queue if job ID was created.")
             return    
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             job_type = "staged"
@@ -972,10 +939,7 @@ def secure_erase_disk(script_examples="", controller_fqdd="", disk_fqdd=""):
             logging.info("- INFO, staged config job detected, server will validate scheduled job status before rebooting the server")
             while True:
                 try:
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 except requests.ConnectionError as error_message:
                     logging.error(error_message)
                     return
@@ -1015,12 +979,8 @@ def assign_disk_hotspare(script_examples="", hotspare_type="", disk_fqdd="", vir
             payload={"TargetFQDD":disk_fqdd}
         elif hotspare_type.lower() == "dedicated":
             payload={"TargetFQDD":disk_fqdd,"VirtualDiskArray":[virtual_disk_fqdd]}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1040,10 +1000,7 @@ def assign_disk_hotspare(script_examples="", hotspare_type="", disk_fqdd="", vir
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -1061,12 +1018,8 @@ def unassign_disk_hotspare(script_examples="", disk_fqdd=""):
         method = "UnassignSpare"
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.UnassignSpare' % (creds["idrac_ip"])
         payload={"TargetFQDD":disk_fqdd}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1086,10 +1039,7 @@ def unassign_disk_hotspare(script_examples="", disk_fqdd=""):
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -1105,10 +1055,7 @@ def set_storage_controller_key(script_examples="", controller_fqdd="", key_id=""
         print("""\n- IdracRedfishSupport.set_storage_controller_key(controller_fqdd="RAID.Mezzanine.1-1", key_id="testkey"), this example will set controller LKM encryption. Script will prompt you to enter new passphrase.""")
     else:
         method = "SetControllerKey"
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         if data['Oem']['Dell']['DellController']['SecurityStatus'] == "EncryptionNotCapable":
             logging.warning("\n- WARNING, storage controller %s does not support encryption" % controller_fqdd)
@@ -1118,12 +1065,8 @@ def set_storage_controller_key(script_examples="", controller_fqdd="", key_id=""
         key_passphrase = getpass.getpass("- Enter new key passphrase to set: ")
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.SetControllerKey' % (creds["idrac_ip"])
         payload={"TargetFQDD":controller_fqdd,"Key":key_passphrase,"Keyid":key_id}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1143,10 +1086,7 @@ def set_storage_controller_key(script_examples="", controller_fqdd="", key_id=""
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -1161,10 +1101,7 @@ def rekey_storage_controller_key(script_examples="", controller_fqdd="", encrypt
         print("""\n- IdracRedfishSupport.rekey_storage_controller_key(controller_fqdd="RAID.Mezzanine.1-1", encryption_mode="LKM", key_id="newkey"), this example will rekey controller key for RAID.Mezzanine.1-1. It will prompt user to enter current passphrase and new passphrase.""")
     else:
         method = "ReKey"
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         current_key_id = data["Oem"]["Dell"]["DellController"]["KeyID"]
         if data['Oem']['Dell']['DellController']['SecurityStatus'] == "EncryptionNotCapable":
@@ -1183,12 +1120,8 @@ def rekey_storage_controller_key(script_examples="", controller_fqdd="", encrypt
         else:
             logging.error("- FAIL, invalid value or missing value for encryption_mode argument")
             return
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1208,10 +1141,7 @@ def rekey_storage_controller_key(script_examples="", controller_fqdd="", encrypt
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -1227,10 +1157,7 @@ def remove_storage_controller_key(script_examples="", controller_fqdd=""):
         print("""\n- IdracRedfishSupport.remove_storage_controller_key(controller_fqdd="RAID.Mezzanine.1-1"), this example will remove controller key for RAID.Mezzanine.1-1.""")
     else:
         method = "RemoveControllerKey"
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         if data['Oem']['Dell']['DellController']['SecurityStatus'] == "EncryptionNotCapable":
             print("\n- WARNING, storage controller %s does not support encryption" % controller_fqdd)
@@ -1239,12 +1166,8 @@ def remove_storage_controller_key(script_examples="", controller_fqdd=""):
             pass
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.RemoveControllerKey' % (creds["idrac_ip"])
         payload={"TargetFQDD":controller_fqdd}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1264,10 +1187,7 @@ def remove_storage_controller_key(script_examples="", controller_fqdd=""):
             print("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             print("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -1282,10 +1202,7 @@ def check_consistency_virtual_disk(script_examples="", virtual_disk_fqdd=""):
     if script_examples:
         print("""\n- IdracRedfishSupport.check_consistency_virtual_disk(virtual_disk_fqdd="Disk.Virtual.0:RAID.Mezzanine.1-1"), this example will check consistency for virtual disk 0.""")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], virtual_disk_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], virtual_disk_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/Volumes/%s' % (creds["idrac_ip"], virtual_disk_fqdd))
         data = response.json()
         payload = {}
         for i in data.items():
@@ -1296,12 +1213,8 @@ def check_consistency_virtual_disk(script_examples="", virtual_disk_fqdd=""):
                         return
         controller_fqdd = virtual_disk_fqdd.split(":")[-1]
         url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s/Volumes/%s/Actions/Volume.CheckConsistency' % (creds["idrac_ip"], controller_fqdd,virtual_disk_fqdd)
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -1319,10 +1232,7 @@ def check_consistency_virtual_disk(script_examples="", virtual_disk_fqdd=""):
         except:
             logging.error("\n- FAIL, unable to locate job ID in the headers response, check job queue if job ID was created.")
             return   
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             job_type = "staged"
@@ -1333,10 +1243,7 @@ def check_consistency_virtual_disk(script_examples="", virtual_disk_fqdd=""):
             logging.info("- INFO, staged config job detected, server will validate scheduled job status before rebooting the server")
             while True:
                 try:
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 except requests.ConnectionError as error_message:
                     logging.error(error_message)
                     return
@@ -1373,22 +1280,15 @@ def secure_virtual_disk(script_examples="", virtual_disk_fqdd=""):
     else:
         method = "SecureVirtualDisk"
         controller_fqdd = virtual_disk_fqdd.split(":")[-1]
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Storage/%s' % (creds["idrac_ip"], controller_fqdd))
         data = response.json()
         if data['Oem']['Dell']['DellController']['SecurityStatus'] == "EncryptionNotCapable":
             logging.warning("\n- WARNING, storage controller %s does not support encryption" % controller_fqdd)
             return
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.LockVirtualDisk' % (creds["idrac_ip"])
         payload={"TargetFQDD":virtual_disk_fqdd}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1408,10 +1308,7 @@ def secure_virtual_disk(script_examples="", virtual_disk_fqdd=""):
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -1429,12 +1326,8 @@ def set_controller_boot_virtual_disk(script_examples="", controller_fqdd="", vir
         method = "SetBootVD"
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.SetBootVD' % (creds["idrac_ip"])
         payload={"ControllerFQDD":controller_fqdd, "VirtualDiskFQDD":virtual_disk_fqdd}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1454,10 +1347,7 @@ def set_controller_boot_virtual_disk(script_examples="", controller_fqdd="", vir
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -1474,12 +1364,8 @@ def rename_virtual_disk(script_examples="", virtual_disk_fqdd="", vd_name=""):
         method = "RenameVD"
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.RenameVD' % (creds["idrac_ip"])
         payload={"TargetFQDD":virtual_disk_fqdd, "Name":vd_name}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1499,10 +1385,7 @@ def rename_virtual_disk(script_examples="", virtual_disk_fqdd="", vd_name=""):
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -1515,10 +1398,7 @@ def get_current_iDRAC_sessions(script_examples=""):
     if script_examples:
         print("""\n- IdracRedfishSupport.get_current_iDRAC_sessions(), this example will return current active running iDRAC sessions.""")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/SessionService/Sessions?$expand=*($levels=1)' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/SessionService/Sessions?$expand=*($levels=1)' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/SessionService/Sessions?$expand=*($levels=1)' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1538,12 +1418,8 @@ def delete_iDRAC_session(script_examples="", session_id=""):
         print("""\n- IdracRedfishSupport.delete_iDRAC_session(session_id=12), this example will delete current iDRAC session ID 12.""")
     else:
         url = 'https://%s/redfish/v1/SessionService/Sessions/%s' % (creds["idrac_ip"], str(session_id))
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.delete(url, headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.delete(url, headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.delete(url, headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -1569,10 +1445,7 @@ def get_server_slot_information(script_examples=""):
         current_date_time = "- iDRAC IP %s, data collection timestamp: %s-%s-%s  %s:%s:%s\n" % (creds["idrac_ip"], time_now.month, time_now.day, time_now.year, time_now.hour, time_now.minute, time_now.second)
         open_file.writelines(current_date_time)
         open_file.writelines("\n\n")
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1587,10 +1460,7 @@ def get_server_slot_information(script_examples=""):
             open_file.writelines("\n")
         number_list=[i for i in range (1,100001) if i % 50 == 0]
         for seq in number_list:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (creds["idrac_ip"], seq),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (creds["idrac_ip"], seq),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSlotCollection?$skip=%s' % (creds["idrac_ip"], seq))
             data = response.json()
             if response.status_code == 400:
                 if "out of range" in data['error']['@Message.ExtendedInfo'][0]['Message']:
@@ -1618,10 +1488,7 @@ def get_iDRAC_current_job_queue(script_examples=""):
     if script_examples:
         print("""\n- IdracRedfishSupport.get_iDRAC_current_job_queue(), this example will return current iDRAC job queue, all job IDs completed, running, scheduled or failed.""")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs?$expand=*($levels=1)' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs?$expand=*($levels=1)' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs?$expand=*($levels=1)' % (creds["idrac_ip"]))
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -1652,12 +1519,8 @@ def delete_iDRAC_job_id_or_job_queue(script_examples="", job_id=""):
             logging.info("- INFO, deleting the job queue, this may up to 1 minute to complete depending on the number of job ids")
         else:
             payload = {"JobID":job_id}    
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -1672,6 +1535,30 @@ def delete_iDRAC_job_id_or_job_queue(script_examples="", job_id=""):
             logging.error(data)
             return
 
+def watch_iDRAC_job_ids(script_examples="", job_ids="", timeout=""):
+    """Function to loop checking status of one or more job IDs until they are all marked completed or failed. All job IDs are checked using one Jobs collection request per poll and poll interval adapts to job progress. Supported function arguments: job_ids (pass in job ID as a string or multiple job IDs as a list) and timeout (optional, max time in minutes to wait for the job IDs, default is 120)."""
+    if script_examples:
+        print("""\n- IdracRedfishSupport.watch_iDRAC_job_ids(job_ids="JID_292828393894"), this example will loop checking job status until the job is marked completed or failed.
+        \n- IdracRedfishSupport.watch_iDRAC_job_ids(job_ids=["JID_292828393894","JID_292828393895"], timeout=30), this example will loop checking status of both jobs, max time to wait is 30 minutes.""")
+    else:
+        if isinstance(job_ids, str):
+            job_ids = [job_ids]
+        if timeout:
+            timeout = timedelta(minutes=int(timeout))
+        else:
+            timeout = timedelta(hours=2)
+        def job_status_update(status):
+            logging.info("- INFO, job ID %s status: %s, percent complete: %s" % (status.job_id, status.message, status.percent_complete))
+        for status in _watch_jobs(job_ids, timeout, on_update=job_status_update):
+            if status.timed_out:
+                logging.error("- FAIL, job ID %s not marked completed within %s, current status: %s" % (status.job_id, timeout, status.message))
+            elif status.error:
+                logging.error("- FAIL, unable to check job ID %s status, %s" % (status.job_id, status.error))
+            elif status.failed:
+                logging.error("- FAIL, job ID %s failed, final job status message: %s" % (status.job_id, status.message))
+            else:
+                logging.info("- PASS, job ID %s marked completed in %s, final job status message: %s" % (status.job_id, str(status.elapsed)[0:7], status.message))
+
 def get_pcie_device_or_function_inventory(script_examples="", user_input=""):
     """Function to get either PCIe device or PCIe function inventory data. Supported function argument: user_input (supported values: "device" or "function")."""
     if script_examples:
@@ -1685,10 +1572,7 @@ def get_pcie_device_or_function_inventory(script_examples="", user_input=""):
         else:
             logging.error("- WARNING, incorrect value entered for user_input argument")
             return
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1' % (creds["idrac_ip"]))
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -1709,10 +1593,7 @@ def get_pcie_device_or_function_inventory(script_examples="", user_input=""):
                 print(ii[1])
                 pcie_devices.append(ii[1])
         for i in pcie_devices:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s%s' % (creds["idrac_ip"], i),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s%s' % (creds["idrac_ip"], i),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s%s' % (creds["idrac_ip"], i))
             if response.status_code != 200:
                 logging.error("- FAIL, get request failed, status code %s returned" % response.status_code)
                 data = response.json()
@@ -1737,12 +1618,8 @@ def reset_iDRAC(script_examples=""):
     else:
         url = "https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Actions/Manager.Reset/" % creds["idrac_ip"]
         payload={"ResetType":"GracefulRestart"}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -1762,12 +1639,8 @@ def set_idrac_default_settings(script_examples="", reset_type=""):
     else:
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Actions/Oem/DellManager.ResetToDefaults' % creds["idrac_ip"]
         payload = {"ResetType": reset_type}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -1779,49 +1652,55 @@ def set_idrac_default_settings(script_examples="", reset_type=""):
         time.sleep(15)
         logging.info("\n- iDRAC will now reset to default settings and restart the iDRAC. iDRAC should be back up within a few minutes.")
 
+def _get_registry(registry_uri, message_index=False):
+    # Registry is read from the versioned registry cache, it is only downloaded once per model and firmware version
+    try:
+        if message_index:
+            return get_message_index(creds["idrac_ip"], transport=transport, registry_uri=registry_uri)
+        return get_registry(creds["idrac_ip"], registry_uri, transport=transport)
+    except RegistryError as error:
+        _log_registry_error(error)
+        return None
+
+def _log_registry_error(error):
+    if error.status_code == 401:
+        logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
+    else:
+        logging.error("\n- FAIL, GET command failed for %s, status code %s returned" % (error.uri, error.status_code))
+        logging.error("\n- Detailed failure results:\n %s" % error.data)
+
 def get_message_registry(script_examples="", message_id=""):
     import os
-    """Function to get complete iDRAC message registry which returns message IDs and message strings or a specific entry. Supported function argument: message_id."""
+    """Function to get complete iDRAC message registry which returns message IDs and message strings or a specific entry. Supported function argument: message_id (message ID with or without registry prefix, if no exact match is found all message IDs starting with the value are returned)."""
     if script_examples:
         print("""\n- IdracRedfishSupport.get_message_registry(), this example will return complete iDRAC message registry.
-        \n- IdracRedfishSupport.get_message_registry(message_id="CPU0001"), this example will only return details for message ID CPU0001.""")
+        \n- IdracRedfishSupport.get_message_registry(message_id="CPU0001"), this example will only return details for message ID CPU0001.
+        \n- IdracRedfishSupport.get_message_registry(message_id="IDRAC.2.9.LC"), this example will return details for all message IDs starting with LC.""")
     elif message_id != "":
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-        data = response.json()
-        if response.status_code == 401:
-            logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
+        message_index = _get_registry(MESSAGE_REGISTRY_URI, message_index=True)
+        if message_index is None:
             return
-        elif response.status_code != 200:
-            logging.error("- FAIL, get request failed, status code %s returned" % response.status_code)
-            data = response.json()
-            logging.error(data)
+        message = message_index.get(message_id)
+        if message:
+            logging.info("\n- Details for message ID %s -\n" % message_id)
+            pprint(message)
+            return
+        message_ids = message_index.search(message_id)
+        if message_ids:
+            logging.info("\n- Details for message IDs starting with %s -\n" % message_id)
+            for i in message_ids:
+                pprint(message_index.get(i))
             return
-        for i in data['Messages'].items():
-            if i[0].lower() == message_id.lower():
-                logging.info("\n- Details for message ID %s -\n" % message_id)
-                pprint(i)
-                #print("\nMessage ID: %s" % i[0])
-                #for ii in i[1].items():
-                #    print("%s: %s" % (ii[0], ii[1]))
-                #print("\n")
-                return
-            else:
-                pass
         logging.error("\n - FAIL, either invalid message ID was passed in or message ID does not exist on this iDRAC version")
     else:
         try:
             os.remove("message_registry.txt")
         except:
             pass
+        data = _get_registry(MESSAGE_REGISTRY_URI)
+        if data is None:
+            return
         open_file = open("message_registry.txt","a")
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Registries/Messages/EEMIRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-        data = response.json()
         for i in data['Messages'].items():
             message = "Message ID: %s" % i[0]
             pprint(i)
@@ -1871,12 +1750,8 @@ def change_bios_password(script_examples="", password_type="", set_password="",
         else:
             logging.error("- FAIL, argument not detected to set, change or delete password")
             return
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.__dict__
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1890,12 +1765,8 @@ def change_bios_password(script_examples="", password_type="", set_password="",
             return
         payload = {"TargetSettingsURI":"/redfish/v1/Systems/System.Embedded.1/Bios/Settings"}
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs' % creds["idrac_ip"]
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 200:
             logging.info("- PASS: POST command passed to create target config job, status code %s returned" % response.status_code)
         else:
@@ -1911,10 +1782,7 @@ def change_bios_password(script_examples="", password_type="", set_password="",
             return
         logging.info("- INFO: %s job ID successfully created" % job_id)
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
             if response.status_code != 200:
                 logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
                 logging.error("Extended Info Message: {0}".format(response.json()))
@@ -1954,12 +1822,8 @@ def bios_device_recovery(script_examples=""):
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellBIOSService/Actions/DellBIOSService.DeviceRecovery' % (creds["idrac_ip"])
         method = "DeviceRecovery"
         payload={"Device":"BIOS"}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -1980,17 +1844,8 @@ def get_bios_attribute_registry(script_examples="", attribute_name=""):
     else:
         if attribute_name:
             print("\n")
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-            data = response.json()
-            if response.status_code == 401:
-                logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
-                return
-            elif response.status_code != 200:
-                logging.error("\n- FAIL, GET command failed, status code %s returned" % (method, response.status_code))
-                logging.error("\n- Detailed failure results:\n %s" % data)
+            data = _get_registry(BIOS_REGISTRY_URI)
+            if data is None:
                 return
             for i in data['RegistryEntries']['Attributes']:
                 if attribute_name in i.values():
@@ -2004,16 +1859,10 @@ def get_bios_attribute_registry(script_examples="", attribute_name=""):
                 os.remove("bios_attribute_registry.txt")
             except:
                 pass
-            open_file = open("bios_attribute_registry.txt","a")
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-            data = response.json()
-            if response.status_code != 200:
-                logging.error("\n- FAIL, GET command failed, status code %s returned" % (method, response.status_code))
-                logging.error("\n- Detailed failure results:\n %s" % data)
+            data = _get_registry(BIOS_REGISTRY_URI)
+            if data is None:
                 return
+            open_file = open("bios_attribute_registry.txt","a")
             for i in data['RegistryEntries']['Attributes']:
                 pprint(i)
                 print("\n")
@@ -2035,10 +1884,7 @@ def get_bios_attributes(script_examples="", attribute_name=""):
         \n- IdracRedfishSupport.get_bios_attributes(attribute_name="MemTest"), this example will return only current value for BIOS attribute MemTest""")
     else:
         if attribute_name:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios' % (creds["idrac_ip"]))
             if response.status_code == 401:
                 logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
                 return
@@ -2060,10 +1906,7 @@ def get_bios_attributes(script_examples="", attribute_name=""):
             except:
                 pass
             open_file = open("bios_attributes.txt","a")
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios' % (creds["idrac_ip"]))
             if response.status_code != 200:
                 logging.error("\n- FAIL, GET command failed, status code %s returned" % (method, response.status_code))
                 logging.error("\n- Detailed failure results:\n %s" % data)
@@ -2083,45 +1926,39 @@ def get_bios_attributes(script_examples="", attribute_name=""):
             open_file.close()
 
 def set_bios_attributes(script_examples="", attribute_name="", attribute_value="", reboot=""):
-    """Function to set either one or multiple BIOS attributes. Supported function arguments: attribute_name, attribute_value and reboot(supported values are yes and no). Make sure to pass in attribute name exactly due to case senstive. Example: MemTest will pass but memtest will fail. If you want to configure multiple attributes, make sure to use a comma separator between each attribute name and attribute value. If needed, see examples for passing in multiple attribute names and values."""
+    """Function to set either one or multiple BIOS attributes. Supported function arguments: attribute_name, attribute_value and reboot(supported values are yes and no). Make sure to pass in attribute name exactly due to case senstive. Example: MemTest will pass but memtest will fail. If you want to configure multiple attributes, make sure to use a comma separator between each attribute name and attribute value. If needed, see examples for passing in multiple attribute names and values. The attribute set is validated against the BIOS registry (types, supported values, read only and dependencies) before anything is sent, attributes already set to the new value are skipped."""
     global job_id
     if script_examples:
         print("""\n- IdracRedfishSupport.set_bios_attributes(attribute_name="MemTest,EmbSata",attribute_value="Disabled,AhciMode",reboot="yes"), this example will reboot the server now to set BIOS attribute MemTest to Disabled and EmbSata to AhciMode.
         \n- IdracRedfishSupport.set_bios_attributes(attribute_name="MemTest",attribute_value="Enabled",reboot="no"), this example will not reoot the server now to set BIOS attribute MemTest to Eanbled. Config job is still scheduled and will execute on next server manual reboot.""")
     else:
-        bios_attribute_payload = {"Attributes":{}}
-        attribute_names = attribute_name.split(",")
-        attribute_values = attribute_value.split(",")
-        for i,ii in zip(attribute_names, attribute_values):
-            bios_attribute_payload["Attributes"][i] = ii
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-        if response.status_code == 401:
-            logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
+        # Attribute set is validated against the cached BIOS registry and current values before the PATCH, an invalid set fails here instead of in the config job after a reboot
+        try:
+            validation = validate_bios_attributes(creds["idrac_ip"], attribute_set(attribute_name, attribute_value), transport=transport)
+        except ValueError as error:
+            logging.error("\n- FAIL, %s" % error)
             return
-        elif response.status_code != 200:
-            logging.error("\n- FAIL, GET command failed, status code %s returned" % (method, response.status_code))
-            logging.error("\n- Detailed failure results:\n %s" % data)
+        except RegistryError as error:
+            _log_registry_error(error)
             return
-        data = response.json()
-        for i in bios_attribute_payload["Attributes"].items():
-            for ii in data['RegistryEntries']['Attributes']:
-                if i[0] in ii.values():
-                    if ii['Type'] == "Integer":
-                        bios_attribute_payload['Attributes'][i[0]] = int(i[1])
+        for i in validation.unchanged:
+            logging.info("- INFO, attribute %s is already set to the new value, not included in the config job" % i)
+        if validation.errors:
+            logging.error("\n- FAIL, BIOS attribute(s) failed validation against the BIOS registry, no changes sent -\n")
+            for i in validation.errors:
+                logging.error("Attribute Name: %s, value: %s, %s" % (i.attribute, i.value, i.reason))
+            return
+        if not validation.attributes:
+            logging.info("\n- INFO, all BIOS attribute(s) are already set to the new values, config job not created")
+            return
+        bios_attribute_payload = {"Attributes": validation.attributes}
         for i in bios_attribute_payload["Attributes"].items():
             print("Attribute Name: %s, setting new value to: %s" % (i[0], i[1]))
         url = 'https://%s/redfish/v1/Systems/System.Embedded.1/Bios/Settings' % creds["idrac_ip"]
         payload_patch = {"@Redfish.SettingsApplyTime":{"ApplyTime":"OnReset"}}
         payload_patch.update(bios_attribute_payload)
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload_patch), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload_patch), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload_patch), headers=headers)
         statusCode = response.status_code
         if response.status_code == 202 or response.status_code == 200:
             logging.info("\n- PASS: PATCH command passed to set BIOS attribute pending values and create config job, status code %s returned" % response.status_code)
@@ -2137,10 +1974,7 @@ def set_bios_attributes(script_examples="", attribute_name="", attribute_value="
             return
         logging.info("- INFO: %s job ID successfully created" % job_id)
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
             if response.status_code != 200:
                 logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
                 logging.error("Extended Info Message: {0}".format(response.json()))
@@ -2175,12 +2009,8 @@ def boot_to_network_iso(script_examples="", attach_iso="", detach_iso="", get_at
         if get_attach_status:
             url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellOSDeploymentService/Actions/DellOSDeploymentService.GetAttachStatus' % (creds["idrac_ip"])
             payload={}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code == 401:
                 logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2194,12 +2024,8 @@ def boot_to_network_iso(script_examples="", attach_iso="", detach_iso="", get_at
         elif detach_iso:
             url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellOSDeploymentService/Actions/DellOSDeploymentService.DetachISOImage' % (creds["idrac_ip"])
             payload={}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code == 200 or response.status_code == 202:
                 logging.info("\n- PASS: POST command passed to detach ISO image, status code %s returned" % response.status_code)
@@ -2225,12 +2051,8 @@ def boot_to_network_iso(script_examples="", attach_iso="", detach_iso="", get_at
                 cifs_password = getpass.getpass("- Enter CIFS share password: ")
                 payload["UserName"] = share_username
                 payload["Password"] = cifs_password
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code == 202 or response.status_code == 200:
                 logging.info("\n- PASS: POST command passed for %s method, status code %s returned" % (method, response.status_code))
@@ -2252,11 +2074,8 @@ def check_concrete_job_uri_status():
     from datetime import datetime
     start_time=datetime.now()
     while True:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s%s' % (creds["idrac_ip"], concrete_job_uri),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s%s' % (creds["idrac_ip"], concrete_job_uri),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-        current_time=str((datetime.now()-start_time))[0:7]
+        response = transport.get('https://%s%s' % (creds["idrac_ip"], concrete_job_uri))
+        current_time = (datetime.now()-start_time)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -2267,7 +2086,7 @@ def check_concrete_job_uri_status():
             logging.error("Extended Info Message: {0}".format(response.json()))
             return
         data= response.json()
-        if str(current_time)[0:7] >= "0:30:00":
+        if current_time >= timedelta(minutes=30):
             logging.error("\n- FAIL: Timeout of 30 minutes has been hit, script stopped\n")
             return
         elif data['TaskState'] == "Completed":
@@ -2315,12 +2134,8 @@ def unpack_and_attach_driver_pack(script_examples="", get_driver_packs="", get_a
         if get_driver_packs:
             url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellOSDeploymentService/Actions/DellOSDeploymentService.GetDriverPackInfo' % (creds["idrac_ip"])
             payload={}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code == 401:
                 logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2338,12 +2153,8 @@ def unpack_and_attach_driver_pack(script_examples="", get_driver_packs="", get_a
             url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellOSDeploymentService/Actions/DellOSDeploymentService.GetAttachStatus' % (creds["idrac_ip"])
             headers = {'content-type': 'application/json'}
             payload={}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code != 200:
                 logging.error("\n- FAIL, POST command failed to get driver pack attach status, status code: %s" % (response.status_code))
@@ -2356,12 +2167,8 @@ def unpack_and_attach_driver_pack(script_examples="", get_driver_packs="", get_a
             url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellOSDeploymentService/Actions/DellOSDeploymentService.UnpackAndAttach' % (creds["idrac_ip"])
             method = "UnpackAndAttach"
             payload={"OSName":attach_driver_pack}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code == 202 or response.status_code == 200:
                 logging.info("\n- PASS: POST command passed for %s method, status code %s returned" % (method, response.status_code))
@@ -2380,12 +2187,8 @@ def unpack_and_attach_driver_pack(script_examples="", get_driver_packs="", get_a
         elif detach_driver_pack:
             url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellOSDeploymentService/Actions/DellOSDeploymentService.DetachDrivers' % (creds["idrac_ip"])
             payload={}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code == 200 or response.status_code == 202:
                 logging.info("\n- PASS: POST command passed to detach driver pack, status code %s returned" % response.status_code)
@@ -2405,12 +2208,8 @@ def manage_iDRAC_time(script_examples="", get_time="", set_time=""):
             url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellTimeService/Actions/DellTimeService.ManageTime' % (creds["idrac_ip"])
             method = "ManageTime"
             payload={"GetRequest":True}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data=response.json()
             if response.status_code == 401:
                 logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2427,12 +2226,8 @@ def manage_iDRAC_time(script_examples="", get_time="", set_time=""):
             url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellTimeService/Actions/DellTimeService.ManageTime' % (creds["idrac_ip"])
             method = "ManageTime"
             payload={"GetRequest":False, "TimeData":set_time}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data=response.json()
             if response.status_code == 200:
                 logging.info("\n- PASS: POST command passed for %s action to SET iDRAC time, status code 200 returned\n" % method)
@@ -2451,12 +2246,8 @@ def clear_foreign_config_controller(script_examples="", controller_fqdd=""):
         payload={"TargetFQDD": controller_fqdd}
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.ClearForeignConfig' % (creds["idrac_ip"])
         method = "ClearForeignConfig"
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2475,10 +2266,7 @@ def clear_foreign_config_controller(script_examples="", controller_fqdd=""):
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -2496,12 +2284,8 @@ def import_foreign_config_controller(script_examples="", controller_fqdd=""):
         payload={"TargetFQDD": controller_fqdd}
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.ImportForeignConfig' % (creds["idrac_ip"])
         method = "ImportForeignConfig"
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2520,10 +2304,7 @@ def import_foreign_config_controller(script_examples="", controller_fqdd=""):
             logging.error("\n- POST command failure results:\n %s" % data)
             return
         time.sleep(5)
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         if data['JobType'] == "RAIDConfiguration":
             logging.info("- INFO, staged config job created, server will now reboot to execute the config job")
@@ -2539,12 +2320,8 @@ def reset_bios_default_settings(script_examples="", reboot=""):
     else:
         url = "https://%s/redfish/v1/Systems/System.Embedded.1/Bios/Actions/Bios.ResetBios" % creds["idrac_ip"]
         payload = {}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.__dict__
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2572,10 +2349,7 @@ def get_current_bios_boot_order(script_examples=""):
     if script_examples:
         print("""\n- IdracRedfishSupport.get_current_bios_boot_order(), this example will return current BIOS boot mode and the boot order.""")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios?$select=Attributes/BootMode' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios?$select=Attributes/BootMode' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios?$select=Attributes/BootMode' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2585,10 +2359,7 @@ def get_current_bios_boot_order(script_examples=""):
         else:
             logging.error("- ERROR, GET command failed to get current boot mode, status code %s returned" % response.status_code)
             return
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/BootOptions?$expand=*($levels=1)' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/BootOptions?$expand=*($levels=1)' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/BootOptions?$expand=*($levels=1)' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code != 200:
             logging.error("- ERROR, GET command failed to get current boot order, status code %s returned" % response.status_code)
@@ -2610,10 +2381,7 @@ def change_bios_boot_order(script_examples="", boot_order_devices="", reboot="")
         print("""\n- IdracRedfishSupport.change_bios_boot_order(boot_order_devices="Boot0000", reboot="yes"), this example will reboot the server now to set Boot0000 entry as first device in the boot order.")
         \n - IdracRedfishSupport.change_bios_boot_order(boot_order_devices="Boot0004,Boot0009,Boot0000", reboot="no"), this examples shows setting the boot order passing in multipe devices. Server will not reboot now but the job will execute on next server manual reboot.""")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios?$select=Attributes/BootMode' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios?$select=Attributes/BootMode' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/Bios?$select=Attributes/BootMode' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2629,12 +2397,8 @@ def change_bios_boot_order(script_examples="", boot_order_devices="", reboot="")
         else:
             boot_order_ids = [boot_order_devices]
         payload = {"Boot":{"BootOrder":boot_order_ids}}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200 or response.status_code == 202:
             logging.info("\n- PASS: PATCH command passed to change %s boot order sequence" % current_boot_mode)
@@ -2650,10 +2414,7 @@ def change_bios_boot_order(script_examples="", boot_order_devices="", reboot="")
             return
         logging.info("- PASS, job ID \"%s\" successfully created" % (job_id))
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
             if response.status_code == 200:
                 pass
                 time.sleep(10)
@@ -2685,10 +2446,7 @@ def system_erase(script_examples="", get_supported_components="", erase_componen
         \n - IdracRedfishSupport.system_erase(erase_components="LCData,CryptographicErasePD,IDRAC"), this example will excute system erase to erase Lifecycle Controller data, crypto erase drives and reset iDRAC to default settings.""")
     else:
         if get_supported_components:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]))
             data = response.json()
             if response.status_code == 401:
                 logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2711,12 +2469,8 @@ def system_erase(script_examples="", get_supported_components="", erase_componen
             logging.info("\n- INFO, component(s) selected for System Erase operation -\n")
             for i in payload["Component"]:
                 print(i)
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             data = response.json()
             if response.status_code == 202:
                 logging.info("\n- PASS: POST command passed for %s method, status code 202 returned" % method)
@@ -2733,20 +2487,14 @@ def system_erase(script_examples="", get_supported_components="", erase_componen
             logging.info("- PASS, job ID %s successfuly created for %s method" % (job_id, method))
             start_time=datetime.now()
             count_number = 0
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
             data = response.json()
             logging.info("- INFO, job status not completed, current status: \"%s\"" % (data['Message']))
             start_job_status_message = data['Message']
             retry_count = 1
             while True:
                 try:
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 except:
                     if retry_count == 10:
                         logging.info("- INFO, retry count of 10 has been reached to communicate with iDRAC, script will exit")
@@ -2763,7 +2511,7 @@ def system_erase(script_examples="", get_supported_components="", erase_componen
                     print("\n- FAIL, Command failed to check job status, return code %s" % response.status_code)
                 data = response.json()
                 new_job_status_message = data['Message']
-                if str(current_time)[0:7] >= "2:00:00":
+                if current_time >= timedelta(hours=2):
                     logging.error("\n- FAIL: Timeout of 2 hours has elapsed, script stopped\n")
                     return
                 elif data['JobState'] == "Failed" or "Fail" in data['Message'] or "Unable" in data['Message'] or "Invalid" in data['Message'] or "fail" in data['Message'] or "Cannot" in data['Message'] or "cannot" in data['Message']:
@@ -2798,17 +2546,8 @@ def get_iDRAC_attribute_registry(script_examples="", attribute_name=""):
     else:
         if attribute_name:
             print("\n")
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Registries/ManagerAttributeRegistry/ManagerAttributeRegistry.v1_0_0.json' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Registries/ManagerAttributeRegistry/ManagerAttributeRegistry.v1_0_0.json' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-            data = response.json()
-            if response.status_code == 401:
-                    logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
-                    return
-            elif response.status_code != 200:
-                logging.error("\n- FAIL, GET command failed, status code %s returned" % (method, response.status_code))
-                logging.error("\n- Detailed failure results:\n %s" % data)
+            data = _get_registry(IDRAC_REGISTRY_URI)
+            if data is None:
                 return
             found = ""
             for i in data['RegistryEntries']['Attributes']:
@@ -2824,16 +2563,10 @@ def get_iDRAC_attribute_registry(script_examples="", attribute_name=""):
                 os.remove("iDRAC_attribute_registry.txt")
             except:
                 pass
-            open_file = open("iDRAC_attribute_registry.txt","a")
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Registries/ManagerAttributeRegistry/ManagerAttributeRegistry.v1_0_0.json' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Registries/ManagerAttributeRegistry/ManagerAttributeRegistry.v1_0_0.json' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-            data = response.json()
-            if response.status_code != 200:
-                logging.error("\n- FAIL, GET command failed, status code %s returned" % (method, response.status_code))
-                logging.error("\n- Detailed failure results:\n %s" % data)
+            data = _get_registry(IDRAC_REGISTRY_URI)
+            if data is None:
                 return
+            open_file = open("iDRAC_attribute_registry.txt","a")
             for i in data['RegistryEntries']['Attributes']:
                 pprint(i)
                 print("\n")
@@ -2863,10 +2596,7 @@ def get_iDRAC_attributes(script_examples="", group_name="", attribute_name=""):
             else:
                 print("- INFO, either missing or incorrect value for group_name argument")
                 return
-            if x_auth_token == "yes":
-                response = requests.get(uri,verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get(uri,verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get(uri)
             data = response.json()
             if response.status_code == 401:
                 logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2925,10 +2655,7 @@ def set_iDRAC_attributes(script_examples="", group_name="", attribute_names="",
         else:
             print("- INFO, either missing or incorrect value for group_name argument")
             return
-        if x_auth_token == "yes":
-            response = requests.get(uri,verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get(uri,verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get(uri)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -2943,16 +2670,10 @@ def set_iDRAC_attributes(script_examples="", group_name="", attribute_names="",
         for i,ii in zip(attribute_names_list, attribute_values_list):
             payload["Attributes"][i] = ii
         print("\n- INFO, configuring \"%s\" attributes\n" % group_name.upper())
+        data = _get_registry(IDRAC_REGISTRY_URI)
+        if data is None:
+            return
         for i in payload["Attributes"].items():
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Registries/ManagerAttributeRegistry/ManagerAttributeRegistry.v1_0_0.json' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Registries/ManagerAttributeRegistry/ManagerAttributeRegistry.v1_0_0.json' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-            data = response.json()
-            if response.status_code != 200:
-                logging.error("\n- FAIL, GET command failed, status code %s returned" % (response.status_code))
-                logging.error("\n- Detailed failure results:\n %s" % data)
-                return
             for ii in data['RegistryEntries']['Attributes']:
                 if i[0] in ii.values():
                     for iii in ii.items():
@@ -2961,12 +2682,8 @@ def set_iDRAC_attributes(script_examples="", group_name="", attribute_names="",
                                 payload["Attributes"][i[0]] = int(i[1])
         for i in payload["Attributes"].items():
             print(" Attribute Name: %s, setting new value to: %s" % (i[0], i[1]))
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(uri, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(uri, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(uri, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("\n- PASS, PATCH command passed to successfully set \"%s\" attribute(s), status code %s returned\n" % (group_name.upper(), response.status_code))
@@ -2986,10 +2703,7 @@ def export_hardware_inventory(script_examples="", get_supported_share_types="",
         \n- IdracRedfishSupport.export_hardware_inventory(export_hw_inventory=True, share_type="local", filename="R740_HW_inv.xml"), this example will export server HW inventory locally.
         \n- IdracRedfishSupport.export_hardware_inventory(export_hw_inventory=True, share_type="NFS", filename="R650_HW_inv.xml", share_ip="192.168.0.130", share_name="/nfs"), this example will export HW inventory to NFS share.""")
     elif get_supported_share_types:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3025,12 +2739,8 @@ def export_hardware_inventory(script_examples="", get_supported_share_types="",
             payload["Password"] = share_password
         if ignore_cert_warning:
             payload["IgnoreCertWarning"] = ignore_cert_warning
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 202:
             logging.info("\n- PASS: POST command passed for %s method, status code 202 returned" % method)
@@ -3041,10 +2751,7 @@ def export_hardware_inventory(script_examples="", get_supported_share_types="",
             return
         if share_type.lower() == "local":
             if response.headers['Location'] == "/redfish/v1/Dell/hwinv.xml":
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                response = transport.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']))
                 if filename:
                     export_filename = filename
                 else:
@@ -3066,17 +2773,14 @@ def export_hardware_inventory(script_examples="", get_supported_share_types="",
             from datetime import datetime
             start_time=datetime.now()
             while True:
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 current_time=(datetime.now()-start_time)
                 if response.status_code != 200:
                     logging.error("\n- FAIL, Command failed to check job status, return code %s" % statusCode)
                     logging.error("Extended Info Message: {0}".format(response.json()))
                     return
                 data = response.json()
-                if str(current_time)[0:7] >= "0:05:00":
+                if current_time >= timedelta(minutes=5):
                     logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
                     return
                 elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed" or "Unable" in data['Message']:
@@ -3104,10 +2808,7 @@ def export_iDRAC_lifecycle_logs(script_examples="", get_supported_share_types=""
         \n- IdracRedfishSupport.export_iDRAC_lifecycle_logs(export_lc_logs=True, share_type="local", filename="R740_LC_logs.xml"), this example will export iDRAC LC logs locally.
         \n- IdracRedfishSupport.export_iDRAC_lifecycle_logs(export_lc_logs=true, share_type="NFS", filename="R650_LC_logs.xml", share_ip="192.168.0.130", share_name="/nfs"), this example will export iDRAC LC logs to NFS share.""")
     elif get_supported_share_types:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3143,12 +2844,8 @@ def export_iDRAC_lifecycle_logs(script_examples="", get_supported_share_types=""
             payload["Password"] = share_password
         if ignore_cert_warning:
             payload["IgnoreCertWarning"] = ignore_cert_warning
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 202:
             logging.info("\n- PASS: POST command passed for %s method, status code 202 returned" % method)
@@ -3159,10 +2856,7 @@ def export_iDRAC_lifecycle_logs(script_examples="", get_supported_share_types=""
             return
         if share_type.lower() == "local":
             if response.headers['Location'] == "/redfish/v1/Dell/lclog.xml":
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                response = transport.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']))
                 if filename:
                     export_filename = filename
                 else:
@@ -3183,17 +2877,14 @@ def export_iDRAC_lifecycle_logs(script_examples="", get_supported_share_types=""
             logging.info("- PASS, job ID %s successfuly created for %s method\n" % (job_id, method))
             start_time = datetime.now()
             while True:
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 current_time = (datetime.now()-start_time)
                 if response.status_code != 200:
                     logging.error("\n- FAIL, Command failed to check job status, return code %s" % response.status_code)
                     logging.error("Extended Info Message: {0}".format(response.json()))
                     return
                 data = response.json()
-                if str(current_time)[0:7] >= "0:05:00":
+                if current_time >= timedelta(minutes=5):
                     logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
                     return
                 elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed" or "Unable" in data['Message']:
@@ -3221,10 +2912,7 @@ def export_server_factory_configuration(script_examples="", get_supported_share_
         \n- IdracRedfishSupport.export_server_factory_configuration(export_factory_config=True, share_type="local"), this example will export factory configuration XML file locally. 
         \n- IdracRedfishSupport.export_server_factory_configuration(export_factory_config=True, share_type="NFS", filename="R740_factory_config.xml", share_ip="192.168.0.130), this example will export server factory configuration to NFS share.""")
     elif get_supported_share_types:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3260,12 +2948,8 @@ def export_server_factory_configuration(script_examples="", get_supported_share_
             payload["Password"] = share_password
         if ignore_cert_warning:
             payload["IgnoreCertWarning"] = ignore_cert_warning
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 202:
             logging.info("\n- PASS: POST command passed for %s method, status code 202 returned" % method)
@@ -3277,10 +2961,7 @@ def export_server_factory_configuration(script_examples="", get_supported_share_
         if share_type.lower() == "local":
             if response.headers['Location'] == "/redfish/v1/Dell/factoryconfig.xml":
                 while True:
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']), verify=creds["verify_cert"], headers={'X-Auth-Token': creds["idrac_x_auth_token"]})   
-                    else:
-                        response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']))
                     export_filename = "factoryconfig.xml"    
                     with open(export_filename, "wb") as output:
                         output.write(response.content)
@@ -3299,10 +2980,7 @@ def export_server_factory_configuration(script_examples="", get_supported_share_
             logging.info("- PASS, job ID %s successfuly created for %s method\n" % (job_id, method))
             start_time = datetime.now()
             while True:
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
                 current_time = (datetime.now()-start_time)
                 if response.status_code == 401:
                     logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3312,7 +2990,7 @@ def export_server_factory_configuration(script_examples="", get_supported_share_
                     logging.error("Extended Info Message: {0}".format(response.json()))
                     return
                 data = response.json()
-                if str(current_time)[0:7] >= "0:05:00":
+                if current_time >= timedelta(minutes=5):
                     logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
                     return
                 elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed" or "Unable" in data['Message']:
@@ -3344,12 +3022,8 @@ def export_server_screen_shot(script_examples="", file_type=""):
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.ExportServerScreenShot' % (creds["idrac_ip"])
         method = "ExportServerScreenShot"
         payload["FileType"] = file_type
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3381,12 +3055,8 @@ def export_server_video_log(script_examples="", file_type=""):
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.ExportVideoLog' % (creds["idrac_ip"])
         method = "ExportVideoLog"
         payload={"ShareType":"Local","FileType":file_type}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3405,10 +3075,7 @@ def export_server_video_log(script_examples="", file_type=""):
             logging.error("- FAIL, unable to locate video capture URI in POST response output")
             return
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']), verify=creds["verify_cert"], headers={'X-Auth-Token': creds["idrac_x_auth_token"]})   
-            else:
-                response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']))
             export_filename = "bootlogs.zip"    
             with open(export_filename, "wb") as output:
                 output.write(response.content)
@@ -3424,10 +3091,7 @@ def export_server_thermal_history(script_examples="", get_supported_share_types=
         print("""\n- IdracRedfishSupport.export_server_thermal_history(get_supported_share_types=True), this example will get supported share types for export.
         \n- IdracRedfishSupport.export_server_thermal_history(export_thermal_history=True, share_ip="192.168.0.130", share_type="NFS", share_name="/nfs", filename="r740_thermal_history.csv", file_type="CSV"), this example will export thermal history to NFS share in CSV file format.""")
     elif get_supported_share_types:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellMetricService' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellMetricService' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellMetricService' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3460,12 +3124,8 @@ def export_server_thermal_history(script_examples="", get_supported_share_types=
             payload["UserName"] = share_username
         if share_password:
             payload["Password"] = share_password
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 202:
             logging.info("\n- PASS: POST command passed for %s method, status code 202 returned" % method)
@@ -3482,17 +3142,14 @@ def export_server_thermal_history(script_examples="", get_supported_share_types=
         logging.info("- PASS, job ID %s successfuly created for %s method\n" % (job_id, method))
         start_time = datetime.now()
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
             current_time=(datetime.now()-start_time)
             if response.status_code != 200:
                 logging.error("\n- FAIL, Command failed to check job status, return code %s" % response.status_code)
                 logging.error("Extended Info Message: {0}".format(response.json()))
                 return
             data = response.json()
-            if str(current_time)[0:7] >= "0:05:00":
+            if current_time >= timedelta(minutes=5):
                 logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
                 return
             elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed" or "Unable" in data['Message']:
@@ -3527,12 +3184,8 @@ def convert_drives_RAID(script_examples="", drives=""):
         else:
             convert_drives = [drives]
         payload={"PDArray": convert_drives}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3568,12 +3221,8 @@ def convert_drives_nonRAID(script_examples="", drives=""):
         else:
             convert_drives = [drives]
         payload={"PDArray": convert_drives}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3606,12 +3255,8 @@ def export_clear_serial_datalogs(script_examples="", enable_capture_serial="", e
     elif enable_capture_serial:
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % creds["idrac_ip"]
         payload = {"Attributes":{"SerialCapture.1.Enable":"Enabled","Serial.1.Enable":"Enabled"}}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3631,12 +3276,8 @@ def export_clear_serial_datalogs(script_examples="", enable_capture_serial="", e
         method = "SerialDataExport"
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/SerialInterfaces/Serial.1/Actions/Oem/DellSerialInterface.SerialDataExport' % (creds["idrac_ip"])
         payload={}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 200:
             logging.info("\n- PASS: POST command passed for %s method, status code %s returned" % (method, response.status_code))
         else:
@@ -3664,12 +3305,8 @@ def export_clear_serial_datalogs(script_examples="", enable_capture_serial="", e
         method = "SerialDataClear"
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/SerialInterfaces/Serial.1/Actions/Oem/DellSerialInterface.SerialDataClear' % (creds["idrac_ip"])
         payload={}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 204:
             logging.info("\n- PASS: POST command passed for %s method, status code %s returned" % (method, response.status_code))
         else:
@@ -3679,12 +3316,8 @@ def export_clear_serial_datalogs(script_examples="", enable_capture_serial="", e
     elif disable_capture_serial:
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % creds["idrac_ip"]
         payload = {"Attributes":{"SerialCapture.1.Enable":"Disabled"}}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("\n- PASS, PATCH command passed to successfully disable attribute for serial data capture, status code %s returned\n" % response.status_code)
@@ -3708,12 +3341,8 @@ def supportassist_status_accept_EULA(script_examples="", get_EULA_status="", acc
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.SupportAssistAcceptEULA' % (creds["idrac_ip"])
         method = "SupportAssistAcceptEULA"
         payload = {}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3728,12 +3357,8 @@ def supportassist_status_accept_EULA(script_examples="", get_EULA_status="", acc
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.SupportAssistGetEULAStatus' % (creds["idrac_ip"])
         method = "SupportAssistGetEULAStatus"
         payload = {}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3760,12 +3385,8 @@ def supportassist_register(script_examples="", get_register_status="", register=
     elif get_register_status:
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.SupportAssistGetEULAStatus' % (creds["idrac_ip"])
         payload = {}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3780,12 +3401,8 @@ def supportassist_register(script_examples="", get_register_status="", register=
     elif register and city and companyname and country and firstname and lastname and phonenumber and state and street and zipcode:            
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % creds["idrac_ip"]
         payload = {"Attributes":{"OS-BMC.1.AdminState":"Enabled"}}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3802,12 +3419,8 @@ def supportassist_register(script_examples="", get_register_status="", register=
         print("\n- Parameters passed in for SupportAssistRegister action -\n")
         for i in payload.items():
             print ("%s: %s" % (i[0], i[1]))
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 200 or response.status_code == 202:
             logging.info("\n- PASS, SupportAssistRegister action passed, status code %s returned" % response.status_code)
         else:
@@ -3826,10 +3439,7 @@ def export_support_assist_collection(script_examples="", get_supported_share_typ
         \n- IdracRedfishSupport.export_support_assist_collection(export_collection=True, share_type="Local",data_selector="HWData"), this example shows exporting SupportAssist collection locally.
         \n- IdracRedfishSupport.export_support_assist_collection(export_collection=True, share_type="NFS",data_selector="HWData,TTYLogs",share_name="/nfs",share_ip="192.168.0.130"), this example shows exporting SupportAssist collection to NFS share.""")
     elif get_supported_share_types:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService' % (creds["idrac_ip"]))
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3870,12 +3480,8 @@ def export_support_assist_collection(script_examples="", get_supported_share_typ
                 payload["DataSelectorArrayIn"] = data_selector
             else:
                 payload["DataSelectorArrayIn"] = [data_selector]
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -3895,10 +3501,7 @@ def export_support_assist_collection(script_examples="", get_supported_share_typ
         logging.info("- PASS, job ID %s successfuly created for %s method\n" % (job_id, method))
         start_time = datetime.now()
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
             current_time=(datetime.now()-start_time)
             if response.status_code != 200:
                 logging.error("\n- FAIL, Command failed to check job status, return code %s" % response.status_code)
@@ -3908,10 +3511,7 @@ def export_support_assist_collection(script_examples="", get_supported_share_typ
             try:
                 if response.headers['Location'] == "/redfish/v1/Dell/sacollect.zip" or response.headers['Location'] == "/redfish/v1/Oem/Dell/sacollect.zip":
                     logging.info("- PASS, job ID %s successfully marked completed" % job_id)
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']), verify=creds["verify_cert"], headers={'X-Auth-Token': creds["idrac_x_auth_token"]})   
-                    else:
-                        response = requests.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s%s' % (creds["idrac_ip"], response.headers['Location']))
                     SA_export_filename = "sacollect.zip"    
                     with open(SA_export_filename, "wb") as output:
                         output.write(response.content)
@@ -3922,7 +3522,7 @@ def export_support_assist_collection(script_examples="", get_supported_share_typ
                     logging.error("- ERROR, unable to locate SA collection URI in headers output, JSON response: \n%s" % data)
                     return
             except:
-                if str(current_time)[0:7] >= "1:00:00":
+                if current_time >= timedelta(hours=1):
                     logging.error("\n- FAIL: Timeout of 1 hour has been hit, script stopped\n")
                     return
                 elif data['JobState'] == "CompletedWithErrors":
@@ -3941,10 +3541,7 @@ def export_support_assist_collection(script_examples="", get_supported_share_typ
                             pass
                         else:
                             print("%s: %s" % (i[0],i[1]))
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % (creds["idrac_ip"]),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % (creds["idrac_ip"]),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1' % (creds["idrac_ip"]))
                     data = response.json()
                     service_tag = data['Oem']['Dell']['DellSystem']['NodeID']
                     logging.info("\n- SA exported log file located on your network share should be in ZIP format with server service tag \"%s\" in the file name" % service_tag)
@@ -3956,19 +3553,17 @@ def export_support_assist_collection(script_examples="", get_supported_share_typ
         logging.warning("- WARNING, missing arguments or incorrect argument values passed in. Check help text and script examples for more details")
         return
     
-def firmware_update_multipart_upload(script_examples="", get_fw_inventory="", fw_image_path="", reboot=""):
-    """Function to either get current firmware inventory or update firmware for one supported device. Supported function arguments: (get_fw_inventory (possible value: True), firmware_image_path (pass in the complete directory path with firmware image name. Firmware image must be Windows Dell Update Package EXE file) and reboot (supported values: yes and no). Reboot server is required for certain devices to apply the firmware (Examples: BIOS, NIC, PERC). Refer to iDRAC user guide update section for more details."""
+def firmware_update_multipart_upload(script_examples="", get_fw_inventory="", fw_image_path="", reboot="", max_upload_rate=""):
+    """Function to either get current firmware inventory or update firmware for one supported device. Supported function arguments: (get_fw_inventory (possible value: True), firmware_image_path (pass in the complete directory path with firmware image name. Firmware image must be Windows Dell Update Package EXE file) and reboot (supported values: yes and no). Reboot server is required for certain devices to apply the firmware (Examples: BIOS, NIC, PERC). Refer to iDRAC user guide update section for more details. max_upload_rate (optional, max upload bandwidth in MB per second, firmware image is streamed from disk and upload progress is reported)."""
     global job_id
     if script_examples:
         print("""\n- IdracRedfishSupport.firmware_update_multipart_upload(fw_image_path="C:\\Users\\administrator\\Downloads\\Diags_R650.EXE"), this example will update DIAGS. This device is an immediate update so no reboot argument is needed.
         \n- IdracRedfishSupport.firmware_update_multipart_upload(fw_image_path="C:\\Users\\administrator\\Downloads\\H745_A16.EXE",reboot="no"), this example shows updating H745 storage controller. Update job is scehduled but will not auto reboot. Update job will execute on next server manual reboot.
-        \n- IdracRedfishSupport.firmware_update_multipart_upload(fw_image_path="C:\\Users\\administrator\\Downloads\\H745_A16.EXE",reboot="yes"), this example will reboot the server now to update H745 storage controller.""")
+        \n- IdracRedfishSupport.firmware_update_multipart_upload(fw_image_path="C:\\Users\\administrator\\Downloads\\H745_A16.EXE",reboot="yes"), this example will reboot the server now to update H745 storage controller.
+        \n- IdracRedfishSupport.firmware_update_multipart_upload(fw_image_path="C:\\Users\\administrator\\Downloads\\iDRAC_6.10.00.00_A00.EXE",max_upload_rate=20), this example will update iDRAC limiting the firmware image upload to 20 MB per second.""")
     elif get_fw_inventory:
         logging.info("\n- INFO, getting current firmware inventory for iDRAC %s -\n" % creds["idrac_ip"])
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/UpdateService/FirmwareInventory?$expand=*($levels=1)' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/UpdateService/FirmwareInventory?$expand=*($levels=1)' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/UpdateService/FirmwareInventory?$expand=*($levels=1)' % creds["idrac_ip"])
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -3994,11 +3589,7 @@ def firmware_update_multipart_upload(script_examples="", get_fw_inventory="", fw
             payload = {"Targets": [], "@Redfish.OperationApplyTime": "OnReset", "Oem": {}}
         files = {"UpdateParameters": (None, json.dumps(payload), "application/json"),
              "UpdateFile": (os.path.basename(fw_image_path), open(fw_image_path, "rb"), "application/octet-stream")}
-        if x_auth_token == "yes":
-            headers = {'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, files=files, headers=headers, verify=creds["verify_cert"])
-        else:
-            response = requests.post(url, files=files, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        response = post_multipart(url, files, transport=transport, max_rate=float(max_upload_rate) if max_upload_rate else None)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4019,11 +3610,9 @@ def firmware_update_multipart_upload(script_examples="", get_fw_inventory="", fw
             if retry_count == 20:
                 logging.warning("- WARNING, GET command retry count of 20 has been reached, script will exit")
                 return
+            current_time = datetime.now() - start_time
             try:
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                response = transport.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id))
             except requests.ConnectionError as error_message:
                 logging.info("- INFO, GET request failed due to connection error, retry")
                 time.sleep(10)
@@ -4039,12 +3628,11 @@ def firmware_update_multipart_upload(script_examples="", get_fw_inventory="", fw
                 logging.info("\n- INFO, job ID marked completed, detailed final job status results:\n")
                 for i in data['Oem']['Dell'].items():
                     print("%s: %s" % (i[0],i[1]))
-                logging.info("\n- JOB ID %s completed in %s" % (job_id, current_time))
+                logging.info("\n- JOB ID %s completed in %s" % (job_id, str(current_time)[0:7]))
                 return
-            current_time = str(datetime.now()-start_time)[0:7]   
             data = response.json()
             message_string = data["Messages"]
-            if str(current_time)[0:7] >= "0:30:00":
+            if current_time >= timedelta(minutes=30):
                 logging.error("\n- FAIL: Timeout of 30 minutes has been hit, update job should of already been marked completed. Check the iDRAC job queue and LC logs to debug the issue\n")
                 return
             elif "failed" in data['Oem']['Dell']['Message'] or "completed with errors" in data['Oem']['Dell']['Message'] or "Failed" in data['Oem']['Dell']['Message']:
@@ -4083,10 +3671,7 @@ def set_next_onetime_boot_device(script_examples="", get_supported_devices="", s
         \n- IdracRedfishSupport.set_next_onetime_boot_device(set_onetime_boot="Cd", reboot="yes"), this example will set next onetime boot device to Cd and reboot the server now.
         \n- IdracRedfishSupport.set_next_onetime_boot_device(set_onetime_boot="UefiTarget", uefi_device_path="3A191845-5F86-4E78-8FCE-C4CFF59F9DAA", reboot="no"), this example will set next onetime boot to UEFI device target path. Server will not reboot now but flag is still set, onetime boot will occur on next server manual reboot.""")
     elif get_supported_devices:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1' % creds["idrac_ip"])
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4103,10 +3688,7 @@ def set_next_onetime_boot_device(script_examples="", get_supported_devices="", s
         logging.info("\n- INFO, next server reboot onetime boot setting currently set to \"%s\"" % data['Boot']['BootSourceOverrideTarget'])
         return
     elif get_uefi_device_paths:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/BootOptions?$expand=*($levels=1)' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/BootOptions?$expand=*($levels=1)' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/BootOptions?$expand=*($levels=1)' % creds["idrac_ip"])
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4131,12 +3713,8 @@ def set_next_onetime_boot_device(script_examples="", get_supported_devices="", s
           payload = {"Boot":{"BootSourceOverrideTarget":set_onetime_boot,"UefiTargetBootSourceOverride":uefi_device_path}}
         else:
           payload = {"Boot":{"BootSourceOverrideTarget":set_onetime_boot}}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         time.sleep(5)
         if response.status_code == 401:
@@ -4173,10 +3751,7 @@ def export_import_iDRAC_license(script_examples="", get_license_info="", get_net
         \n- IdracRedfishSupport.export_import_iDRAC_license(import_license=True, share_type="NFS", share_ip="192.168.0.121", share_name="/nfs",license_filename="iDRAC_Enterprise_license.xml"), this example will import iDRAC license from NFS share.
         \n- IdracRedfishSupport.export_import_iDRAC_license(license_id="FD00000021942269", delete_license=True), this example will delete iDRAC license with Id FD00000021942269.""")
     elif get_license_info:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseCollection' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseCollection' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseCollection' % creds["idrac_ip"])
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4192,10 +3767,7 @@ def export_import_iDRAC_license(script_examples="", get_license_info="", get_net
                 pprint(i)
                 print("\n")
     elif get_network_share_types:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseManagementService' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseManagementService' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseManagementService' % creds["idrac_ip"])
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4211,12 +3783,8 @@ def export_import_iDRAC_license(script_examples="", get_license_info="", get_net
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseManagementService/Actions/DellLicenseManagementService.ExportLicense' % (creds["idrac_ip"])
         method = "ExportLicense"
         payload={"EntitlementID":license_id}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4249,12 +3817,8 @@ def export_import_iDRAC_license(script_examples="", get_license_info="", get_net
         filename_open.close()
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseManagementService/Actions/DellLicenseManagementService.ImportLicense' % (creds["idrac_ip"])
         payload = {"FQDD":"iDRAC.Embedded.1","ImportOptions":"Force","LicenseFile":read_file}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4268,12 +3832,8 @@ def export_import_iDRAC_license(script_examples="", get_license_info="", get_net
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLicenseManagementService/Actions/DellLicenseManagementService.DeleteLicense' % (creds["idrac_ip"])
         method = "DeleteLicense"
         payload={"EntitlementID":license_id,"DeleteOptions":"Force"}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4308,12 +3868,8 @@ def export_import_iDRAC_license(script_examples="", get_license_info="", get_net
             payload["Password"] = share_password
         if ignore_certwarning:
             payload["IgnoreCertificateWarning"] = ignore_certwarning
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4334,10 +3890,7 @@ def export_import_iDRAC_license(script_examples="", get_license_info="", get_net
         start_time = datetime.now()
         time.sleep(3)
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id),verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
             current_time=(datetime.now()-start_time)
             if response.status_code == 200:
                 logging.info("- PASS, GET command passed to get job status details")
@@ -4346,7 +3899,7 @@ def export_import_iDRAC_license(script_examples="", get_license_info="", get_net
                 logging.error("Extended Info Message: {0}".format(req.json()))
                 return
             data = response.json()
-            if str(current_time)[0:7] >= "0:05:00":
+            if current_time >= timedelta(minutes=5):
                 logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
                 return
             elif "Fail" in data['Message'] or "fail" in data['Message'] or data['JobState'] == "Failed":
@@ -4371,10 +3924,7 @@ def generate_replace_iDRAC_CSR(script_examples="", get_current_certs="", generat
         \n- IdracRedfishSupport.generate_replace_iDRAC_CSR(generate_CSR=True, city="Austin", state="Texas", country="US", email="tester@dell.com", org="PG", orgunit="test", common_name="product test"), this example shows generating new iDRAC CSR.
         \n- IdracRedfishSupport.generate_replace_iDRAC_CSR(replace_CSR="SecurityCertificate.1", CSR_filename="signed_CSR_cert.cer"), this example will replace cert Id SecurityCertificate.1 with new signed CSR cert file.""")
     elif get_current_certs:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4390,20 +3940,14 @@ def generate_replace_iDRAC_CSR(script_examples="", get_current_certs="", generat
             for i in data["Members"]:
                 for ii in i.items():
                     print("\n- Details for cert \"%s\"\n" % ii[1].split("/")[-1])
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s%s' % (creds["idrac_ip"], ii[1]), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s%s' % (creds["idrac_ip"], ii[1]), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s%s' % (creds["idrac_ip"], ii[1]))
                     data = response.json()
                     for i in data.items():
                         pprint(i)
                     print("\n")
     elif generate_CSR:
         logging.info("\n- INFO, generating CSR for iDRAC %s, this may take a few seconds to complete\n" % creds["idrac_ip"])
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4418,22 +3962,15 @@ def generate_replace_iDRAC_CSR(script_examples="", get_current_certs="", generat
             payload = {"CertificateCollection":"/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates","City":city,"CommonName":common_name,"Country":country,"Organization":org,"OrganizationalUnit":orgunit,"State":state}   
         if email:
             payload["Email"] = email
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data_post = response.json()
         if response.status_code != 200:
             logging.error("- FAIL, generate CSR failed, status code %s returned, detailed error results: \n%s" % (response.status_code, data_post))
             return
         logging.info("\n- INFO, CSR generated for iDRAC %s\n" % creds["idrac_ip"])
         logging.info(data_post["CSRString"])
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Chassis/System.Embedded.1' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Chassis/System.Embedded.1' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Chassis/System.Embedded.1' % creds["idrac_ip"])
         data_get = response.json()
         if response.status_code == 200:
             model_name = data_get["Model"].replace(" ","")
@@ -4450,10 +3987,7 @@ def generate_replace_iDRAC_CSR(script_examples="", get_current_certs="", generat
             x.writelines(data_post["CSRString"])
         logging.info("\n- Generated CSR also copied to file \"%s\"" % filename)
     elif replace_CSR:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4473,12 +4007,8 @@ def generate_replace_iDRAC_CSR(script_examples="", get_current_certs="", generat
             payload = {"CertificateType": "PEM","CertificateUri":{"@odata.id":"/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates/%s" % replace_CSR},"CertificateString":read_file}
         else:
             payload = {"CertificateType": "PEM","CertificateUri":"/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates/%s" % replace_CSR,"CertificateString":read_file}   
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 202:
             logging.info("\n- PASS, replace CSR cert passed. iDRAC reset is needed for new cert to get applied.")
@@ -4492,12 +4022,8 @@ def generate_replace_iDRAC_CSR(script_examples="", get_current_certs="", generat
         else:   
             url = "https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Actions/Manager.Reset/" % creds["idrac_ip"]
             payload={"ResetType":"GracefulRestart"}
-            if x_auth_token == "yes":
-                headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-            else:
-                headers = {'content-type': 'application/json'}
-                response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+            headers = {'content-type': 'application/json'}
+            response = transport.post(url, data=json.dumps(payload), headers=headers)
             if response.status_code == 204:
                 logging.info("\n- PASS, status code %s returned for POST command to reset iDRAC\n" % response.status_code)
             else:
@@ -4518,10 +4044,7 @@ def export_import_iDRAC_certs(script_examples="", get_current_certs="", get_cert
         \n- IdracRedfishSupport.export_import_iDRAC_certs(export_cert="Server"), this example will export iDRAC server cert.
         \n- IdracRedfishSupport.export_import_iDRAC_certs(import_cert="ClientTrustCertificate", cert_filename="signed_cert.pem"), this example will import client trust cert signed pem file.""")
     elif get_current_certs:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/NetworkProtocol/HTTPS/Certificates' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4537,18 +4060,12 @@ def export_import_iDRAC_certs(script_examples="", get_current_certs="", get_cert
             for i in data["Members"]:
                 for ii in i.items():
                     print("\n- Details for cert \"%s\"\n" % ii[1].split("/")[-1])
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s%s' % (creds["idrac_ip"], ii[1]), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s%s' % (creds["idrac_ip"], ii[1]), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s%s' % (creds["idrac_ip"], ii[1]))
                     data = response.json()
                     for i in data.items():
                         pprint(i)
     elif get_cert_types:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DelliDRACCardService' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DelliDRACCardService' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DelliDRACCardService' % creds["idrac_ip"])
         data = response.json()
         if response.status_code != 200:
             logging.error("\n- ERROR, GET commmand failed to get cert types supported for export/import cert operations, status code %s returned" % response.status_code)
@@ -4569,12 +4086,8 @@ def export_import_iDRAC_certs(script_examples="", get_current_certs="", get_cert
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DelliDRACCardService/Actions/DelliDRACCardService.ExportSSLCertificate' % (creds["idrac_ip"])
         method = "ExportSSLCertificate"
         payload={"SSLCertType":export_cert}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4608,12 +4121,8 @@ def export_import_iDRAC_certs(script_examples="", get_current_certs="", get_cert
         payload={"CertificateType":import_cert,"SSLCertificateFile":read_file}
         if cert_passphrase:
             payload["Passphrase"] = cert_passphrase
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -4627,12 +4136,8 @@ def export_import_iDRAC_certs(script_examples="", get_current_certs="", get_cert
                 url = "https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Actions/Manager.Reset/" % creds["idrac_ip"]
                 payload={"ResetType":"GracefulRestart"}
                 headers = {'content-type': 'application/json'}
-                if x_auth_token == "yes":
-                    headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-                else:
-                    headers = {'content-type': 'application/json'}
-                    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+                headers = {'content-type': 'application/json'}
+                response = transport.post(url, data=json.dumps(payload), headers=headers)
                 if response.status_code == 204:
                     logging.info("\n- PASS, status code %s returned for POST command to reboot iDRAC\n" % response.status_code)
                 else:
@@ -4661,10 +4166,7 @@ def create_delete_iDRAC_subscriptions(script_examples="", get_subscriptions="",
         \n- IdracRedfishSupport.create_delete_iDRAC_subscriptions(submit_test_event=True, destination_uri="https://192.168.0.140", event_type="Alert", message_id="TMP0118"), this example shows submitting a test event to subscription destination https://192.168.0.140.
         \n- IdracRedfishSupport.create_delete_iDRAC_subscriptions(delete_subscription_uri="/redfish/v1/EventService/Subscriptions/e507a4bc-ac8a-11ec-ad0d-b07b25d2e318"), this example shows deleting subscription.""")
     elif get_subscriptions:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/EventService/Subscriptions?$expand=*($levels=1)' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/EventService/Subscriptions?$expand=*($levels=1)' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/EventService/Subscriptions?$expand=*($levels=1)' % creds["idrac_ip"])
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4685,10 +4187,7 @@ def create_delete_iDRAC_subscriptions(script_examples="", get_subscriptions="",
             print("\n")
 
     elif create_subscription:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % creds["idrac_ip"])
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4706,12 +4205,8 @@ def create_delete_iDRAC_subscriptions(script_examples="", get_subscriptions="",
                 logging.info("\n- INFO, iDRAC version detected does not support PATCH to set iDRAC attributes, executing Server Configuration Profile feature set iDRAC attribute \"IPMILan.1#AlertEnable\" locally\n")
                 url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Actions/Oem/EID_674_Manager.ImportSystemConfiguration' % idrac_ip
                 payload = {"ImportBuffer":"<SystemConfiguration><Component FQDD=\"iDRAC.Embedded.1\"><Attribute Name=\"IPMILan.1#AlertEnable\">Enabled</Attribute></Component></SystemConfiguration>","ShareParameters":{"Target":"All"}}
-                if x_auth_token == "yes":
-                    headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-                else:
-                    headers = {'content-type': 'application/json'}
-                    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+                headers = {'content-type': 'application/json'}
+                response = transport.post(url, data=json.dumps(payload), headers=headers)
                 create_dict = str(response.__dict__)
                 try:
                     job_id_search = re.search("JID_.+?,",create_dict).group()
@@ -4729,10 +4224,7 @@ def create_delete_iDRAC_subscriptions(script_examples="", get_subscriptions="",
                 job_id = response_output["headers"]["Location"]
                 job_id = re.search("JID_.+",job_id).group()
                 while True:
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                    response = transport.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id))
                     data = req.json()
                     message_string = data["Messages"]
                     final_message_string = str(message_string)
@@ -4772,18 +4264,14 @@ def create_delete_iDRAC_subscriptions(script_examples="", get_subscriptions="",
                 logging.info("- INFO, current value for iDRAC attribute \"IPMILan.1.AlertEnable\" is set to Disabled, setting value to Enabled")
                 payload = {"Attributes":{"IPMILan.1.AlertEnable":"Enabled"}}
                 url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % creds["idrac_ip"]
-                if x_auth_token == "yes":
-                    headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-                    response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-                else:
-                    headers = {'content-type': 'application/json'}
-                    response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+                headers = {'content-type': 'application/json'}
+                response = transport.patch(url, data=json.dumps(payload), headers=headers)
                 if response.status_code == 200:
                     logging.error("- PASS, PATCH command passed to set iDRAC attribute \"IPMILan.1.AlertEnable\" to enabled")
                 else:
                     logging.error("- FAIL, PATCH command failed to set iDRAC attribute \"IPMILan.1.AlertEnable\" to enabled")
                     return
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % idrac_ip,verify=False,auth=(idrac_username, idrac_password))
+                response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Attributes' % creds["idrac_ip"])
                 data = response.json()
                 attributes_dict=data['Attributes']
                 if attributes_dict["IPMILan.1.AlertEnable"] == "Enabled":
@@ -4797,12 +4285,8 @@ def create_delete_iDRAC_subscriptions(script_examples="", get_subscriptions="",
                 break
         url = "https://%s/redfish/v1/EventService/Subscriptions" % creds["idrac_ip"]
         payload = {"Destination": destination_uri,"EventTypes": [event_type],"Context": "root","Protocol": "Redfish", "EventFormatType":event_format_type}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.__dict__["status_code"] == 201:
             logging.info("- PASS, POST command passed to create iDRAC subscription")
         else:
@@ -4811,12 +4295,8 @@ def create_delete_iDRAC_subscriptions(script_examples="", get_subscriptions="",
     elif submit_test_event:
         payload = {"Destination": destination_uri,"EventTypes": event_type,"Context": "Root","Protocol": "Redfish","MessageId":message_id}
         url = "https://%s/redfish/v1/EventService/Actions/EventService.SubmitTestEvent" % creds["idrac_ip"]
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.__dict__["status_code"] == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4828,12 +4308,8 @@ def create_delete_iDRAC_subscriptions(script_examples="", get_subscriptions="",
     elif delete_subscription_uri:
         url = "https://%s%s" % (creds["idrac_ip"], delete_subscription_uri)
         headers = {'content-type': 'application/json'}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.delete(url, headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.delete(url, headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.delete(url, headers=headers)
         if response.__dict__["status_code"] == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
             return
@@ -4861,12 +4337,8 @@ def export_import_server_configuration_profile_local(script_examples="", export_
             payload["ExportUse"] = export_use
         if include_in_export:
             payload["IncludeInExport"] = include_in_export
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 202:
             logging.info("- PASS, POST command passed for ExportSystemConfiguration action")
         else:
@@ -4883,81 +4355,33 @@ def export_import_server_configuration_profile_local(script_examples="", export_
         start_time = datetime.now()
         while True:
             current_time = (datetime.now()-start_time)
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-            dict_output = response.__dict__
-            if export_format.upper() == "XML":
-                if "<SystemConfiguration Model" in str(dict_output):
+            response = transport.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), stream=True)
+            # Exported profile is returned as the task response body once the job completes, see IdracRedfishSupport.scp
+            try:
+                scp_format, data = read_task_response(response)
+            except ValueError:
+                logging.error("- FAIL, unable to parse GET task response, status code %s returned" % response.status_code)
+                return
+            if scp_format:
+                get_date_info = datetime.now()
+                filename = "%s-%s-%s_%s%s%s_export.%s"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second,scp_format.lower())
+                if scp_format == "XML":
                     print("\n- Export locally job ID %s successfully completed. Attributes exported:\n" % job_id)
-                    regex_search = re.search("<SystemConfiguration.+</SystemConfiguration>",str(dict_output)).group()
-                    try:
-                        security_string = re.search('<Attribute Name="GUI.1#SecurityPolicyMessage">.+?>', regex_search).group()
-                    except:
-                        pass
-                    #Below code is needed to parse the string to set up in pretty XML format
-                    replace_variable = regex_search.replace("\\n"," ")
-                    replace_variable = replace_variable.replace("<!--  ","<!--")
-                    replace_variable = replace_variable.replace(" -->","-->")
-                    del_attribute = '<Attribute Name="SerialRedirection.1#QuitKey">^\\\\</Attribute>'
-                    try:
-                        replace_variable = replace_variable.replace(del_attribute,"")
-                    except:
-                        pass
                     try:
-                        replace_variable = replace_variable.replace(security_string,"")
-                    except:
-                        pass
-                    create_list = replace_variable.split("> ")
-                    export_xml = []
-                    for i in create_list:
-                        create_string = i+">"
-                        export_xml.append(create_string)
-                    export_xml[-1] = "</SystemConfiguration>"
-                    get_date_info = datetime.now()
-                    filename = "%s-%s-%s_%s%s%s_export.xml"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                    open_file = open(filename,"w")
-                    for i in export_xml:
-                        open_file.writelines("%s \n" % i)
-                    open_file.close()
-                    for i in export_xml:
-                        print(i)
+                        scp_export = write_scp_xml(data, filename, echo=sys.stdout)
+                    except ExpatError as error:
+                        logging.error("\n- FAIL, unable to parse exported XML profile, error: %s" % error)
+                        return
                     print("\n")
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-                    data = response.json()
-                    logging.info("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
-                    for i in data.items():
-                        print("%s: %s" % (i[0],i[1]))
-                    logging.info("\n- Exported attributes also saved in file: %s" % filename)
-                    return
-                else:
-                    pass
-            elif export_format.upper() == "JSON":
-                if "SystemConfiguration" in str(dict_output):
-                    data = response.json()
-                    json_format = json.dumps(data)
-                    get_date_info = datetime.now()
-                    filename = "%s-%s-%s_%s%s%s_export.json"% (get_date_info.year,get_date_info.month,get_date_info.day,get_date_info.hour,get_date_info.minute,get_date_info.second)
-                    open_file = open(filename,"w")
-                    open_file.write(json.dumps(json.loads(json_format), indent=4))
-                    open_file.close()
-                    if x_auth_token == "yes":
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                    else:
-                        response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-                    data = response.json()
-                    logging.info("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
-                    for i in data.items():
-                        print("%s: %s" % (i[0],i[1]))
-                    logging.info("\n- Exported attributes saved to file: %s" % filename)
-                    return
                 else:
-                    pass
-            data = response.json()
+                    scp_export = write_scp_json(data, filename)
+                response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
+                data = response.json()
+                logging.info("\n- PASS, final detailed job status results for job ID %s -\n" % job_id)
+                for i in data.items():
+                    print("%s: %s" % (i[0],i[1]))
+                logging.info("\n- %s attributes exported (%s bytes), saved to file: %s" % (scp_export.attributes, scp_export.size, filename))
+                return
             try:
                 message_string = data["Messages"]
             except:
@@ -4971,7 +4395,7 @@ def export_import_server_configuration_profile_local(script_examples="", export_
             else:
                 logging.error("Execute job ID command failed, status code %s returned" % response.status_code)
                 return
-            if str(current_time)[0:7] >= "0:10:00":
+            if current_time >= timedelta(minutes=10):
                 logging.error("\n-FAIL, Timeout of 10 minutes has been reached before marking the job completed.")
                 return
 
@@ -4984,10 +4408,7 @@ def export_import_server_configuration_profile_local(script_examples="", export_
                     time.sleep(1)
                 continue
     elif import_profile and import_filename:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % creds["idrac_ip"])
         data = response.json()
         get_version = data['FirmwareVersion'].split(".")[:2]
         get_version = int("".join(get_version))
@@ -5010,12 +4431,8 @@ def export_import_server_configuration_profile_local(script_examples="", export_
         if end_host_powerstate:
             payload["HostPowerState"] = end_host_powerstate
         payload["ImportBuffer"] = file_string
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         response_output = response.__dict__
         if response.status_code == 202:
             logging.info("- PASS, POST command passed for ImportSystemConfiguration action")
@@ -5041,11 +4458,7 @@ def export_import_server_configuration_profile_local(script_examples="", export_
                 logging.info("- INFO, retry count of 10 has been hit for retry job status GET request, script will exit")
                 return
             try:
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-                    data = response.json()
+                response = transport.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id))
             except requests.ConnectionError as error_message:
                 logging.error("- FAIL, requests command failed to GET job status, detailed error information: \n%s" % error_message)
                 time.sleep(10)
@@ -5194,12 +4607,8 @@ def export_import_server_configuration_profile_network_share(script_examples="",
             payload["ShareParameters"]["Password"] = share_password
         if ignore_certwarning:
             payload["ShareParameters"]["IgnoreCertificateWarning"] = ignore_certwarning
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
                 logging.info("- INFO, status code 401 detected, iDRAC username password changed while applying configuration changes. Access the iDRAC using new password to check job status")
                 return
@@ -5218,18 +4627,14 @@ def export_import_server_configuration_profile_network_share(script_examples="",
         logging.info("- PASS, job ID %s successfully created" % job_id)
         start_time = datetime.now()
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-                data = response.json()
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id))
             current_time = (datetime.now()-start_time)
             if response.status_code != 200:
                 logging.error("\n- FAIL, Command failed to check job status, return code is %s" % response.status_code)
                 logging.error("Extended Info Message: {0}".format(req.json()))
                 return
             data = response.json()
-            if str(current_time)[0:7] >= "0:05:00":
+            if current_time >= timedelta(minutes=5):
                 logging.error("\n- FAIL: Timeout of 5 minutes has been hit, script stopped\n")
                 return
             elif "fail" in data['Message'].lower() or "unable" in data['Message'].lower() or "not" in data['Message'].lower():
@@ -5248,10 +4653,7 @@ def export_import_server_configuration_profile_network_share(script_examples="",
                 logging.info("- INFO, job not completed, current status: \"%s\", percent complete: \"%s\"" % (data['Message'],data['PercentComplete']))
                 time.sleep(1)
     elif import_profile and filename and share_name and share_ip and share_type:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1' % creds["idrac_ip"])
         data = response.json()
         get_version = data['FirmwareVersion'].split(".")[:2]
         get_version = int("".join(get_version)) 
@@ -5277,12 +4679,8 @@ def export_import_server_configuration_profile_network_share(script_examples="",
             payload["ShareParameters"]["Password"] = share_password
         if ignore_certwarning:
             payload["ShareParameters"]["IgnoreCertificateWarning"] = ignore_certwarning
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         response_output = response.__dict__
         if response.status_code == 401:
                 logging.info("- INFO, status code 401 detected, iDRAC username password changed while applying configuration changes. Access the iDRAC using new password to check job status")
@@ -5311,11 +4709,7 @@ def export_import_server_configuration_profile_network_share(script_examples="",
                 logging.info("- INFO, retry count of 10 has been hit for retry job status GET request, script will exit")
                 return
             try:
-                if x_auth_token == "yes":
-                    response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                else:
-                    response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
-                    data = response.json()
+                response = transport.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id))
             except requests.ConnectionError as error_message:
                 logging.error("- FAIL, requests command failed to GET job status, detailed error information: \n%s" % error_message)
                 time.sleep(10)
@@ -5455,12 +4849,8 @@ def preview_server_configuration_profile_local(script_examples="", profile_name=
     
     payload = {"ImportBuffer":"","ShareParameters":{"Target":"ALL"}}
     payload["ImportBuffer"] = scp_file_string
-    if x_auth_token == "yes":
-        headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-    else:
-        headers = {'content-type': 'application/json'}
-        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+    headers = {'content-type': 'application/json'}
+    response = transport.post(url, data=json.dumps(payload), headers=headers)
     if response.status_code == 401:
         logging.info("- INFO, status code 401 detected, iDRAC username password changed while applying configuration changes. Access the iDRAC using new password to check job status")
         return
@@ -5476,10 +4866,7 @@ def preview_server_configuration_profile_local(script_examples="", profile_name=
     logging.info("\n- %s successfully created for ImportSystemConfigurationPreview method\n" % (job_id) )
     start_time = datetime.now()
     while True:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id))
         data = response.json()
         message_string = data["Messages"]
         final_message_string = str(message_string)
@@ -5558,12 +4945,8 @@ def preview_server_configuration_profile_network_share(script_examples="", profi
             payload["ShareParameters"]["Password"] = share_password
         if ignore_certwarning:
             payload["ShareParameters"]["IgnoreCertificateWarning"] = ignore_certwarning
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 401:
             logging.info("- INFO, status code 401 detected, iDRAC username password changed while applying configuration changes. Access the iDRAC using new password to check job status")
             return
@@ -5578,10 +4961,7 @@ def preview_server_configuration_profile_network_share(script_examples="", profi
         logging.info("\n- %s successfully created for ImportSystemConfigurationPreview method\n" % (job_id) )
         start_time = datetime.now()
         while True:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/TaskService/Tasks/%s' % (creds["idrac_ip"], job_id))
             data = response.json()
             message_string = data["Messages"]
             final_message_string = str(message_string)
@@ -5644,10 +5024,7 @@ def get_set_chassis_indicator_LED(script_examples="", get_LED_status="", set_LED
         print("""\n- IdracRedfishSupport.get_set_chassis_indicator_LED(get_LED_status=True), this example will get current chassis LED status.
         \n- IdracRedfishSupport.get_set_chassis_indicator_LED(set_LED="Blinking"), this example will blink chassis LED.""")    
     elif get_LED_status:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Chassis/System.Embedded.1' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Chassis/System.Embedded.1' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Chassis/System.Embedded.1' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.warning("\n- WARNING, status code 401 detected, check iDRAC username / password credentials")
@@ -5659,12 +5036,8 @@ def get_set_chassis_indicator_LED(script_examples="", get_LED_status="", set_LED
     elif set_LED:
         url = 'https://%s/redfish/v1/Chassis/System.Embedded.1' % creds["idrac_ip"]
         payload = {'IndicatorLED': set_LED}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         if response.status_code == 200:
             logging.info("\n- PASS, PATCH command successfully completed \"%s\" request for chassis indicator LED" % set_LED)
         else:
@@ -5684,12 +5057,8 @@ def supportassist_schedule_auto_collection(script_examples="", get_supportassist
     elif get_supportassist_auto_collection_details:
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.SupportAssistGetAutoCollectSchedule' % creds["idrac_ip"]
         payload = {}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("\n- PASS, POST command passed to get SupportAssist auto collection details\n")
@@ -5703,12 +5072,8 @@ def supportassist_schedule_auto_collection(script_examples="", get_supportassist
     elif clear_supportassist_auto_collection:
         url = 'https://%s/redfish/v1/Dell/Managers/iDRAC.Embedded.1/DellLCService/Actions/DellLCService.SupportAssistClearAutoCollectSchedule' % creds["idrac_ip"]
         payload = {}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("\n- PASS, POST command passed to clear SupportAssist auto collection details\n")
@@ -5727,12 +5092,8 @@ def supportassist_schedule_auto_collection(script_examples="", get_supportassist
             payload["DayOfWeek"] = dayofweek
         if dayofmonth:
             payload["DayOfMonth"] = dayofmonth       
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("\n- PASS, POST command passed to set SupportAssist auto collection details\n")
@@ -5756,10 +5117,7 @@ def create_modify_delete_iDRAC_users(script_examples="", get_current_users="", c
         \n- IdracRedfishSupport.create_modify_delete_iDRAC_users(delete_user=\"16\"), this example shows deleting user ID 16""")
     
     elif get_current_users:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Accounts?$expand=*($levels=1)' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Accounts?$expand=*($levels=1)' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Accounts?$expand=*($levels=1)' % creds["idrac_ip"])
         data = response.json()
         if response.status_code != 200:
             logging.error("- ERROR, GET command failed, status code %s returned, error results: %s" % (response.status_code, data))
@@ -5774,12 +5132,8 @@ def create_modify_delete_iDRAC_users(script_examples="", get_current_users="", c
         new_iDRAC_username_password = getpass.getpass("\n- Pass in new password to create new iDRAC user %s: " % new_username)
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Accounts/%s' % (creds["idrac_ip"], user_id)
         payload = {"UserName":new_username, "Password":new_iDRAC_username_password, "RoleId":str(role_id), "Enabled":enable_user}        
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("\n- PASS, PATCH command passed to create new iDRAC user %s\n" % new_username)
@@ -5802,12 +5156,8 @@ def create_modify_delete_iDRAC_users(script_examples="", get_current_users="", c
             payload["UserName"] = new_username
         if role_id:
             payload["RoleId"] = role_id
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("\n- PASS, PATCH command passed to modify iDRAC user ID %s" % str(modify_user))
@@ -5818,12 +5168,8 @@ def create_modify_delete_iDRAC_users(script_examples="", get_current_users="", c
     elif delete_user:
         url = 'https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Accounts/%s' % (creds["idrac_ip"], str(delete_user))
         payload = {"Enabled":False,"RoleId":"None"}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data=response.json()
         if response.status_code == 200:
             logging.info("\n- PASS, PATCH command passed to delete iDRAC user ID %s\n" % str(delete_user))
@@ -5831,12 +5177,8 @@ def create_modify_delete_iDRAC_users(script_examples="", get_current_users="", c
             logging.error("\n- ERROR, status code %s returned, detailed error information:\n %s" % (response.status_code, data))
             return
         payload = {"UserName":""}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.patch(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.patch(url, data=json.dumps(payload), headers=headers)
         data=response.json()
         if response.status_code != 200:
             logging.error("\n- ERROR, status code %s returned, detailed error information:\n %s" % (response.status_code, data))
@@ -5857,10 +5199,7 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
     
     elif get_fw_inventory:
         logging.info("\n- INFO, getting current firmware inventory for iDRAC %s -\n" % creds["idrac_ip"])
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/UpdateService/FirmwareInventory?$expand=*($levels=1)' % creds["idrac_ip"],verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/UpdateService/FirmwareInventory?$expand=*($levels=1)' % creds["idrac_ip"],verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/UpdateService/FirmwareInventory?$expand=*($levels=1)' % creds["idrac_ip"])
         if response.status_code == 200:
             logging.info("- INFO, GET command passed to get firmware inventory")
         else:
@@ -5886,12 +5225,8 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
         open_file = open("repo_based_update_list.xml","a")
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSoftwareInstallationService/Actions/DellSoftwareInstallationService.GetRepoBasedUpdateList' % (creds["idrac_ip"])
         payload={}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("\n- PASS: POST command passed to get repo update list, status code 200 returned")
@@ -5910,12 +5245,8 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
         logging.info("\n- Device Name and Criticality Details for Updatable Devices -\n")
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSoftwareInstallationService/Actions/DellSoftwareInstallationService.GetRepoBasedUpdateList' % (creds["idrac_ip"])
         payload={}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         try:
             get_all_devices = re.findall("Criticality.+BaseLocation",data["PackageList"])
@@ -5945,10 +5276,7 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
             print("\n")
       
     elif repository_update and reboot_needed == "yes" or reboot_needed == "no" and apply_update == "yes" or apply_update == "no":
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs' % creds["idrac_ip"])
         data = str(response.json())
         if response.status_code != 200:
             logging.error("\n- ERROR, GET command failed to get job queue details, status code %s returned, detailed error information:\n %s" % (response.status_code, data))
@@ -5983,12 +5311,8 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
             payload["Password"] = share_password
         if ignore_certwarning:
             payload["IgnoreCertWarning"] = ignore_certwarning
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 202:
             logging.info("\n- PASS: POST command passed for method \"%s\", status code %s returned" % (method, response.status_code))
@@ -6012,10 +5336,7 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
                 count = 0
                 while count != 5:
                     try:
-                        if x_auth_token == "yes":
-                            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id_to_query), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-                        else:
-                            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id_to_query), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+                        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], job_id_to_query))
                         break
                     except requests.ConnectionError as error_message:
                         logging.error("- ERROR, requests command failed to GET job status, detailed error information: \n%s" % error_message)
@@ -6026,13 +5347,13 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
                 if count == 5:
                     logging.error("- ERROR, unable to get job status after 5 attempts, script will exit")
                     return
-                current_time = str((datetime.now()-start_time))[0:7]
+                current_time = (datetime.now()-start_time)
                 if response.status_code != 200:
                     logging.error("\n- ERROR, GET command failed to check job status, status code %s returned" % response.status_code)
                     logging.info("Extended Info Message: {0}".format(response.json()))
                     return
                 data = response.json()
-                if str(current_time)[0:7] >= "2:00:00":
+                if current_time >= timedelta(hours=2):
                     logging.error("\n- ERROR: Timeout of 2 hours has been reached, script stopped\n")
                     return
                 elif "Fail" in data['Message'] or "fail" in data['Message'] or "invalid" in data['Message'] or "unable" in data['Message'] or "Unable" in data['Message'] or "not" in data['Message'] or "cancel" in data['Message'] or "Cancel" in data['Message']:
@@ -6083,12 +5404,8 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
         # Code to get newly created update job ids
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellSoftwareInstallationService/Actions/DellSoftwareInstallationService.GetRepoBasedUpdateList' % (creds["idrac_ip"])
         payload={}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 200:
             logging.info("- PASS, GET command passed to get repo update list details")
@@ -6101,10 +5418,7 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
                 data = response.json()
                 logging.info("\n- Failure results:\n %s" % data)
                 return
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs' % creds["idrac_ip"])
         data = str(response.json())
         jobid_search = re.findall("JID_.+?'",data)
         if jobid_search == []:
@@ -6125,10 +5439,7 @@ def install_from_repository(script_examples="", get_fw_inventory="", get_repo_up
         time.sleep(30)
         # Code to check for scheduled update jobs
         for i in new_job_ids:
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], i), verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], i), verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/Jobs/%s' % (creds["idrac_ip"], i))
             if response.status_code != 200:
                 logging.error("\n- ERROR, GET command failed to check job status, status code %s returned" % response.status_code)
                 logging.error("Extended Info Message: {0}".format(req.json()))
@@ -6172,10 +5483,7 @@ def insert_eject_virtual_media(script_examples="", get_attach_status="", insert_
         \n- IdracRedfishSupport.insert_eject_virtual_media(eject_virtual_media=1), this example using iDRAC 6.00.00 shows ejecting virtual media index 1 device.
         \n- IdracRedfishSupport.insert_eject_virtual_media(eject_virtual_media=2), this example using iDRAC 6.00.00 shows ejecting virtual media index 2 device.""")
     else:
-        if x_auth_token == "yes":
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-        else:
-            response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+        response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1?$select=FirmwareVersion' % creds["idrac_ip"])
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -6191,15 +5499,9 @@ def insert_eject_virtual_media(script_examples="", get_attach_status="", insert_
     if get_attach_status:
         virtual_media_uris = []
         if iDRAC_version == "old":
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/VirtualMedia?$expand=*($levels=1)' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/VirtualMedia?$expand=*($levels=1)' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))
+            response = transport.get('https://%s/redfish/v1/Managers/iDRAC.Embedded.1/VirtualMedia?$expand=*($levels=1)' % creds["idrac_ip"])
         if iDRAC_version == "new":
-            if x_auth_token == "yes":
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/VirtualMedia?$expand=*($levels=1)' % creds["idrac_ip"], verify=creds["verify_cert"],headers={'X-Auth-Token': creds["idrac_x_auth_token"]})    
-            else:
-                response = requests.get('https://%s/redfish/v1/Systems/System.Embedded.1/VirtualMedia?$expand=*($levels=1)' % creds["idrac_ip"], verify=creds["verify_cert"],auth=(creds["idrac_username"], creds["idrac_password"]))   
+            response = transport.get('https://%s/redfish/v1/Systems/System.Embedded.1/VirtualMedia?$expand=*($levels=1)' % creds["idrac_ip"])
         data = response.json()
         if response.status_code != 200:
             logging.error("\n- ERROR, GET command failed to get virtual media attach status details, status code %s returned" % response.status_code)
@@ -6222,12 +5524,8 @@ def insert_eject_virtual_media(script_examples="", get_attach_status="", insert_
         if iDRAC_version == "new":
             url = "https://%s/redfish/v1/Systems/System.Embedded.1/VirtualMedia/%s/Actions/VirtualMedia.InsertMedia" % (creds["idrac_ip"], insert_virtual_media)
         payload = {'Image': image_path, 'Inserted':True,'WriteProtected':True}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.__dict__
         if response.status_code != 204:
             logging.error("\n- FAIL, POST command failed to insert virtual media, detailed error message: %s" % response._content)
@@ -6247,12 +5545,8 @@ def insert_eject_virtual_media(script_examples="", get_attach_status="", insert_
         if iDRAC_version == "new":
             url = "https://%s/redfish/v1/Systems/System.Embedded.1/VirtualMedia/%s/Actions/VirtualMedia.EjectMedia" % (creds["idrac_ip"], eject_virtual_media)
         payload = {}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.__dict__
         if response.status_code != 204:
             logging.error("\n- FAIL, POST command failed to eject virtual media, detailed error message: %s" % response._content)
@@ -6271,12 +5565,8 @@ def change_disk_state_virtualdisk(script_examples="", disk="", state=""):
         method = "ChangePDState"
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.ChangePDState' % (creds["idrac_ip"])
         payload = {"State":state.title(),"TargetFQDD":disk}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -6317,12 +5607,8 @@ def blink_unblink_storage_device(script_examples="", blink="", unblink=""):
     else:
         logging.warning("- WARNING, missing arguments or incorrect argument values passed in. Check help text and script examples for more details")
         return
-    if x_auth_token == "yes":
-        headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-    else:
-        headers = {'content-type': 'application/json'}
-        response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+    headers = {'content-type': 'application/json'}
+    response = transport.post(url, data=json.dumps(payload), headers=headers)
     data = response.json()
     if response.status_code == 200 or response.status_code == 202:
         logging.info("\n- PASS: POST command passed for %s, status code %s returned" % (method, response.status_code))
@@ -6342,12 +5628,8 @@ def cancel_check_consistency_virtual_disk(script_examples="", virtual_disk_fqdd=
         method = "CancelCheckConsistency"
         url = 'https://%s/redfish/v1/Dell/Systems/System.Embedded.1/DellRaidService/Actions/DellRaidService.CancelCheckConsistency' % (creds["idrac_ip"])
         payload = {"TargetFQDD":virtual_disk_fqdd}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -6388,12 +5670,8 @@ def expand_virtualdisk(script_examples="", pdisks="", expand="", size=""):
                 payload = {"TargetFQDD": expand,  "PDArray": [pdisks]}   
         elif size:
             payload = {"TargetFQDD": expand,  "Size": int(size)}
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -6431,12 +5709,8 @@ def raidlevel_migration(script_examples="", pdisks="", migrate="", new_raid_leve
                 payload = {"TargetFQDD": migrate, "PDArray": disk_list, "NewRaidLevel":new_raid_level.upper()}
             else:
                 payload = {"TargetFQDD": migrate, "PDArray": [pdisks], "NewRaidLevel":new_raid_level.upper()}   
-        if x_auth_token == "yes":
-            headers = {'content-type': 'application/json', 'X-Auth-Token': creds["idrac_x_auth_token"]}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"])
-        else:
-            headers = {'content-type': 'application/json'}
-            response = requests.post(url, data=json.dumps(payload), headers=headers, verify=creds["verify_cert"],auth=(creds["idrac_username"],creds["idrac_password"]))
+        headers = {'content-type': 'application/json'}
+        response = transport.post(url, data=json.dumps(payload), headers=headers)
         data = response.json()
         if response.status_code == 401:
             logging.error("- ERROR, status code 401 detected, check to make sure your iDRAC script session has correct username/password credentials or if using X-auth token, confirm the session is still active.")
@@ -6470,8 +5744,75 @@ def raidlevel_migration(script_examples="", pdisks="", migrate="", new_raid_leve
     
 
 
+# Names holding per iDRAC session state. Every IdracSession gets its own copy of these, the module level functions use the module globals (default session).
+_SESSION_STATE_NAMES = ("creds", "x_auth_token", "transport", "event_receiver", "job_id", "job_type", "concrete_job_uri")
+
+class IdracSession(object):
+    """iDRAC session object holding its own credentials, X-auth token, transport and job IDs. Every module workflow function is callable as a method of the session, example: session = IdracRedfishSupport.IdracSession("192.168.0.120", "root", "calvin") then session.get_storage_controllers(). Multiple session objects can be used at the same time from the same interpreter or from a thread pool, each session talks only to its own iDRAC."""
+
+    def __init__(self, idrac_ip, idrac_username, idrac_password, verify_cert=False, create_x_auth_token=False):
+        namespace = dict(globals())
+        for name in _SESSION_STATE_NAMES:
+            namespace.pop(name, None)
+        namespace["transport"] = None
+        namespace["event_receiver"] = None
+        self._bind(namespace)
+        self.start_iDRAC_script_session(idrac_ip=idrac_ip, idrac_username=idrac_username, idrac_password=idrac_password, verify_cert=verify_cert, create_x_auth_token=create_x_auth_token)
+
+    @classmethod
+    def _from_namespace(cls, namespace):
+        session = cls.__new__(cls)
+        session._bind(namespace)
+        return session
+
+    def _bind(self, namespace):
+        # Rebind every module function to the session namespace so the functions and the functions they call (loop_job_status_final, reboot_server...) read and write this session state only
+        self._namespace = namespace
+        for name, value in list(namespace.items()):
+            if isinstance(value, types.FunctionType) and value.__module__ == __name__:
+                if namespace is not globals():
+                    value = types.FunctionType(value.__code__, namespace, value.__name__, value.__defaults__, value.__closure__)
+                    namespace[name] = value
+                if not name.startswith("_"):
+                    setattr(self, name, value)
+
+    @property
+    def creds(self):
+        return self._namespace.get("creds")
+
+    @property
+    def idrac_ip(self):
+        if self.creds:
+            return self.creds["idrac_ip"]
+
+    @property
+    def x_auth_token(self):
+        return self._namespace.get("x_auth_token") == "yes"
+
+    @property
+    def transport(self):
+        return self._namespace.get("transport")
+
+    @property
+    def job_id(self):
+        """Job ID created by the last workflow function executed for this session"""
+        return self._namespace.get("job_id")
 
+    def close(self):
+        if self._namespace.get("event_receiver"):
+            self._namespace["event_receiver"].close()
+            self._namespace["event_receiver"] = None
+        if self.transport:
+            self.transport.close()
 
+    def __enter__(self):
+        return self
 
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
+    def __repr__(self):
+        return "IdracSession(%r)" % self.idrac_ip
 
+# Session used by the module level functions, state is kept in the module globals so existing scripts calling IdracRedfishSupport.<function>() keep working
+default_session = IdracSession._from_namespace(globals())
@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# asyncio Redfish client for fleet wide read operations against many iDRACs. Network I/O only uses the Python
+# standard library, requests is not asyncio aware, while URIs and response parsing are shared with the sync modules.
+# Total requests in flight and requests in flight per iDRAC are both capped so the small iDRAC web server is never
+# flooded when thousands of hosts are queried at the same time.
+
+import asyncio
+import base64
+import collections
+import queue
+import ssl
+import threading
+
+from .firmware import FIRMWARE_INVENTORY_EXPAND_URI, firmware_inventory_members
+from .jobs import JOBS_EXPAND_URI, JOBS_URI, job_members
+from .registry import SYSTEM_URI
+from .transport import decode_json, host_address, split_host
+
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_PER_HOST_LIMIT = 2
+DEFAULT_TIMEOUT = 60
+
+BulkResult = collections.namedtuple("BulkResult", ["idrac_ip", "result", "error"])
+
+
+class RedfishRequestError(Exception):
+    """Raised when a Redfish call returns a status code other than 200"""
+
+    def __init__(self, idrac_ip, uri, status_code, data):
+        self.idrac_ip = idrac_ip
+        self.uri = uri
+        self.status_code = status_code
+        self.data = data
+        Exception.__init__(self, "iDRAC %s, GET %s failed, status code %s returned" % (idrac_ip, uri, status_code))
+
+
+class _Connection(object):
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, method, idrac_ip, uri, headers):
+        lines = ["%s %s HTTP/1.1" % (method, uri), "Host: %s" % host_address(idrac_ip), "Accept: application/json", "Connection: keep-alive"]
+        lines.extend("%s: %s" % i for i in headers.items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by iDRAC %s" % idrac_ip)
+        status_code = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+        if method == "HEAD" or status_code in (204, 304):
+            body = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in response_headers:
+            body = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            response_headers["connection"] = "close"
+        reusable = response_headers.get("connection", "").lower() != "close"
+        return status_code, response_headers, body, reusable
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncRedfishClient(object):
+    """asyncio Redfish client. Connections to each iDRAC are kept alive and reused, max_in_flight caps requests in flight across all iDRACs and per_host_limit caps requests in flight (and open connections) per iDRAC. Credentials passed in are used for every iDRAC unless per iDRAC credentials are added with add_host()."""
+
+    def __init__(self, username=None, password=None, x_auth_token=None, verify_cert=False, max_in_flight=DEFAULT_MAX_IN_FLIGHT, per_host_limit=DEFAULT_PER_HOST_LIMIT, timeout=DEFAULT_TIMEOUT):
+        self.username = username
+        self.password = password
+        self.x_auth_token = x_auth_token
+        self.max_in_flight = max_in_flight
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.ssl_context = ssl.create_default_context()
+        if not verify_cert:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._host_credentials = {}
+        self._idle_connections = {}
+        self._host_semaphores = {}
+        self._global_semaphore = None
+
+    def add_host(self, idrac_ip, username=None, password=None, x_auth_token=None):
+        """Set credentials used for one iDRAC only"""
+        self._host_credentials[idrac_ip] = (username, password, x_auth_token)
+
+    def _auth_headers(self, idrac_ip):
+        username, password, x_auth_token = self._host_credentials.get(idrac_ip, (self.username, self.password, self.x_auth_token))
+        if x_auth_token:
+            return {"X-Auth-Token": x_auth_token}
+        elif username:
+            return {"Authorization": "Basic %s" % base64.b64encode(("%s:%s" % (username, password)).encode("utf-8")).decode("ascii")}
+        return {}
+
+    def _semaphores(self, idrac_ip):
+        # Semaphores are created lazily so they belong to the running event loop
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_in_flight)
+        if idrac_ip not in self._host_semaphores:
+            self._host_semaphores[idrac_ip] = asyncio.Semaphore(self.per_host_limit)
+        return self._global_semaphore, self._host_semaphores[idrac_ip]
+
+    async def _connect(self, idrac_ip):
+        host, port = split_host(idrac_ip)
+        reader, writer = await asyncio.open_connection(host, port, ssl=self.ssl_context, server_hostname=host if self.ssl_context.check_hostname else None)
+        return _Connection(reader, writer)
+
+    async def _send(self, connection, method, idrac_ip, uri, headers):
+        # Connection is closed on any failure, timeout or cancellation, a connection left mid request can't be reused
+        try:
+            return await connection.request(method, idrac_ip, uri, headers)
+        except BaseException:
+            connection.close()
+            raise
+
+    async def _request(self, method, idrac_ip, uri):
+        idle = self._idle_connections.setdefault(idrac_ip, [])
+        headers = self._auth_headers(idrac_ip)
+        if idle:
+            connection = idle.pop()
+            try:
+                result = await self._send(connection, method, idrac_ip, uri, headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # iDRAC closed the idle keep-alive connection, retry once on a new connection
+                connection = await self._connect(idrac_ip)
+                result = await self._send(connection, method, idrac_ip, uri, headers)
+        else:
+            connection = await self._connect(idrac_ip)
+            result = await self._send(connection, method, idrac_ip, uri, headers)
+        status_code, response_headers, body, reusable = result
+        if reusable:
+            idle.append(connection)
+        else:
+            connection.close()
+        return status_code, response_headers, body
+
+    async def request(self, method, idrac_ip, uri):
+        """Execute one Redfish call, returns status code, lower case response headers and raw body"""
+        if not uri.startswith("/"):
+            uri = "/" + uri
+        uri = uri.replace(" ", "%20")
+        global_semaphore, host_semaphore = self._semaphores(idrac_ip)
+        async with host_semaphore:
+            async with global_semaphore:
+                return await asyncio.wait_for(self._request(method, idrac_ip, uri), self.timeout)
+
+    async def get(self, idrac_ip, uri):
+        """GET Redfish URI and return JSON data, raises RedfishRequestError if status code 200 is not returned"""
+        status_code, response_headers, body = await self.request("GET", idrac_ip, uri)
+        data = decode_json(body)
+        if status_code != 200:
+            raise RedfishRequestError(idrac_ip, uri, status_code, data if data is not None or not body else {"body": body.decode("utf-8", "replace")})
+        return data if data is not None else {}
+
+    async def get_system_details(self, idrac_ip):
+        """Return Systems/System.Embedded.1 details (PowerState, Model, BiosVersion, Status...)"""
+        return await self.get(idrac_ip, SYSTEM_URI)
+
+    async def get_health_rollup(self, idrac_ip):
+        """Return server rollup health and power state"""
+        data = await self.get_system_details(idrac_ip)
+        return {"HealthRollup": data.get("Status", {}).get("HealthRollup"), "Health": data.get("Status", {}).get("Health"), "PowerState": data.get("PowerState")}
+
+    async def get_firmware_inventory(self, idrac_ip):
+        """Return list of firmware inventory members using one expanded request, members are fetched concurrently on iDRAC versions not supporting $expand"""
+        members, member_uris = firmware_inventory_members(await self.get(idrac_ip, FIRMWARE_INVENTORY_EXPAND_URI))
+        members.extend(await asyncio.gather(*[self.get(idrac_ip, i) for i in member_uris]))
+        return members
+
+    async def get_job_queue(self, idrac_ip):
+        """Return list of all job IDs in the iDRAC job queue using one expanded request"""
+        return list(job_members(await self.get(idrac_ip, JOBS_EXPAND_URI)).values())
+
+    async def get_job_status(self, idrac_ip, job_id):
+        return await self.get(idrac_ip, "%s/%s" % (JOBS_URI, job_id))
+
+    async def bulk(self, hosts, operation, *args):
+        """Async generator executing operation against every iDRAC and yielding BulkResult(idrac_ip, result, error) as each one completes. hosts is a list of iDRAC IPs or dictionaries with idrac_ip, idrac_username, idrac_password and optional idrac_x_auth_token keys. operation is either the name of a client method (example: "get_firmware_inventory") or a coroutine function called as operation(client, idrac_ip, *args)."""
+        async def run(idrac_ip):
+            try:
+                if isinstance(operation, str):
+                    result = await getattr(self, operation)(idrac_ip, *args)
+                else:
+                    result = await operation(self, idrac_ip, *args)
+                return BulkResult(idrac_ip, result, None)
+            except Exception as error:
+                return BulkResult(idrac_ip, None, error)
+        tasks = []
+        for host in hosts:
+            if isinstance(host, dict):
+                self.add_host(host["idrac_ip"], host.get("idrac_username"), host.get("idrac_password"), host.get("idrac_x_auth_token"))
+                host = host["idrac_ip"]
+            tasks.append(asyncio.ensure_future(run(host)))
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def close(self):
+        for connections in self._idle_connections.values():
+            for connection in connections:
+                connection.close()
+        self._idle_connections = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+def bulk_query(hosts, operation, *args, **client_arguments):
+    """Generator for non asyncio callers, executes operation against every iDRAC using AsyncRedfishClient on a background event loop and yields BulkResult(idrac_ip, result, error) as each one completes. client_arguments are passed to AsyncRedfishClient (username, password, verify_cert, max_in_flight, per_host_limit, timeout)."""
+    results = queue.Queue()
+    finished = object()
+    errors = []
+
+    async def run():
+        async with AsyncRedfishClient(**client_arguments) as client:
+            async for result in client.bulk(hosts, operation, *args):
+                results.put(result)
+
+    def worker():
+        try:
+            asyncio.run(run())
+        except Exception as error:
+            errors.append(error)
+        finally:
+            results.put(finished)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    while True:
+        result = results.get()
+        if result is finished:
+            break
+        yield result
+    thread.join()
+    if errors:
+        raise errors[0]
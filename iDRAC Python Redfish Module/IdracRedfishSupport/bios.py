@@ -0,0 +1,300 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Local BIOS attribute validation. iDRAC only rejects a bad BIOS attribute value, a read-only attribute or a value a
+# Dependencies rule doesn't allow when the config job runs, after the server rebooted. BiosRegistryIndex indexes the
+# BIOS registry (read through the versioned registry cache) once per model and BIOS version and checks a whole
+# attribute set before anything is sent: attribute names, types, allowed values, bounds, ReadOnly and the registry
+# Dependencies MapFrom/MapTo rules. Rules are evaluated against the current BIOS values with the whole pending set
+# applied, so changing an attribute together with the attribute it depends on in the same PATCH validates. Attributes
+# already set to the requested value are reported as unchanged so they don't cost a config job and a reboot.
+
+import collections
+import re
+import threading
+
+from .registry import BIOS_REGISTRY_URI, RegistryError, get_firmware_versions, get_registry
+from .transport import RedfishTransport
+
+BIOS_URI = "/redfish/v1/Systems/System.Embedded.1/Bios"
+# MapToProperty values of a Dependencies rule which block setting the attribute while the rule applies
+BLOCKING_PROPERTIES = ("ReadOnly", "GrayOut")
+CONDITION_OPERATORS = {"EQU": "=", "NEQ": "!=", "GTR": ">", "GEQ": ">=", "LSS": "<", "LEQ": "<="}
+# Max allowed values listed in a validation error
+MAX_LISTED_VALUES = 10
+
+BiosAttributeError = collections.namedtuple("BiosAttributeError", ["attribute", "value", "reason"])
+BiosValidation = collections.namedtuple("BiosValidation", ["attributes", "unchanged", "errors"])
+
+_index_cache = {}
+_cache_lock = threading.Lock()
+
+
+def attribute_set(attribute_names, attribute_values):
+    """Return ordered dictionary of attribute name to value for comma separated attribute_names and attribute_values (strings or lists). Raises ValueError if the number of names and values don't match."""
+    if isinstance(attribute_names, str):
+        attribute_names = attribute_names.split(",")
+    if isinstance(attribute_values, str):
+        attribute_values = attribute_values.split(",")
+    attribute_names = [i.strip() for i in attribute_names]
+    if len(attribute_names) != len(attribute_values):
+        raise ValueError("%s attribute name(s) and %s attribute value(s) passed in, make sure the attribute names and values align" % (len(attribute_names), len(attribute_values)))
+    return collections.OrderedDict(zip(attribute_names, attribute_values))
+
+
+def _same(value, other):
+    return value is not None and other is not None and str(value).lower() == str(other).lower()
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _condition(term, values):
+    # Returns True or False, None when the MapFrom attribute value is not known
+    name = term.get("MapFromAttribute")
+    if term.get("MapFromProperty", "CurrentValue") != "CurrentValue" or name not in values:
+        return None
+    value = values[name]
+    expected = term.get("MapFromValue")
+    condition = term.get("MapFromCondition", "EQU")
+    if condition == "EQU":
+        return _same(value, expected)
+    if condition == "NEQ":
+        return not _same(value, expected)
+    value, expected = _number(value), _number(expected)
+    if value is None or expected is None:
+        return None
+    if condition == "GTR":
+        return value > expected
+    if condition == "GEQ":
+        return value >= expected
+    if condition == "LSS":
+        return value < expected
+    if condition == "LEQ":
+        return value <= expected
+    return None
+
+
+def evaluate_map_from(map_from, values):
+    """Return True if the MapFrom terms of a Dependencies rule apply for values (dictionary of attribute name to value), False if not and None if an attribute the rule reads is not in values. Terms are combined left to right with the MapTerms of each following term, unknown terms are handled as three-valued logic."""
+    result = None
+    for position, term in enumerate(map_from):
+        condition = _condition(term, values)
+        if position == 0:
+            result = condition
+        elif term.get("MapTerms", "AND").upper() == "OR":
+            result = True if result is True or condition is True else (None if result is None or condition is None else False)
+        else:
+            result = False if result is False or condition is False else (None if result is None or condition is None else True)
+    return result
+
+
+def describe_map_from(map_from):
+    """Return Dependencies rule MapFrom terms as text, example: SysProfile = PerfOptimized OR SysProfile = PerfPerWattOptimizedOs"""
+    text = []
+    for position, term in enumerate(map_from):
+        if position:
+            text.append(term.get("MapTerms", "AND").upper())
+        text.append("%s %s %s" % (term.get("MapFromAttribute"), CONDITION_OPERATORS.get(term.get("MapFromCondition"), term.get("MapFromCondition")), term.get("MapFromValue")))
+    return " ".join(text)
+
+
+class BiosRegistryIndex(object):
+    """Lookup index over a BIOS registry (BiosRegistry JSON with RegistryEntries Attributes and Dependencies). Attributes, allowed values and Dependencies rules by MapToAttribute are indexed once, validate() then checks an attribute set with dictionary lookups and no iDRAC access."""
+
+    def __init__(self, registry):
+        entries = registry.get("RegistryEntries", registry)
+        self.registry_id = registry.get("Id")
+        self.attributes = dict((i["AttributeName"], i) for i in entries.get("Attributes", []) if i.get("AttributeName"))
+        self._lower_names = dict((name.lower(), name) for name in self.attributes)
+        self._values = {}
+        for name, attribute in self.attributes.items():
+            if attribute.get("Type") == "Enumeration":
+                self._values[name] = [i.get("ValueName") for i in attribute.get("Value") or []]
+        self._rules = collections.defaultdict(list)
+        for dependency in entries.get("Dependencies", []):
+            rule = dependency.get("Dependency") or {}
+            target = rule.get("MapToAttribute") or dependency.get("DependencyFor") or dependency.get("AttributeName")
+            if target and rule.get("MapFrom"):
+                self._rules[target].append(rule)
+
+    def __len__(self):
+        return len(self.attributes)
+
+    def __contains__(self, name):
+        return name in self.attributes
+
+    def get(self, name):
+        """Return registry entry of the attribute or None if the attribute is not in the registry"""
+        return self.attributes.get(name)
+
+    def rules(self, name):
+        """Return Dependencies rules (Dependency dictionaries with MapFrom, MapToProperty and MapToValue) which change the attribute"""
+        return self._rules.get(name, [])
+
+    def coerce(self, name, value):
+        """Return (value converted to the attribute type, None) or (value, reason) if the value is not valid for the attribute type, allowed values, bounds or length"""
+        attribute = self.attributes[name]
+        attribute_type = attribute.get("Type")
+        if attribute_type == "Integer":
+            try:
+                if isinstance(value, bool):
+                    raise ValueError
+                value = int(str(value).strip())
+            except ValueError:
+                return value, "value is not an integer"
+            lower_bound, upper_bound = attribute.get("LowerBound"), attribute.get("UpperBound")
+            if lower_bound is not None and value < lower_bound or upper_bound is not None and value > upper_bound:
+                return value, "value is out of range, supported range is %s to %s" % (lower_bound, upper_bound)
+            increment = attribute.get("ScalarIncrement")
+            if increment and (value - (lower_bound or 0)) % increment:
+                return value, "value must be a multiple of %s starting at %s" % (increment, lower_bound or 0)
+        elif attribute_type == "Enumeration":
+            value = str(value).strip()
+            allowed = self._values.get(name, [])
+            if value not in allowed:
+                matches = [i for i in allowed if _same(i, value)]
+                if matches:
+                    return value, "value is case sensitive, did you mean %s" % matches[0]
+                listed = ", ".join(str(i) for i in allowed[:MAX_LISTED_VALUES])
+                return value, "value is not supported, supported values: %s%s" % (listed, ", ..." if len(allowed) > MAX_LISTED_VALUES else "")
+        elif attribute_type == "Boolean":
+            if not isinstance(value, bool):
+                if str(value).strip().lower() not in ("true", "false"):
+                    return value, "value is not true or false"
+                value = str(value).strip().lower() == "true"
+        elif attribute_type in ("String", "Password"):
+            value = str(value)
+            min_length, max_length = attribute.get("MinLength"), attribute.get("MaxLength")
+            if min_length is not None and len(value) < min_length or max_length is not None and len(value) > max_length:
+                return value, "value length must be %s to %s characters" % (min_length or 0, max_length)
+            expression = attribute.get("ValueExpression")
+            if expression:
+                try:
+                    if re.fullmatch(expression, value) is None:
+                        return value, "value does not match %s" % expression
+                except re.error:
+                    # Registry expressions are ECMA-262, skipped if Python can't compile one
+                    pass
+        return value, None
+
+    def _dependency_error(self, name, value, values):
+        # ReadOnly/GrayOut rules which apply decide if the attribute can be set, a rule with MapToValue false unlocks an attribute the registry marks ReadOnly. The static ReadOnly flag is only used when no such rule applies.
+        locked_by = None
+        unlocked = False
+        for rule in self.rules(name):
+            if rule.get("MapToProperty") not in BLOCKING_PROPERTIES or evaluate_map_from(rule["MapFrom"], values) is not True:
+                continue
+            if rule.get("MapToValue"):
+                locked_by = locked_by or rule
+            else:
+                unlocked = True
+        if locked_by:
+            return "attribute is read only when %s" % describe_map_from(locked_by["MapFrom"])
+        if not unlocked and self.attributes[name].get("ReadOnly"):
+            return "attribute is read only"
+        for rule in self.rules(name):
+            if rule.get("MapToProperty") == "CurrentValue" and not _same(value, rule.get("MapToValue")) and evaluate_map_from(rule["MapFrom"], values) is True:
+                return "value must be %s when %s" % (rule.get("MapToValue"), describe_map_from(rule["MapFrom"]))
+        return None
+
+    def validate(self, attributes, current_values=None):
+        """Return BiosValidation for attributes (dictionary of attribute name to value). attributes of the result are the values converted to the registry types, without unchanged attributes (already set to the value in current_values) and without attributes with errors. errors is a list of BiosAttributeError in attributes order. ReadOnly and Dependencies rules are evaluated against current_values (BIOS Attributes) with every valid pending value applied, rules reading an attribute not in current_values are skipped."""
+        valid = collections.OrderedDict()
+        unchanged = []
+        errors = []
+        for name, value in attributes.items():
+            if name not in self.attributes:
+                registry_name = self._lower_names.get(name.lower())
+                errors.append(BiosAttributeError(name, value, "attribute name is case sensitive, did you mean %s" % registry_name if registry_name else "attribute is not in the BIOS registry"))
+                continue
+            value, reason = self.coerce(name, value)
+            if reason:
+                errors.append(BiosAttributeError(name, value, reason))
+            elif current_values and name in current_values and current_values[name] == value:
+                unchanged.append(name)
+            else:
+                valid[name] = value
+        # A rejected value is not applied, checked again until no more values are rejected since it may have unlocked another attribute
+        rejected = True
+        while rejected:
+            rejected = False
+            values = dict(current_values or {})
+            values.update(valid)
+            for name, value in list(valid.items()):
+                reason = self._dependency_error(name, value, values)
+                if reason:
+                    errors.append(BiosAttributeError(name, value, reason))
+                    valid.pop(name)
+                    rejected = True
+        order = list(attributes)
+        errors.sort(key=lambda x: order.index(x.attribute))
+        return BiosValidation(valid, unchanged, errors)
+
+
+def get_bios_registry_index(idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None):
+    """Return BiosRegistryIndex for the iDRAC BIOS registry. Registry is read through get_registry() and the index is built once per model and BIOS version for the life of the process. Raises RegistryError if the registry can't be fetched."""
+    owned_transport = transport is None
+    if owned_transport:
+        transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+    try:
+        versions = get_firmware_versions(idrac_ip, transport=transport)
+        registry = get_registry(idrac_ip, BIOS_REGISTRY_URI, transport=transport)
+    finally:
+        if owned_transport:
+            transport.close()
+    key = (versions.model, versions.bios)
+    with _cache_lock:
+        cached = _index_cache.get(key)
+    # Registry object changes when a revalidation downloads a new copy
+    if cached and cached[0] is registry:
+        return cached[1]
+    index = BiosRegistryIndex(registry)
+    with _cache_lock:
+        _index_cache[key] = (registry, index)
+    return index
+
+
+def get_current_bios_attributes(idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None):
+    """Return dictionary of BIOS attribute name to current value. Raises RegistryError if BIOS attributes can't be read."""
+    owned_transport = transport is None
+    if owned_transport:
+        transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+    try:
+        response = transport.get(BIOS_URI)
+    finally:
+        if owned_transport:
+            transport.close()
+    try:
+        data = response.json()
+    except ValueError:
+        data = None
+    if response.status_code != 200 or not isinstance(data, dict):
+        raise RegistryError(BIOS_URI, response.status_code, data)
+    return data.get("Attributes") or {}
+
+
+def validate_bios_attributes(idrac_ip, attributes, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None):
+    """Return BiosValidation of attributes (dictionary of attribute name to value) against the iDRAC BIOS registry and current BIOS values, see BiosRegistryIndex.validate(). Nothing is changed on the iDRAC. Raises RegistryError if the registry or BIOS attributes can't be read."""
+    owned_transport = transport is None
+    if owned_transport:
+        transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+    try:
+        index = get_bios_registry_index(idrac_ip, transport=transport)
+        current_values = get_current_bios_attributes(idrac_ip, transport=transport)
+    finally:
+        if owned_transport:
+            transport.close()
+    return index.validate(attributes, current_values)
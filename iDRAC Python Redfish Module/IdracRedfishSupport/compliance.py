@@ -0,0 +1,342 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Offline firmware compliance against a Dell catalog (Catalog.xml). The catalog is parsed once with iterparse into a
+# CatalogIndex keyed by device component ID, PCI IDs, system ID and device class, the index can be saved and loaded
+# again in a fraction of the parse time. Firmware inventory of each iDRAC is collected with one $expand
+# FirmwareInventory request (plus one GET of the system for its system ID) and can be saved to a file, update plans
+# for the whole fleet are then computed locally without any iDRAC or GetRepoBasedUpdateList call.
+#
+# Only Windows DUPs (.EXE) of firmware component types are indexed by default, iDRAC can't apply Linux packages and
+# driver packages list the same devices as the firmware packages.
+
+import collections
+import concurrent.futures
+import functools
+import gzip
+import json
+import marshal
+import re
+import xml.etree.ElementTree as ET
+
+import requests
+
+from .firmware import forget_firmware_inventory, get_firmware_inventory
+from .transport import RedfishTransport
+
+CATALOG_INDEX_FORMAT = 1
+DEFAULT_COLLECT_WORKERS = 16
+FIRMWARE_COMPONENT_TYPES = ("BIOS", "FRMW", "APAC")
+SYSTEM_URI = "/redfish/v1/Systems/System.Embedded.1"
+
+COMPLIANCE_STATUSES = ("UPDATE", "COMPLIANT", "NEWER", "NOT_IN_CATALOG")
+
+CatalogComponent = collections.namedtuple("CatalogComponent", ["package_id", "path", "version", "name", "component_type", "category", "criticality", "reboot_required", "release_date", "component_ids", "pci_ids", "system_ids"])
+HostInventory = collections.namedtuple("HostInventory", ["idrac_ip", "system_id", "model", "members", "error"])
+DeviceCompliance = collections.namedtuple("DeviceCompliance", ["member_id", "name", "component_id", "installed_version", "status", "component"])
+HostPlan = collections.namedtuple("HostPlan", ["idrac_ip", "system_id", "model", "devices", "packages", "error"])
+
+# FirmwareInventory member properties kept in saved inventories
+MEMBER_PROPERTIES = ("Id", "Name", "Version", "SoftwareId", "Updateable")
+DELL_INVENTORY_PROPERTIES = ("ComponentID", "DeviceID", "VendorID", "SubDeviceID", "SubVendorID", "FQDD", "ComponentType")
+
+
+@functools.lru_cache(maxsize=None)
+def version_key(version):
+    """Return sort key for a firmware version, numeric parts compare as numbers (2.10.0 is newer than 2.9.1)"""
+    return tuple((0, int(i), "") if i.isdigit() else (1, 0, i.lower()) for i in re.findall(r"\d+|[A-Za-z]+", version or ""))
+
+
+def _open_catalog(filename):
+    with open(filename, "rb") as open_file:
+        magic = open_file.read(2)
+    return gzip.open(filename, "rb") if magic == b"\x1f\x8b" else open(filename, "rb")
+
+
+def _pci_id(value):
+    # Catalog and inventory format PCI IDs differently (0x14E4, 14e4, 000E)
+    value = str(value or "").lower()
+    if value.startswith("0x"):
+        value = value[2:]
+    return value.lstrip("0") or ("0" if value else "")
+
+
+def _parse_component(element):
+    path = element.get("path", "").replace("\\", "/")
+    component_ids = []
+    pci_ids = []
+    for device in element.iterfind("SupportedDevices/Device"):
+        if device.get("componentID"):
+            component_ids.append(device.get("componentID"))
+        for pci in device.iterfind("PCIInfo"):
+            pci_ids.append((_pci_id(pci.get("vendorID")), _pci_id(pci.get("deviceID")), _pci_id(pci.get("subVendorID")), _pci_id(pci.get("subDeviceID"))))
+    system_ids = []
+    models = {}
+    for model in element.iterfind("SupportedSystems/Brand/Model"):
+        if model.get("systemID"):
+            system_ids.append(model.get("systemID").upper())
+            models[model.get("systemID").upper()] = (model.findtext("Display") or "").strip()
+    criticality = element.find("Criticality")
+    component_type = element.find("ComponentType")
+    category = element.find("Category")
+    component = CatalogComponent(element.get("packageID"), path, element.get("vendorVersion"), (element.findtext("Name/Display") or "").strip(),
+                                 component_type.get("value") if component_type is not None else None, category.get("value") if category is not None else None,
+                                 criticality.get("value") if criticality is not None else None, element.get("rebootRequired", "").lower() == "true",
+                                 element.get("releaseDate") or element.get("dateTime"), tuple(component_ids), tuple(pci_ids), frozenset(system_ids))
+    return component, models
+
+
+class CatalogIndex(object):
+    """Components of a Dell catalog with lookup indexes. components_for() returns the components applicable to a device by component ID or PCI IDs for a system ID, find() filters by component ID, system ID and device class (component type or category value). Use read_catalog() to parse a catalog or load a saved index."""
+
+    def __init__(self, components, models=None, version=None, release_id=None):
+        self.components = list(components)
+        self.models = dict(models or {})
+        self.version = version
+        self.release_id = release_id
+        self._by_component_id = collections.defaultdict(list)
+        self._by_pci_id = collections.defaultdict(list)
+        self._by_system_id = collections.defaultdict(list)
+        self._by_device_class = collections.defaultdict(list)
+        self._system_ids_by_model = collections.defaultdict(set)
+        self._best_components = {}
+        for position, component in enumerate(self.components):
+            for component_id in component.component_ids:
+                self._by_component_id[component_id].append(position)
+            for pci_id in component.pci_ids:
+                self._by_pci_id[pci_id[:2]].append(position)
+            for system_id in component.system_ids:
+                self._by_system_id[system_id].append(position)
+            for device_class in (component.component_type, component.category):
+                if device_class:
+                    self._by_device_class[device_class.upper()].append(position)
+        for system_id, model in self.models.items():
+            self._system_ids_by_model[model.lower()].add(system_id)
+
+    def system_ids_for_model(self, model):
+        """Return set of catalog system IDs for a model name (R650 or PowerEdge R650)"""
+        model = (model or "").lower()
+        if model in self._system_ids_by_model:
+            return self._system_ids_by_model[model]
+        return self._system_ids_by_model.get(model.split(" ")[-1], set())
+
+    def find(self, component_id=None, system_id=None, device_class=None):
+        """Return list of CatalogComponent matching every filter passed in"""
+        positions = None
+        for index, key in ((self._by_component_id, component_id), (self._by_system_id, system_id and system_id.upper()), (self._by_device_class, device_class and device_class.upper())):
+            if key is None:
+                continue
+            matched = set(index.get(str(key), []))
+            positions = matched if positions is None else positions & matched
+        if positions is None:
+            return list(self.components)
+        return [self.components[i] for i in sorted(positions)]
+
+    def components_for(self, system_ids, component_id=None, pci_id=None):
+        """Return list of CatalogComponent supporting a device (component ID or (vendor, device, subvendor, subdevice) PCI IDs) on a system, components without supported systems apply to every system"""
+        positions = set(self._by_component_id.get(str(component_id), [])) if component_id else set()
+        if pci_id and pci_id[0] and pci_id[1]:
+            for position in self._by_pci_id.get(pci_id[:2], []):
+                # Subsystem IDs must match when both the catalog and the inventory have them
+                if any(i[2:] == pci_id[2:] or not all(i[2:]) or not all(pci_id[2:]) for i in self.components[position].pci_ids if i[:2] == pci_id[:2]):
+                    positions.add(position)
+        return [self.components[i] for i in sorted(positions) if not self.components[i].system_ids or self.components[i].system_ids & system_ids]
+
+    def best_component(self, system_ids, component_id=None, pci_id=None):
+        """Return the CatalogComponent with the highest version (latest release date if versions are equal) from components_for() or None. Results are cached, fleets share few system and device combinations."""
+        key = (frozenset(system_ids), component_id, pci_id)
+        if key not in self._best_components:
+            components = self.components_for(system_ids, component_id, pci_id)
+            self._best_components[key] = max(components, key=lambda x: (version_key(x.version), x.release_date or "")) if components else None
+        return self._best_components[key]
+
+    def save(self, filename):
+        """Save the index to a file, read_catalog() loads it without parsing the catalog again"""
+        with open(filename, "wb") as open_file:
+            marshal.dump({"format": CATALOG_INDEX_FORMAT, "version": self.version, "release_id": self.release_id, "models": self.models,
+                          "components": [tuple(i) for i in self.components]}, open_file)
+
+
+def parse_catalog(filename, component_types=FIRMWARE_COMPONENT_TYPES):
+    """Parse a Dell catalog (Catalog.xml, gzip compressed or not) into a CatalogIndex. Only Windows DUPs (.EXE) of component_types are indexed, pass None for every component type. Raises xml.etree.ElementTree.ParseError if the catalog is not valid XML."""
+    components = []
+    models = {}
+    version = None
+    release_id = None
+    with _open_catalog(filename) as open_file:
+        for event, element in ET.iterparse(open_file, events=("start", "end")):
+            if event == "start":
+                if element.tag == "Manifest":
+                    version = element.get("version")
+                    release_id = element.get("releaseID")
+                continue
+            if element.tag == "SoftwareComponent":
+                component, component_models = _parse_component(element)
+                element.clear()
+                if not component.path.lower().endswith(".exe") or (component_types and component.component_type not in component_types):
+                    continue
+                components.append(component)
+                models.update(component_models)
+            elif element.tag == "SoftwareBundle":
+                element.clear()
+    return CatalogIndex(components, models, version, release_id)
+
+
+def read_catalog(filename, component_types=FIRMWARE_COMPONENT_TYPES):
+    """Return CatalogIndex for a Dell catalog (XML or gzip compressed XML) or an index saved with CatalogIndex.save(). Raises ValueError if the file is neither."""
+    with _open_catalog(filename) as open_file:
+        start = open_file.read(4)
+    if start.lstrip()[:1] == b"<" or start[:2] in (b"\xff\xfe", b"\xfe\xff") or start[:3] == b"\xef\xbb\xbf":
+        try:
+            return parse_catalog(filename, component_types)
+        except ET.ParseError as error:
+            raise ValueError("%s is not a valid catalog, detailed error information: %s" % (filename, error))
+    with open(filename, "rb") as open_file:
+        try:
+            data = marshal.load(open_file)
+        except (EOFError, TypeError, ValueError) as error:
+            raise ValueError("%s is not a catalog or saved catalog index, detailed error information: %s" % (filename, error))
+    if not isinstance(data, dict) or data.get("format") != CATALOG_INDEX_FORMAT:
+        raise ValueError("%s is not a catalog or saved catalog index" % filename)
+    return CatalogIndex([CatalogComponent(*i) for i in data["components"]], data["models"], data["version"], data["release_id"])
+
+
+def _member_record(member):
+    record = dict((key, member[key]) for key in MEMBER_PROPERTIES if key in member)
+    dell_inventory = member.get("Oem", {}).get("Dell", {}).get("DellSoftwareInventory", {})
+    if dell_inventory:
+        record["Oem"] = {"Dell": {"DellSoftwareInventory": dict((key, dell_inventory[key]) for key in DELL_INVENTORY_PROPERTIES if key in dell_inventory)}}
+    return record
+
+
+def _system_id(system):
+    system_id = system.get("Oem", {}).get("Dell", {}).get("DellSystem", {}).get("SystemID")
+    if isinstance(system_id, int):
+        return "%04X" % system_id
+    return str(system_id).upper() if system_id else None
+
+
+def collect_inventory(idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None):
+    """Return HostInventory for one iDRAC: system ID, model and installed FirmwareInventory members (only the properties used for compliance). Errors are returned in error instead of raised."""
+    owned_transport = transport is None
+    if owned_transport:
+        transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+    try:
+        members = get_firmware_inventory(idrac_ip, transport=transport, max_age=0)
+        response = transport.get(SYSTEM_URI)
+        if response.status_code != 200:
+            raise ValueError("GET %s failed, status code %s returned" % (SYSTEM_URI, response.status_code))
+        system = response.json()
+        return HostInventory(idrac_ip, _system_id(system), system.get("Model"), [_member_record(i) for i in members if i.get("Id", "").lower().startswith("installed")], None)
+    except (requests.RequestException, ValueError) as error:
+        return HostInventory(idrac_ip, None, None, [], str(error))
+    finally:
+        forget_firmware_inventory(idrac_ip)
+        if owned_transport:
+            transport.close()
+
+
+def collect_inventories(idrac_ips, username=None, password=None, x_auth_token=None, verify_cert=False, max_workers=DEFAULT_COLLECT_WORKERS):
+    """Generator returning HostInventory for every iDRAC as collected, max_workers iDRACs at the same time"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(collect_inventory, idrac_ip, username, password, x_auth_token, verify_cert) for idrac_ip in idrac_ips]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def save_inventories(inventories, filename):
+    """Write HostInventory records to an NDJSON file (one iDRAC per line), returns number of iDRACs written"""
+    count = 0
+    with open(filename, "w") as open_file:
+        for inventory in inventories:
+            open_file.write(json.dumps(inventory._asdict()))
+            open_file.write("\n")
+            count += 1
+    return count
+
+
+def load_inventories(filenames):
+    """Generator returning HostInventory for every iDRAC in NDJSON files written by save_inventories()"""
+    for filename in filenames:
+        with open(filename) as open_file:
+            for line in open_file:
+                if line.strip():
+                    data = json.loads(line)
+                    yield HostInventory(data["idrac_ip"], data.get("system_id"), data.get("model"), data.get("members", []), data.get("error"))
+
+
+def _package_order(component):
+    # Same order as the rollout: other packages first, then CPLD, iDRAC last
+    path = component.path.lower()
+    return ("idrac" in path or "integrated dell remote access" in component.name.lower(), "cpld" in path)
+
+
+def plan_host(catalog, inventory):
+    """Return HostPlan for one HostInventory. devices has one DeviceCompliance per installed device, packages the CatalogComponents to apply in update order (one per package even if it updates multiple devices)."""
+    if inventory.error:
+        return HostPlan(inventory.idrac_ip, inventory.system_id, inventory.model, [], [], inventory.error)
+    system_ids = set([inventory.system_id]) if inventory.system_id else catalog.system_ids_for_model(inventory.model)
+    if not system_ids:
+        return HostPlan(inventory.idrac_ip, inventory.system_id, inventory.model, [], [], "system ID %s model %s not found in catalog" % (inventory.system_id, inventory.model))
+    devices = []
+    packages = collections.OrderedDict()
+    for member in inventory.members:
+        dell_inventory = member.get("Oem", {}).get("Dell", {}).get("DellSoftwareInventory", {})
+        component_id = str(member.get("SoftwareId") or dell_inventory.get("ComponentID") or "")
+        if component_id == "0":
+            component_id = ""
+        pci_id = tuple(_pci_id(dell_inventory.get(key)) for key in ("VendorID", "DeviceID", "SubVendorID", "SubDeviceID")) if dell_inventory else None
+        component = catalog.best_component(system_ids, component_id, pci_id)
+        installed_version = member.get("Version")
+        if component is None:
+            devices.append(DeviceCompliance(member.get("Id"), member.get("Name"), component_id, installed_version, "NOT_IN_CATALOG", None))
+            continue
+        comparison = (version_key(component.version) > version_key(installed_version)) - (version_key(component.version) < version_key(installed_version))
+        status = "UPDATE" if comparison > 0 else "NEWER" if comparison < 0 else "COMPLIANT"
+        devices.append(DeviceCompliance(member.get("Id"), member.get("Name"), component_id, installed_version, status, component))
+        if status == "UPDATE":
+            packages.setdefault(component.path, component)
+    return HostPlan(inventory.idrac_ip, inventory.system_id, inventory.model, devices, sorted(packages.values(), key=_package_order), None)
+
+
+def plan_fleet(catalog, inventories):
+    """Generator returning HostPlan for every HostInventory, no iDRAC access"""
+    for inventory in inventories:
+        yield plan_host(catalog, inventory)
+
+
+def device_records(plan, statuses=("UPDATE",)):
+    """Return list of output records (dictionaries) for the devices of a HostPlan with a status in statuses (None for every device)"""
+    records = []
+    for device in plan.devices:
+        if statuses and device.status not in statuses:
+            continue
+        component = device.component
+        records.append(collections.OrderedDict([("IdracIp", plan.idrac_ip), ("SystemID", plan.system_id), ("Model", plan.model), ("Device", device.name), ("FirmwareId", device.member_id),
+                                                ("ComponentID", device.component_id), ("InstalledVersion", device.installed_version), ("CatalogVersion", component.version if component else None),
+                                                ("Status", device.status), ("Criticality", component.criticality if component else None), ("RebootRequired", component.reboot_required if component else None),
+                                                ("ComponentType", component.component_type if component else None), ("PackagePath", component.path if component else None)]))
+    return records
+
+
+def compliance_summary(plans):
+    """Return dictionary with totals for a list of HostPlan: iDRACs compliant, needing updates or failed and iDRAC count per package path"""
+    summary = {"total": len(plans), "compliant": 0, "updates_needed": 0, "errors": 0, "packages": collections.Counter()}
+    for plan in plans:
+        if plan.error:
+            summary["errors"] += 1
+        elif plan.packages:
+            summary["updates_needed"] += 1
+            summary["packages"].update(i.path for i in plan.packages)
+        else:
+            summary["compliant"] += 1
+    summary["packages"] = summary["packages"].most_common()
+    return summary
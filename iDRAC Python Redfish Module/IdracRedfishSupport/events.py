@@ -0,0 +1,419 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Redfish event receiver, a local HTTPS listener which creates an EventService subscription on each iDRAC and routes
+# pushed events to whoever is waiting on a job ID or power state change. Jobs watched through a JobWatcher attached to
+# the receiver are polled once when an event for the job arrives and otherwise only every fallback interval, so
+# polling remains in place when an event is lost or iDRAC can't reach the listener. Event POSTs are not authenticated,
+# only events sent from the address of a subscribed iDRAC are accepted.
+
+import collections
+import http.server
+import json
+import logging
+import re
+import socket
+import socketserver
+import ssl
+import threading
+import time
+
+import requests
+
+from .jobs import JobWatcher
+from .transport import RedfishTransport, split_host
+
+SUBSCRIPTIONS_URI = "/redfish/v1/EventService/Subscriptions"
+SYSTEM_URI = "/redfish/v1/Systems/System.Embedded.1"
+IDRAC_ATTRIBUTES_URI = "/redfish/v1/Managers/iDRAC.Embedded.1/Attributes"
+DEFAULT_PORT = 8443
+DEFAULT_EVENT_PATH = "/redfish_events"
+DEFAULT_EVENT_TYPES = ("Alert",)
+# Seconds between polls when no event arrives, jobs and power state are still checked at least this often
+DEFAULT_FALLBACK_INTERVAL = 60
+# Subscription Context is set to this prefix plus the iDRAC IP, only used to identify subscriptions created by the
+# receiver, events are routed by client address since anyone can POST a Context
+CONTEXT_PREFIX = "IdracRedfishSupport:"
+REQUEST_TIMEOUT = 30
+
+# Job IDs (JID_/RID_) found in MessageArgs, OriginOfCondition or Message, iDRAC job events carry the job ID there
+JOB_ID_PATTERN = re.compile(r"\b(?:JID|RID)_[0-9]+\b")
+# Message ID prefixes of job events not referencing a job ID, every job watched on the iDRAC is polled
+JOB_MESSAGE_PREFIXES = ("JCP", "SUP", "RED", "JobEvent", "TaskEvent")
+
+Event = collections.namedtuple("Event", ["idrac_ip", "event_type", "message_id", "message", "message_args", "origin", "job_ids", "timestamp", "data"])
+
+
+def _event_records(idrac_ip, payload):
+    # Redfish events are delivered as {"Events": [...]}, older iDRAC versions POST one event record per request
+    records = payload.get("Events") if isinstance(payload.get("Events"), list) else [payload]
+    events = []
+    for record in records:
+        message_args = record.get("MessageArgs") or []
+        origin = record.get("OriginOfCondition") or ""
+        if isinstance(origin, dict):
+            origin = origin.get("@odata.id", "")
+        text = " ".join([str(i) for i in message_args] + [origin, record.get("Message") or ""])
+        job_ids = list(collections.OrderedDict.fromkeys(JOB_ID_PATTERN.findall(text)))
+        events.append(Event(idrac_ip, record.get("EventType"), record.get("MessageId"), record.get("Message"), message_args, origin, job_ids,
+                            record.get("EventTimestamp"), record))
+    return events
+
+
+def is_job_event(event):
+    """Return True if the event references a job ID or its message ID is a job message (example: IDRAC.2.8.JCP037)"""
+    if event.job_ids:
+        return True
+    message_id = (event.message_id or "").split(".")[-1]
+    registry = (event.message_id or "").split(".")[0]
+    return message_id.startswith(JOB_MESSAGE_PREFIXES) or registry in JOB_MESSAGE_PREFIXES
+
+
+def _normalize_address(address):
+    # Client address as reported by the listener socket, IPv4 clients of a dual stack listener show up as ::ffff:a.b.c.d
+    address = address.split("%")[0].lower()
+    if address.startswith("::ffff:") and "." in address:
+        address = address[len("::ffff:"):]
+    return address
+
+
+def local_address_for(idrac_ip):
+    """Return local IP address used to reach the iDRAC, used as the subscription destination host"""
+    host, port = split_host(idrac_ip)
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    udp_socket = socket.socket(family, socket.SOCK_DGRAM)
+    try:
+        # UDP connect only selects the route, no packet is sent
+        udp_socket.connect((host, port))
+        return udp_socket.getsockname()[0]
+    finally:
+        udp_socket.close()
+
+
+class _Waiter(object):
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.event = threading.Event()
+        self.matched = None
+
+
+class _EventRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = REQUEST_TIMEOUT
+
+    def log_message(self, format, *args):
+        logging.debug("- INFO, event receiver %s: %s" % (self.client_address[0], format % args))
+
+    def _respond(self, status_code):
+        self.send_response(status_code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            payload = json.loads(body.decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            self._respond(400)
+            return
+        if self.server.receiver.idrac_for_address(self.client_address[0]) is None:
+            logging.debug("- INFO, event receiver ignored event from %s, not the address of a subscribed iDRAC" % self.client_address[0])
+            self._respond(403)
+            return
+        # Respond before routing so iDRAC event delivery never waits on callbacks
+        self._respond(200)
+        self.server.receiver.dispatch(payload, self.client_address[0])
+
+    def do_GET(self):
+        self._respond(200)
+
+
+class _EventServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, server_address, receiver, ssl_context):
+        if ":" in server_address[0]:
+            self.address_family = socket.AF_INET6
+        http.server.HTTPServer.__init__(self, server_address, _EventRequestHandler)
+        self.receiver = receiver
+        self.ssl_context = ssl_context
+
+    def finish_request(self, request, client_address):
+        # TLS handshake is done in the request thread so a slow client doesn't block accepting other iDRAC connections
+        if self.ssl_context is not None:
+            request.settimeout(REQUEST_TIMEOUT)
+            try:
+                request = self.ssl_context.wrap_socket(request, server_side=True)
+            except (ssl.SSLError, OSError) as error:
+                logging.debug("- INFO, event receiver TLS handshake with %s failed, detailed error information: %s" % (client_address[0], error))
+                return
+        http.server.HTTPServer.finish_request(self, request, client_address)
+
+
+class EventReceiver(object):
+    """Local Redfish event listener. iDRAC only sends events to HTTPS destinations, pass in certfile/keyfile of a certificate for this host (use_tls=False is only meant for testing). subscribe() creates an EventService subscription on an iDRAC pointing to this listener, every subscription created is deleted on close(). Only events sent from the address of a subscribed iDRAC are accepted. Events are passed to listeners added with add_listener(), to wait_for_event() / wait_for_power_state() callers and wake the jobs of attached JobWatchers."""
+
+    def __init__(self, listen_address="0.0.0.0", port=DEFAULT_PORT, certfile=None, keyfile=None, destination_host=None, use_tls=True, event_path=DEFAULT_EVENT_PATH):
+        ssl_context = None
+        if use_tls:
+            if not certfile:
+                raise ValueError("certfile is required for the HTTPS event listener, iDRAC only sends events to HTTPS destinations")
+            ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ssl_context.load_cert_chain(certfile, keyfile)
+        self.use_tls = use_tls
+        self.destination_host = destination_host
+        self.event_path = event_path
+        self._server = _EventServer((listen_address, port), self, ssl_context)
+        self.port = self._server.server_address[1]
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._watchers = []
+        self._waiters = collections.defaultdict(list)
+        self._subscriptions = collections.OrderedDict()
+        self._transports = {}
+        self._owned_transports = []
+        self._addresses = {}
+        self._restore_alerts = {}
+        self.event_count = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, name="EventReceiver", daemon=True)
+        self._thread.start()
+
+    def destination_uri(self, idrac_ip):
+        """Return subscription destination URI for the iDRAC"""
+        host = self.destination_host or local_address_for(idrac_ip)
+        if ":" in host:
+            host = "[%s]" % host
+        return "%s://%s:%s%s" % ("https" if self.use_tls else "http", host, self.port, self.event_path)
+
+    def _get_transport(self, idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None):
+        if transport is None:
+            transport = self._transports.get(idrac_ip)
+        if transport is None:
+            transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+            self._owned_transports.append(transport)
+        self._transports[idrac_ip] = transport
+        return transport
+
+    def enable_alerts(self, idrac_ip, transport):
+        """Set iDRAC attribute IPMILan.1.AlertEnable to Enabled if disabled, iDRAC doesn't send Alert events when disabled. The attribute is set back to Disabled by unsubscribe(). Returns True if enabled."""
+        response = transport.get(IDRAC_ATTRIBUTES_URI)
+        if response.status_code != 200:
+            return False
+        if response.json().get("Attributes", {}).get("IPMILan.1.AlertEnable") != "Disabled":
+            return True
+        response = transport.patch(IDRAC_ATTRIBUTES_URI, data=json.dumps({"Attributes": {"IPMILan.1.AlertEnable": "Enabled"}}), headers={'content-type': 'application/json'})
+        if response.status_code != 200:
+            return False
+        with self._lock:
+            self._restore_alerts[idrac_ip] = "Disabled"
+        return True
+
+    def _restore_alert_setting(self, idrac_ip):
+        with self._lock:
+            alert_enable = self._restore_alerts.pop(idrac_ip, None)
+        if alert_enable is None:
+            return
+        try:
+            response = self._transports[idrac_ip].patch(IDRAC_ATTRIBUTES_URI, data=json.dumps({"Attributes": {"IPMILan.1.AlertEnable": alert_enable}}), headers={'content-type': 'application/json'})
+        except requests.RequestException as error:
+            logging.warning("- WARNING, unable to set iDRAC attribute IPMILan.1.AlertEnable back to %s on iDRAC %s, detailed error information: %s" % (alert_enable, idrac_ip, error))
+            return
+        if response.status_code != 200:
+            logging.warning("- WARNING, unable to set iDRAC attribute IPMILan.1.AlertEnable back to %s on iDRAC %s, status code %s returned" % (alert_enable, idrac_ip, response.status_code))
+
+    def _add_addresses(self, idrac_ip):
+        try:
+            address_infos = socket.getaddrinfo(split_host(idrac_ip)[0], None)
+        except socket.error as error:
+            logging.warning("- WARNING, unable to resolve iDRAC %s, events from it will be ignored, detailed error information: %s" % (idrac_ip, error))
+            return
+        with self._lock:
+            for address_info in address_infos:
+                self._addresses[_normalize_address(address_info[4][0])] = idrac_ip
+
+    def _remove_addresses(self, idrac_ip):
+        with self._lock:
+            for address in [i for i, j in self._addresses.items() if j == idrac_ip]:
+                del self._addresses[address]
+
+    def idrac_for_address(self, client_address):
+        """Return the subscribed iDRAC an event sender address belongs to, or None if the address is not a subscribed iDRAC"""
+        return self._addresses.get(_normalize_address(client_address))
+
+    def subscribe(self, idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None, event_types=DEFAULT_EVENT_TYPES, enable_alerts=False):
+        """Create an EventService subscription on the iDRAC sending events to this listener. Pass in either credentials or an existing RedfishTransport, the same transport is used to poll jobs and power state for the iDRAC. iDRAC doesn't send Alert events while attribute IPMILan.1.AlertEnable is Disabled, pass in enable_alerts=True to enable it until unsubscribe(). Returns subscription URI or None if the subscription could not be created (polling fallback still works for the iDRAC)."""
+        transport = self._get_transport(idrac_ip, username, password, x_auth_token, verify_cert, transport)
+        # Sender addresses are known before the subscription exists so the first event isn't rejected
+        self._add_addresses(idrac_ip)
+        try:
+            if enable_alerts and "Alert" in event_types and not self.enable_alerts(idrac_ip, transport):
+                logging.warning("- WARNING, unable to enable iDRAC attribute IPMILan.1.AlertEnable on iDRAC %s, Alert events may not be sent" % idrac_ip)
+            payload = {"Destination": self.destination_uri(idrac_ip), "EventTypes": list(event_types), "Context": CONTEXT_PREFIX + idrac_ip, "Protocol": "Redfish"}
+            response = transport.post(SUBSCRIPTIONS_URI, data=json.dumps(payload), headers={'content-type': 'application/json'})
+        except (requests.RequestException, ValueError, OSError) as error:
+            logging.warning("- WARNING, unable to create event subscription on iDRAC %s, detailed error information: %s" % (idrac_ip, error))
+            self._remove_addresses(idrac_ip)
+            self._restore_alert_setting(idrac_ip)
+            return None
+        if response.status_code != 201:
+            logging.warning("- WARNING, unable to create event subscription on iDRAC %s, status code %s returned, error: %s" % (idrac_ip, response.status_code, response.text))
+            self._remove_addresses(idrac_ip)
+            self._restore_alert_setting(idrac_ip)
+            return None
+        subscription_uri = response.headers.get("Location", "")
+        if "/redfish/" in subscription_uri:
+            subscription_uri = subscription_uri[subscription_uri.index("/redfish/"):]
+        with self._lock:
+            self._subscriptions[idrac_ip] = subscription_uri
+        return subscription_uri
+
+    def unsubscribe(self, idrac_ip):
+        """Delete the subscription created on the iDRAC and set IPMILan.1.AlertEnable back if subscribe() enabled it, returns True if deleted"""
+        with self._lock:
+            subscription_uri = self._subscriptions.pop(idrac_ip, None)
+        if not subscription_uri:
+            return False
+        self._remove_addresses(idrac_ip)
+        self._restore_alert_setting(idrac_ip)
+        try:
+            response = self._transports[idrac_ip].delete(subscription_uri)
+        except requests.RequestException as error:
+            logging.warning("- WARNING, unable to delete event subscription %s on iDRAC %s, detailed error information: %s" % (subscription_uri, idrac_ip, error))
+            return False
+        return response.status_code in (200, 202, 204)
+
+    @property
+    def subscriptions(self):
+        """Dictionary of iDRAC IP and subscription URI for every subscription created"""
+        return dict(self._subscriptions)
+
+    def add_listener(self, callback):
+        """Call callback with every Event received"""
+        self._listeners.append(callback)
+
+    def attach(self, watcher):
+        """Wake jobs watched by the JobWatcher when an event for the job arrives"""
+        self._watchers.append(watcher)
+        return watcher
+
+    def job_watcher(self, fallback_interval=DEFAULT_FALLBACK_INTERVAL, **kwargs):
+        """Return a JobWatcher attached to this receiver. Jobs are polled when watched, then every fallback_interval seconds unless an event for the job triggers a poll sooner. Other arguments are passed to JobWatcher, iDRACs subscribed before calling this reuse the subscription transport."""
+        kwargs.setdefault("min_interval", fallback_interval)
+        kwargs.setdefault("max_interval", fallback_interval)
+        watcher = JobWatcher(**kwargs)
+        for idrac_ip, transport in self._transports.items():
+            watcher.add_host(idrac_ip, transport=transport)
+        return self.attach(watcher)
+
+    def detach(self, watcher):
+        """Stop waking jobs of the JobWatcher, the watcher is not closed"""
+        if watcher in self._watchers:
+            self._watchers.remove(watcher)
+
+    def dispatch(self, payload, client_address):
+        """Route an event payload received from client_address, called by the listener for every event POST. Events not sent from the address of a subscribed iDRAC are dropped, returns number of events routed."""
+        idrac_ip = self.idrac_for_address(client_address)
+        if idrac_ip is None:
+            return 0
+        events = _event_records(idrac_ip, payload)
+        for event in events:
+            self.event_count += 1
+            logging.debug("- INFO, event received from iDRAC %s: %s %s" % (idrac_ip, event.message_id, event.message))
+            for callback in list(self._listeners):
+                try:
+                    callback(event)
+                except Exception as error:
+                    logging.debug("- INFO, event listener callback failed, detailed error information: %s" % error)
+            if is_job_event(event):
+                for watcher in list(self._watchers):
+                    if event.job_ids:
+                        for job_id in event.job_ids:
+                            watcher.wake(idrac_ip, job_id)
+                    else:
+                        watcher.wake(idrac_ip)
+            with self._lock:
+                waiters = list(self._waiters.get(idrac_ip, []))
+            for waiter in waiters:
+                if waiter.predicate is None or waiter.predicate(event):
+                    waiter.matched = event
+                    waiter.event.set()
+        return len(events)
+
+    def _add_waiter(self, idrac_ip, predicate):
+        waiter = _Waiter(predicate)
+        with self._lock:
+            self._waiters[idrac_ip].append(waiter)
+        return waiter
+
+    def _remove_waiter(self, idrac_ip, waiter):
+        with self._lock:
+            self._waiters[idrac_ip].remove(waiter)
+            if not self._waiters[idrac_ip]:
+                del self._waiters[idrac_ip]
+
+    def wait_for_event(self, idrac_ip, predicate=None, timeout=None):
+        """Wait for the next event from the iDRAC, predicate is a function called with Event returning True for the event to wait for. Returns Event or None if timeout in seconds is reached."""
+        waiter = self._add_waiter(idrac_ip, predicate)
+        try:
+            waiter.event.wait(timeout)
+            return waiter.matched
+        finally:
+            self._remove_waiter(idrac_ip, waiter)
+
+    def wait_for_job_event(self, idrac_ip, job_id, timeout=None):
+        """Wait for the next event referencing the job ID, returns Event or None if timeout in seconds is reached"""
+        return self.wait_for_event(idrac_ip, lambda event: job_id in event.job_ids, timeout)
+
+    def wait_for_power_state(self, idrac_ip, power_state, timeout=None, transport=None, fallback_interval=DEFAULT_FALLBACK_INTERVAL):
+        """Wait until server PowerState is the value passed in (example: On or Off). PowerState is read when called, on every event received from the iDRAC and every fallback_interval seconds if no event arrives. Returns True or False if timeout in seconds is reached."""
+        transport = transport or self._transports.get(idrac_ip)
+        if transport is None:
+            raise ValueError("no transport for iDRAC %s, call subscribe() or pass in transport" % idrac_ip)
+        deadline = None if timeout is None else time.time() + timeout
+        # Waiter is registered before reading PowerState so an event arriving in between is not missed
+        waiter = self._add_waiter(idrac_ip, None)
+        try:
+            while True:
+                try:
+                    response = transport.get(SYSTEM_URI)
+                    if response.status_code == 200 and response.json().get("PowerState") == power_state:
+                        return True
+                except (requests.RequestException, ValueError) as error:
+                    logging.debug("- INFO, unable to get PowerState for iDRAC %s, detailed error information: %s" % (idrac_ip, error))
+                wait_time = fallback_interval
+                if deadline is not None:
+                    wait_time = min(wait_time, deadline - time.time())
+                    if wait_time <= 0:
+                        return False
+                waiter.event.wait(wait_time)
+                waiter.event.clear()
+        finally:
+            self._remove_waiter(idrac_ip, waiter)
+
+    def close(self):
+        """Delete every subscription created, stop the listener and close transports created by the receiver"""
+        for idrac_ip in list(self._subscriptions):
+            self.unsubscribe(idrac_ip)
+        self._server.shutdown()
+        self._server.server_close()
+        for watcher in self._watchers:
+            watcher.close()
+        for transport in self._owned_transports:
+            transport.close()
+        self._owned_transports = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
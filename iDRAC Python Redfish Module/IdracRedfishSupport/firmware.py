@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Local Dell Update Package (DUP) version check. Device component IDs and package version are read from package.xml
+# inside the DUP (or the DUP file name as fallback) and compared against iDRAC firmware inventory before uploading
+# the package, so packages already installed are never uploaded. Firmware inventory is fetched with one $expand
+# request and cached per iDRAC for the life of the process.
+
+import collections
+import logging
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+
+import requests
+
+from .transport import RedfishTransport
+
+FIRMWARE_INVENTORY_URI = "/redfish/v1/UpdateService/FirmwareInventory"
+FIRMWARE_INVENTORY_EXPAND_URI = "%s?$expand=*($levels=1)" % FIRMWARE_INVENTORY_URI
+# Seconds cached firmware inventory is reused, call forget_firmware_inventory() once an update job completes
+DEFAULT_INVENTORY_CACHE_SECONDS = 600
+# DUPs without package.xml in a zip archive are scanned for the embedded SoftwareComponent XML in chunks of this size
+SCAN_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_PACKAGE_XML_SIZE = 1024 * 1024
+
+# Dell DUP file name, example: Network_Firmware_H8M48_WN64_20.5.16_A00.EXE or BIOS_8MRPC_C6420_WN64_2.11.2.EXE
+DUP_FILENAME_PATTERN = re.compile(r"_(?P<package_id>[0-9A-Z]{5})_.*?WN(?:32|64)_(?P<version>[0-9][^_]*?)(?:_A[0-9]+(?:-[0-9]+)?(?:_[0-9]+)?)?\.exe$", re.IGNORECASE)
+
+DupPackage = collections.namedtuple("DupPackage", ["filename", "package_id", "version", "dell_version", "component_ids", "device_names", "source"])
+VersionCheck = collections.namedtuple("VersionCheck", ["package", "installed", "update_needed", "reason"])
+
+_inventory_cache = {}
+_inventory_cache_lock = threading.Lock()
+
+
+def _local_name(element):
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _parse_package_xml(filename, content):
+    root = ET.fromstring(content)
+    component = root if _local_name(root) == "SoftwareComponent" else next((i for i in root.iter() if _local_name(i) == "SoftwareComponent"), None)
+    if component is None:
+        return None
+    component_ids = []
+    device_names = []
+    for device in component.iter():
+        if _local_name(device) != "Device":
+            continue
+        if device.get("componentID"):
+            component_ids.append(device.get("componentID"))
+        display = next((i.text for i in device.iter() if _local_name(i) == "Display" and i.text), None)
+        if display:
+            device_names.append(display.strip())
+    return DupPackage(os.path.basename(filename), component.get("packageID"), component.get("vendorVersion"), component.get("dellVersion"),
+                      component_ids, device_names, "package.xml")
+
+
+def _read_zip_package_xml(filename):
+    try:
+        with zipfile.ZipFile(filename) as zip_file:
+            for name in zip_file.namelist():
+                if os.path.basename(name).lower() == "package.xml":
+                    return zip_file.read(name)
+    except (zipfile.BadZipfile, OSError, RuntimeError, NotImplementedError):
+        pass
+    return None
+
+
+def _scan_package_xml(filename):
+    start_tag = b"<SoftwareComponent"
+    end_tag = b"</SoftwareComponent>"
+    with open(filename, "rb") as open_file:
+        buffer = b""
+        while True:
+            chunk = open_file.read(SCAN_CHUNK_SIZE)
+            if not chunk:
+                return None
+            buffer += chunk
+            start = buffer.find(start_tag)
+            if start == -1:
+                # Keep the tail in case the start tag is split across chunks
+                buffer = buffer[-len(start_tag):]
+                continue
+            end = buffer.find(end_tag, start)
+            if end != -1:
+                return buffer[start:end + len(end_tag)]
+            if len(buffer) - start > MAX_PACKAGE_XML_SIZE:
+                return None
+            buffer = buffer[start:]
+
+
+def read_dup_package(filename):
+    """Return DupPackage for a Windows Dell Update Package. package.xml is read from the DUP without executing or extracting it, if not found package ID and version are taken from the DUP file name (source "filename", component_ids is empty). Returns None if neither is detected."""
+    for read_package_xml in (_read_zip_package_xml, _scan_package_xml):
+        try:
+            content = read_package_xml(filename)
+            package = _parse_package_xml(filename, content) if content else None
+        except (ET.ParseError, OSError) as error:
+            logging.debug("- INFO, unable to read package.xml from %s, detailed error information: %s" % (filename, error))
+            package = None
+        if package and package.version:
+            return package
+    match = DUP_FILENAME_PATTERN.search(os.path.basename(filename))
+    if not match:
+        return None
+    return DupPackage(os.path.basename(filename), match.group("package_id").upper(), match.group("version"), None, [], [], "filename")
+
+
+def firmware_inventory_members(data):
+    """Return (members, member URIs) for a FirmwareInventory collection response. Expanded members are returned in members, on iDRAC versions not supporting $expand the collection only lists member URIs which are returned to be fetched one by one."""
+    members = list((data or {}).get("Members", []))
+    if members and "Version" not in members[0]:
+        return [], [i["@odata.id"] for i in members]
+    return members, []
+
+
+def get_firmware_inventory(idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None, max_age=DEFAULT_INVENTORY_CACHE_SECONDS):
+    """Return list of FirmwareInventory members with details for the iDRAC. Inventory is fetched with one $expand request (one GET per member on iDRAC versions not supporting $expand) and cached per iDRAC for max_age seconds. Raises requests.RequestException or ValueError if inventory can't be fetched."""
+    with _inventory_cache_lock:
+        cached = _inventory_cache.get(idrac_ip)
+    if cached and time.time() - cached[0] < max_age:
+        return cached[1]
+    owned_transport = transport is None
+    if owned_transport:
+        transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+    try:
+        response = transport.get(FIRMWARE_INVENTORY_EXPAND_URI)
+        if response.status_code != 200:
+            raise ValueError("GET firmware inventory failed, status code %s returned" % response.status_code)
+        members, member_uris = firmware_inventory_members(response.json())
+        for member_uri in member_uris:
+            response = transport.get(member_uri)
+            if response.status_code != 200:
+                raise ValueError("GET %s failed, status code %s returned" % (member_uri, response.status_code))
+            members.append(response.json())
+    finally:
+        if owned_transport:
+            transport.close()
+    with _inventory_cache_lock:
+        _inventory_cache[idrac_ip] = (time.time(), members)
+    return members
+
+
+def forget_firmware_inventory(idrac_ip):
+    """Remove cached firmware inventory for the iDRAC, next get_firmware_inventory() call fetches it again"""
+    with _inventory_cache_lock:
+        _inventory_cache.pop(idrac_ip, None)
+
+
+def installed_members(package, inventory):
+    """Return installed FirmwareInventory members for the devices supported by the package, matched by component ID (SoftwareId)"""
+    return [i for i in inventory if i.get("Id", "").lower().startswith("installed") and str(i.get("SoftwareId")) in package.component_ids]
+
+
+def check_dup_version(package, inventory):
+    """Compare package version against installed versions of the devices it supports. Returns VersionCheck, update_needed is True if any matched device has a different version, False if every matched device already has the package version or None if no installed device could be matched (version check must then be done after upload)."""
+    if not package.component_ids:
+        return VersionCheck(package, [], None, "package.xml not detected in %s, device component IDs unknown" % package.filename)
+    installed = installed_members(package, inventory)
+    if not installed:
+        return VersionCheck(package, [], None, "no installed device detected for component ID(s) %s" % ", ".join(package.component_ids))
+    different = [i for i in installed if i.get("Version") != package.version]
+    if different:
+        return VersionCheck(package, installed, True, "installed version %s, package version %s" % (", ".join(sorted(set(i.get("Version", "") for i in different))), package.version))
+    return VersionCheck(package, installed, False, "package version %s already installed" % package.version)
+
+
+def dup_update_needed(filename, idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None):
+    """Read the DUP locally and compare with cached iDRAC firmware inventory. Returns VersionCheck, update_needed is None when the check could not be done locally (package not readable, device not matched or inventory not available)."""
+    package = read_dup_package(filename)
+    if package is None:
+        return VersionCheck(None, [], None, "unable to detect package version for %s" % os.path.basename(filename))
+    try:
+        inventory = get_firmware_inventory(idrac_ip, username, password, x_auth_token, verify_cert, transport)
+    except (requests.RequestException, ValueError) as error:
+        return VersionCheck(package, [], None, "unable to get firmware inventory, detailed error information: %s" % error)
+    return check_dup_version(package, inventory)
@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Fleet runner support, expands an iDRAC inventory (IP list, CIDR, ranges or inventory file) and executes a Redfish
+# Python script against every iDRAC through a bounded worker pool. Each script run is a separate process so script
+# globals, sys.exit() calls and password prompts never affect other iDRACs. Output of every run is saved to its own
+# file and exit status is captured per iDRAC. Each run executes in its own working directory <output_dir>/<idrac_ip>
+# so files scripts write with fixed relative names (inventory files, script log files) never collide across iDRACs.
+#
+# The iDRAC password is passed to the script processes in environment variable IDRAC_REDFISH_PASSWORD, never on the
+# command line where other local users can read it (ps, /proc/<pid>/cmdline). Scripts read it with
+# read_idrac_password() when argument -p is not passed in.
+
+import collections
+import concurrent.futures
+import configparser
+import getpass
+import ipaddress
+import os
+import re
+import subprocess
+import sys
+import time
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_OUTPUT_DIRECTORY = "fleet_output"
+PASSWORD_ENVIRONMENT_VARIABLE = "IDRAC_REDFISH_PASSWORD"
+
+# Scripts log failures with logging.error("- FAIL, ...") or logging.error("- ERROR, ...") but most still exit with status 0
+FAIL_PATTERN = re.compile(r"- FAIL|- ERROR|Traceback \(most recent call last\)")
+
+FleetResult = collections.namedtuple("FleetResult", ["idrac_ip", "status", "exit_code", "elapsed", "output_file", "error"])
+
+
+def _expand_range(value):
+    start, end = [i.strip() for i in value.split("-", 1)]
+    start_address = ipaddress.ip_address(start)
+    if "." in end or ":" in end:
+        # Full end address, range can span multiple subnets. Example: 192.168.0.250-192.168.1.10
+        end_address = ipaddress.ip_address(end)
+    else:
+        # Last octet range. Example: 192.168.0.130-140
+        end_address = ipaddress.ip_address(start.rsplit(".", 1)[0] + "." + end)
+    if end_address < start_address:
+        raise ValueError("invalid iDRAC IP range %s, end address is lower than start address" % value)
+    return [str(ipaddress.ip_address(i)) for i in range(int(start_address), int(end_address) + 1)]
+
+
+def expand_idrac_ips(value):
+    """Return list of iDRAC IPs/hostnames for an inventory string. Entries are separated by commas or whitespace, each entry is either one iDRAC IP or hostname, a last octet range (192.168.0.130-140), a range across subnets (192.168.0.250-192.168.1.10) or a CIDR network (192.168.0.0/28, network and broadcast addresses are skipped). Duplicates are removed, order is preserved."""
+    idrac_ips = []
+    for entry in re.split(r"[,\s]+", value.strip()):
+        if not entry:
+            continue
+        if "/" in entry:
+            network = ipaddress.ip_network(entry, strict=False)
+            if network.num_addresses == 1:
+                idrac_ips.append(str(network.network_address))
+            else:
+                idrac_ips.extend(str(i) for i in network.hosts())
+        elif re.match(r"^[0-9.]+-[0-9.]+$|^[0-9a-fA-F:]*:[0-9a-fA-F:]*-[0-9a-fA-F:]+$", entry):
+            idrac_ips.extend(_expand_range(entry))
+        else:
+            idrac_ips.append(entry)
+    return list(collections.OrderedDict.fromkeys(idrac_ips))
+
+
+def read_inventory_file(filename):
+    """Return list of iDRAC IPs from an inventory file. Either an INI file with idrac_ips setting in [Parameters] section (same format used by GetSetBiosAttributesREDFISH.py and GetNetworkDevicePropertiesCsvFileREDFISH.py) or a text file with one or more inventory entries per line, # starts a comment."""
+    with open(filename, "r") as open_file:
+        content = open_file.read()
+    if re.search(r"^\s*\[Parameters\]", content, re.MULTILINE):
+        config = configparser.ConfigParser()
+        config.read_string(content)
+        return expand_idrac_ips(config.get("Parameters", "idrac_ips"))
+    lines = [line.split("#", 1)[0] for line in content.splitlines()]
+    return expand_idrac_ips(" ".join(lines))
+
+
+def read_idrac_password(idrac_username):
+    """Return iDRAC user password from environment variable IDRAC_REDFISH_PASSWORD (set by the fleet runner), otherwise prompt for it"""
+    password = os.environ.get(PASSWORD_ENVIRONMENT_VARIABLE)
+    if password:
+        return password
+    return getpass.getpass("\n- Argument -p not detected, pass in iDRAC user %s password: " % idrac_username)
+
+
+def _entry_point(script):
+    return not script.endswith(".py") and ":" in script
+
+
+def _absolute_path(argument):
+    # Script runs in a per iDRAC working directory, relative paths to existing files (config files, firmware images) are passed in as absolute paths
+    if not argument.startswith("-") and not os.path.isabs(argument) and os.path.exists(argument):
+        return os.path.abspath(argument)
+    return argument
+
+
+def build_command(script, idrac_ip, script_arguments=(), host_argument="-ip"):
+    """Return command line executing the script against one iDRAC. script is either a script path or a module:function entry point (example: IdracRedfishSupport.some_module:main), script arguments follow the iDRAC IP argument. Script path and script arguments naming existing files are made absolute, the script is executed in a per iDRAC working directory."""
+    if _entry_point(script):
+        module_name, function_name = script.split(":", 1)
+        code = "import sys, %s as m; sys.argv[0] = %r; sys.exit(m.%s())" % (module_name, script, function_name)
+        command = [sys.executable, "-c", code]
+    else:
+        command = [sys.executable, os.path.abspath(script)]
+    return command + [host_argument, idrac_ip] + [_absolute_path(i) for i in script_arguments]
+
+
+def _host_name(idrac_ip):
+    return re.sub(r"[^0-9A-Za-z._-]", "_", idrac_ip)
+
+
+def _output_filename(output_directory, idrac_ip):
+    return os.path.join(output_directory, "%s.log" % _host_name(idrac_ip))
+
+
+def host_directory(output_directory, idrac_ip):
+    """Return working directory used for script runs against the iDRAC, files the script writes are saved in this directory"""
+    return os.path.join(output_directory, _host_name(idrac_ip))
+
+
+def run_script(script, idrac_ip, script_arguments=(), timeout=None, output_directory=DEFAULT_OUTPUT_DIRECTORY, host_argument="-ip", password=None):
+    """Execute the script against one iDRAC in working directory <output_directory>/<idrac_ip>, stdout and stderr are saved to <output_directory>/<idrac_ip>.log. password is passed to the script in environment variable IDRAC_REDFISH_PASSWORD. Returns FleetResult, status is PASS, FAIL (non zero exit code or script logged a FAIL or ERROR message), TIMEOUT or ERROR (script could not be started)."""
+    output_file = _output_filename(output_directory, idrac_ip)
+    working_directory = os.path.abspath(host_directory(output_directory, idrac_ip))
+    command = build_command(script, idrac_ip, script_arguments, host_argument)
+    environment = dict(os.environ)
+    if password:
+        environment[PASSWORD_ENVIRONMENT_VARIABLE] = password
+    if _entry_point(script):
+        # python -c imports from the working directory, keep modules in the current directory importable
+        environment["PYTHONPATH"] = os.pathsep.join([os.getcwd()] + [i for i in [environment.get("PYTHONPATH")] if i])
+    start_time = time.time()
+    with open(output_file, "wb") as open_file:
+        try:
+            if not os.path.isdir(working_directory):
+                os.makedirs(working_directory)
+            # stdin is closed so a script prompting for a password fails instead of hanging the worker
+            exit_code = subprocess.call(command, stdin=subprocess.DEVNULL, stdout=open_file, stderr=subprocess.STDOUT, timeout=timeout, env=environment, cwd=working_directory)
+        except subprocess.TimeoutExpired:
+            return FleetResult(idrac_ip, "TIMEOUT", None, time.time() - start_time, output_file, "script did not complete within %s seconds" % timeout)
+        except OSError as error:
+            return FleetResult(idrac_ip, "ERROR", None, time.time() - start_time, output_file, str(error))
+    elapsed = time.time() - start_time
+    with open(output_file, "r", errors="replace") as open_file:
+        failed = FAIL_PATTERN.search(open_file.read())
+    if exit_code != 0:
+        return FleetResult(idrac_ip, "FAIL", exit_code, elapsed, output_file, "script exit code %s" % exit_code)
+    elif failed:
+        return FleetResult(idrac_ip, "FAIL", exit_code, elapsed, output_file, "script logged FAIL or ERROR message")
+    return FleetResult(idrac_ip, "PASS", exit_code, elapsed, output_file, None)
+
+
+def run_fleet(script, idrac_ips, script_arguments=(), max_workers=DEFAULT_MAX_WORKERS, timeout=None, output_directory=DEFAULT_OUTPUT_DIRECTORY, host_argument="-ip", password=None):
+    """Generator executing the script against every iDRAC with at most max_workers scripts running at the same time, yields FleetResult as each iDRAC completes. timeout is the max time in seconds allowed per iDRAC, password is passed to every script run in environment variable IDRAC_REDFISH_PASSWORD."""
+    if not os.path.isdir(output_directory):
+        os.makedirs(output_directory)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_script, script, idrac_ip, script_arguments, timeout, output_directory, host_argument, password) for idrac_ip in idrac_ips]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def fleet_summary(results):
+    """Return summary dictionary for a list of FleetResult: total count, count per status, failed iDRAC IPs with error and longest script run in seconds"""
+    status_count = collections.OrderedDict((i, 0) for i in ("PASS", "FAIL", "TIMEOUT", "ERROR"))
+    for result in results:
+        status_count[result.status] += 1
+    return {"total": len(results), "status": dict(status_count),
+            "failed": [{"idrac_ip": i.idrac_ip, "status": i.status, "error": i.error, "output_file": i.output_file} for i in results if i.status != "PASS"],
+            "longest_seconds": round(max([i.elapsed for i in results] or [0]), 1)}
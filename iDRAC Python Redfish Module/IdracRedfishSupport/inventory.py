@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Hardware inventory fetch engine used by GetSystemHWInventoryREDFISH.py. Collections (memory, processors, storage)
+# are read with one $expand=*($levels=1) request and expanded members are cached under their own URI, on iDRAC versions
+# not supporting $expand the member GETs are fanned out through a bounded thread pool instead of one at a time. Every
+# URI is fetched once per inventory, callers prefetch URIs they will need next and then read responses in their own
+# order so output order is the same as fetching serially.
+
+import collections
+import concurrent.futures
+import threading
+
+from .transport import RedfishTransport, decode_json
+
+DEFAULT_INVENTORY_WORKERS = 4
+EXPAND_QUERY = "$expand=*($levels=1)"
+
+InventoryResponse = collections.namedtuple("InventoryResponse", ["uri", "status_code", "data"])
+
+
+def _json(response):
+    return decode_json(response.content)
+
+
+def _expanded(members):
+    # iDRAC versions not supporting $expand return only member URIs
+    return all(isinstance(i, dict) and len(i) > 1 for i in members)
+
+
+class RedfishInventory(object):
+    """Concurrent, cached Redfish GETs for one iDRAC inventory. get() returns InventoryResponse (data is the JSON response body or None), prefetch() starts GETs in the background on a pool of workers threads, get_collection() reads a collection with $expand and caches each member. Call close() once the inventory is complete."""
+
+    def __init__(self, idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None, workers=DEFAULT_INVENTORY_WORKERS):
+        self.idrac_ip = idrac_ip
+        self.workers = max(1, workers)
+        self._owned_transport = transport is None
+        if self._owned_transport:
+            transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token, pool_maxsize=self.workers)
+        self.transport = transport
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, uri):
+        response = self.transport.get(uri)
+        return InventoryResponse(uri, response.status_code, _json(response))
+
+    def _cache(self, uri, inventory_response):
+        future = concurrent.futures.Future()
+        future.set_result(inventory_response)
+        with self._lock:
+            self._futures.setdefault(uri, future)
+
+    def prefetch(self, uris):
+        """Start GET for each URI not already fetched or in flight, returns immediately"""
+        with self._lock:
+            for uri in uris:
+                # Fragments are not sent (Thermal#/Fans/0 and Thermal#/Fans/1 are one GET of Thermal)
+                uri = uri.split("#")[0]
+                if uri not in self._futures:
+                    self._futures[uri] = self._executor.submit(self._fetch, uri)
+
+    def get(self, uri):
+        """Return InventoryResponse for the URI, waits for the GET if it was prefetched and is still in flight"""
+        self.prefetch([uri])
+        with self._lock:
+            future = self._futures[uri.split("#")[0]]
+        return future.result()
+
+    def get_many(self, uris):
+        """Return list of InventoryResponse in the same order as uris, GETs are executed concurrently"""
+        uris = list(uris)
+        self.prefetch(uris)
+        return [self.get(uri) for uri in uris]
+
+    def get_collection(self, uri, expand=True):
+        """Return InventoryResponse for a collection. Members only contain @odata.id (same as the collection without $expand), member details are cached so get() for a member URI doesn't execute another GET. When $expand is not supported member GETs are prefetched concurrently."""
+        expanded_uri = "%s?%s" % (uri, EXPAND_QUERY)
+        with self._lock:
+            future = self._futures.get(expanded_uri) if expand else None
+        if future is None and expand:
+            self.prefetch([expanded_uri])
+            with self._lock:
+                future = self._futures[expanded_uri]
+        collection_response = None
+        if future is not None:
+            expanded_response = future.result()
+            members = expanded_response.data.get("Members") if isinstance(expanded_response.data, dict) else None
+            if expanded_response.status_code == 200 and isinstance(members, list):
+                if not _expanded(members):
+                    # $expand ignored by iDRAC, response is the collection itself
+                    collection_response = InventoryResponse(uri, 200, expanded_response.data)
+                else:
+                    for member in members:
+                        self._cache(member["@odata.id"], InventoryResponse(member["@odata.id"], 200, member))
+                    data = dict(expanded_response.data)
+                    data["Members"] = [{"@odata.id": i["@odata.id"]} for i in members]
+                    return InventoryResponse(uri, 200, data)
+        if collection_response is None:
+            collection_response = self.get(uri)
+        if collection_response.status_code == 200 and isinstance(collection_response.data, dict):
+            self.prefetch([i["@odata.id"] for i in collection_response.data.get("Members", []) if "@odata.id" in i])
+        return collection_response
+
+    def prefetch_collections(self, uris, expand=True):
+        """Start $expand GETs for multiple collections in the background, read them later with get_collection()"""
+        self.prefetch(["%s?%s" % (uri, EXPAND_QUERY) if expand else uri for uri in uris])
+
+    def close(self):
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        if self._owned_transport:
+            self.transport.close()
@@ -0,0 +1,304 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Job watcher tracking any number of iDRAC job IDs across any number of iDRACs in one polling loop. Per iDRAC, all
+# watched jobs are fetched with one Jobs collection request using $expand (and $filter on job Id when supported)
+# instead of one GET per job. Poll interval adapts per job based on PercentComplete progress and timeouts are real
+# timedeltas per job.
+
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+
+from datetime import datetime, timedelta
+
+import requests
+
+from .transport import RedfishTransport
+
+JOBS_URI = "/redfish/v1/Managers/iDRAC.Embedded.1/Jobs"
+JOBS_EXPAND_URI = "%s?$expand=*($levels=1)" % JOBS_URI
+DEFAULT_MIN_INTERVAL = 2
+DEFAULT_MAX_INTERVAL = 30
+DEFAULT_TIMEOUT = timedelta(hours=2)
+DEFAULT_MAX_WORKERS = 16
+# Max job IDs added to one $filter query, more jobs on the same iDRAC are matched from the expanded collection
+MAX_FILTER_JOBS = 20
+
+FINAL_JOB_STATES = ("Completed", "CompletedWithErrors", "Failed", "RebootFailed")
+FAILED_JOB_STATES = ("CompletedWithErrors", "Failed", "RebootFailed")
+
+_JOB_STATUS_FIELDS = ["idrac_ip", "job_id", "job_state", "message", "percent_complete", "elapsed", "data", "timed_out", "error"]
+
+
+class JobStatus(collections.namedtuple("JobStatus", _JOB_STATUS_FIELDS)):
+    """Status of a watched job. elapsed is a timedelta since the job was added to the watcher, data is the last job details returned by iDRAC, error is set when the job could not be polled."""
+    __slots__ = ()
+
+    @property
+    def failed(self):
+        return bool(self.timed_out or self.error or self.job_state in FAILED_JOB_STATES or "fail" in (self.message or "").lower())
+
+
+def job_members(data):
+    """Return ordered dictionary of job ID to job details for an expanded Jobs collection response"""
+    return collections.OrderedDict((i.get("Id"), i) for i in (data or {}).get("Members", []))
+
+
+class _PollError(Exception):
+
+    def __init__(self, message, job_id=None):
+        Exception.__init__(self, message)
+        self.job_id = job_id
+
+
+class _WatchedJob(object):
+
+    def __init__(self, idrac_ip, job_id, timeout, until, callback, on_update, min_interval):
+        self.idrac_ip = idrac_ip
+        self.job_id = job_id
+        self.start_time = datetime.now()
+        self.deadline = self.start_time + timeout
+        self.until = until
+        self.callback = callback
+        self.on_update = on_update
+        self.data = {}
+        self.interval = min_interval
+        self.next_poll = time.time()
+        self.last_percent = None
+        self.last_percent_time = None
+
+    def status(self, timed_out=False, error=None):
+        return JobStatus(self.idrac_ip, self.job_id, self.data.get("JobState"), self.data.get("Message"), self.data.get("PercentComplete"),
+                         datetime.now() - self.start_time, self.data, timed_out, error)
+
+    def finished(self):
+        if self.data.get("JobState") in FINAL_JOB_STATES:
+            return True
+        if self.until is None:
+            return False
+        if callable(self.until):
+            return bool(self.until(self.data))
+        return self.data.get("JobState") in self.until
+
+
+class JobWatcher(object):
+    """Watch iDRAC jobs until they reach a final state (Completed, CompletedWithErrors, Failed, RebootFailed), timeout or a caller defined state. Each iDRAC gets one Jobs collection request per poll, iDRACs due for polling are queried in parallel using up to max_workers threads. Poll interval per job starts at min_interval, shrinks towards min_interval based on estimated time left while PercentComplete is increasing and grows up to max_interval while the job makes no progress. Finished jobs are returned by poll(), yielded by results() or passed to the callback set for the job."""
+
+    def __init__(self, username=None, password=None, x_auth_token=None, verify_cert=False, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL, timeout=DEFAULT_TIMEOUT, max_workers=DEFAULT_MAX_WORKERS):
+        self.username = username
+        self.password = password
+        self.x_auth_token = x_auth_token
+        self.verify_cert = verify_cert
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._transports = {}
+        self._owned_transports = []
+        self._jobs = collections.OrderedDict()
+        self._filter_supported = {}
+        self._expand_supported = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def add_host(self, idrac_ip, username=None, password=None, x_auth_token=None, transport=None):
+        """Set credentials or an existing RedfishTransport used for one iDRAC. Hosts not added use the watcher credentials."""
+        if transport is None:
+            transport = RedfishTransport(idrac_ip, verify_cert=self.verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+            self._owned_transports.append(transport)
+        self._transports[idrac_ip] = transport
+
+    def _transport(self, idrac_ip):
+        if idrac_ip not in self._transports:
+            transport = RedfishTransport(idrac_ip, verify_cert=self.verify_cert, username=self.username, password=self.password, x_auth_token=self.x_auth_token)
+            self._owned_transports.append(transport)
+            self._transports[idrac_ip] = transport
+        return self._transports[idrac_ip]
+
+    def watch(self, idrac_ip, job_id, timeout=None, until=None, callback=None, on_update=None):
+        """Start watching a job. timeout is a timedelta or seconds (default is the watcher timeout). until is either a list of JobState values also ending the watch (example: ["Scheduled"]) or a function called with job details returning True to end the watch. callback is called with JobStatus once the watch ends, on_update is called with JobStatus every time JobState, Message or PercentComplete changes."""
+        if timeout is None:
+            timeout = self.timeout
+        elif not isinstance(timeout, timedelta):
+            timeout = timedelta(seconds=timeout)
+        with self._lock:
+            self._jobs[(idrac_ip, job_id)] = _WatchedJob(idrac_ip, job_id, timeout, until, callback, on_update, self.min_interval)
+        self._wakeup.set()
+
+    def wake(self, idrac_ip, job_id=None):
+        """Poll the job (or every job watched on the iDRAC if job_id is not passed) on the next poll instead of waiting for its poll interval, used by EventReceiver when iDRAC pushes an event for a watched job. Returns number of jobs woken."""
+        woken = 0
+        with self._lock:
+            for job in self._jobs.values():
+                if job.idrac_ip == idrac_ip and job_id in (None, job.job_id):
+                    job.next_poll = time.time()
+                    woken += 1
+        if woken:
+            self._wakeup.set()
+        return woken
+
+    @property
+    def pending(self):
+        """Number of jobs still being watched"""
+        return len(self._jobs)
+
+    def _get_jobs(self, idrac_ip, job_ids):
+        transport = self._transport(idrac_ip)
+        if self._expand_supported.get(idrac_ip, True):
+            uri = JOBS_EXPAND_URI
+            use_filter = self._filter_supported.get(idrac_ip, True) and len(job_ids) <= MAX_FILTER_JOBS
+            if use_filter:
+                uri += "&$filter=%s" % " or ".join("Id eq '%s'" % i for i in job_ids)
+            response = transport.get(uri)
+            if response.status_code == 200:
+                members = job_members(response.json())
+                missing = [i for i in job_ids if i not in members]
+                if missing and use_filter and len(members) == 0:
+                    # $filter accepted but ignored or not matching on this iDRAC version, use $expand only from now on
+                    self._filter_supported[idrac_ip] = False
+                for job_id in missing:
+                    members.update(self._get_job(transport, job_id))
+                return members
+            if use_filter and response.status_code in (400, 405, 501):
+                self._filter_supported[idrac_ip] = False
+                return self._get_jobs(idrac_ip, job_ids)
+            if response.status_code in (401, 403):
+                raise _PollError("status code %s returned, check iDRAC credentials" % response.status_code)
+            logging.debug("- INFO, Jobs collection $expand not supported by iDRAC %s, status code %s returned, polling each job ID" % (idrac_ip, response.status_code))
+            self._expand_supported[idrac_ip] = False
+        members = {}
+        for job_id in job_ids:
+            members.update(self._get_job(transport, job_id))
+        return members
+
+    def _get_job(self, transport, job_id):
+        response = transport.get("%s/%s" % (JOBS_URI, job_id))
+        if response.status_code == 200:
+            return {job_id: response.json()}
+        if response.status_code in (401, 403):
+            raise _PollError("status code %s returned, check iDRAC credentials" % response.status_code)
+        if response.status_code == 404:
+            raise _PollError("job ID %s not found" % job_id, job_id)
+        return {}
+
+    def _next_interval(self, job, data, now):
+        percent = data.get("PercentComplete")
+        if isinstance(percent, int) and job.last_percent is not None and percent > job.last_percent:
+            rate = (percent - job.last_percent) / max(now - job.last_percent_time, 0.001)
+            # Poll about four times during the estimated time left so completion is seen soon after it happens
+            interval = (100 - percent) / rate / 4
+        elif data.get("JobState") != job.data.get("JobState"):
+            interval = self.min_interval
+        else:
+            interval = job.interval * 1.5
+        if isinstance(percent, int) and percent != job.last_percent:
+            job.last_percent = percent
+            job.last_percent_time = now
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _poll_host(self, idrac_ip, jobs):
+        now = time.time()
+        finished = []
+        try:
+            members = self._get_jobs(idrac_ip, [i.job_id for i in jobs])
+        except _PollError as error:
+            for job in jobs:
+                if error.job_id in (None, job.job_id):
+                    finished.append((job, job.status(error=str(error))))
+            return finished
+        except (requests.RequestException, ValueError) as error:
+            # iDRAC not reachable (example: iDRAC reboot during firmware update), retry at max interval
+            logging.debug("- INFO, unable to poll jobs on iDRAC %s, detailed error information: %s" % (idrac_ip, error))
+            for job in jobs:
+                job.next_poll = now + self.max_interval
+                if datetime.now() >= job.deadline:
+                    finished.append((job, job.status(timed_out=True, error=str(error))))
+            return finished
+        for job in jobs:
+            data = members.get(job.job_id)
+            if data is None:
+                job.next_poll = now + self.max_interval
+            else:
+                changed = [data.get(i) for i in ("JobState", "Message", "PercentComplete")] != [job.data.get(i) for i in ("JobState", "Message", "PercentComplete")]
+                job.interval = self._next_interval(job, data, now)
+                job.next_poll = now + job.interval
+                job.data = data
+                if changed and job.on_update:
+                    job.on_update(job.status())
+                if job.finished():
+                    finished.append((job, job.status()))
+                    continue
+            if datetime.now() >= job.deadline:
+                finished.append((job, job.status(timed_out=True)))
+        return finished
+
+    def poll(self):
+        """Poll every iDRAC which has a job due for polling, returns list of JobStatus for jobs which finished"""
+        now = time.time()
+        hosts = collections.OrderedDict()
+        with self._lock:
+            due = set(i.idrac_ip for i in self._jobs.values() if i.next_poll <= now)
+            for job in self._jobs.values():
+                if job.idrac_ip in due:
+                    hosts.setdefault(job.idrac_ip, []).append(job)
+        if not hosts:
+            return []
+        if len(hosts) == 1:
+            host_results = [self._poll_host(*list(hosts.items())[0])]
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.max_workers, len(hosts))) as executor:
+                host_results = list(executor.map(lambda i: self._poll_host(*i), hosts.items()))
+        results = []
+        for job, status in [i for host_result in host_results for i in host_result]:
+            with self._lock:
+                self._jobs.pop((job.idrac_ip, job.job_id), None)
+            if job.callback:
+                job.callback(status)
+            results.append(status)
+        return results
+
+    def results(self):
+        """Generator polling until every watched job finished, yields JobStatus as each job finishes. Jobs can be added with watch() while iterating."""
+        while self._jobs:
+            self._wakeup.clear()
+            for status in self.poll():
+                yield status
+            with self._lock:
+                next_poll = min([i.next_poll for i in self._jobs.values()] or [time.time()])
+            # Sleep until the next job is due, wake() or watch() from another thread ends the sleep early
+            self._wakeup.wait(max(0, next_poll - time.time()))
+
+    def wait(self):
+        """Poll until every watched job finished, returns list of JobStatus"""
+        return list(self.results())
+
+    def close(self):
+        for transport in self._owned_transports:
+            transport.close()
+        self._owned_transports = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def wait_for_job(idrac_ip, job_id, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None, timeout=DEFAULT_TIMEOUT, until=None, on_update=None, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL):
+    """Watch one job until it finishes and return JobStatus, same arguments as JobWatcher.watch()"""
+    with JobWatcher(username, password, x_auth_token, verify_cert, min_interval=min_interval, max_interval=max_interval) as watcher:
+        if transport is not None:
+            watcher.add_host(idrac_ip, transport=transport)
+        watcher.watch(idrac_ip, job_id, timeout=timeout, until=until, on_update=on_update)
+        return watcher.wait()[0]
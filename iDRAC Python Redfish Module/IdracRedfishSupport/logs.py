@@ -0,0 +1,359 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Lifecycle Controller (LC) and System Event Log (SEL) download. Members@odata.count is read from the first page and
+# disjoint $skip ranges are fetched concurrently by a small worker pool (see IdracRedfishSupport.paging), entries are
+# written in log order to a single NDJSON file (one JSON entry per line, optionally gzip compressed) as soon as each
+# page arrives so only the pages in flight are held in memory.
+#
+# Incremental sync stores the highest entry Id and its Created timestamp per iDRAC and log (one file per iDRAC under
+# ~/.idrac_redfish/log_watermarks, set environment variable IDRAC_REDFISH_LOG_WATERMARKS to a different directory).
+# Later runs only request entries with $filter=Created ge watermark and append new entries to the NDJSON file, the
+# complete log is appended again if the watermark entry is gone and Ids start over (log was cleared). The watermark is
+# stored after the append together with the NDJSON file size, if a sync stopped in between the unrecorded append is
+# truncated by the next sync so entries are never written twice. If the watermark directory can't be created or
+# written to, sync_log_entries() raises WatermarkError before appending anything.
+#
+# LogClassifier matches each entry against any number of named rules (Message keywords, MessageId prefix, Severity,
+# Category) in a single pass, Message keywords of every rule are compiled into one regular expression. With
+# route_log_entries() one download of the log feeds several reports (sinks) at once.
+
+import collections
+import datetime
+import gzip
+import hashlib
+import itertools
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+
+from urllib.parse import quote
+
+from .paging import CollectionError, RedfishCollection
+
+LC_LOG_URI = "/redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Lclog/Entries"
+SEL_LOG_URI = "/redfish/v1/Managers/iDRAC.Embedded.1/LogServices/Sel/Entries"
+# Concurrent page downloads per iDRAC, iDRAC web server handles a small number of parallel requests well
+DEFAULT_DOWNLOAD_WORKERS = 4
+# Message keywords identifying failed operations in LC log entries
+FAILURE_KEYWORDS = ("unable", "fail", "error", "fault")
+
+LogDownload = collections.namedtuple("LogDownload", ["filename", "entries", "pages", "seconds"])
+LogSync = collections.namedtuple("LogSync", ["filename", "entries", "full_resync", "last_id", "last_created", "seconds"])
+LogRule = collections.namedtuple("LogRule", ["name", "keywords", "message_id_prefixes", "severities", "categories"])
+
+
+class WatermarkError(Exception):
+    """Raised when the log watermark directory or a watermark file can't be created or written, incremental sync is not possible"""
+
+
+def open_ndjson_file(filename, compress=None, append=False):
+    """Open NDJSON file for writing text, file is gzip compressed if compress is True or (compress None) file name ends with .gz. append adds to an existing file (a new gzip member for compressed files)."""
+    if compress is None:
+        compress = filename.lower().endswith(".gz")
+    mode = "a" if append else "w"
+    if compress:
+        return gzip.open(filename, mode + "t", encoding="utf-8")
+    return open(filename, mode, encoding="utf-8")
+
+
+def download_log_entries(idrac_ip, uri, filename, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None,
+                         workers=DEFAULT_DOWNLOAD_WORKERS, compress=None, match=None):
+    """Download every entry of a log collection (uri can include $filter) to an NDJSON file in log order, workers pages are fetched concurrently. match is an optional function called with each entry, only entries it returns True for are written. File is written under a temporary name and renamed once complete. Returns LogDownload, raises paging.CollectionError if the log can't be read."""
+    start_time = time.time()
+    collection = RedfishCollection(idrac_ip, uri, username=username, password=password, x_auth_token=x_auth_token, verify_cert=verify_cert,
+                                   transport=transport, prefetch=workers)
+    if compress is None:
+        compress = filename.lower().endswith(".gz")
+    temporary_filename = "%s.part" % filename
+    entries = 0
+    try:
+        with open_ndjson_file(temporary_filename, compress) as open_file:
+            for page in collection.pages():
+                lines = [json.dumps(i) for i in page["Members"] if match is None or match(i)]
+                if lines:
+                    open_file.write("\n".join(lines) + "\n")
+                    entries += len(lines)
+        os.replace(temporary_filename, filename)
+    finally:
+        if os.path.exists(temporary_filename):
+            os.remove(temporary_filename)
+    return LogDownload(filename, entries, collection.pages_fetched, time.time() - start_time)
+
+
+def read_ndjson_file(filename):
+    """Yield entries from an NDJSON file written by download_log_entries(), gzip compressed files (.gz) are detected by file name"""
+    if filename.lower().endswith(".gz"):
+        open_file = gzip.open(filename, "rt", encoding="utf-8")
+    else:
+        open_file = open(filename, "r", encoding="utf-8")
+    with open_file:
+        for line in open_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _watermark_directory():
+    directory = os.environ.get("IDRAC_REDFISH_LOG_WATERMARKS", "")
+    if not directory:
+        directory = os.path.join(os.path.expanduser("~"), ".idrac_redfish", "log_watermarks")
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+            os.chmod(directory, 0o700)
+    except OSError as error:
+        raise WatermarkError("unable to create log watermark directory %s, detailed error information: %s" % (directory, error))
+    if not os.access(directory, os.W_OK):
+        raise WatermarkError("log watermark directory %s is not writable, set environment variable IDRAC_REDFISH_LOG_WATERMARKS to a writable directory" % directory)
+    return directory
+
+
+def _watermark_file(idrac_ip, uri):
+    key = hashlib.sha256(("%s|%s" % (idrac_ip, uri.lstrip("/"))).encode("utf-8")).hexdigest()
+    return os.path.join(_watermark_directory(), "%s.json" % key)
+
+
+def get_log_watermark(idrac_ip, uri):
+    """Return stored watermark dictionary (last_id, last_created) for the iDRAC log or None if the log was never synced"""
+    try:
+        with open(_watermark_file(idrac_ip, uri), "r") as open_file:
+            return json.load(open_file)
+    except (IOError, OSError, ValueError, WatermarkError):
+        return None
+
+
+def set_log_watermark(idrac_ip, uri, last_id, last_created, ndjson_filename=None, file_size=None):
+    """Store watermark for the iDRAC log, file is written to a temp file and renamed so concurrent syncs never read a partial file. ndjson_filename and file_size are the NDJSON file synced to and its size once the entries up to the watermark were appended. Raises WatermarkError if the watermark can't be written."""
+    filename = _watermark_file(idrac_ip, uri)
+    try:
+        file_descriptor, temp_filename = tempfile.mkstemp(dir=os.path.dirname(filename))
+    except OSError as error:
+        raise WatermarkError("unable to write log watermark file %s, detailed error information: %s" % (filename, error))
+    try:
+        with os.fdopen(file_descriptor, "w") as open_file:
+            json.dump({"idrac_ip": idrac_ip, "uri": uri, "last_id": last_id, "last_created": last_created, "ndjson_filename": ndjson_filename, "file_size": file_size, "updated": time.time()}, open_file)
+        os.replace(temp_filename, filename)
+    except OSError as error:
+        raise WatermarkError("unable to write log watermark file %s, detailed error information: %s" % (filename, error))
+    finally:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
+
+def forget_log_watermark(idrac_ip, uri):
+    """Remove stored watermark, next sync_log_entries() call appends the complete log"""
+    try:
+        os.remove(_watermark_file(idrac_ip, uri))
+    except (OSError, WatermarkError):
+        pass
+
+
+def _entry_id(entry):
+    try:
+        return int(entry.get("Id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _entry_created(entry):
+    try:
+        return datetime.datetime.fromisoformat(entry.get("Created", "").replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _newer_entry(entry, newest):
+    # Entries are compared by numeric Id, Created timestamp is used for logs without numeric Ids
+    if newest is None:
+        return True
+    entry_id, newest_id = _entry_id(entry), _entry_id(newest)
+    if entry_id is not None and newest_id is not None:
+        return entry_id > newest_id
+    entry_created, newest_created = _entry_created(entry), _entry_created(newest)
+    return entry_created is not None and newest_created is not None and entry_created > newest_created
+
+
+def _truncate_unrecorded_append(watermark, filename):
+    # Entries appended after file_size were written by a sync which stopped before storing its watermark, they are synced again
+    if not watermark or watermark.get("file_size") is None or watermark.get("ndjson_filename") != os.path.abspath(filename):
+        return
+    try:
+        if os.path.getsize(filename) <= watermark["file_size"]:
+            return
+        with open(filename, "r+b") as open_file:
+            open_file.truncate(watermark["file_size"])
+    except OSError:
+        return
+    logging.info("- INFO, entries appended to %s after the last stored watermark removed, they will be synced again" % filename)
+
+
+def sync_log_entries(idrac_ip, uri, filename, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None,
+                     workers=DEFAULT_DOWNLOAD_WORKERS, compress=None):
+    """Append LC or SEL log entries created since the last sync of this iDRAC log to an NDJSON file and store the new watermark. First sync or a cleared log (entry the watermark was taken from no longer returned) appends the complete log. Only entries with Created greater or equal to the watermark are requested, if $filter is not supported the log is read and filtered locally. Returns LogSync, raises paging.CollectionError if the log can't be read or WatermarkError if the watermark directory can't be used."""
+    start_time = time.time()
+    # Unusable watermark directory is reported before anything is appended, entries synced without a stored watermark would be appended again by the next sync
+    _watermark_directory()
+    watermark = get_log_watermark(idrac_ip, uri)
+    _truncate_unrecorded_append(watermark, filename)
+    collection_arguments = {"username": username, "password": password, "x_auth_token": x_auth_token, "verify_cert": verify_cert, "transport": transport, "prefetch": workers}
+    new_entries = []
+    full_resync = watermark is None
+    if watermark:
+        last_id = _entry_id({"Id": watermark["last_id"]})
+        last_created = _entry_created({"Created": watermark["last_created"]})
+        collection = RedfishCollection(idrac_ip, "%s?$filter=Created ge '%s'" % (uri, quote(watermark["last_created"], safe=":")), **collection_arguments)
+        try:
+            entries = iter(collection)
+            first_entry = next(entries, None)
+            entries = [] if first_entry is None else itertools.chain([first_entry], entries)
+        except CollectionError as error:
+            if error.status_code not in (400, 501):
+                raise
+            logging.debug("- INFO, $filter on Created not supported for %s, log will be read and filtered locally" % uri)
+            entries = RedfishCollection(idrac_ip, uri, **collection_arguments)
+        # Entry the watermark was taken from is returned again (Created ge), if it's gone the log was cleared
+        watermark_detected = False
+        for entry in entries:
+            if entry.get("Id") == watermark["last_id"] and entry.get("Created") == watermark["last_created"]:
+                watermark_detected = True
+                continue
+            created = _entry_created(entry)
+            if created is not None and last_created is not None and created < last_created:
+                continue
+            entry_id = _entry_id(entry)
+            if entry_id is None or last_id is None or entry_id > last_id:
+                new_entries.append(entry)
+        if not watermark_detected:
+            logging.info("- INFO, last synced %s log entry Id %s not detected, log was cleared, complete log will be synced" % (idrac_ip, watermark["last_id"]))
+            full_resync = True
+            new_entries = []
+    if compress is None:
+        compress = filename.lower().endswith(".gz")
+    newest = None
+    entry_count = 0
+    with open_ndjson_file(filename, compress, append=True) as open_file:
+        if full_resync:
+            for page in RedfishCollection(idrac_ip, uri, **collection_arguments).pages():
+                for entry in page["Members"]:
+                    if _newer_entry(entry, newest):
+                        newest = entry
+                if page["Members"]:
+                    open_file.write("\n".join(json.dumps(i) for i in page["Members"]) + "\n")
+                    entry_count += len(page["Members"])
+        elif new_entries:
+            for entry in new_entries:
+                if _newer_entry(entry, newest):
+                    newest = entry
+            open_file.write("\n".join(json.dumps(i) for i in new_entries) + "\n")
+            entry_count = len(new_entries)
+    if newest is not None:
+        set_log_watermark(idrac_ip, uri, newest.get("Id"), newest.get("Created"), os.path.abspath(filename), os.path.getsize(filename))
+        last_id, last_created = newest.get("Id"), newest.get("Created")
+    elif watermark:
+        last_id, last_created = watermark["last_id"], watermark["last_created"]
+    else:
+        last_id, last_created = None, None
+    return LogSync(filename, entry_count, full_resync, last_id, last_created, time.time() - start_time)
+
+
+class LogClassifier(object):
+    """Classify LC and SEL log entries against named rules in one pass. A rule matches an entry if the entry matches every criteria passed in for the rule: any Message keyword (case insensitive substring), any MessageId prefix, any Severity value or any Oem Dell Category value (case insensitive). Keywords of all rules are compiled into one regular expression so each Message is scanned once no matter the number of rules."""
+
+    def __init__(self):
+        self.rules = []
+        self._keywords = frozenset()
+        self._keyword_pattern = None
+        self._matched_keywords = {}
+
+    def add_rule(self, name, keywords=None, message_id_prefixes=None, severities=None, categories=None):
+        """Add a named rule, returns the classifier so calls can be chained"""
+        self.rules.append(LogRule(name, frozenset(i.lower() for i in keywords or ()), tuple(message_id_prefixes or ()),
+                                  frozenset(i.lower() for i in severities or ()), frozenset(i.lower() for i in categories or ())))
+        self._keyword_pattern = None
+        self._matched_keywords = {}
+        return self
+
+    def _compile(self):
+        keywords = set()
+        for rule in self.rules:
+            keywords.update(rule.keywords)
+        # Longest keywords first, keywords contained in a longer match (fail in failure) are resolved in _keywords_in
+        self._keywords = keywords
+        self._keyword_pattern = re.compile("|".join(re.escape(i) for i in sorted(keywords, key=len, reverse=True)), re.IGNORECASE) if keywords else False
+
+    def _keywords_in(self, match):
+        keywords = self._matched_keywords.get(match)
+        if keywords is None:
+            keywords = frozenset(i for i in self._keywords if i in match)
+            self._matched_keywords[match] = keywords
+        return keywords
+
+    def classify(self, entry):
+        """Return list of rule names matching the entry, in the order rules were added"""
+        if self._keyword_pattern is None:
+            self._compile()
+        found = set()
+        if self._keyword_pattern:
+            for match in self._keyword_pattern.findall(entry.get("Message") or ""):
+                found.update(self._keywords_in(match.lower()))
+        message_id = entry.get("MessageId") or ""
+        severity = (entry.get("Severity") or "").lower()
+        try:
+            category = (entry["Oem"]["Dell"]["Category"] or "").lower()
+        except (KeyError, TypeError):
+            category = ""
+        names = []
+        for rule in self.rules:
+            if rule.keywords and rule.keywords.isdisjoint(found):
+                continue
+            if rule.message_id_prefixes and not message_id.startswith(rule.message_id_prefixes):
+                continue
+            if rule.severities and severity not in rule.severities:
+                continue
+            if rule.categories and category not in rule.categories:
+                continue
+            names.append(rule.name)
+        return names
+
+    def matches(self, entry):
+        """Return True if any rule matches the entry"""
+        return bool(self.classify(entry))
+
+
+class NdjsonSink(object):
+    """Sink for route_log_entries() writing each entry passed in as one line to an NDJSON file, gzip compressed if compress is True or (compress None) file name ends with .gz"""
+
+    def __init__(self, filename, compress=None):
+        self.filename = filename
+        self.entries = 0
+        self._file = open_ndjson_file(filename, compress)
+
+    def __call__(self, entry):
+        self._file.write(json.dumps(entry) + "\n")
+        self.entries += 1
+
+    def close(self):
+        self._file.close()
+
+
+def route_log_entries(entries, classifier, sinks):
+    """Classify each entry once and pass it to the sink of every rule it matches. entries is any iterable of log entries (example: paging.RedfishCollection), sinks is a dictionary of rule name to a function called with the entry (example: list.append or NdjsonSink). Returns dictionary of matched entry count per rule name."""
+    counts = collections.OrderedDict((rule.name, 0) for rule in classifier.rules)
+    for entry in entries:
+        for name in classifier.classify(entry):
+            counts[name] += 1
+            sink = sinks.get(name)
+            if sink is not None:
+                sink(entry)
+    return counts
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Structured streaming output for the Get Redfish Python scripts. Records (log entries, sensors, registry entries)
+# are written one at a time as NDJSON, CSV or a pretty printed JSON array, so output can be consumed by other tools
+# without parsing "key: value" text and large collections are never formatted or held in memory as a whole. Scripts
+# add the common --output-format and --output-file arguments with add_output_arguments().
+
+import abc
+import csv
+import gzip
+import json
+import os
+import sys
+
+OUTPUT_FORMATS = ["ndjson", "csv", "json"]
+
+
+def add_output_arguments(parser):
+    """Add --output-format and --output-file arguments to a script argument parser"""
+    parser.add_argument('--output-format', help='Write output as structured records instead of printing it and writing a text file, supported values: %s. Records are written to stdout unless argument --output-file is passed in' % ", ".join(OUTPUT_FORMATS), choices=OUTPUT_FORMATS, dest="output_format", required=False)
+    parser.add_argument('--output-file', help='Pass in file name with argument --output-format to write records to a file. File name ending with .gz will be gzip compressed.', dest="output_file", required=False)
+
+
+def flatten_record(record, prefix=""):
+    """Return record with nested dictionaries flattened into dotted column names (Status.Health), lists and other values not supported by CSV are JSON encoded"""
+    flat_record = {}
+    for key, value in record.items():
+        name = "%s%s" % (prefix, key)
+        if isinstance(value, dict):
+            flat_record.update(flatten_record(value, name + "."))
+        elif isinstance(value, (list, tuple)):
+            flat_record[name] = json.dumps(value)
+        else:
+            flat_record[name] = value
+    return flat_record
+
+
+class OutputWriter(abc.ABC):
+    """Base class for streaming record writers, subclasses implement _write() for one record. Records are written with write() or write_all() as they are produced, close() completes the output. Output to a file is written to a temporary .part file renamed once closed, so a partial file is never left under the final name. Use as a context manager to close on success and remove the partial file on error."""
+
+    newline = None
+
+    def __init__(self, filename=None):
+        self.filename = filename if filename and filename != "-" else None
+        self.records = 0
+        if self.filename:
+            self._part_filename = "%s.part" % self.filename
+            if self.filename.lower().endswith(".gz"):
+                self.open_file = gzip.open(self._part_filename, "wt", encoding="utf-8", newline=self.newline)
+            else:
+                self.open_file = open(self._part_filename, "w", encoding="utf-8", newline=self.newline)
+        else:
+            self.open_file = sys.stdout
+
+    @abc.abstractmethod
+    def _write(self, record):
+        pass
+
+    def _finish(self):
+        pass
+
+    def write(self, record):
+        """Write one record (dictionary)"""
+        self._write(record)
+        self.records += 1
+
+    def write_all(self, records):
+        """Write every record from an iterable or generator, returns number of records written"""
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def close(self):
+        """Complete the output, for files the .part file is renamed to the final file name"""
+        self._finish()
+        if self.filename:
+            self.open_file.close()
+            os.replace(self._part_filename, self.filename)
+        else:
+            self.open_file.flush()
+
+    def abort(self):
+        """Close without completing the output, partial file is removed"""
+        if self.filename:
+            self.open_file.close()
+            try:
+                os.remove(self._part_filename)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        if exception_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class NdjsonWriter(OutputWriter):
+    """One JSON record per line"""
+
+    def _write(self, record):
+        self.open_file.write(json.dumps(record))
+        self.open_file.write("\n")
+
+
+class JsonWriter(OutputWriter):
+    """Pretty printed JSON array, each record is formatted and written as it is received"""
+
+    def _write(self, record):
+        self.open_file.write("[\n" if self.records == 0 else ",\n")
+        self.open_file.write("\n".join("    %s" % i for i in json.dumps(record, indent=4).splitlines()))
+
+    def _finish(self):
+        self.open_file.write("[]\n" if self.records == 0 else "\n]\n")
+
+
+class CsvWriter(OutputWriter):
+    """CSV with a header row, nested values are flattened with flatten_record(). Columns are fieldnames if passed in, otherwise the columns of the first record, columns only present in later records are not written."""
+
+    newline = ""
+
+    def __init__(self, filename=None, fieldnames=None):
+        OutputWriter.__init__(self, filename)
+        self.fieldnames = fieldnames
+        self._writer = None
+
+    def _write(self, record):
+        record = flatten_record(record)
+        if self._writer is None:
+            if self.fieldnames is None:
+                self.fieldnames = list(record)
+            self._writer = csv.DictWriter(self.open_file, fieldnames=self.fieldnames, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow(record)
+
+
+def open_output(output_format, filename=None, fieldnames=None):
+    """Return OutputWriter for output_format (ndjson, csv or json) writing to filename or stdout if filename is None. fieldnames sets CSV columns. Raises ValueError for an unsupported format."""
+    if output_format == "ndjson":
+        return NdjsonWriter(filename)
+    if output_format == "json":
+        return JsonWriter(filename)
+    if output_format == "csv":
+        return CsvWriter(filename, fieldnames)
+    raise ValueError("unsupported output format \"%s\", supported values: %s" % (output_format, ", ".join(OUTPUT_FORMATS)))
+
+
+def write_records(records, output_format, filename=None, fieldnames=None):
+    """Stream records from an iterable or generator to filename (or stdout) in output_format, returns number of records written"""
+    with open_output(output_format, filename, fieldnames) as writer:
+        return writer.write_all(records)
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Repository update list support. DellSoftwareInstallationService.GetRepoBasedUpdateList returns PackageList, a CIM
+# XML document with one instance per update available from the repository and every value stored as a PROPERTY
+# (PROPERTY.ARRAY for multiple values) element. The document is parsed incrementally with expat in one linear pass and
+# each instance is returned as a RepoUpdate record as soon as it is complete. RepoUpdateIndex combines the update
+# lists of many iDRACs so the fleet can be queried by component, criticality or reboot type.
+
+import collections
+import json
+import xml.parsers.expat
+
+PACKAGE_LIST_CHUNK_SIZE = 64 * 1024
+CRITICALITY = {"1": "Recommended", "2": "Urgent", "3": "Optional"}
+
+# Properties iDRAC versions use for the same value, first one present is used
+CURRENT_VERSION_PROPERTIES = ("ComponentInstalledVersion", "InstalledVersion", "CurrentVersion")
+PACKAGE_PATH_PROPERTIES = ("PackagePath", "PackageName")
+
+RepoUpdate = collections.namedtuple("RepoUpdate", ["component_id", "target", "display_name", "component_type", "current_version", "target_version", "criticality", "reboot_type", "package_path", "properties"])
+
+# Record keys used for structured output and RepoUpdateIndex files, same order as RepoUpdate
+RECORD_KEYS = ["ComponentID", "Target", "DisplayName", "ComponentType", "CurrentVersion", "TargetVersion", "Criticality", "RebootType", "PackagePath"]
+
+
+def _property(properties, *names):
+    for name in names:
+        value = properties.get(name)
+        if value:
+            return ", ".join(value) if isinstance(value, list) else value
+    return None
+
+
+def repo_update(properties):
+    """Return RepoUpdate for the properties (dictionary of property name to value, list for PROPERTY.ARRAY) of one PackageList instance. Criticality is returned as its name (Recommended, Urgent, Optional)."""
+    criticality = _property(properties, "Criticality")
+    return RepoUpdate(_property(properties, "ComponentID"), _property(properties, "Target", "ComponentInstalled"), _property(properties, "DisplayName"), _property(properties, "ComponentType"),
+                      _property(properties, *CURRENT_VERSION_PROPERTIES), _property(properties, "PackageVersion"), CRITICALITY.get(criticality, criticality), _property(properties, "RebootType"),
+                      _property(properties, *PACKAGE_PATH_PROPERTIES), properties)
+
+
+class PackageListParser(object):
+    """Incremental PackageList parser, feed() the XML (str or bytes) in any number of chunks and close() once complete. Completed instances are collected as RepoUpdate in updates, read and clear them with pop_updates() between feeds. Any element with PROPERTY children is an instance, so the CIM wrapper elements iDRAC versions use around instances don't matter. Raises xml.parsers.expat.ExpatError if the XML is not well formed."""
+
+    def __init__(self):
+        self.updates = []
+        self._depth = 0
+        self._instance_depth = None
+        self._properties = None
+        self._name = None
+        self._array = False
+        self._value = None
+        self._parser = xml.parsers.expat.ParserCreate()
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._characters
+
+    def _start(self, name, attributes):
+        self._depth += 1
+        if name == "PROPERTY" or name == "PROPERTY.ARRAY":
+            if self._properties is None:
+                self._properties = {}
+                self._instance_depth = self._depth - 1
+            self._name = attributes.get("NAME")
+            self._array = name == "PROPERTY.ARRAY"
+            self._properties[self._name] = [] if self._array else ""
+        elif name == "VALUE" and self._name is not None:
+            self._value = ""
+
+    def _end(self, name):
+        if name == "VALUE" and self._value is not None:
+            if self._array:
+                self._properties[self._name].append(self._value.strip())
+            else:
+                self._properties[self._name] = self._value.strip()
+            self._value = None
+        elif name == "PROPERTY" or name == "PROPERTY.ARRAY":
+            self._name = None
+        elif self._depth == self._instance_depth:
+            self.updates.append(repo_update(self._properties))
+            self._properties = None
+            self._instance_depth = None
+        self._depth -= 1
+
+    def _characters(self, data):
+        if self._value is not None:
+            self._value += data
+
+    def feed(self, data):
+        self._parser.Parse(data, False)
+
+    def close(self):
+        self._parser.Parse(b"", True)
+
+    def pop_updates(self):
+        """Return updates completed since the last call"""
+        updates = self.updates
+        self.updates = []
+        return updates
+
+
+def parse_package_list(package_list, chunk_size=PACKAGE_LIST_CHUNK_SIZE):
+    """Generator returning RepoUpdate for every update of a PackageList (GetRepoBasedUpdateList response value, str or bytes) in document order, each update is returned as soon as its instance is parsed. Raises xml.parsers.expat.ExpatError if the XML is not well formed."""
+    parser = PackageListParser()
+    for i in range(0, len(package_list), chunk_size):
+        parser.feed(package_list[i:i + chunk_size])
+        for update in parser.pop_updates():
+            yield update
+    parser.close()
+    for update in parser.pop_updates():
+        yield update
+
+
+def update_record(update, idrac_ip=None):
+    """Return RepoUpdate as an output record (dictionary with RECORD_KEYS keys), IdracIp is added first when idrac_ip is passed in"""
+    record = collections.OrderedDict()
+    if idrac_ip:
+        record["IdracIp"] = idrac_ip
+    for key, value in zip(RECORD_KEYS, update):
+        record[key] = value
+    return record
+
+
+def _record_update(record):
+    return RepoUpdate(*([record.get(key) for key in RECORD_KEYS] + [{}]))
+
+
+class RepoUpdateIndex(object):
+    """Repository update lists of many iDRACs. add() replaces the update list of an iDRAC, query() filters updates across every iDRAC and summary() counts iDRACs per update. Component ID lookups use an index, other filters scan the updates. Use save() and load_update_index() to build the index from update lists collected by separate script runs (FleetRunner)."""
+
+    def __init__(self):
+        self.updates = collections.OrderedDict()
+        self._components = collections.defaultdict(list)
+
+    def add(self, idrac_ip, updates):
+        """Add (or replace) the update list of one iDRAC"""
+        if idrac_ip in self.updates:
+            for update in self.updates[idrac_ip]:
+                self._components[update.component_id].remove((idrac_ip, update))
+        self.updates[idrac_ip] = list(updates)
+        for update in self.updates[idrac_ip]:
+            self._components[update.component_id].append((idrac_ip, update))
+
+    def query(self, component_id=None, display_name=None, criticality=None, reboot_type=None, target_version=None):
+        """Return list of (idrac_ip, RepoUpdate) matching every filter passed in. display_name matches case-insensitive substrings, criticality and reboot_type are case-insensitive."""
+        if component_id is not None:
+            updates = list(self._components.get(str(component_id), []))
+        else:
+            updates = [(idrac_ip, update) for idrac_ip, idrac_updates in self.updates.items() for update in idrac_updates]
+        if display_name:
+            updates = [i for i in updates if display_name.lower() in (i[1].display_name or "").lower()]
+        if criticality:
+            updates = [i for i in updates if (i[1].criticality or "").lower() == criticality.lower()]
+        if reboot_type:
+            updates = [i for i in updates if (i[1].reboot_type or "").lower() == reboot_type.lower()]
+        if target_version:
+            updates = [i for i in updates if i[1].target_version == target_version]
+        return updates
+
+    def summary(self):
+        """Return list of dictionaries, one per update (display name, target version and criticality) with the number of iDRACs and the iDRAC IPs needing it, most iDRACs first"""
+        summary = collections.OrderedDict()
+        for idrac_ip, updates in self.updates.items():
+            for update in updates:
+                key = (update.display_name, update.target_version, update.criticality)
+                if key not in summary:
+                    summary[key] = {"DisplayName": update.display_name, "TargetVersion": update.target_version, "Criticality": update.criticality, "RebootType": update.reboot_type, "idrac_ips": []}
+                if idrac_ip not in summary[key]["idrac_ips"]:
+                    summary[key]["idrac_ips"].append(idrac_ip)
+        for i in summary.values():
+            i["count"] = len(i["idrac_ips"])
+        return sorted(summary.values(), key=lambda x: -x["count"])
+
+    def save(self, filename):
+        """Save the index as NDJSON records, load it with load_update_index()"""
+        with open(filename, "w") as open_file:
+            for idrac_ip, updates in self.updates.items():
+                for update in updates:
+                    open_file.write(json.dumps(update_record(update, idrac_ip)))
+                    open_file.write("\n")
+
+
+def load_update_index(filenames, index=None):
+    """Return RepoUpdateIndex with the records of NDJSON or JSON files written by RepoUpdateIndex.save() or InstallFromRepositoryREDFISH.py --output-format ndjson/json, records without IdracIp use the file name. Raises ValueError if a file is not valid JSON."""
+    index = index or RepoUpdateIndex()
+    for filename in filenames:
+        with open(filename) as open_file:
+            text = open_file.read()
+        if text.lstrip().startswith("["):
+            records = json.loads(text)
+        else:
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        updates = collections.OrderedDict()
+        for record in records:
+            updates.setdefault(record.get("IdracIp") or filename, []).append(_record_update(record))
+        for idrac_ip, idrac_updates in updates.items():
+            index.add(idrac_ip, idrac_updates)
+    return index
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Lazy iterator for paged Redfish collections (LC log, SEL, sensor and slot collections). Pages are fetched by
+# following Members@odata.nextLink instead of guessing $skip values, the next page is fetched on a background worker
+# while the caller consumes the current page and members are yielded one at a time so only the pages in flight are
+# held in memory. When iDRAC reports Members@odata.count the remaining $skip pages are known up front and a bounded
+# window of them is fetched concurrently.
+
+import concurrent.futures
+import logging
+import re
+
+from .transport import RedfishTransport, decode_json
+
+# Number of pages fetched ahead of the page being consumed
+DEFAULT_PREFETCH_PAGES = 4
+SKIP_OUT_OF_RANGE_MESSAGE = "query parameter $skip is out of range"
+SKIP_PATTERN = re.compile(r"\$skip=(\d+)")
+TOP_PATTERN = re.compile(r"\$top=\d+")
+
+
+class CollectionError(Exception):
+    """Raised when a collection page can't be fetched. uri, status_code and data (JSON response body or None) are set from the failed response, status_code 200 means the response did not contain Members."""
+
+    def __init__(self, uri, status_code, data):
+        if status_code == 200:
+            message = "'Members' key not detected in JSON response for GET %s" % uri
+        else:
+            message = "GET %s failed, status code %s returned" % (uri, status_code)
+        Exception.__init__(self, message)
+        self.uri = uri
+        self.status_code = status_code
+        self.data = data
+
+
+def _json(response):
+    return decode_json(response.content)
+
+
+def _skip_out_of_range(response, data):
+    if response.status_code != 400 or not isinstance(data, dict):
+        return False
+    try:
+        return SKIP_OUT_OF_RANGE_MESSAGE in data["error"]["@Message.ExtendedInfo"][0]["Message"]
+    except (KeyError, IndexError, TypeError):
+        return False
+
+
+def _add_query(uri, query):
+    return "%s%s%s" % (uri, "&" if "?" in uri else "?", query)
+
+
+class RedfishCollection(object):
+    """Iterate members of a paged Redfish collection, example: for entry in RedfishCollection(idrac_ip, LC_LOG_URI, x_auth_token=token). uri can include query parameters ($filter), page_size adds $top on iDRAC versions supporting it and prefetch is the number of pages fetched ahead of the caller. Iterating yields members, pages() yields complete page JSON. Raises CollectionError if the first page can't be fetched or a later page fails with an error other than end of collection."""
+
+    def __init__(self, idrac_ip, uri, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None, page_size=None, prefetch=DEFAULT_PREFETCH_PAGES):
+        self.idrac_ip = idrac_ip
+        self.uri = uri
+        self.page_size = page_size
+        self.prefetch = max(1, prefetch)
+        self.count = None
+        self.pages_fetched = 0
+        self._owned_transport = transport is None
+        if self._owned_transport:
+            transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token, pool_maxsize=max(self.prefetch, 1))
+        self.transport = transport
+
+    def _get(self, uri):
+        response = self.transport.get(uri)
+        return response, _json(response)
+
+    def _first_page(self):
+        uri = self.uri
+        if self.page_size:
+            top_uri = _add_query(uri, "$top=%s" % self.page_size)
+            response, data = self._get(top_uri)
+            if response.status_code in (400, 501):
+                logging.debug("- INFO, $top query parameter not supported for %s, collection will be paged by iDRAC" % uri)
+                self.page_size = None
+                response, data = self._get(uri)
+            else:
+                uri = top_uri
+        else:
+            response, data = self._get(uri)
+        if response.status_code != 200 or not isinstance(data, dict) or "Members" not in data:
+            raise CollectionError(uri, response.status_code, data)
+        return data
+
+    def _next_page(self, uri):
+        # Returns page JSON or None once the end of the collection is reached
+        response, data = self._get(uri)
+        if response.status_code == 500 or _skip_out_of_range(response, data):
+            return None
+        if response.status_code != 200:
+            raise CollectionError(uri, response.status_code, data)
+        if not isinstance(data, dict) or not data.get("Members"):
+            return None
+        return data
+
+    def _next_link(self, data):
+        next_link = data.get("Members@odata.nextLink")
+        if next_link and self.page_size and not TOP_PATTERN.search(next_link):
+            next_link = _add_query(next_link, "$top=%s" % self.page_size)
+        return next_link
+
+    def _skip_uris(self, data):
+        # Remaining page URIs when total count and page length are known, otherwise empty list
+        next_link = self._next_link(data)
+        match = SKIP_PATTERN.search(next_link) if next_link else None
+        page_length = len(data["Members"])
+        if not match or not page_length or not isinstance(self.count, int):
+            return []
+        return [SKIP_PATTERN.sub("$skip=%s" % skip, next_link, 1) for skip in range(int(match.group(1)), self.count, page_length)]
+
+    def pages(self):
+        """Yield each page of the collection as JSON, the first page is always yielded (Members may be empty)"""
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.prefetch)
+        pending = []
+        try:
+            data = self._first_page()
+            self.count = data.get("Members@odata.count")
+            self.pages_fetched = 1
+            skip_uris = self._skip_uris(data)
+            requested = set(skip_uris)
+            next_link = self._next_link(data)
+            index = 0
+            while True:
+                if index < len(skip_uris):
+                    # Page URIs known up front, keep a window of prefetch pages in flight and yield them in order
+                    while index < len(skip_uris) and len(pending) < self.prefetch:
+                        pending.append(executor.submit(self._next_page, skip_uris[index]))
+                        index += 1
+                elif not pending and next_link and next_link not in requested:
+                    # Follow nextLink, next page is fetched in the background while the current page is consumed.
+                    # Also covers entries added while iterating past the count reported on the first page.
+                    requested.add(next_link)
+                    pending.append(executor.submit(self._next_page, next_link))
+                yield data
+                if not pending:
+                    return
+                data = pending.pop(0).result()
+                if data is None:
+                    return
+                self.pages_fetched += 1
+                next_link = self._next_link(data)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            if self._owned_transport:
+                self.transport.close()
+
+    def __iter__(self):
+        for page in self.pages():
+            for member in page["Members"]:
+                yield member
+
+    def members(self):
+        """Return list of all members, use iteration instead for large collections"""
+        return list(self)
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# In-process iDRAC reachability probe used while polling jobs, replaces executing ping in a subprocess. iDRAC is
+# probed with either a TCP connect to the HTTPS port or an unauthenticated HEAD request on the Redfish service root,
+# both work on networks where ICMP is blocked. A successful probe is cached for a short window so job polling loops
+# checking the connection every iteration don't execute a probe each time.
+
+import asyncio
+import logging
+import socket
+import threading
+import time
+
+import requests
+
+from .transport import host_address, split_host
+
+# Seconds a successful probe is reused without probing the iDRAC again
+CACHE_SECONDS = 10
+PROBE_TIMEOUT = 3
+# Backoff delays in seconds while waiting for iDRAC to respond again, doubled after each failed probe up to max
+INITIAL_RETRY_DELAY = 2
+MAX_RETRY_DELAY = 30
+
+_last_success = {}
+_last_success_lock = threading.Lock()
+
+
+def probe_idrac(idrac_ip, verify_cert=False, method="https", timeout=PROBE_TIMEOUT):
+    """Probe iDRAC once without using the cache. method "https" executes HEAD on /redfish/v1 and passes if the iDRAC web server returns any response, method "tcp" passes if a TCP connection to the HTTPS port can be opened. Returns True or False."""
+    try:
+        if method == "tcp":
+            socket.create_connection(split_host(idrac_ip), timeout=timeout).close()
+        else:
+            requests.head("https://%s/redfish/v1" % host_address(idrac_ip), verify=verify_cert, timeout=timeout, allow_redirects=False)
+    except (OSError, requests.RequestException):
+        return False
+    with _last_success_lock:
+        _last_success[idrac_ip] = time.time()
+    return True
+
+
+async def probe_idrac_async(idrac_ip, timeout=PROBE_TIMEOUT):
+    """asyncio TCP connect probe for callers running an event loop (example: AsyncRedfishClient bulk operations). Returns True or False."""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*split_host(idrac_ip)), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    with _last_success_lock:
+        _last_success[idrac_ip] = time.time()
+    return True
+
+
+def is_idrac_reachable(idrac_ip, verify_cert=False, method="https", cache_seconds=CACHE_SECONDS):
+    """Return True if iDRAC responded to a probe within the last cache_seconds, otherwise probe the iDRAC"""
+    with _last_success_lock:
+        last_success = _last_success.get(idrac_ip)
+    if last_success and time.time() - last_success < cache_seconds:
+        return True
+    return probe_idrac(idrac_ip, verify_cert, method)
+
+
+def forget_idrac(idrac_ip):
+    """Remove cached successful probe, call this once iDRAC reset or reboot is triggered so the next check probes the iDRAC"""
+    with _last_success_lock:
+        _last_success.pop(idrac_ip, None)
+
+
+def wait_for_idrac(idrac_ip, verify_cert=False, method="https", timeout=None, initial_delay=INITIAL_RETRY_DELAY, max_delay=MAX_RETRY_DELAY):
+    """Probe iDRAC until it responds, waiting between probes with exponential backoff (initial_delay doubled up to max_delay). Returns True once iDRAC responds or False if timeout in seconds is reached, default is no timeout."""
+    start_time = time.time()
+    delay = initial_delay
+    while not probe_idrac(idrac_ip, verify_cert, method):
+        if timeout is not None and time.time() - start_time + delay > timeout:
+            return False
+        logging.info("- INFO, unable to reach iDRAC %s, script will wait %s seconds and try again" % (idrac_ip, delay))
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+    return True
@@ -0,0 +1,328 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Versioned on-disk cache for BIOS, iDRAC, NIC and message registries. Registries only change with firmware, so
+# each one is keyed by server model, the firmware version it belongs to (BIOS version for the BIOS registry, iDRAC
+# version for iDRAC and message registries) and the registry URI, and one cached copy is shared by every iDRAC running
+# the same firmware. Registries are stored already parsed in marshal format, loading one is much faster than
+# downloading and parsing the multi-MB JSON again. Cached registries older than the revalidate interval are checked
+# with a conditional GET (If-None-Match) and reused when iDRAC returns 304.
+#
+# Registries are stored under ~/.idrac_redfish/registries, set environment variable IDRAC_REDFISH_REGISTRY_CACHE to
+# a different directory or to "off" to disable the on-disk cache.
+#
+# MessageRegistryIndex indexes the message registry once (exact, case-insensitive and sorted prefix lookup) and
+# resolves LC/SEL entry MessageId and MessageArgs into message text and recommended action without iDRAC access. An
+# index can be saved to a file and loaded on a host with no iDRAC connection.
+
+import bisect
+import collections
+import hashlib
+import logging
+import marshal
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from .transport import RedfishTransport, decode_json
+
+BIOS_REGISTRY_URI = "/redfish/v1/Systems/System.Embedded.1/Bios/BiosRegistry"
+IDRAC_REGISTRY_URI = "/redfish/v1/Registries/ManagerAttributeRegistry/ManagerAttributeRegistry.v1_0_0.json"
+MESSAGE_REGISTRY_URI = "/redfish/v1/Registries/Messages/EEMIRegistry"
+SYSTEM_URI = "/redfish/v1/Systems/System.Embedded.1"
+MANAGER_URI = "/redfish/v1/Managers/iDRAC.Embedded.1"
+# Firmware the registry version follows, registries not listed here (NIC registries) need firmware_version passed in
+REGISTRY_FIRMWARE = {BIOS_REGISTRY_URI: "bios", IDRAC_REGISTRY_URI: "idrac", MESSAGE_REGISTRY_URI: "idrac"}
+# Seconds a cached registry is used before it is revalidated with iDRAC
+DEFAULT_REVALIDATE_SECONDS = 24 * 3600
+# Seconds model and firmware versions read from an iDRAC are reused, call forget_firmware_versions() after a BIOS or iDRAC update
+DEFAULT_VERSION_CACHE_SECONDS = 600
+# Bump when the cache file layout changes, files written with a different format are ignored
+CACHE_FORMAT = 1
+# Registry prefix of log entry MessageId values, example: IDRAC.2.9.LC011 or IDRAC.2.9.LC for prefix search
+MESSAGE_ID_PREFIX = re.compile(r"^[A-Za-z]+\.\d+\.\d+\.")
+MESSAGE_ARG_PATTERN = re.compile(r"%(\d+)")
+
+FirmwareVersions = collections.namedtuple("FirmwareVersions", ["model", "bios", "idrac"])
+ResolvedMessage = collections.namedtuple("ResolvedMessage", ["message_id", "message", "resolution", "severity", "found"])
+
+_registry_cache = {}
+_version_cache = {}
+_index_cache = {}
+_cache_lock = threading.Lock()
+
+
+class RegistryError(Exception):
+    """Raised when a registry or the firmware versions used to key it can't be fetched. uri, status_code and data (JSON response body or None) are set from the failed response."""
+
+    def __init__(self, uri, status_code, data):
+        Exception.__init__(self, "GET %s failed, status code %s returned" % (uri, status_code))
+        self.uri = uri
+        self.status_code = status_code
+        self.data = data
+
+
+def _json(response):
+    return decode_json(response.content)
+
+
+def _cache_directory():
+    directory = os.environ.get("IDRAC_REDFISH_REGISTRY_CACHE", "")
+    if directory.lower() in ("off", "none", "false", "0"):
+        return None
+    if not directory:
+        directory = os.path.join(os.path.expanduser("~"), ".idrac_redfish", "registries")
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+            os.chmod(directory, 0o700)
+    except OSError:
+        logging.debug("- INFO, unable to create registry cache directory %s" % directory)
+        return None
+    return directory
+
+
+def _cache_key(registry_uri, model, firmware_version):
+    # marshal format is specific to the Python version, files written by another Python version are not shared
+    return "%s|%s.%s|%s|%s|%s" % (CACHE_FORMAT, sys.version_info[0], sys.version_info[1], registry_uri, model, firmware_version)
+
+
+def _cache_file(key):
+    directory = _cache_directory()
+    if not directory:
+        return None
+    return os.path.join(directory, "%s.registry" % hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+
+def _read_cache(filename, key):
+    try:
+        with open(filename, "rb") as open_file:
+            entry = marshal.load(open_file)
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(entry, dict) or entry.get("key") != key:
+        return None
+    return entry
+
+
+def _write_cache(filename, entry):
+    # Write to a temp file, then rename so concurrent script runs never read a partial file
+    file_descriptor, temp_filename = tempfile.mkstemp(dir=os.path.dirname(filename))
+    try:
+        with os.fdopen(file_descriptor, "wb") as open_file:
+            marshal.dump(entry, open_file)
+        os.chmod(temp_filename, 0o600)
+        os.replace(temp_filename, filename)
+    except (IOError, OSError, ValueError):
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+        logging.debug("- INFO, unable to write registry cache file %s" % filename)
+
+
+def _get_selected(transport, uri, properties):
+    # $select keeps the response small, retried without it on iDRAC versions not supporting $select
+    response = transport.get("%s?$select=%s" % (uri, ",".join(properties)))
+    if response.status_code in (400, 501):
+        response = transport.get(uri)
+    data = _json(response)
+    if response.status_code != 200 or not isinstance(data, dict):
+        raise RegistryError(uri, response.status_code, data)
+    return data
+
+
+def get_firmware_versions(idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None, max_age=DEFAULT_VERSION_CACHE_SECONDS):
+    """Return FirmwareVersions (model, bios, idrac) for the iDRAC, read once and cached per iDRAC for max_age seconds. Raises RegistryError if versions can't be read."""
+    with _cache_lock:
+        cached = _version_cache.get(idrac_ip)
+    if cached and time.time() - cached[0] < max_age:
+        return cached[1]
+    owned_transport = transport is None
+    if owned_transport:
+        transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+    try:
+        system = _get_selected(transport, SYSTEM_URI, ["Model", "BiosVersion"])
+        manager = _get_selected(transport, MANAGER_URI, ["FirmwareVersion"])
+    finally:
+        if owned_transport:
+            transport.close()
+    versions = FirmwareVersions(system.get("Model"), system.get("BiosVersion"), manager.get("FirmwareVersion"))
+    with _cache_lock:
+        _version_cache[idrac_ip] = (time.time(), versions)
+    return versions
+
+
+def forget_firmware_versions(idrac_ip):
+    """Remove cached model and firmware versions for the iDRAC, next registry lookup reads them again"""
+    with _cache_lock:
+        _version_cache.pop(idrac_ip, None)
+
+
+def _fetch_registry(transport, registry_uri, etag):
+    # Returns (registry, etag), registry is None if iDRAC confirmed the cached copy with 304
+    headers = {"If-None-Match": etag} if etag else None
+    response = transport.get(registry_uri, headers=headers)
+    if etag and response.status_code == 304:
+        return None, etag
+    data = _json(response)
+    if response.status_code != 200 or not isinstance(data, dict):
+        raise RegistryError(registry_uri, response.status_code, data)
+    return data, response.headers.get("ETag")
+
+
+def get_registry(idrac_ip, registry_uri, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None, firmware_version=None, revalidate_after=DEFAULT_REVALIDATE_SECONDS):
+    """Return registry JSON for registry_uri (BIOS_REGISTRY_URI, IDRAC_REGISTRY_URI, MESSAGE_REGISTRY_URI or any other registry URI), from the in-process or on-disk cache when a copy for the same model and firmware version exists. For registries not listed in REGISTRY_FIRMWARE (NIC attribute registries) pass in firmware_version of the device the registry belongs to, otherwise iDRAC version is used. Cached copies older than revalidate_after seconds are revalidated with a conditional GET. Raises RegistryError if the registry can't be fetched."""
+    owned_transport = transport is None
+    if owned_transport:
+        transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+    try:
+        versions = get_firmware_versions(idrac_ip, transport=transport)
+        if firmware_version is None:
+            firmware_version = versions.bios if REGISTRY_FIRMWARE.get(registry_uri) == "bios" else versions.idrac
+        key = _cache_key(registry_uri, versions.model, firmware_version)
+        with _cache_lock:
+            entry = _registry_cache.get(key)
+        filename = _cache_file(key)
+        if entry is None and filename:
+            entry = _read_cache(filename, key)
+        if entry and time.time() - entry["validated"] < revalidate_after:
+            logging.debug("- INFO, using cached registry %s for %s firmware version %s" % (registry_uri, versions.model, firmware_version))
+        else:
+            registry, etag = _fetch_registry(transport, registry_uri, entry["etag"] if entry else None)
+            if registry is None:
+                logging.debug("- INFO, cached registry %s revalidated, not modified" % registry_uri)
+                registry = entry["registry"]
+            entry = {"key": key, "etag": etag, "validated": time.time(), "registry": registry}
+            if filename:
+                _write_cache(filename, entry)
+    finally:
+        if owned_transport:
+            transport.close()
+    with _cache_lock:
+        _registry_cache[key] = entry
+    return entry["registry"]
+
+
+def clear_registry_cache():
+    """Remove every cached registry from memory and disk, firmware versions and message indexes cached in memory are also cleared"""
+    with _cache_lock:
+        _registry_cache.clear()
+        _version_cache.clear()
+        _index_cache.clear()
+    directory = _cache_directory()
+    if not directory:
+        return
+    for filename in os.listdir(directory):
+        if filename.endswith(".registry"):
+            try:
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                pass
+
+
+def _message_key(message_id):
+    # Registry keys don't include the registry prefix (LC011 for log entry MessageId IDRAC.2.9.LC011)
+    return MESSAGE_ID_PREFIX.sub("", message_id.strip(), 1).lower()
+
+
+class MessageRegistryIndex(object):
+    """Lookup index over a message registry (registry JSON with a Messages dictionary, example: EEMIRegistry). Built once in O(n log n), get() is a dictionary lookup and search() a binary search, message IDs are matched case-insensitively with or without registry prefix (LC011, lc011 or IDRAC.2.9.LC011). resolve() substitutes MessageArgs into the message text, use save() and load_message_index() to use the index with no iDRAC connection."""
+
+    def __init__(self, registry):
+        self.registry_id = registry.get("Id")
+        self.messages = registry["Messages"]
+        self._lower_ids = dict((message_id.lower(), message_id) for message_id in self.messages)
+        self._sorted_ids = sorted(self._lower_ids)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __contains__(self, message_id):
+        return self.get(message_id) is not None
+
+    def get(self, message_id):
+        """Return (registry message ID, message details) or None if the message ID is not in the registry"""
+        if message_id in self.messages:
+            return message_id, self.messages[message_id]
+        registry_id = self._lower_ids.get(_message_key(message_id))
+        if registry_id is None:
+            return None
+        return registry_id, self.messages[registry_id]
+
+    def search(self, prefix):
+        """Return sorted list of registry message IDs starting with prefix, example: IDRAC.2.9.LC or lc0"""
+        key = _message_key(prefix)
+        start = bisect.bisect_left(self._sorted_ids, key)
+        # Every ID starting with key sorts before key followed by the highest code point
+        end = bisect.bisect_left(self._sorted_ids, key + "\U0010ffff", start)
+        return [self._lower_ids[i] for i in self._sorted_ids[start:end]]
+
+    def resolve(self, message_id, message_args=None, message=None):
+        """Return ResolvedMessage with %1..%n in the registry message replaced by message_args and the recommended action (registry Resolution). If the message ID is not in the registry, found is False and message (log entry Message) is returned as is."""
+        match = self.get(message_id) if message_id else None
+        if match is None:
+            return ResolvedMessage(message_id, message, None, None, False)
+        registry_id, details = match
+        message_args = message_args or []
+
+        def message_arg(arg_match):
+            index = int(arg_match.group(1)) - 1
+            return str(message_args[index]) if 0 <= index < len(message_args) else arg_match.group(0)
+        text = MESSAGE_ARG_PATTERN.sub(message_arg, details.get("Message") or message or "")
+        return ResolvedMessage(registry_id, text, details.get("Resolution"), details.get("Severity"), True)
+
+    def resolve_entry(self, entry):
+        """Return ResolvedMessage for an LC or SEL log entry using its MessageId, MessageArgs and Message"""
+        return self.resolve(entry.get("MessageId"), entry.get("MessageArgs"), entry.get("Message"))
+
+    def save(self, filename):
+        """Save the index to a file, load it with load_message_index()"""
+        with open(filename, "wb") as open_file:
+            marshal.dump({"format": CACHE_FORMAT, "Id": self.registry_id, "Messages": self.messages}, open_file)
+
+
+def load_message_index(filename):
+    """Return MessageRegistryIndex saved with MessageRegistryIndex.save(), no iDRAC connection is needed. Raises ValueError if the file is not a saved index."""
+    with open(filename, "rb") as open_file:
+        try:
+            data = marshal.load(open_file)
+        except (EOFError, TypeError) as error:
+            raise ValueError("%s is not a saved message registry index, detailed error information: %s" % (filename, error))
+    if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT or "Messages" not in data:
+        raise ValueError("%s is not a saved message registry index" % filename)
+    return MessageRegistryIndex(data)
+
+
+def get_message_index(idrac_ip, username=None, password=None, x_auth_token=None, verify_cert=False, transport=None, registry_uri=MESSAGE_REGISTRY_URI):
+    """Return MessageRegistryIndex for the iDRAC message registry. Registry is read through get_registry() and the index is built once per model and iDRAC version for the life of the process. Raises RegistryError if the registry can't be fetched."""
+    owned_transport = transport is None
+    if owned_transport:
+        transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+    try:
+        versions = get_firmware_versions(idrac_ip, transport=transport)
+        registry = get_registry(idrac_ip, registry_uri, transport=transport)
+    finally:
+        if owned_transport:
+            transport.close()
+    key = (registry_uri, versions.model, versions.idrac)
+    with _cache_lock:
+        cached = _index_cache.get(key)
+    # Registry object changes when a revalidation downloads a new copy
+    if cached and cached[0] is registry:
+        return cached[1]
+    index = MessageRegistryIndex(registry)
+    with _cache_lock:
+        _index_cache[key] = (registry, index)
+    return index
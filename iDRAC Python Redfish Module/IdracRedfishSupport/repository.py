@@ -0,0 +1,436 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Local firmware repository served to iDRACs over HTTP or HTTPS. Instead of pushing every Dell Update Package (DUP) to
+# every iDRAC with a multipart upload, iDRACs are handed an ImageURI (SimpleUpdate) or share parameters
+# (InstallFromRepository) pointing at this system and pull the packages themselves, all at the same time from the
+# page cache of one host.
+#
+# Packages and catalogs are copied into a content-addressed cache, each file is stored under its SHA256 hash after the
+# hash was computed while copying and, for packages listed in a catalog, checked against the catalog hashes. Hashes of
+# source files are remembered by path, size and modification time so a repository is only hashed again once it
+# changes. The cache is stored under ~/.idrac_redfish/dup_cache, set environment variable IDRAC_REDFISH_DUP_CACHE to a
+# different directory or to "off" to serve the source files directly.
+#
+# RepositoryServer is a threaded HTTP server (HTTPS when a certificate is passed in) supporting GET and HEAD, single
+# range requests (iDRAC resumes interrupted downloads) and a bandwidth limit per client IP.
+
+import collections
+import hashlib
+import http.server
+import json
+import logging
+import os
+import socket
+import socketserver
+import ssl
+import tempfile
+import threading
+import urllib.parse
+import xml.etree.ElementTree
+
+from .upload import BandwidthLimiter
+
+HASH_CHUNK_SIZE = 1024 * 1024
+SERVE_CHUNK_SIZE = 256 * 1024
+DEFAULT_REPOSITORY_PORT = 8080
+REPOSITORY_SHARE_NAME = "repository"
+REQUEST_QUEUE_SIZE = 256
+INDEX_FILENAME = "index.json"
+
+RepositoryPackage = collections.namedtuple("RepositoryPackage", ["path", "sha256", "size", "filename"])
+ClientStatistics = collections.namedtuple("ClientStatistics", ["client_ip", "requests", "bytes_sent"])
+
+
+class RepositoryError(Exception):
+    """Raised when a package does not match its catalog hash or can't be added to the repository"""
+
+
+def _cache_directory():
+    directory = os.environ.get("IDRAC_REDFISH_DUP_CACHE", "")
+    if directory.lower() in ("off", "none", "false", "0"):
+        return None
+    if not directory:
+        directory = os.path.join(os.path.expanduser("~"), ".idrac_redfish", "dup_cache")
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+            os.chmod(directory, 0o700)
+    except OSError:
+        logging.debug("- INFO, unable to create DUP cache directory %s" % directory)
+        return None
+    return directory
+
+
+def _copy_and_hash(filename, output_file=None):
+    # One pass over the file computes both hashes, catalogs list MD5 and newer catalogs also SHA256
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    size = 0
+    with open(filename, "rb") as open_file:
+        while True:
+            chunk = open_file.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            sha256.update(chunk)
+            md5.update(chunk)
+            size += len(chunk)
+            if output_file is not None:
+                output_file.write(chunk)
+    return sha256.hexdigest(), md5.hexdigest(), size
+
+
+def _check_hashes(filename, sha256, md5, expected_md5, expected_sha256):
+    if expected_sha256 and expected_sha256.lower() != sha256:
+        raise RepositoryError("%s SHA256 hash %s does not match catalog hash %s" % (filename, sha256, expected_sha256))
+    if expected_md5 and expected_md5.lower() != md5:
+        raise RepositoryError("%s MD5 hash %s does not match catalog hash %s" % (filename, md5, expected_md5))
+
+
+def read_catalog_hashes(catalog_filename):
+    """Return dictionary of package file name (lower case) to {"md5": hash, "sha256": hash} for every SoftwareComponent of a Dell catalog (Catalog.xml), hashes not listed in the catalog are None"""
+    hashes = {}
+    for event, element in xml.etree.ElementTree.iterparse(catalog_filename):
+        if element.tag != "SoftwareComponent":
+            continue
+        path = element.get("path")
+        if path:
+            sha256 = None
+            for hash_element in element.iter("Hash"):
+                if hash_element.get("algorithm", "").upper() == "SHA256" and hash_element.text:
+                    sha256 = hash_element.text.strip().lower()
+            md5 = element.get("hashMD5")
+            hashes[path.replace("\\", "/").split("/")[-1].lower()] = {"md5": md5.lower() if md5 else None, "sha256": sha256}
+        element.clear()
+    return hashes
+
+
+class DupRepository(object):
+    """Packages and catalogs served by RepositoryServer, keyed by URL path relative to the repository (FOLDER01234/1/BIOS_XXXX.EXE). add_file() and add_directory() hash each file, verify it against catalog hashes and copy it into the content-addressed cache. Raises RepositoryError if a package hash does not match the catalog."""
+
+    def __init__(self, cache_directory=None):
+        self.cache_directory = cache_directory or _cache_directory()
+        self.packages = {}
+        self.catalogs = []
+        self._index = {}
+        self._index_changed = False
+        self._lock = threading.Lock()
+        if self.cache_directory:
+            try:
+                with open(os.path.join(self.cache_directory, INDEX_FILENAME)) as open_file:
+                    self._index = json.load(open_file)
+            except (IOError, OSError, ValueError):
+                self._index = {}
+
+    def _blob_filename(self, sha256):
+        return os.path.join(self.cache_directory, sha256[:2], sha256)
+
+    def _store(self, filename, expected_md5, expected_sha256):
+        # Returns (sha256, size, served file name), source files already hashed with the same size and mtime are not read again. Files not matching the expected hashes are never stored in the cache.
+        filename = os.path.abspath(filename)
+        stat = os.stat(filename)
+        entry = self._index.get(filename)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            _check_hashes(filename, entry["sha256"], entry["md5"], expected_md5, expected_sha256)
+            if not self.cache_directory:
+                return entry["sha256"], entry["size"], filename
+            blob_filename = self._blob_filename(entry["sha256"])
+            if os.path.isfile(blob_filename) and os.path.getsize(blob_filename) == entry["size"]:
+                return entry["sha256"], entry["size"], blob_filename
+        if not self.cache_directory:
+            sha256, md5, size = _copy_and_hash(filename)
+            _check_hashes(filename, sha256, md5, expected_md5, expected_sha256)
+            served_filename = filename
+        else:
+            file_descriptor, temporary_filename = tempfile.mkstemp(dir=self.cache_directory, suffix=".part")
+            try:
+                with os.fdopen(file_descriptor, "wb") as output_file:
+                    sha256, md5, size = _copy_and_hash(filename, output_file)
+                _check_hashes(filename, sha256, md5, expected_md5, expected_sha256)
+                served_filename = self._blob_filename(sha256)
+                os.makedirs(os.path.dirname(served_filename), exist_ok=True)
+                os.replace(temporary_filename, served_filename)
+            finally:
+                if os.path.exists(temporary_filename):
+                    os.remove(temporary_filename)
+        self._index[filename] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": sha256, "md5": md5}
+        self._index_changed = True
+        return sha256, size, served_filename
+
+    def add_file(self, filename, path=None, expected_md5=None, expected_sha256=None):
+        """Add one file served under path (default is the file name), returns RepositoryPackage"""
+        path = (path or os.path.basename(filename)).replace("\\", "/").lstrip("/")
+        sha256, size, served_filename = self._store(filename, expected_md5, expected_sha256)
+        package = RepositoryPackage(path, sha256, size, served_filename)
+        with self._lock:
+            self.packages[path] = package
+        return package
+
+    def add_directory(self, directory):
+        """Add every file of a directory tree keeping relative paths, so the directory layout of a catalog repository (Dell Repository Manager export) is served as is. Packages listed in an .xml catalog in the top directory are verified against the catalog hashes. Returns list of RepositoryPackage."""
+        catalog_hashes = {}
+        for filename in sorted(os.listdir(directory)):
+            if filename.lower().endswith(".xml") and os.path.isfile(os.path.join(directory, filename)):
+                try:
+                    hashes = read_catalog_hashes(os.path.join(directory, filename))
+                except xml.etree.ElementTree.ParseError:
+                    continue
+                if hashes:
+                    catalog_hashes.update(hashes)
+                    self.catalogs.append(filename)
+        packages = []
+        for root, directories, filenames in os.walk(directory):
+            directories.sort()
+            for filename in sorted(filenames):
+                if filename.endswith(".part"):
+                    continue
+                path = os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, "/")
+                hashes = catalog_hashes.get(filename.lower(), {})
+                packages.append(self.add_file(os.path.join(root, filename), path, hashes.get("md5"), hashes.get("sha256")))
+        self.save_index()
+        return packages
+
+    def get(self, path):
+        """Return RepositoryPackage for a URL path or None"""
+        with self._lock:
+            return self.packages.get(path.lstrip("/"))
+
+    def save_index(self):
+        """Save source file hashes so the next run doesn't hash unchanged files again"""
+        if not self.cache_directory or not self._index_changed:
+            return
+        file_descriptor, temporary_filename = tempfile.mkstemp(dir=self.cache_directory)
+        try:
+            with os.fdopen(file_descriptor, "w") as open_file:
+                json.dump(self._index, open_file)
+            os.replace(temporary_filename, os.path.join(self.cache_directory, INDEX_FILENAME))
+            self._index_changed = False
+        except OSError:
+            logging.debug("- INFO, unable to save DUP cache index")
+        finally:
+            if os.path.exists(temporary_filename):
+                os.remove(temporary_filename)
+
+    def verify(self):
+        """Hash every cached file served by this repository again, returns list of paths whose cached file is missing or no longer matches its hash. Mismatched cached files are removed so the next add re-copies them."""
+        failed = []
+        for package in list(self.packages.values()):
+            try:
+                sha256 = _copy_and_hash(package.filename)[0]
+            except (IOError, OSError):
+                sha256 = None
+            if sha256 != package.sha256:
+                failed.append(package.path)
+                if self.cache_directory and package.filename.startswith(self.cache_directory):
+                    try:
+                        os.remove(package.filename)
+                    except OSError:
+                        pass
+        return failed
+
+
+def _parse_range(header, size):
+    # Returns (start, end) inclusive, None to send the full file (missing, malformed or multi range header) or False if not satisfiable
+    if not header or not header.strip().lower().startswith("bytes=") or "," in header:
+        return None
+    start, separator, end = header.strip()[6:].partition("-")
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                return False
+            return max(0, size - length), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+class RepositoryRequestHandler(http.server.BaseHTTPRequestHandler):
+    """GET and HEAD of repository packages with Range support"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "IdracRedfishRepository/1.0"
+
+    def log_message(self, format, *args):
+        logging.debug("- INFO, repository client %s: %s" % (self.client_address[0], format % args))
+
+    def do_HEAD(self):
+        self._send_package(head=True)
+
+    def do_GET(self):
+        self._send_package(head=False)
+
+    def _send_package(self, head):
+        repository_server = self.server.repository_server
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path).lstrip("/")
+        prefix = "%s/" % repository_server.share_name
+        package = repository_server.repository.get(path[len(prefix):]) if path.startswith(prefix) else None
+        if package is None:
+            self.send_error(404)
+            return
+        byte_range = _parse_range(self.headers.get("Range"), package.size)
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header("Content-Range", "bytes */%s" % package.size)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start, end = byte_range or (0, package.size - 1)
+        length = end - start + 1 if package.size else 0
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", "application/xml" if path.lower().endswith(".xml") else "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"%s"' % package.sha256)
+        if byte_range:
+            self.send_header("Content-Range", "bytes %s-%s/%s" % (start, end, package.size))
+        self.end_headers()
+        if head or not length:
+            return
+        limiter = repository_server.client_limiter(self.client_address[0])
+        sent = 0
+        try:
+            with open(package.filename, "rb") as open_file:
+                if limiter is None:
+                    # Zero copy from the page cache, falls back to send() for HTTPS
+                    self.wfile.flush()
+                    sent = self.connection.sendfile(open_file, start, length)
+                else:
+                    open_file.seek(start)
+                    while sent < length:
+                        chunk = open_file.read(min(SERVE_CHUNK_SIZE, length - sent))
+                        if not chunk:
+                            break
+                        limiter.consume(len(chunk))
+                        self.wfile.write(chunk)
+                        sent += len(chunk)
+        except (ConnectionError, socket.timeout, ssl.SSLError) as error_message:
+            logging.debug("- INFO, repository client %s disconnected: %s" % (self.client_address[0], error_message))
+            self.close_connection = True
+        finally:
+            repository_server.add_statistics(self.client_address[0], sent)
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+
+def local_address(idrac_ip):
+    """Return the IP address of this system used to reach idrac_ip, used in ImageURI values when the server listens on every interface. No packet is sent."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as open_socket:
+        open_socket.connect((urllib.parse.urlsplit("//%s" % idrac_ip).hostname, 443))
+        return open_socket.getsockname()[0]
+
+
+class RepositoryServer(object):
+    """HTTP server for a DupRepository, HTTPS when certfile is passed in (keyfile is optional if the key is in certfile). max_client_rate limits bandwidth per client IP in bytes per second. Packages are served under /repository/<path>. Use start() to serve from a background thread and stop() once iDRACs completed their downloads, or use as a context manager."""
+
+    def __init__(self, repository, host="", port=DEFAULT_REPOSITORY_PORT, certfile=None, keyfile=None, max_client_rate=None, advertise_address=None):
+        self.repository = repository
+        self.host = host
+        self.max_client_rate = max_client_rate
+        self.advertise_address = advertise_address
+        self.share_name = REPOSITORY_SHARE_NAME
+        self.protocol = "HTTPS" if certfile else "HTTP"
+        self._limiters = {}
+        self._statistics = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._server = _ThreadingHTTPServer((host, port), RepositoryRequestHandler)
+        self._server.repository_server = self
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            # Handshake runs in the request thread on first read, a slow client doesn't block accepting other clients
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True, do_handshake_on_connect=False)
+        self.port = self._server.server_address[1]
+
+    def client_limiter(self, client_ip):
+        """Return BandwidthLimiter shared by every connection of a client IP, None if bandwidth is not limited"""
+        if not self.max_client_rate:
+            return None
+        with self._lock:
+            if client_ip not in self._limiters:
+                self._limiters[client_ip] = BandwidthLimiter(self.max_client_rate)
+            return self._limiters[client_ip]
+
+    def add_statistics(self, client_ip, bytes_sent):
+        with self._lock:
+            requests, total = self._statistics.get(client_ip, (0, 0))
+            self._statistics[client_ip] = (requests + 1, total + bytes_sent)
+
+    def client_statistics(self):
+        """Return list of ClientStatistics, one per client IP which sent a request"""
+        with self._lock:
+            return [ClientStatistics(client_ip, requests, bytes_sent) for client_ip, (requests, bytes_sent) in sorted(self._statistics.items())]
+
+    def address(self, idrac_ip=None):
+        """Return address iDRACs use to reach this server: advertise_address if passed in, the listen address or the local address used to reach idrac_ip"""
+        if self.advertise_address:
+            return self.advertise_address
+        if self.host not in ("", "0.0.0.0"):
+            return self.host
+        if idrac_ip:
+            return local_address(idrac_ip)
+        return socket.gethostbyname(socket.gethostname())
+
+    def _host_port(self, idrac_ip):
+        address = self.address(idrac_ip)
+        if (self.protocol, self.port) in (("HTTP", 80), ("HTTPS", 443)):
+            return address
+        return "%s:%s" % (address, self.port)
+
+    def image_uri(self, path, idrac_ip=None):
+        """Return ImageURI for SimpleUpdate for a repository path (or RepositoryPackage)"""
+        if isinstance(path, RepositoryPackage):
+            path = path.path
+        return "%s://%s/%s/%s" % (self.protocol.lower(), self._host_port(idrac_ip), self.share_name, urllib.parse.quote(path.lstrip("/")))
+
+    def share_parameters(self, idrac_ip=None, catalog_file=None):
+        """Return IPAddress, ShareType, ShareName and CatalogFile payload values for DellSoftwareInstallationService.InstallFromRepository. Port is part of IPAddress when the server doesn't listen on the protocol default port."""
+        parameters = {"IPAddress": self._host_port(idrac_ip), "ShareType": self.protocol, "ShareName": self.share_name}
+        catalog_file = catalog_file or (self.repository.catalogs[0] if self.repository.catalogs else None)
+        if catalog_file:
+            parameters["CatalogFile"] = catalog_file
+        if self.protocol == "HTTPS":
+            parameters["IgnoreCertWarning"] = "On"
+        return parameters
+
+    def start(self):
+        """Serve from a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="RepositoryServer")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve from the calling thread until interrupted"""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving and close the listening socket"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.stop()
+        return False
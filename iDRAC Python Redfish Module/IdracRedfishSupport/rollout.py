@@ -0,0 +1,299 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Fleet firmware rollout, applies a local directory of Dell Update Packages (DUPs) to any number of iDRACs in waves.
+# A canary wave runs first, remaining iDRACs are updated in waves of wave_size and the rollout halts once a wave has
+# more failed iDRACs than allowed. iDRACs of a wave are updated concurrently while every package upload from this
+# system (jump host or share server) goes through one UploadBudget: max uploads at the same time and a bandwidth limit
+# shared by all of them. Per iDRAC the ordering of FirmwareUpdateLocalRepoREDFISH.py is kept: all other packages
+# first with one server reboot for every scheduled job, then CPLD (own reboot, never stacked with other updates) and
+# iDRAC last since iDRAC resets once its update completes. The next package is uploaded while iDRAC is still staging
+# the job of the previous one, jobs are then watched together with one JobWatcher per iDRAC.
+
+import collections
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+import time
+
+from datetime import timedelta
+
+import requests
+
+from .firmware import check_dup_version, forget_firmware_inventory, get_firmware_inventory, read_dup_package
+from .jobs import JobWatcher
+from .probe import forget_idrac, wait_for_idrac
+from .transport import RedfishTransport
+from .upload import MB, BandwidthLimiter, post_multipart
+
+DEFAULT_CANARY_HOSTS = 1
+DEFAULT_WAVE_SIZE = 25
+# Max iDRACs of a wave updated at the same time
+DEFAULT_MAX_HOSTS = 25
+# Max package uploads from this system at the same time, across all iDRACs
+DEFAULT_MAX_UPLOADS = 4
+DEFAULT_MAX_FAILED_PERCENT = 10
+DEFAULT_JOB_TIMEOUT = timedelta(minutes=50)
+# Seconds allowed for graceful shutdown before forced shutdown, and for iDRAC to respond again after CPLD or iDRAC update
+SHUTDOWN_TIMEOUT = 300
+IDRAC_RESET_TIMEOUT = 1800
+
+MULTIPART_UPLOAD_URI = "/redfish/v1/UpdateService/MultipartUpload"
+SYSTEM_URI = "/redfish/v1/Systems/System.Embedded.1"
+RESET_URI = "%s/Actions/ComputerSystem.Reset" % SYSTEM_URI
+
+ROLLOUT_STATUSES = ("PASS", "FAIL", "ERROR", "HALTED")
+
+RepositoryPackages = collections.namedtuple("RepositoryPackages", ["standard", "cpld", "idrac"])
+RolloutResult = collections.namedtuple("RolloutResult", ["idrac_ip", "wave", "status", "applied", "skipped", "failed", "elapsed", "error"])
+
+
+class _HostError(Exception):
+    pass
+
+
+def read_repository(directory):
+    """Return RepositoryPackages (lists of file paths sorted by file name) for the Windows DUPs in the directory. iDRAC and CPLD packages are detected by file name (contains idrac or cpld), same as FirmwareUpdateLocalRepoREDFISH.py."""
+    filenames = sorted(os.path.join(directory, i) for i in os.listdir(directory) if i.lower().endswith(".exe"))
+    idrac = [i for i in filenames if "idrac" in os.path.basename(i).lower()]
+    cpld = [i for i in filenames if "cpld" in os.path.basename(i).lower() and i not in idrac]
+    return RepositoryPackages([i for i in filenames if i not in idrac and i not in cpld], cpld, idrac)
+
+
+def plan_waves(idrac_ips, canary_hosts=DEFAULT_CANARY_HOSTS, wave_size=DEFAULT_WAVE_SIZE):
+    """Return list of waves (lists of iDRAC IPs) in rollout order. First wave is the canary wave of canary_hosts iDRACs (none if 0), remaining iDRACs are split into waves of wave_size."""
+    idrac_ips = list(idrac_ips)
+    waves = []
+    if canary_hosts:
+        waves.append(idrac_ips[:canary_hosts])
+        idrac_ips = idrac_ips[canary_hosts:]
+    wave_size = max(1, wave_size)
+    waves.extend(idrac_ips[i:i + wave_size] for i in range(0, len(idrac_ips), wave_size))
+    return [i for i in waves if i]
+
+
+class UploadBudget(object):
+    """Upload limits of the system running the rollout: at most max_uploads uploads at the same time and max_rate MB per second combined for all of them (bandwidth not limited if None). Use as a context manager around each upload and pass limiter to post_multipart()."""
+
+    def __init__(self, max_uploads=DEFAULT_MAX_UPLOADS, max_rate=None):
+        self.max_uploads = max(1, max_uploads)
+        self.max_rate = max_rate
+        self.limiter = BandwidthLimiter(max_rate * MB) if max_rate else None
+        self._semaphore = threading.BoundedSemaphore(self.max_uploads)
+
+    def __enter__(self):
+        self._semaphore.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._semaphore.release()
+
+
+def _scheduled(data):
+    # Update jobs needing a server reboot stay Scheduled until the reboot
+    return data.get("JobState") == "Scheduled" or "schedule" in (data.get("Message") or "").lower()
+
+
+class HostRollout(object):
+    """Apply RepositoryPackages to one iDRAC. Packages already installed are skipped unless force is True, run() returns RolloutResult with status PASS (every applied job completed), FAIL (a job, upload or reboot failed) or ERROR (iDRAC not reachable or unexpected response)."""
+
+    def __init__(self, idrac_ip, packages, username=None, password=None, x_auth_token=None, verify_cert=False, budget=None, force=False, job_timeout=DEFAULT_JOB_TIMEOUT, wave=1):
+        self.idrac_ip = idrac_ip
+        self.packages = packages
+        self.verify_cert = verify_cert
+        self.budget = budget if budget is not None else UploadBudget()
+        self.force = force
+        self.job_timeout = job_timeout
+        self.wave = wave
+        self.transport = RedfishTransport(idrac_ip, verify_cert=verify_cert, username=username, password=password, x_auth_token=x_auth_token)
+        self.applied = []
+        self.skipped = []
+        self.failed = []
+
+    def _log(self, message):
+        logging.info("- INFO, iDRAC %s, %s" % (self.idrac_ip, message))
+
+    def _packages_needed(self, filenames):
+        if self.force or not filenames:
+            return list(filenames)
+        try:
+            inventory = get_firmware_inventory(self.idrac_ip, transport=self.transport)
+        except (requests.RequestException, ValueError) as error:
+            self._log("unable to get firmware inventory to compare package versions, every package will be applied. Detailed error information: %s" % error)
+            return list(filenames)
+        needed = []
+        for filename in filenames:
+            package = read_dup_package(filename)
+            if package is not None and check_dup_version(package, inventory).update_needed is False:
+                self.skipped.append(os.path.basename(filename))
+            else:
+                needed.append(filename)
+        return needed
+
+    def _upload(self, filename):
+        # Returns job ID, None if iDRAC rejected the package (status code 400, same as the single iDRAC script the package is skipped)
+        payload = {"Targets": [], "@Redfish.OperationApplyTime": "OnReset", "Oem": {}}
+        files = {'UpdateParameters': (None, json.dumps(payload), 'application/json'),
+                 'UpdateFile': (os.path.basename(filename), open(filename, 'rb'), 'application/octet-stream')}
+        with self.budget:
+            start_time = time.time()
+            response = post_multipart(MULTIPART_UPLOAD_URI, files, transport=self.transport, log_progress=False, limiter=self.budget.limiter)
+            elapsed = time.time() - start_time
+        if response.status_code == 400:
+            logging.error("- FAIL, iDRAC %s, upload of package \"%s\" failed, status code 400 returned, detailed error: %s" % (self.idrac_ip, os.path.basename(filename), response.text))
+            self.failed.append(os.path.basename(filename))
+            return None
+        if response.status_code != 202 or "Location" not in response.headers:
+            raise _HostError("upload of package \"%s\" failed, status code %s returned" % (os.path.basename(filename), response.status_code))
+        job_id = response.headers["Location"].split("/")[-1]
+        self._log("package \"%s\" uploaded in %s seconds (%.2f MB/s), job ID %s" % (os.path.basename(filename), round(elapsed, 1), os.path.getsize(filename) / float(MB) / max(elapsed, 0.001), job_id))
+        return job_id
+
+    def _watch(self, jobs, until=None):
+        # jobs is a dictionary of job ID and package file name, returns job IDs scheduled (waiting for server reboot)
+        scheduled = []
+        with JobWatcher(verify_cert=self.verify_cert, timeout=self.job_timeout) as watcher:
+            watcher.add_host(self.idrac_ip, transport=self.transport)
+            for job_id in jobs:
+                watcher.watch(self.idrac_ip, job_id, until=until)
+            for status in watcher.results():
+                package = os.path.basename(jobs[status.job_id])
+                if status.failed:
+                    logging.error("- FAIL, iDRAC %s, job ID %s for package \"%s\" failed, %s" % (self.idrac_ip, status.job_id, package, status.error or status.message))
+                    self.failed.append(package)
+                elif until is not None and _scheduled(status.data):
+                    scheduled.append(status.job_id)
+                else:
+                    self._log("job ID %s for package \"%s\" completed" % (status.job_id, package))
+                    self.applied.append(package)
+        return scheduled
+
+    def _apply(self, filenames):
+        # Upload every package before waiting on jobs, iDRAC stages the previous job while the next package is uploaded
+        jobs = collections.OrderedDict()
+        for filename in filenames:
+            job_id = self._upload(filename)
+            if job_id:
+                jobs[job_id] = filename
+        scheduled = self._watch(jobs, until=_scheduled)
+        if scheduled:
+            self._reboot_server()
+            self._watch(collections.OrderedDict((i, jobs[i]) for i in scheduled))
+        return bool(jobs)
+
+    def _power_state(self):
+        response = self.transport.get(SYSTEM_URI)
+        if response.status_code != 200:
+            raise _HostError("GET %s failed, status code %s returned" % (SYSTEM_URI, response.status_code))
+        return response.json().get("PowerState")
+
+    def _reset(self, reset_type):
+        response = self.transport.post(RESET_URI, json={"ResetType": reset_type})
+        if response.status_code != 204:
+            raise _HostError("POST %s with ResetType %s failed, status code %s returned" % (RESET_URI, reset_type, response.status_code))
+
+    def _reboot_server(self):
+        # Graceful shutdown, forced shutdown if the server is still on after SHUTDOWN_TIMEOUT, then power on
+        self._log("rebooting the server to apply scheduled update jobs")
+        if self._power_state() == "On":
+            self._reset("GracefulShutdown")
+            start_time = time.time()
+            while self._power_state() != "Off":
+                if time.time() - start_time > SHUTDOWN_TIMEOUT:
+                    self._log("unable to perform graceful shutdown, performing forced shutdown")
+                    self._reset("ForceOff")
+                    time.sleep(10)
+                    if self._power_state() != "Off":
+                        raise _HostError("server not in OFF state after forced shutdown")
+                    break
+                time.sleep(10)
+        self._reset("On")
+
+    def _wait_for_idrac_reset(self):
+        forget_idrac(self.idrac_ip)
+        if not wait_for_idrac(self.idrac_ip, self.verify_cert, timeout=IDRAC_RESET_TIMEOUT):
+            raise _HostError("iDRAC did not respond within %s seconds after the update" % IDRAC_RESET_TIMEOUT)
+
+    def _run(self):
+        standard = self._packages_needed(self.packages.standard)
+        cpld = self._packages_needed(self.packages.cpld)
+        idrac = self._packages_needed(self.packages.idrac)
+        self._log("%s package(s) to apply, %s already installed" % (len(standard) + len(cpld) + len(idrac), len(self.skipped)))
+        if standard:
+            self._apply(standard)
+        for filename in cpld:
+            if self._apply([filename]):
+                self._wait_for_idrac_reset()
+        for filename in idrac:
+            job_id = self._upload(filename)
+            if job_id:
+                self._watch({job_id: filename})
+                self._wait_for_idrac_reset()
+        if self.applied:
+            forget_firmware_inventory(self.idrac_ip)
+
+    def run(self):
+        start_time = time.time()
+        status, error = "PASS", None
+        try:
+            self._run()
+            if self.failed:
+                status, error = "FAIL", "%s package(s) failed: %s" % (len(self.failed), ", ".join(self.failed))
+        except _HostError as host_error:
+            status, error = "FAIL", str(host_error)
+        except (requests.RequestException, ValueError, OSError) as host_error:
+            status, error = "ERROR", str(host_error)
+        finally:
+            self.transport.close()
+        return RolloutResult(self.idrac_ip, self.wave, status, self.applied, self.skipped, self.failed, time.time() - start_time, error)
+
+
+def run_rollout(idrac_ips, packages, username=None, password=None, x_auth_token=None, verify_cert=False, canary_hosts=DEFAULT_CANARY_HOSTS, wave_size=DEFAULT_WAVE_SIZE,
+                max_hosts=DEFAULT_MAX_HOSTS, max_uploads=DEFAULT_MAX_UPLOADS, max_upload_rate=None, max_failed_percent=DEFAULT_MAX_FAILED_PERCENT, force=False,
+                job_timeout=DEFAULT_JOB_TIMEOUT):
+    """Generator applying RepositoryPackages to every iDRAC wave by wave (see plan_waves()), yields RolloutResult as each iDRAC completes. Up to max_hosts iDRACs of a wave are updated at the same time, uploads share one UploadBudget (max_uploads, max_upload_rate in MB per second). Rollout halts if any canary iDRAC fails or more than max_failed_percent of a later wave fails, iDRACs of remaining waves are yielded with status HALTED."""
+    budget = UploadBudget(max_uploads, max_upload_rate)
+    waves = plan_waves(idrac_ips, canary_hosts, wave_size)
+    for wave_number, wave in enumerate(waves, 1):
+        canary = bool(canary_hosts) and wave_number == 1
+        logging.info("\n- INFO, starting %s %s of %s, %s iDRAC(s)\n" % ("canary wave" if canary else "wave", wave_number, len(waves), len(wave)))
+        failed = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_hosts, len(wave)))) as executor:
+            futures = [executor.submit(HostRollout(idrac_ip, packages, username, password, x_auth_token, verify_cert, budget, force, job_timeout, wave_number).run) for idrac_ip in wave]
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                if result.status != "PASS":
+                    failed += 1
+                yield result
+        if canary and failed:
+            reason = "rollout halted, %s of %s canary iDRAC(s) failed" % (failed, len(wave))
+        elif failed * 100.0 / len(wave) > max_failed_percent:
+            reason = "rollout halted, %s of %s iDRAC(s) failed in wave %s (max %s%%)" % (failed, len(wave), wave_number, max_failed_percent)
+        else:
+            continue
+        logging.error("\n- FAIL, %s" % reason)
+        for halted_wave_number, halted_wave in enumerate(waves[wave_number:], wave_number + 1):
+            for idrac_ip in halted_wave:
+                yield RolloutResult(idrac_ip, halted_wave_number, "HALTED", [], [], [], 0.0, reason)
+        return
+
+
+def rollout_summary(results):
+    """Return summary dictionary for a list of RolloutResult: total count, count per status, packages applied and skipped, failed or halted iDRAC IPs with error and longest iDRAC rollout in seconds"""
+    status_count = collections.OrderedDict((i, 0) for i in ROLLOUT_STATUSES)
+    for result in results:
+        status_count[result.status] += 1
+    return {"total": len(results), "status": dict(status_count),
+            "packages_applied": sum(len(i.applied) for i in results), "packages_skipped": sum(len(i.skipped) for i in results),
+            "failed": [{"idrac_ip": i.idrac_ip, "wave": i.wave, "status": i.status, "error": i.error} for i in results if i.status != "PASS"],
+            "longest_seconds": round(max([i.elapsed for i in results] or [0]), 1)}
@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Server configuration profile (SCP) local export. Once the export job completes, iDRAC returns the exported profile
+# as the body of the task GET response. The body is read as bytes (GET with stream=True) and detected by content-type,
+# XML profiles are fed chunk by chunk to an expat parser and written to disk indented one element per line as they are
+# parsed, JSON profiles are parsed once and written with json.dump(). Files are written under a temporary .part name
+# and renamed once complete.
+
+import collections
+import itertools
+import json
+import os
+import xml.parsers.expat
+
+SCP_CHUNK_SIZE = 64 * 1024
+XML_INDENT = "  "
+
+ScpExport = collections.namedtuple("ScpExport", ["filename", "export_format", "attributes", "size"])
+
+
+def _escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _quote(value):
+    value = _escape(value).replace('"', "&quot;")
+    if "\n" in value or "\r" in value or "\t" in value:
+        value = value.replace("\n", "&#10;").replace("\r", "&#13;").replace("\t", "&#9;")
+    return '"%s"' % value
+
+
+def _json_attributes(data):
+    try:
+        return sum(len(i.get("Attributes", [])) for i in data["SystemConfiguration"]["Components"])
+    except (KeyError, TypeError, AttributeError):
+        return 0
+
+
+class ScpXmlFormatter(object):
+    """Incremental XML pretty printer, feed() response body chunks (bytes) as they are received and close() once the body is complete. Elements with only text are written on one line, comments (attributes iDRAC exports commented out) are kept. Lines are written to every file object in outputs. Raises xml.parsers.expat.ExpatError if the body is not well formed XML."""
+
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.attributes = 0
+        self._depth = 0
+        self._pending = None
+        self._text = ""
+        self._lines = []
+        self._parser = xml.parsers.expat.ParserCreate()
+        self._parser.ordered_attributes = True
+        self._parser.buffer_text = True
+        self._parser.XmlDeclHandler = self._declaration
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._characters
+        self._parser.CommentHandler = self._comment
+
+    def _start_tag(self, name, attributes):
+        if len(attributes) == 2:
+            return '<%s %s=%s>' % (name, attributes[0], _quote(attributes[1]))
+        return "<%s%s>" % (name, "".join(" %s=%s" % (attributes[i], _quote(attributes[i + 1])) for i in range(0, len(attributes), 2)))
+
+    def _flush_pending(self):
+        # Pending element has child elements or comments, its start tag goes on its own line
+        if self._pending is not None:
+            self._lines.append("%s%s" % (XML_INDENT * (self._depth - 1), self._start_tag(*self._pending)))
+            self._pending = None
+        text = self._text.strip()
+        if text:
+            self._lines.append("%s%s" % (XML_INDENT * self._depth, _escape(text)))
+        self._text = ""
+
+    def _declaration(self, version, encoding, standalone):
+        self._lines.append('<?xml version="%s"%s?>' % (version, ' encoding="%s"' % encoding if encoding else ""))
+
+    def _start(self, name, attributes):
+        self._flush_pending()
+        self._pending = (name, attributes)
+        self._depth += 1
+        if name == "Attribute":
+            self.attributes += 1
+
+    def _end(self, name):
+        if self._pending is not None:
+            self._lines.append("%s%s%s</%s>" % (XML_INDENT * (self._depth - 1), self._start_tag(*self._pending), _escape(self._text), name))
+            self._pending = None
+            self._text = ""
+        else:
+            self._flush_pending()
+            self._lines.append("%s</%s>" % (XML_INDENT * (self._depth - 1), name))
+        self._depth -= 1
+
+    def _characters(self, data):
+        self._text += data
+
+    def _comment(self, data):
+        self._flush_pending()
+        self._lines.append("%s<!-- %s -->" % (XML_INDENT * self._depth, data.strip()))
+
+    def _write_lines(self):
+        if self._lines:
+            text = "\n".join(self._lines) + "\n"
+            for output in self.outputs:
+                output.write(text)
+            self._lines = []
+
+    def feed(self, chunk):
+        self._parser.Parse(chunk, False)
+        self._write_lines()
+
+    def close(self):
+        self._parser.Parse(b"", True)
+        self._write_lines()
+
+
+def read_task_response(response):
+    """Read task GET response (executed with stream=True). Returns ("XML", chunks) when the body is an exported XML profile (chunks is an iterator of body bytes, nothing is read past the first chunk), ("JSON", data) when the body is an exported JSON profile and (None, data) for task status JSON. Raises ValueError if the body is not XML and not valid JSON."""
+    chunks = response.iter_content(chunk_size=SCP_CHUNK_SIZE)
+    first_chunk = next(chunks, b"")
+    if "xml" in response.headers.get("Content-Type", "").lower() or first_chunk.lstrip().startswith(b"<"):
+        return "XML", itertools.chain([first_chunk], chunks)
+    data = json.loads(first_chunk + b"".join(chunks))
+    if isinstance(data, dict) and "SystemConfiguration" in data:
+        return "JSON", data
+    return None, data
+
+
+def _write_file(filename, write):
+    temporary_filename = "%s.part" % filename
+    try:
+        with open(temporary_filename, "w", encoding="utf-8") as open_file:
+            attributes = write(open_file)
+        os.replace(temporary_filename, filename)
+    finally:
+        if os.path.exists(temporary_filename):
+            os.remove(temporary_filename)
+    return attributes
+
+
+def write_scp_xml(chunks, filename, echo=None):
+    """Write XML profile body chunks (bytes) to filename indented one element per line, echo is an optional file object (sys.stdout) the formatted profile is also written to. Returns ScpExport."""
+    def write(open_file):
+        formatter = ScpXmlFormatter([open_file] if echo is None else [open_file, echo])
+        for chunk in chunks:
+            formatter.feed(chunk)
+        formatter.close()
+        return formatter.attributes
+    attributes = _write_file(filename, write)
+    return ScpExport(filename, "XML", attributes, os.path.getsize(filename))
+
+
+def write_scp_json(data, filename):
+    """Write JSON profile (parsed task response body) to filename with 4 space indent. Returns ScpExport."""
+    def write(open_file):
+        json.dump(data, open_file, indent=4)
+        return _json_attributes(data)
+    attributes = _write_file(filename, write)
+    return ScpExport(filename, "JSON", attributes, os.path.getsize(filename))
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Persistent iDRAC X-auth token cache shared by the standalone Redfish scripts. A token is created once per iDRAC
+# user and reused by later script runs until it expires or the iDRAC rejects it, instead of every Redfish call
+# authenticating with username/password.
+#
+# Tokens are stored in one file per iDRAC user under ~/.idrac_redfish/x_auth_tokens, readable by the current user
+# only. Set environment variable IDRAC_REDFISH_TOKEN_CACHE to a different directory or to "off" to disable caching.
+# If the directory can't be created or written to, no token is returned and scripts use username/password.
+#
+# Each cached token is bound to a salted PBKDF2 hash of the username and password used to create it. A run passing in
+# a different password (wrong or rotated) never gets the cached token, a new session is created with the password
+# passed in instead. A token is checked against the iDRAC again only when it was last checked more than
+# VERIFY_INTERVAL seconds ago, back to back script runs don't spend a request on it.
+
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import os
+import tempfile
+import time
+
+import requests
+
+# Default iDRAC session idle timeout in seconds, used when SessionService can't be queried
+DEFAULT_SESSION_TIMEOUT = 1800
+# Tokens this close to idle timeout are not reused
+EXPIRY_MARGIN = 60
+REQUEST_TIMEOUT = 30
+# Cached tokens checked against the iDRAC within this many seconds are reused without checking them again
+VERIFY_INTERVAL = 300
+CREDENTIALS_HASH_ITERATIONS = 100000
+
+
+def _cache_directory():
+    directory = os.environ.get("IDRAC_REDFISH_TOKEN_CACHE", "")
+    if directory.lower() in ("off", "none", "false", "0"):
+        return None
+    if not directory:
+        directory = os.path.join(os.path.expanduser("~"), ".idrac_redfish", "x_auth_tokens")
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+            os.chmod(directory, 0o700)
+    except OSError:
+        logging.debug("- INFO, unable to create X-auth token cache directory %s" % directory)
+        return None
+    # A token which can't be cached would create a new iDRAC session every script run, username/password is used instead
+    if not os.access(directory, os.W_OK):
+        logging.debug("- INFO, X-auth token cache directory %s is not writable" % directory)
+        return None
+    return directory
+
+
+def _cache_file(idrac_ip, idrac_username):
+    directory = _cache_directory()
+    if not directory:
+        return None
+    key = hashlib.sha256(("%s|%s" % (idrac_ip, idrac_username)).encode("utf-8")).hexdigest()
+    return os.path.join(directory, "%s.json" % key)
+
+
+def _read_cache(filename):
+    try:
+        with open(filename, "r") as open_file:
+            return json.load(open_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_cache(filename, entry):
+    # Write to a temp file created with user only permissions, then rename so concurrent script runs never read a partial file
+    try:
+        file_descriptor, temp_filename = tempfile.mkstemp(dir=os.path.dirname(filename))
+    except (IOError, OSError):
+        logging.debug("- INFO, unable to write X-auth token cache file %s" % filename)
+        return
+    try:
+        with os.fdopen(file_descriptor, "w") as open_file:
+            json.dump(entry, open_file)
+        os.chmod(temp_filename, 0o600)
+        os.replace(temp_filename, filename)
+    except (IOError, OSError):
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+        logging.debug("- INFO, unable to write X-auth token cache file %s" % filename)
+
+
+def _credentials_hash(idrac_username, idrac_password, salt):
+    return binascii.hexlify(hashlib.pbkdf2_hmac("sha256", ("%s|%s" % (idrac_username, idrac_password)).encode("utf-8"), binascii.unhexlify(salt), CREDENTIALS_HASH_ITERATIONS)).decode("ascii")
+
+
+def _credentials_match(entry, idrac_username, idrac_password):
+    if not entry.get("credentials_salt") or not entry.get("credentials_hash"):
+        return False
+    return hmac.compare_digest(entry["credentials_hash"], _credentials_hash(idrac_username, idrac_password, entry["credentials_salt"]))
+
+
+def _remove_cache(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+def get_session_uri(idrac_ip, verify_cert=False, auth=None):
+    """Return session collection URI based off Redfish version, same selection as CreateXAuthTokenSessionREDFISH.py"""
+    response = requests.get('https://%s/redfish/v1' % idrac_ip, verify=verify_cert, auth=auth, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 200:
+        return None
+    redfish_version = int(response.json()["RedfishVersion"].replace(".", ""))
+    if redfish_version >= 160:
+        return "redfish/v1/SessionService/Sessions"
+    else:
+        return "redfish/v1/Sessions"
+
+
+def create_x_auth_session(idrac_ip, idrac_username, idrac_password, verify_cert=False):
+    """Create X-auth token session, returns cache entry dictionary or None if the session could not be created"""
+    session_uri = get_session_uri(idrac_ip, verify_cert, auth=(idrac_username, idrac_password))
+    if not session_uri:
+        return None
+    url = 'https://%s/%s' % (idrac_ip, session_uri)
+    payload = {"UserName": idrac_username, "Password": idrac_password}
+    headers = {'content-type': 'application/json'}
+    response = requests.post(url, data=json.dumps(payload), headers=headers, verify=verify_cert, timeout=REQUEST_TIMEOUT)
+    if response.status_code != 201:
+        logging.debug("- INFO, unable to create X-auth token session, status code %s returned" % response.status_code)
+        return None
+    x_auth_token = response.headers["X-Auth-Token"]
+    session_location = response.headers.get("Location")
+    session_timeout = DEFAULT_SESSION_TIMEOUT
+    response = requests.get('https://%s/redfish/v1/SessionService' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': x_auth_token}, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 200:
+        session_timeout = response.json().get("SessionTimeout", DEFAULT_SESSION_TIMEOUT)
+    current_time = time.time()
+    salt = binascii.hexlify(os.urandom(16)).decode("ascii")
+    return {"idrac_ip": idrac_ip, "idrac_username": idrac_username, "x_auth_token": x_auth_token,
+            "session_location": session_location, "session_timeout": session_timeout,
+            "credentials_salt": salt, "credentials_hash": _credentials_hash(idrac_username, idrac_password, salt),
+            "created": current_time, "last_used": current_time, "last_verified": current_time}
+
+
+def get_cached_x_auth_token(idrac_ip, idrac_username, idrac_password, verify_cert=False):
+    """Return X-auth token for the iDRAC user. Cached token is reused if it was created with the same password, has not expired and iDRAC still accepts it (checked at most every VERIFY_INTERVAL seconds), otherwise a new X-auth token session is created and cached. Returns None if caching is disabled or a session can't be created, caller should then use username/password."""
+    filename = _cache_file(idrac_ip, idrac_username)
+    if not filename or not idrac_password:
+        return None
+    entry = _read_cache(filename)
+    current_time = time.time()
+    try:
+        if entry and not _credentials_match(entry, idrac_username, idrac_password):
+            # Password passed in is not the one the token was created with, the token must not authenticate this run
+            logging.debug("- INFO, cached X-auth token was created with different credentials, creating new X-auth token session")
+            delete_cached_x_auth_token(idrac_ip, idrac_username, verify_cert)
+            entry = None
+        if entry and current_time - entry["last_used"] < entry["session_timeout"] - EXPIRY_MARGIN:
+            if current_time - entry.get("last_verified", 0) < VERIFY_INTERVAL:
+                entry["last_used"] = current_time
+                _write_cache(filename, entry)
+                return entry["x_auth_token"]
+            response = requests.get('https://%s/redfish/v1/SessionService' % idrac_ip, verify=verify_cert, headers={'X-Auth-Token': entry["x_auth_token"]}, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                entry["last_used"] = current_time
+                entry["last_verified"] = current_time
+                _write_cache(filename, entry)
+                return entry["x_auth_token"]
+            logging.debug("- INFO, cached X-auth token rejected, status code %s returned, creating new X-auth token session" % response.status_code)
+        if entry:
+            _remove_cache(filename)
+        entry = create_x_auth_session(idrac_ip, idrac_username, idrac_password, verify_cert)
+    except requests.RequestException as error_message:
+        logging.debug("- INFO, unable to get X-auth token, detailed error information: %s" % error_message)
+        return None
+    if not entry:
+        return None
+    _write_cache(filename, entry)
+    return entry["x_auth_token"]
+
+
+def delete_cached_x_auth_token(idrac_ip, idrac_username, verify_cert=False):
+    """Delete cached X-auth token for the iDRAC user and its iDRAC session. Returns True if a cached token was found."""
+    filename = _cache_file(idrac_ip, idrac_username)
+    if not filename:
+        return False
+    entry = _read_cache(filename)
+    if not entry:
+        return False
+    if entry.get("session_location"):
+        try:
+            requests.delete('https://%s%s' % (idrac_ip, entry["session_location"]), verify=verify_cert, headers={'X-Auth-Token': entry["x_auth_token"]}, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException:
+            logging.debug("- INFO, unable to delete iDRAC session %s" % entry["session_location"])
+    _remove_cache(filename)
+    return True
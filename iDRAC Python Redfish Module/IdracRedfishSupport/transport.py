@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Pooled keep-alive HTTP transport used for all iDRAC Redfish calls.
+
+import json
+import threading
+import time
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+# (connect timeout, read timeout) in seconds applied to every request unless the caller passes timeout
+DEFAULT_TIMEOUT = (10, 300)
+DEFAULT_POOL_MAXSIZE = 10
+
+
+def decode_json(content):
+    """Return JSON decoded response body (bytes or str) or None if the body is empty or not JSON. Used for responses of RedfishTransport and of the asyncio client so both parse response bodies the same way."""
+    if not content:
+        return None
+    try:
+        return json.loads(content.decode("utf-8-sig") if isinstance(content, bytes) else content)
+    except ValueError:
+        return None
+
+
+def split_host(idrac_ip):
+    """Return (host, port) for an iDRAC address passed in as IP, hostname, IP:port, hostname:port, IPv6 address or [IPv6 address]:port, default port is 443"""
+    if idrac_ip.startswith("["):
+        host, _, port = idrac_ip[1:].partition("]")
+        return host, int(port.lstrip(":") or 443)
+    if idrac_ip.count(":") == 1:
+        host, port = idrac_ip.split(":")
+        return host, int(port)
+    return idrac_ip, 443
+
+
+def host_address(idrac_ip):
+    """Return iDRAC address as used in a URL or HTTP Host header, IPv6 addresses without port are enclosed in brackets"""
+    if idrac_ip.count(":") > 1 and not idrac_ip.startswith("["):
+        return "[%s]" % idrac_ip
+    return idrac_ip
+
+
+class RedfishTransport(object):
+    """Keep-alive HTTP transport for one iDRAC. All Redfish calls executed through the same transport reuse pooled TCP/TLS connections instead of opening a new connection per call. Credentials (username/password or X-auth token) and SSL cert verification are applied once to the underlying session, a default timeout is applied to every request and per request latency is recorded."""
+
+    def __init__(self, idrac_ip, verify_cert=False, username=None, password=None, x_auth_token=None, timeout=DEFAULT_TIMEOUT, pool_maxsize=DEFAULT_POOL_MAXSIZE):
+        self.idrac_ip = idrac_ip
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.verify = verify_cert
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats_lock = threading.Lock()
+        self.set_auth(username=username, password=password, x_auth_token=x_auth_token)
+        self.reset_statistics()
+
+    @property
+    def verify_cert(self):
+        return self.session.verify
+
+    def set_auth(self, username=None, password=None, x_auth_token=None):
+        """Set credentials used for every request. X-auth token takes priority over username/password when both are passed in."""
+        if x_auth_token:
+            self.session.auth = None
+            self.session.headers["X-Auth-Token"] = x_auth_token
+        else:
+            self.session.headers.pop("X-Auth-Token", None)
+            if username:
+                self.session.auth = (username, password)
+            else:
+                self.session.auth = None
+
+    def url(self, uri):
+        """Return complete URL for a Redfish URI, URI can be passed in with or without leading slash or already be a complete URL"""
+        if uri.startswith("http://") or uri.startswith("https://"):
+            return uri
+        return "https://%s/%s" % (host_address(self.idrac_ip), uri.lstrip("/"))
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        # Passed per request, REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE environment variables override session level verify
+        kwargs.setdefault("verify", self.session.verify)
+        start_time = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(url), **kwargs)
+        except requests.RequestException:
+            self._record(method, time.perf_counter() - start_time, failed=True)
+            raise
+        self._record(method, time.perf_counter() - start_time, failed=False)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def _record(self, method, elapsed, failed):
+        with self._stats_lock:
+            self._requests += 1
+            if failed:
+                self._failures += 1
+            self._total_seconds += elapsed
+            self._min_seconds = min(self._min_seconds, elapsed)
+            self._max_seconds = max(self._max_seconds, elapsed)
+            self._methods[method] = self._methods.get(method, 0) + 1
+
+    def reset_statistics(self):
+        with self._stats_lock:
+            self._requests = 0
+            self._failures = 0
+            self._total_seconds = 0.0
+            self._min_seconds = float("inf")
+            self._max_seconds = 0.0
+            self._methods = {}
+
+    def statistics(self):
+        """Return dictionary of request latency statistics collected since the transport was created or statistics were last reset"""
+        with self._stats_lock:
+            if self._requests:
+                average = self._total_seconds / self._requests
+                minimum = self._min_seconds
+            else:
+                average = 0.0
+                minimum = 0.0
+            return {"idrac_ip": self.idrac_ip, "requests": self._requests, "failures": self._failures, "methods": dict(self._methods),
+                    "total_seconds": round(self._total_seconds, 3), "average_seconds": round(average, 3),
+                    "min_seconds": round(minimum, 3), "max_seconds": round(self._max_seconds, 3)}
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2022, Dell, Inc.
+#
+# This software is licensed to you under the GNU General Public License,
+# version 2 (GPLv2). There is NO WARRANTY for this software, express or
+# implied, including the implied warranties of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. You should have received a copy of GPLv2
+# along with this software; if not, see
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0.txt.
+#
+# Streaming multipart/form-data upload used for firmware packages (UpdateService/MultipartUpload and HttpPushUri).
+# requests.post(files=...) builds the complete multipart body in memory before sending, the encoder here reads each
+# file in fixed size chunks while the body is sent so memory use stays at one chunk per upload no matter the package
+# size. Upload progress and MB/s are reported through a callback and bandwidth can be limited per upload, or across
+# all uploads sharing one BandwidthLimiter (example: every upload of a fleet firmware rollout from one jump host).
+
+import collections
+import logging
+import os
+import threading
+import time
+import uuid
+
+import requests
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Seconds between upload progress log messages
+DEFAULT_PROGRESS_INTERVAL = 10
+MB = 1024 * 1024
+
+UploadProgress = collections.namedtuple("UploadProgress", ["bytes_sent", "total_bytes", "elapsed", "mb_per_second", "percent_complete"])
+
+
+class BandwidthLimiter(object):
+    """Bandwidth budget shared by any number of concurrent uploads, max_rate is in bytes per second. Each upload calls consume() after sending a chunk and is delayed so the combined rate of all uploads stays at or below max_rate."""
+
+    def __init__(self, max_rate):
+        self.max_rate = float(max_rate)
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def consume(self, size):
+        # Every chunk reserves the next size / max_rate seconds of the budget, uploads sleep until their reservation ends
+        with self._lock:
+            now = time.time()
+            self._next_time = max(self._next_time, now) + size / self.max_rate
+            wait_time = self._next_time - now
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def _part_length(content):
+    if isinstance(content, bytes):
+        return len(content)
+    current_position = content.tell()
+    content.seek(0, os.SEEK_END)
+    length = content.tell() - current_position
+    content.seek(current_position)
+    return length
+
+
+class MultipartEncoder(object):
+    """Iterable multipart/form-data request body. fields uses the same format as requests files argument: dictionary or list of (name, (filename, content, content_type)) where content is a string, bytes or a file object opened in binary mode. File objects are read chunk_size bytes at a time while the body is sent and closed once sent. max_rate limits upload bandwidth in bytes per second, limiter is an optional BandwidthLimiter shared with other uploads, callback is called with UploadProgress after every chunk sent. Pass in as requests data argument along with Content-Type header set to content_type."""
+
+    def __init__(self, fields, chunk_size=DEFAULT_CHUNK_SIZE, max_rate=None, callback=None, limiter=None):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = "multipart/form-data; boundary=%s" % self.boundary
+        self.chunk_size = chunk_size
+        self.max_rate = max_rate
+        self.limiter = limiter
+        self.callback = callback
+        self.bytes_sent = 0
+        self.start_time = None
+        self._parts = []
+        if isinstance(fields, dict):
+            fields = fields.items()
+        for name, (filename, content, content_type) in fields:
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            header = '--%s\r\nContent-Disposition: form-data; name="%s"' % (self.boundary, name)
+            if filename:
+                header += '; filename="%s"' % filename
+            if content_type:
+                header += "\r\nContent-Type: %s" % content_type
+            self._parts.append((header + "\r\n\r\n").encode("utf-8"))
+            self._parts.append(content)
+            self._parts.append(b"\r\n")
+        self._parts.append(("--%s--\r\n" % self.boundary).encode("utf-8"))
+        self.total_bytes = sum(_part_length(i) for i in self._parts)
+
+    def __len__(self):
+        return self.total_bytes
+
+    def progress(self):
+        """Return UploadProgress for the bytes sent so far"""
+        elapsed = time.time() - self.start_time if self.start_time else 0.0
+        mb_per_second = self.bytes_sent / MB / elapsed if elapsed > 0 else 0.0
+        percent_complete = int(self.bytes_sent * 100 / self.total_bytes) if self.total_bytes else 100
+        return UploadProgress(self.bytes_sent, self.total_bytes, elapsed, mb_per_second, percent_complete)
+
+    def _throttle(self):
+        # Sleep until the average rate since upload start drops back to max_rate
+        if self.max_rate:
+            wait_time = self.start_time + self.bytes_sent / float(self.max_rate) - time.time()
+            if wait_time > 0:
+                time.sleep(wait_time)
+
+    def _sent(self, chunk):
+        self.bytes_sent += len(chunk)
+        if self.limiter is not None:
+            self.limiter.consume(len(chunk))
+        self._throttle()
+        if self.callback:
+            self.callback(self.progress())
+
+    def __iter__(self):
+        self.start_time = time.time()
+        self.bytes_sent = 0
+        try:
+            for part in self._parts:
+                if isinstance(part, bytes):
+                    for index in range(0, len(part), self.chunk_size):
+                        chunk = part[index:index + self.chunk_size]
+                        yield chunk
+                        self._sent(chunk)
+                    continue
+                while True:
+                    chunk = part.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+                    self._sent(chunk)
+        finally:
+            self.close()
+
+    def close(self):
+        """Close file objects passed in fields"""
+        for part in self._parts:
+            if not isinstance(part, bytes):
+                part.close()
+
+
+def progress_logger(label="", interval=DEFAULT_PROGRESS_INTERVAL):
+    """Return upload callback logging sent MB, percent complete and MB/s every interval seconds and once the upload completes"""
+    last_logged = [0]
+
+    def log_progress(progress):
+        if progress.bytes_sent < progress.total_bytes and time.time() - last_logged[0] < interval:
+            return
+        last_logged[0] = time.time()
+        logging.info("- INFO, %suploaded %.1f of %.1f MB (%s%%), %.2f MB/s" % ("%s " % label if label else "", progress.bytes_sent / float(MB),
+                     progress.total_bytes / float(MB), progress.percent_complete, progress.mb_per_second))
+    return log_progress
+
+
+def post_multipart(url, files, transport=None, max_rate=None, chunk_size=DEFAULT_CHUNK_SIZE, callback=None, log_progress=True, limiter=None, **kwargs):
+    """POST files (requests files argument format) as a streamed multipart/form-data body. max_rate is the max upload rate in MB per second, default is no limit. limiter is an optional BandwidthLimiter shared by concurrent uploads. Upload progress is logged unless log_progress is False or callback is passed in. Request is executed using the RedfishTransport if passed in, otherwise requests.post, other arguments (headers, verify, auth) are passed to the request. Returns the response."""
+    if callback is None and log_progress:
+        fields = files.values() if isinstance(files, dict) else [i[1] for i in files]
+        callback = progress_logger(" ".join("\"%s\"" % i[0] for i in fields if i[0]))
+    body = MultipartEncoder(files, chunk_size, max_rate * MB if max_rate else None, callback, limiter)
+    headers = dict(kwargs.pop("headers", None) or {})
+    headers["Content-Type"] = body.content_type
+    try:
+        if transport is not None:
+            return transport.post(url, data=body, headers=headers, **kwargs)
+        return requests.post(url, data=body, headers=headers, **kwargs)
+    finally:
+        body.close()
+
@@ -13,7 +13,7 @@ LONG_DESCRIPTION = "Python module for iDRAC Redfish support to allow the user to
 # Setting up
 setup(
         name="IdracRedfishSupport", 
-        version="0.0.8",
+        version="0.0.9",
         license="GPLv2",
         author="Texas Roemer",
         author_email="texas_roemer@dell.com",
@@ -37,7 +37,8 @@ setup(
                  "ExportClearSerialDataLogsREDFISH.py","ExportFactoryConfigurationREDFISH.py","ExportHWInventoryREDFISH.py",
                  "ExportImportSSLCertificateREDFISH.py","ExportLCLogREDFISH.py","ExportServerScreenShotREDFISH.py",
                  "ExportSystemConfigurationLocalREDFISH.py","ExportSystemConfigurationNetworkShareREDFISH.py","ExportThermalHistoryREDFISH.py",
-                 "ExportVideoLogREDFISH.py","FirmwareUpdateLocalRepoREDFISH.py","GenerateCsrREDFISH.py",
+                 "ExportVideoLogREDFISH.py","FirmwareComplianceREDFISH.py","FirmwareRepositoryServerREDFISH.py","FirmwareRolloutREDFISH.py",
+                 "FirmwareUpdateLocalRepoREDFISH.py","FleetRunnerREDFISH.py","GenerateCsrREDFISH.py",
                  "GetAssemblyInventoryREDFISH.py","GetDHSDisksREDFISH.py","GetDeleteiDRACSessionsREDFISH.py",
                  "GetDiskOperationREDFISH.py","GetEthernetInterfacesREDFISH.py","GetFirmwareInventoryREDFISH.py",
                  "GetIdracLcLogsREDFISH.py","GetIdracLcSystemAttributesREDFISH.py","GetIdracMessageRegistryREDFISH.py",